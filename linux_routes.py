@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Linux路由数据源 - 直接解析 /proc/net/route 和 /proc/net/ipv6_route
+
+无需启动 ip/route 子进程，一次文件读取即可得到完整路由表，
+返回的 RouteTable 字段与 Windows 解析结果一致，可直接用于路由表格显示。
+与netlink数据源一致，不可达、禁止、黑洞等不转发的路由不显示。
+"""
+
+import os
+import socket
+import struct
+
+from route_profile import PROFILER, STAGE_READ, STAGE_PARSE
+from route_table import RouteTable
+
+# 内核路由标志（include/uapi/linux/route.h, include/uapi/linux/ipv6_route.h）
+RTF_UP = 0x0001
+RTF_GATEWAY = 0x0002
+RTF_REJECT = 0x0200
+RTF_IPV6_LOCAL = 0x80000000
+
+PROC_ROOT = '/proc'
+
+
+def _hex_to_ipv4(value):
+    """将 /proc/net/route 中的十六进制地址（主机字节序）转换为点分十进制"""
+    return socket.inet_ntoa(struct.pack('=I', int(value, 16)))
+
+
+def _hex_to_ipv6(value):
+    """将 /proc/net/ipv6_route 中的32位十六进制地址转换为IPv6字符串"""
+    return socket.inet_ntop(socket.AF_INET6, bytes.fromhex(value))
+
+
+def parse_proc_route(content):
+    """解析 /proc/net/route 内容，返回IPv4路由表（RouteTable）"""
+    routes = RouteTable()
+    lines = content.splitlines()
+
+    # 第一行为表头：Iface Destination Gateway Flags RefCnt Use Metric Mask MTU Window IRTT
+    for line in lines[1:]:
+        parts = line.split()
+        if len(parts) < 8:
+            continue
+
+        try:
+            flags = int(parts[3], 16)
+            # 不可达/禁止路由带有 RTF_REJECT；黑洞路由没有出接口，接口显示为 "*"
+            if not flags & RTF_UP or flags & RTF_REJECT or parts[0] == '*':
+                continue
+
+            gateway = 'On-link'
+            if flags & RTF_GATEWAY:
+                gateway = _hex_to_ipv4(parts[2])
+
+            routes.add(_hex_to_ipv4(parts[1]), _hex_to_ipv4(parts[7]), gateway,
+                       parts[0], str(int(parts[6])), persistent=False, table='main')
+        except (ValueError, struct.error, OSError):
+            # 跳过格式异常的行
+            continue
+
+    return routes
+
+
+def parse_proc_ipv6_route(content):
+    """解析 /proc/net/ipv6_route 内容，返回IPv6路由表（RouteTable）"""
+    routes = RouteTable()
+
+    # 每行格式：目标 前缀 源 源前缀 网关 跃点数 引用计数 使用计数 标志 设备（无表头）
+    for line in content.splitlines():
+        parts = line.split()
+        if len(parts) < 10:
+            continue
+
+        try:
+            flags = int(parts[8], 16)
+            # 不可达、禁止和黑洞路由都带有 RTF_REJECT
+            if not flags & RTF_UP or flags & RTF_REJECT:
+                continue
+
+            prefix_length = str(int(parts[1], 16))
+            destination = f"{_hex_to_ipv6(parts[0])}/{prefix_length}"
+
+            gateway = 'On-link'
+            if flags & RTF_GATEWAY:
+                gateway = _hex_to_ipv6(parts[4])
+
+            routes.add(destination, prefix_length, gateway, parts[9], str(int(parts[5], 16)),
+                       persistent=False, table='local' if flags & RTF_IPV6_LOCAL else 'main')
+        except (ValueError, OSError):
+            continue
+
+    return routes
+
+
+def get_linux_routes(version="IPv4", proc_root=PROC_ROOT):
+    """读取并解析Linux路由表
+
+    version: "IPv4" 或 "IPv6"
+    proc_root: procfs挂载点，便于在测试中指向采集到的样本目录
+    """
+    if version == "IPv4":
+        path = os.path.join(proc_root, 'net', 'route')
+        parser = parse_proc_route
+    else:
+        path = os.path.join(proc_root, 'net', 'ipv6_route')
+        parser = parse_proc_ipv6_route
+
+    with PROFILER.span(STAGE_READ):
+        with open(path, 'r', encoding='ascii', errors='ignore') as f:
+            content = f.read()
+
+    with PROFILER.span(STAGE_PARSE) as span:
+        routes = parser(content)
+        span.rows = len(routes)
+    return routes
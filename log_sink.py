@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+日志输出 - 后台线程安全的日志队列和有行数上限的日志框
+
+任何线程都可以写入日志，写入只是放入队列，不触碰Tk控件也不等待界面重绘；
+主线程按固定间隔批量取出并写入 Text 控件，控件只保留最近的若干行（环形缓冲），
+长时间运行时内存占用不会增长。
+"""
+
+import queue
+import tkinter as tk
+
+# 写入日志框的间隔（毫秒）
+DRAIN_INTERVAL = 100
+# 日志框最多保留的行数
+MAX_LINES = 1000
+
+
+class QueueLogSink:
+    """队列日志：write 可在任意线程调用，attach 之后由主线程定时写入日志框"""
+
+    def __init__(self, max_lines=MAX_LINES, interval=DRAIN_INTERVAL):
+        self.max_lines = max_lines
+        self.interval = interval
+        self._queue = queue.SimpleQueue()
+        self._text = None
+        self._after_id = None
+
+    def write(self, message):
+        """写入一条日志（不阻塞）"""
+        self._queue.put(message)
+
+    def attach(self, text):
+        """开始把队列中的日志定时写入 Text 控件（主线程中调用）"""
+        self._text = text
+        if self._after_id is None:
+            self._after_id = text.after(self.interval, self._drain)
+
+    def detach(self):
+        """停止写入日志框"""
+        if self._after_id is not None and self._text is not None:
+            self._text.after_cancel(self._after_id)
+        self._after_id = None
+        self._text = None
+
+    def _drain(self):
+        """取出队列中的全部日志，一次写入日志框（主线程中执行）"""
+        lines = []
+        try:
+            while True:
+                lines.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        text = self._text
+        if lines and text is not None:
+            # 超出上限的部分写入后也会被删除，直接跳过
+            if len(lines) > self.max_lines:
+                lines = lines[-self.max_lines:]
+
+            # 用户正在查看较早的日志时不自动滚动到底部
+            follow = text.yview()[1] >= 1.0
+            text.insert(tk.END, '\n'.join(lines) + '\n')
+
+            # 环形缓冲：删除最早的行（最后一行是末尾的空行）
+            excess = int(text.index('end-1c').split('.')[0]) - 1 - self.max_lines
+            if excess > 0:
+                text.delete('1.0', f'{excess + 1}.0')
+            if follow:
+                text.see(tk.END)
+
+        if text is not None:
+            self._after_id = text.after(self.interval, self._drain)
@@ -0,0 +1,659 @@
+#!/usr/bin/env python3
+"""
+rtnetlink客户端 - 通过原生 AF_NETLINK 套接字导出路由表和网络接口
+
+一次 RTM_GETROUTE / RTM_GETLINK / RTM_GETADDR 转储即可获得所有路由表
+（不仅是main表）的内容，无需启动 ip/route 子进程。
+解码函数只依赖原始字节，可以直接用抓取到的netlink报文进行验证。
+监视线程用到的 logging 在 RouteWatcher 中导入，只做转储的命令行工具无需加载；
+threading 已由 route_profile 加载，直接在模块级导入。
+"""
+
+import errno
+import os
+import socket
+import struct
+import threading
+
+from route_profile import PROFILER, STAGE_READ, STAGE_PARSE
+from route_table import RouteTable
+
+
+NETLINK_ROUTE = 0
+AF_NETLINK = getattr(socket, 'AF_NETLINK', 16)
+
+# 消息类型（include/uapi/linux/netlink.h, rtnetlink.h）
+NLMSG_NOOP = 1
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+RTM_GETROUTE = 26
+
+# 消息标志
+NLM_F_REQUEST = 0x01
+NLM_F_MULTI = 0x02
+NLM_F_ACK = 0x04
+NLM_F_DUMP = 0x300
+NLM_F_REPLACE = 0x100
+NLM_F_EXCL = 0x200
+NLM_F_CREATE = 0x400
+
+# 路由属性
+RTA_DST = 1
+RTA_OIF = 4
+RTA_GATEWAY = 5
+RTA_PRIORITY = 6
+RTA_PREFSRC = 7
+RTA_MULTIPATH = 9
+RTA_TABLE = 15
+
+# 接口属性
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+
+# 地址属性
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+
+RTM_F_CLONED = 0x200
+RTPROT_BOOT = 3
+RT_SCOPE_UNIVERSE = 0
+RT_SCOPE_LINK = 253
+RT_SCOPE_NOWHERE = 255
+RTN_UNICAST = 1
+RTN_LOCAL = 2
+# 作为普通路由显示的路由类型；广播、多播、黑洞、不可达、禁止等路由不转发到网关或接口，不显示
+ROUTE_TYPES = (RTN_UNICAST, RTN_LOCAL)
+IFF_UP = 0x1
+
+# 多播组（enum rtnetlink_groups）
+RTNLGRP_LINK = 1
+RTNLGRP_IPV4_IFADDR = 5
+RTNLGRP_IPV4_ROUTE = 7
+RTNLGRP_IPV6_IFADDR = 9
+RTNLGRP_IPV6_ROUTE = 11
+
+RT_TABLE_NAMES = {253: 'default', 254: 'main', 255: 'local'}
+RT_TABLE_MAIN = 254
+
+NLMSG_HDR = struct.Struct('=IHHII')      # len, type, flags, seq, pid
+RTMSG = struct.Struct('=BBBBBBBBI')      # family, dst_len, src_len, tos, table, protocol, scope, type, flags
+IFINFOMSG = struct.Struct('=BxHiII')     # family, type, index, flags, change
+IFADDRMSG = struct.Struct('=BBBBI')      # family, prefixlen, flags, scope, index
+RTATTR = struct.Struct('=HH')            # len, type
+RTNEXTHOP = struct.Struct('=HBBi')       # len, flags, hops, ifindex
+
+RECV_BUFFER_SIZE = 1 << 20
+# 批量修改路由时每次发送的消息数
+CHANGE_BATCH_SIZE = 256
+WATCH_POLL_INTERVAL = 0.5
+
+
+class NetlinkError(OSError):
+    """内核返回的netlink错误"""
+
+
+def _align(length):
+    """netlink属性按4字节对齐"""
+    return (length + 3) & ~3
+
+
+def iter_messages(data):
+    """遍历一个接收缓冲区中的所有netlink消息，返回 (类型, 标志, 序号, 负载)"""
+    offset = 0
+    end = len(data)
+    while offset + NLMSG_HDR.size <= end:
+        msg_len, msg_type, flags, seq, _pid = NLMSG_HDR.unpack_from(data, offset)
+        if msg_len < NLMSG_HDR.size or offset + msg_len > end:
+            break
+        yield msg_type, flags, seq, data[offset + NLMSG_HDR.size:offset + msg_len]
+        offset += _align(msg_len)
+
+
+def parse_attrs(data, offset=0):
+    """解析rtattr列表，返回 {属性类型: 原始字节}"""
+    attrs = {}
+    end = len(data)
+    while offset + RTATTR.size <= end:
+        attr_len, attr_type = RTATTR.unpack_from(data, offset)
+        if attr_len < RTATTR.size or offset + attr_len > end:
+            break
+        # 去掉NLA_F_NESTED/NLA_F_NET_BYTEORDER标志位
+        attrs[attr_type & 0x3fff] = data[offset + RTATTR.size:offset + attr_len]
+        offset += _align(attr_len)
+    return attrs
+
+
+def _format_address(family, raw):
+    """将原始地址字节格式化为字符串"""
+    return socket.inet_ntop(family, raw)
+
+
+def _prefix_to_netmask(prefix_length):
+    """IPv4前缀长度转换为点分十进制子网掩码"""
+    mask = (0xffffffff << (32 - prefix_length)) & 0xffffffff
+    return socket.inet_ntoa(struct.pack('!I', mask))
+
+
+def table_name(table_id):
+    """路由表编号转换为显示名称"""
+    return RT_TABLE_NAMES.get(table_id, str(table_id))
+
+
+def decode_route(payload, ifnames=None):
+    """将 RTM_NEWROUTE/RTM_DELROUTE 负载解码为路由字典
+
+    返回值与 parse_windows_routes 的格式一致，额外带有 'table' 字段；
+    对于路由缓存克隆条目、单播和本机以外的路由类型（黑洞、不可达、多播等）
+    或无法识别的地址族返回 None。
+    """
+    if len(payload) < RTMSG.size:
+        return None
+
+    (family, dst_len, _src_len, _tos, rtm_table, _protocol,
+     _scope, rtm_type, rtm_flags) = RTMSG.unpack_from(payload)
+
+    if family not in (socket.AF_INET, socket.AF_INET6) or rtm_flags & RTM_F_CLONED:
+        return None
+    if rtm_type not in ROUTE_TYPES:
+        return None
+
+    attrs = parse_attrs(payload, RTMSG.size)
+    ifnames = ifnames or {}
+
+    if RTA_DST in attrs:
+        destination = _format_address(family, attrs[RTA_DST])
+    else:
+        destination = '0.0.0.0' if family == socket.AF_INET else '::'
+
+    gateway = 'On-link'
+    oif = None
+    if RTA_GATEWAY in attrs:
+        gateway = _format_address(family, attrs[RTA_GATEWAY])
+    if RTA_OIF in attrs:
+        oif = struct.unpack('=i', attrs[RTA_OIF])[0]
+
+    # 多路径路由只显示第一跳
+    if RTA_MULTIPATH in attrs and len(attrs[RTA_MULTIPATH]) >= RTNEXTHOP.size:
+        nh_data = attrs[RTA_MULTIPATH]
+        nh_len, _nh_flags, _hops, nh_ifindex = RTNEXTHOP.unpack_from(nh_data)
+        oif = nh_ifindex
+        nh_attrs = parse_attrs(nh_data[:nh_len], RTNEXTHOP.size)
+        if RTA_GATEWAY in nh_attrs:
+            gateway = _format_address(family, nh_attrs[RTA_GATEWAY])
+
+    metric = struct.unpack('=I', attrs[RTA_PRIORITY])[0] if RTA_PRIORITY in attrs else 0
+    table_id = struct.unpack('=I', attrs[RTA_TABLE])[0] if RTA_TABLE in attrs else rtm_table
+
+    if family == socket.AF_INET:
+        netmask = _prefix_to_netmask(dst_len)
+    else:
+        netmask = str(dst_len)
+        destination = f"{destination}/{dst_len}"
+
+    return {
+        'destination': destination,
+        'netmask': netmask,
+        'gateway': gateway,
+        'interface': ifnames.get(oif, str(oif) if oif is not None else ''),
+        'metric': str(metric),
+        'persistent': False,
+        'table': table_name(table_id)
+    }
+
+
+def table_id(name):
+    """路由表名称转换为编号，空名称视为main表"""
+    if not name:
+        return RT_TABLE_MAIN
+    for table_id_value, table_name_value in RT_TABLE_NAMES.items():
+        if table_name_value == name:
+            return table_id_value
+    return int(name)
+
+
+def _pack_attr(attr_type, value):
+    """打包一个rtattr（含对齐填充）"""
+    length = RTATTR.size + len(value)
+    return RTATTR.pack(length, attr_type) + value + b'\0' * (_align(length) - length)
+
+
+def encode_route(route, ifindexes=None, delete=False):
+    """将路由字典编码为 RTM_NEWROUTE/RTM_DELROUTE 负载（decode_route 的逆操作）
+
+    interface 为接口名或接口编号；删除时带上网关、接口和跃点数，只匹配这一条路由。
+    无效的地址、前缀或接口抛出 ValueError。
+    """
+    destination = route.get('destination', '')
+    gateway = route.get('gateway', '')
+    interface = route.get('interface', '')
+    metric = route.get('metric', '')
+
+    try:
+        if ':' in destination:
+            family = socket.AF_INET6
+            address, _, prefix = destination.partition('/')
+            dst_len = int(prefix or route.get('netmask', '') or 128)
+        else:
+            family = socket.AF_INET
+            address = destination
+            mask = struct.unpack('!I', socket.inet_aton(route.get('netmask', '') or '255.255.255.255'))[0]
+            dst_len = 32 - (~mask & 0xffffffff).bit_length()
+        dst = socket.inet_pton(family, address)
+        gw = socket.inet_pton(family, gateway) if gateway and gateway != 'On-link' else None
+    except OSError as e:
+        raise ValueError(f"无效的路由地址: {destination} {gateway}") from e
+
+    oif = None
+    if interface:
+        if interface.isdigit():
+            oif = int(interface)
+        elif ifindexes and interface in ifindexes:
+            oif = ifindexes[interface]
+        else:
+            raise ValueError(f"接口不存在: {interface}")
+
+    table = table_id(route.get('table', ''))
+    if delete:
+        protocol, scope, rtm_type = 0, RT_SCOPE_NOWHERE, 0
+    else:
+        protocol, rtm_type = RTPROT_BOOT, RTN_UNICAST
+        # 与ip route一致：没有网关的IPv4路由为链路范围
+        scope = RT_SCOPE_LINK if gw is None and family == socket.AF_INET else RT_SCOPE_UNIVERSE
+
+    payload = RTMSG.pack(family, dst_len, 0, 0, table if table < 256 else 0,
+                         protocol, scope, rtm_type, 0)
+    payload += _pack_attr(RTA_DST, dst)
+    if table >= 256:
+        payload += _pack_attr(RTA_TABLE, struct.pack('=I', table))
+    if gw is not None:
+        payload += _pack_attr(RTA_GATEWAY, gw)
+    if oif is not None:
+        payload += _pack_attr(RTA_OIF, struct.pack('=i', oif))
+    if metric not in ('', None):
+        payload += _pack_attr(RTA_PRIORITY, struct.pack('=I', int(metric)))
+    return payload
+
+
+def decode_link(payload):
+    """将 RTM_NEWLINK 负载解码为 {index, name, flags, mac}"""
+    if len(payload) < IFINFOMSG.size:
+        return None
+
+    _family, _if_type, index, flags, _change = IFINFOMSG.unpack_from(payload)
+    attrs = parse_attrs(payload, IFINFOMSG.size)
+
+    name = attrs.get(IFLA_IFNAME, b'').split(b'\0', 1)[0].decode('utf-8', 'ignore')
+    mac = None
+    if IFLA_ADDRESS in attrs and len(attrs[IFLA_ADDRESS]) == 6:
+        mac = ':'.join(f'{b:02x}' for b in attrs[IFLA_ADDRESS])
+
+    return {'index': index, 'name': name, 'flags': flags, 'mac': mac}
+
+
+def decode_addr(payload):
+    """将 RTM_NEWADDR 负载解码为 {index, family, address, prefixlen}"""
+    if len(payload) < IFADDRMSG.size:
+        return None
+
+    family, prefixlen, _flags, _scope, index = IFADDRMSG.unpack_from(payload)
+    if family not in (socket.AF_INET, socket.AF_INET6):
+        return None
+
+    attrs = parse_attrs(payload, IFADDRMSG.size)
+    # 点对点接口的IFA_ADDRESS是对端地址，本机地址在IFA_LOCAL中
+    raw = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+    if raw is None:
+        return None
+
+    return {
+        'index': index,
+        'family': family,
+        'address': _format_address(family, raw),
+        'prefixlen': prefixlen
+    }
+
+
+def _iter_payloads(buffers, msg_type):
+    """从转储得到的原始缓冲区中提取指定类型的消息负载"""
+    for data in buffers:
+        for m_type, _flags, _seq, payload in iter_messages(data):
+            if m_type == msg_type:
+                yield payload
+
+
+def parse_link_dump(buffers):
+    """解析RTM_GETLINK转储，返回 {接口编号: 接口信息}"""
+    links = {}
+    for payload in _iter_payloads(buffers, RTM_NEWLINK):
+        link = decode_link(payload)
+        if link:
+            links[link['index']] = link
+    return links
+
+
+def parse_route_dump(buffers, ifnames=None):
+    """解析RTM_GETROUTE转储，返回路由表（RouteTable）"""
+    routes = RouteTable()
+    for payload in _iter_payloads(buffers, RTM_NEWROUTE):
+        route = decode_route(payload, ifnames)
+        if route:
+            routes.append(route)
+    return routes
+
+
+def parse_addr_dump(buffers):
+    """解析RTM_GETADDR转储，返回地址信息列表"""
+    addrs = []
+    for payload in _iter_payloads(buffers, RTM_NEWADDR):
+        addr = decode_addr(payload)
+        if addr:
+            addrs.append(addr)
+    return addrs
+
+
+def build_interfaces(links, addrs):
+    """将接口与地址转储组合为 RouteManager 使用的接口字典列表"""
+    ips_by_index = {}
+    for addr in addrs:
+        if addr['family'] == socket.AF_INET:
+            ips_by_index.setdefault(addr['index'], []).append(addr['address'])
+
+    interfaces = []
+    for index in sorted(links):
+        link = links[index]
+        ips = ips_by_index.get(index, [])
+        display_name = link['name']
+        if ips:
+            display_name += f" ({', '.join(ips[:2])})"
+
+        interfaces.append({
+            'number': str(index),
+            'name': link['name'],
+            'display': f"{index} - {display_name}",
+            'ips': ips,
+            'mac': link['mac']
+        })
+
+    return interfaces
+
+
+class RtnetlinkClient:
+    """rtnetlink转储客户端"""
+
+    def __init__(self):
+        self._sock = None
+        self._seq = 0
+
+    def open(self):
+        """打开netlink套接字"""
+        if self._sock is None:
+            sock = socket.socket(AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_SIZE)
+                sock.bind((0, 0))
+            except OSError:
+                sock.close()
+                raise
+            self._sock = sock
+        return self
+
+    def close(self):
+        """关闭netlink套接字"""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def dump_raw(self, msg_type, family=socket.AF_UNSPEC):
+        """发送一次转储请求，返回所有多段应答的原始缓冲区列表"""
+        self.open()
+        self._seq += 1
+        seq = self._seq
+
+        # RTM_GETLINK使用ifinfomsg，其余请求使用rtgenmsg加对齐填充
+        if msg_type == RTM_GETLINK:
+            body = IFINFOMSG.pack(family, 0, 0, 0, 0)
+        else:
+            body = struct.pack('=Bxxx', family)
+        header = NLMSG_HDR.pack(NLMSG_HDR.size + len(body), msg_type,
+                                NLM_F_REQUEST | NLM_F_DUMP, seq, 0)
+        self._sock.send(header + body)
+
+        buffers = []
+        while True:
+            data = self._sock.recv(RECV_BUFFER_SIZE)
+            done = False
+            for m_type, _flags, m_seq, payload in iter_messages(data):
+                if m_seq != seq:
+                    continue
+                if m_type == NLMSG_DONE:
+                    done = True
+                elif m_type == NLMSG_ERROR:
+                    error = struct.unpack_from('=i', payload)[0]
+                    if error:
+                        raise NetlinkError(-error, f"netlink请求失败: {-error}")
+                    done = True
+            buffers.append(data)
+            if done:
+                return buffers
+
+    def change_routes(self, changes, progress=None):
+        """在同一个套接字上批量发送路由修改请求
+
+        changes: (动作, 路由字典) 列表，动作为 'add'、'replace' 或 'delete'
+        progress: 可选回调 progress(已完成数, 总数)
+        返回 {changes中的下标: 错误信息}，空字典表示全部成功。
+        """
+        self.open()
+        ifindexes = {link['name']: index for index, link in self.get_links().items()}
+        errors = {}
+        total = len(changes)
+
+        for batch_start in range(0, total, CHANGE_BATCH_SIZE):
+            # 一批消息拼接后一次发送，每条消息单独请求ACK，按序号对应结果
+            pending = {}
+            buffer = bytearray()
+            for index in range(batch_start, min(batch_start + CHANGE_BATCH_SIZE, total)):
+                action, route = changes[index]
+                try:
+                    payload = encode_route(route, ifindexes, delete=(action == 'delete'))
+                except ValueError as e:
+                    errors[index] = str(e)
+                    continue
+
+                if action == 'delete':
+                    msg_type, flags = RTM_DELROUTE, 0
+                elif action == 'replace':
+                    msg_type, flags = RTM_NEWROUTE, NLM_F_CREATE | NLM_F_REPLACE
+                else:
+                    msg_type, flags = RTM_NEWROUTE, NLM_F_CREATE | NLM_F_EXCL
+
+                self._seq += 1
+                pending[self._seq] = index
+                buffer += NLMSG_HDR.pack(NLMSG_HDR.size + len(payload), msg_type,
+                                         NLM_F_REQUEST | NLM_F_ACK | flags, self._seq, 0)
+                buffer += payload
+
+            if buffer:
+                self._sock.send(bytes(buffer))
+            while pending:
+                data = self._sock.recv(RECV_BUFFER_SIZE)
+                for m_type, _flags, m_seq, payload in iter_messages(data):
+                    if m_type != NLMSG_ERROR or m_seq not in pending:
+                        continue
+                    index = pending.pop(m_seq)
+                    error = struct.unpack_from('=i', payload)[0]
+                    if error:
+                        errors[index] = os.strerror(-error)
+
+            if progress:
+                progress(min(batch_start + CHANGE_BATCH_SIZE, total), total)
+
+        return errors
+
+    def get_links(self):
+        """获取 {接口编号: 接口信息}"""
+        with PROFILER.span(STAGE_READ):
+            buffers = self.dump_raw(RTM_GETLINK)
+        return parse_link_dump(buffers)
+
+    def get_routes(self, version="IPv4", links=None):
+        """获取所有路由表中的路由"""
+        family = socket.AF_INET if version == "IPv4" else socket.AF_INET6
+        if links is None:
+            links = self.get_links()
+        ifnames = {index: link['name'] for index, link in links.items()}
+        with PROFILER.span(STAGE_READ):
+            buffers = self.dump_raw(RTM_GETROUTE, family)
+        with PROFILER.span(STAGE_PARSE) as span:
+            routes = parse_route_dump(buffers, ifnames)
+            span.rows = len(routes)
+        return routes
+
+    def get_interfaces(self):
+        """获取接口列表（与 route_core.get_system_interfaces 格式一致）"""
+        links = self.get_links()
+        with PROFILER.span(STAGE_READ):
+            buffers = self.dump_raw(RTM_GETADDR)
+        addrs = parse_addr_dump(buffers)
+        return build_interfaces(links, addrs)
+
+
+def get_routes(version="IPv4"):
+    """便捷函数：一次性转储指定协议版本的路由"""
+    with RtnetlinkClient() as client:
+        return client.get_routes(version)
+
+
+def get_interfaces():
+    """便捷函数：一次性转储网络接口"""
+    with RtnetlinkClient() as client:
+        return client.get_interfaces()
+
+
+def group_mask(*groups):
+    """将多播组编号转换为bind使用的位掩码"""
+    mask = 0
+    for group in groups:
+        mask |= 1 << (group - 1)
+    return mask
+
+
+class RouteWatcher:
+    """路由变化监视线程 - 订阅rtnetlink多播组，按批次回调增量事件
+
+    回调参数为事件列表，每个事件是 (动作, 数据)：
+      ('add', 路由字典) / ('delete', 路由字典)
+      ('link', 接口信息) / ('link_delete', 接口信息)
+      ('addr', 地址信息) / ('addr_delete', 地址信息)
+      ('resync', None)  内核缓冲区溢出，丢失了事件，需要完整重新加载
+    回调在监视线程中执行，界面更新需自行切换到主线程。
+    """
+
+    GROUPS = (RTNLGRP_LINK, RTNLGRP_IPV4_IFADDR, RTNLGRP_IPV4_ROUTE,
+              RTNLGRP_IPV6_IFADDR, RTNLGRP_IPV6_ROUTE)
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._ifnames = {}
+        self._sock = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """打开订阅套接字并启动监视线程"""
+        sock = socket.socket(AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_SIZE)
+            sock.bind((0, group_mask(*self.GROUPS)))
+            sock.settimeout(WATCH_POLL_INTERVAL)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+
+        # 先订阅再转储接口名，避免遗漏期间的接口变化
+        with RtnetlinkClient() as client:
+            self._ifnames = {index: link['name'] for index, link in client.get_links().items()}
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止监视线程"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(WATCH_POLL_INTERVAL * 2)
+            self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        """监视线程主循环"""
+        import logging
+        logger = logging.getLogger(__name__)
+
+        while not self._stop_event.is_set():
+            try:
+                data = self._sock.recv(RECV_BUFFER_SIZE)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if self._stop_event.is_set():
+                    break
+                if e.errno == errno.ENOBUFS:
+                    # 接收缓冲区溢出，事件已丢失
+                    self.callback([('resync', None)])
+                    continue
+                logger.error(f"路由监视线程异常退出: {e}")
+                break
+
+            events = self.decode_events(data)
+            if events:
+                try:
+                    self.callback(events)
+                except Exception as e:
+                    logger.error(f"处理路由变化事件失败: {e}")
+
+    def decode_events(self, data):
+        """将一个接收缓冲区解码为事件列表"""
+        events = []
+        for msg_type, _flags, _seq, payload in iter_messages(data):
+            if msg_type in (RTM_NEWROUTE, RTM_DELROUTE):
+                route = decode_route(payload, self._ifnames)
+                if route:
+                    events.append(('add' if msg_type == RTM_NEWROUTE else 'delete', route))
+            elif msg_type in (RTM_NEWLINK, RTM_DELLINK):
+                link = decode_link(payload)
+                if link:
+                    if msg_type == RTM_NEWLINK:
+                        self._ifnames[link['index']] = link['name']
+                        events.append(('link', link))
+                    else:
+                        self._ifnames.pop(link['index'], None)
+                        events.append(('link_delete', link))
+            elif msg_type in (RTM_NEWADDR, RTM_DELADDR):
+                addr = decode_addr(payload)
+                if addr:
+                    events.append(('addr' if msg_type == RTM_NEWADDR else 'addr_delete', addr))
+        return events
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+批量路由应用 - 将一批路由与当前路由表比较，只提交必要的修改
+
+Linux下所有修改作为netlink消息流在同一个套接字上发送（每批256条，逐条ACK），
+Windows下所有 route 命令写成一个脚本由同一个进程执行；两种方式都不弹出对话框，
+通过回调报告进度，所有失败的路由在结束时统一返回。
+"""
+
+from route_core import (route_key, route_version, get_system_routes, is_windows, SNAPSHOT_MAX_AGE,
+                        build_add_command, build_delete_command, run_route_script)
+
+# 计划中的动作
+ACTION_ADD = 'add'
+ACTION_REPLACE = 'replace'
+ACTION_DELETE = 'delete'
+
+
+def normalize_route(route):
+    """请求中的路由转换为与路由表一致的写法：IPv6目标带前缀长度"""
+    route = dict(route)
+    destination = route.get('destination', '').strip()
+    netmask = str(route.get('netmask', '')).strip()
+    if ':' in destination:
+        if '/' in destination:
+            netmask = destination.split('/', 1)[1]
+        elif netmask:
+            destination = f"{destination}/{netmask}"
+    route['destination'] = destination
+    route['netmask'] = netmask
+    route['gateway'] = route.get('gateway', '').strip()
+    route['interface'] = str(route.get('interface', '')).strip()
+    route['metric'] = str(route.get('metric', '')).strip()
+    return route
+
+
+def _prefix_key(route):
+    """路由前缀标识：(目标网络, 子网掩码/前缀长度, 路由表)"""
+    destination, netmask, _gateway, _interface, table = route_key(route)
+    return destination, netmask, table
+
+
+def _matches(request, route):
+    """请求中给出的网关和接口与路由一致；未给出的字段不参与比较，接口编号不与接口名比较"""
+    if request['gateway'] and request['gateway'] != route.get('gateway', ''):
+        return False
+    interface = request['interface']
+    if interface and not interface.isdigit() and interface != route.get('interface', ''):
+        return False
+    return True
+
+
+class ApplyResult:
+    """批量应用结果"""
+
+    def __init__(self):
+        self.added = 0
+        self.replaced = 0
+        self.deleted = 0
+        self.skipped = 0
+        # [(动作, 路由, 错误信息)]
+        self.failures = []
+
+    @property
+    def ok(self):
+        return not self.failures
+
+    def summary(self):
+        return (f"新增 {self.added} 条，替换 {self.replaced} 条，删除 {self.deleted} 条，"
+                f"无需修改 {self.skipped} 条，失败 {len(self.failures)} 条")
+
+
+def plan_changes(requests, live_routes):
+    """计算最小修改集
+
+    requests: 路由字典的可迭代对象，可带 'action' 字段（'add' 默认 / 'delete'）
+    live_routes: 当前路由表
+    返回 (修改列表 [(动作, 路由, 当前路由或None)], 无需修改的条数)：
+      - 要添加的路由已存在且跃点数相同（或未指定跃点数）则跳过，跃点数不同则替换
+        （删除当前路由后重新添加，跃点数是内核路由标识的一部分）；未指定网关视为On-link
+      - 要删除的路由按前缀匹配当前路由表，给出网关/接口时只删除匹配的路由，不存在则跳过
+      - 同一路由的多次请求以最后一次为准
+    两边都按前缀建立字典索引，整体为 O(n)。
+    """
+    return _plan_wanted(_wanted_routes(requests), live_routes)
+
+
+def _wanted_routes(requests):
+    """请求去重：{路由标识: (动作, 路由)}，同一路由以最后一次请求为准
+
+    requests 只遍历一次，可以是逐条读取文件的生成器。
+    """
+    wanted = {}
+    for route in requests:
+        route = normalize_route(route)
+        action = route.pop('action', ACTION_ADD) or ACTION_ADD
+        if action not in (ACTION_ADD, ACTION_DELETE):
+            raise ValueError(f"不支持的操作: {action}")
+        if action == ACTION_ADD and not route['gateway']:
+            route['gateway'] = 'On-link'
+        wanted[route_key(route)] = (action, route)
+    return wanted
+
+
+def _plan_wanted(wanted, live_routes):
+    """按去重后的请求计算修改集（见 plan_changes）"""
+    live_by_prefix = {}
+    for route in live_routes:
+        live_by_prefix.setdefault(_prefix_key(route), []).append(route)
+
+    changes = []
+    skipped = 0
+    for action, route in wanted.values():
+        candidates = [current for current in live_by_prefix.get(_prefix_key(route), ())
+                      if _matches(route, current)]
+
+        if action == ACTION_DELETE:
+            if not candidates:
+                skipped += 1
+            for current in candidates:
+                changes.append((ACTION_DELETE, dict(current), dict(current)))
+        elif not candidates:
+            changes.append((ACTION_ADD, route, None))
+        elif not route['metric'] or any(route['metric'] == current.get('metric', '') for current in candidates):
+            skipped += 1
+        else:
+            changes.append((ACTION_REPLACE, route, dict(candidates[0])))
+
+    return changes, skipped
+
+
+def _route_data(route, version):
+    """路由字典转换为命令构建函数使用的路由数据"""
+    destination = route.get('destination', '')
+    route_data = {
+        'destination': destination.split('/', 1)[0],
+        'gateway': route.get('gateway', ''),
+        # Windows route命令只接受接口编号
+        'interface': route.get('interface', '') if str(route.get('interface', '')).isdigit() else '',
+        'metric': str(route.get('metric', '')),
+        'persistent': route.get('persistent', False)
+    }
+    if version == "IPv4":
+        route_data['netmask'] = route.get('netmask', '')
+    else:
+        route_data['prefix_length'] = destination.split('/', 1)[1] if '/' in destination else route.get('netmask', '')
+    return route_data
+
+
+def _apply_with_commands(changes, progress=None):
+    """所有修改的route命令交给同一个进程执行，返回 {下标: 错误信息}"""
+    errors = {}
+    groups = []
+    owners = []
+    for index, (action, route, current) in enumerate(changes):
+        version = route_version(route)
+        try:
+            commands = []
+            if action in (ACTION_DELETE, ACTION_REPLACE):
+                # 按掩码和网关删除计划中的那条路由，不影响同一目标的其他路由
+                commands.append(build_delete_command(current.get('destination', ''), current.get('netmask', ''),
+                                                     version, gateway=current.get('gateway', '')))
+            if action in (ACTION_ADD, ACTION_REPLACE):
+                commands.append(build_add_command(_route_data(route, version), version))
+        except Exception as e:
+            errors[index] = str(e)
+            continue
+        groups.append(commands)
+        owners.append(index)
+
+    def group_progress(done, total):
+        progress(owners[done - 1] + 1, len(changes))
+
+    for group_index, error in run_route_script(groups, progress=group_progress if progress else None).items():
+        errors[owners[group_index]] = error
+    return errors
+
+
+def execute_changes(changes, progress=None):
+    """提交 plan_changes 得到的修改列表，返回 {下标: 错误信息}"""
+    if not changes:
+        return {}
+    if is_windows():
+        return _apply_with_commands(changes, progress)
+
+    import netlink
+
+    # 替换拆分为删除当前路由和添加新路由两条消息
+    messages = []
+    owners = []
+    for index, (action, route, current) in enumerate(changes):
+        if action in (ACTION_DELETE, ACTION_REPLACE):
+            messages.append((ACTION_DELETE, current))
+            owners.append(index)
+        if action in (ACTION_ADD, ACTION_REPLACE):
+            messages.append((ACTION_ADD, route))
+            owners.append(index)
+
+    def message_progress(done, total):
+        progress(owners[done - 1] + 1, len(changes))
+
+    with netlink.RtnetlinkClient() as client:
+        message_errors = client.change_routes(messages, message_progress if progress else None)
+
+    errors = {}
+    for message_index, error in sorted(message_errors.items()):
+        errors.setdefault(owners[message_index], error)
+    return errors
+
+
+def apply_routes(requests, live_routes=None, dry_run=False, progress=None):
+    """将一批路由应用到系统路由表
+
+    requests 可以是逐条读取路由文件的生成器（route_io.iter_route_file），只遍历一次；
+    live_routes 为空时读取当前路由表（请求中出现的协议版本）；
+    dry_run 为真时只计算修改集不执行。返回 (ApplyResult, 修改列表)。
+    """
+    wanted = _wanted_routes(requests)
+    if live_routes is None:
+        live_routes = []
+        for version in sorted({route_version(route) for _action, route in wanted.values()}):
+            # Windows下两个协议版本共用同一次 route print
+            live_routes.extend(get_system_routes(version, max_age=SNAPSHOT_MAX_AGE))
+
+    changes, skipped = _plan_wanted(wanted, live_routes)
+    if dry_run:
+        result = ApplyResult()
+        result.skipped = skipped
+        return result, changes
+    return apply_changes(changes, skipped, progress), changes
+
+
+def apply_changes(changes, skipped=0, progress=None):
+    """提交 plan_changes 得到的修改列表并汇总结果（ApplyResult）"""
+    result = ApplyResult()
+    result.skipped = skipped
+
+    errors = execute_changes(changes, progress)
+    for index, (action, route, _current) in enumerate(changes):
+        error = errors.get(index)
+        if error is not None:
+            result.failures.append((action, route, error))
+        elif action == ACTION_ADD:
+            result.added += 1
+        elif action == ACTION_REPLACE:
+            result.replaced += 1
+        else:
+            result.deleted += 1
+    return result
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+批量路由查询 - 将大量目标IP（如流量日志中的地址）解析为所用路由的下一跳和接口
+
+用法:
+    python route_batch.py flows.csv --column 2 --skip-header -o result.csv
+    python route_batch.py ips.txt --workers 4 -o result.csv
+    python route_batch.py ips.txt --route-print saved_route_print.txt
+
+安装了 numpy 时，IPv4地址按块用 np.searchsorted 在有序区间数组上向量化查询，
+否则逐个二分查找；--workers 大于1时按块分发到进程池。
+输入按块流式读取，结果按输入顺序流式写出，内存占用与文件大小无关。
+"""
+
+import argparse
+import csv
+import itertools
+import socket
+import sys
+import time
+from collections import deque
+
+from route_core import get_system_routes, SNAPSHOT_MAX_AGE
+from route_lookup import RouteLookup, RESULT_HEADER, result_row
+from route_table import RouteTable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHUNK_SIZE = 65536
+
+
+def load_routes(route_print=None):
+    """加载IPv4和IPv6路由
+
+    route_print: 保存的 route print 输出文件；为空时读取当前系统路由表
+    """
+    routes = RouteTable()
+    if route_print:
+        import windows_routes
+        with open(route_print, 'r', encoding='utf-8', errors='ignore') as f:
+            result = windows_routes.parse_route_print_all(f)
+        routes.extend(result.ipv4)
+        routes.extend(result.ipv6)
+        return routes
+
+    for version in ("IPv4", "IPv6"):
+        # Windows下两个协议版本共用同一次 route print
+        routes.extend(get_system_routes(version, max_age=SNAPSHOT_MAX_AGE))
+    return routes
+
+
+def iter_addresses(f, column=0, skip_header=False, is_csv=False):
+    """逐个读取地址：CSV按列读取，文本文件取每行第一个空白分隔的字段（column指定其他字段）"""
+    reader = csv.reader(f) if is_csv else (line.split() for line in f)
+    if skip_header:
+        next(reader, None)
+    for fields in reader:
+        if len(fields) > column:
+            address = fields[column].strip()
+            if address and not address.startswith('#'):
+                yield address
+
+
+def iter_chunks(iterable, size):
+    """按块切分"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BatchResolver:
+    """对地址块做最长前缀匹配，输出 RESULT_HEADER 格式的结果行"""
+
+    def __init__(self, routes, vectorized=True):
+        self.lookup = RouteLookup(routes)
+        self.routes = self.lookup.routes
+        # 同一路由的输出字段只格式化一次
+        self._fields = {}
+
+        self._vector_indexes = None
+        if vectorized and np is not None:
+            self._vector_indexes = [
+                (np.array(index.starts, dtype=np.uint64),
+                 np.array(index.ends, dtype=np.uint64),
+                 np.array(index.rows, dtype=np.int64))
+                for index in self.lookup.indexes(False)
+            ]
+
+    @property
+    def vectorized(self):
+        return self._vector_indexes is not None
+
+    def _lookup_row(self, address):
+        try:
+            return self.lookup.lookup_row(address)
+        except ValueError:
+            return None
+
+    def resolve(self, addresses):
+        """返回每个地址匹配的路由行号列表，未匹配或无效地址为 None"""
+        if self._vector_indexes is None:
+            lookup_row = self._lookup_row
+            return [lookup_row(address) for address in addresses]
+        return self._resolve_vectorized(addresses)
+
+    def _resolve_vectorized(self, addresses):
+        rows = [None] * len(addresses)
+
+        # IPv4地址打包为大端uint32数组；IPv6和无效地址逐个查询
+        packed = bytearray()
+        positions = []
+        inet_pton = socket.inet_pton
+        for position, address in enumerate(addresses):
+            try:
+                packed += inet_pton(socket.AF_INET, address)
+            except OSError:
+                rows[position] = self._lookup_row(address)
+                continue
+            positions.append(position)
+
+        if not positions:
+            return rows
+
+        values = np.frombuffer(bytes(packed), dtype='>u4').astype(np.uint64)
+        result = np.full(len(values), -1, dtype=np.int64)
+        pending = np.arange(len(values))
+
+        # 按路由表查找顺序依次匹配，未命中的地址进入下一张表
+        for starts, ends, index_rows in self._vector_indexes:
+            if not len(pending):
+                break
+            if not len(starts):
+                continue
+            pending_values = values[pending]
+            slots = np.searchsorted(starts, pending_values, side='right') - 1
+            hit = (slots >= 0) & (pending_values <= ends[np.maximum(slots, 0)])
+            result[pending[hit]] = index_rows[slots[hit]]
+            pending = pending[~hit]
+
+        for position, row in zip(positions, result.tolist()):
+            if row >= 0:
+                rows[position] = row
+        return rows
+
+    def format(self, addresses):
+        """查询一块地址，返回 (结果行列表, 匹配数)"""
+        output = []
+        matched = 0
+        fields = self._fields
+        for address, row in zip(addresses, self.resolve(addresses)):
+            if row is None:
+                output.append(result_row(address, None))
+                continue
+            matched += 1
+            route_fields = fields.get(row)
+            if route_fields is None:
+                route_fields = fields[row] = result_row(address, self.routes[row])[1:]
+            output.append((address,) + route_fields)
+        return output, matched
+
+
+# 进程池工作进程中的查询器
+_worker_resolver = None
+
+
+def _init_worker(routes, vectorized):
+    global _worker_resolver
+    _worker_resolver = BatchResolver(routes, vectorized)
+
+
+def _format_in_worker(addresses):
+    return _worker_resolver.format(addresses)
+
+
+def _iter_results(resolver, chunks, workers, vectorized):
+    """按输入顺序产出每块的 (结果行列表, 匹配数)"""
+    if workers <= 1:
+        for chunk in chunks:
+            yield resolver.format(chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # 限制同时在途的块数，避免一次读入整个输入文件
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(resolver.routes, vectorized)) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(_format_in_worker, chunk))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def resolve_file(input_file, output_file, routes, column=0, skip_header=False, is_csv=False,
+                 workers=1, chunk_size=CHUNK_SIZE, vectorized=True):
+    """流式查询 input_file 中的地址并将CSV结果写入 output_file，返回 (地址数, 匹配数)"""
+    resolver = BatchResolver(routes, vectorized)
+    chunks = iter_chunks(iter_addresses(input_file, column, skip_header, is_csv), chunk_size)
+
+    writer = csv.writer(output_file)
+    writer.writerow(RESULT_HEADER)
+    total = 0
+    matched = 0
+    for rows, chunk_matched in _iter_results(resolver, chunks, workers, resolver.vectorized):
+        writer.writerows(rows)
+        total += len(rows)
+        matched += chunk_matched
+    return total, matched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='route_batch',
+        description='批量查询目标IP使用的路由（最长前缀匹配），输出下一跳和接口')
+    parser.add_argument('input', help='IP地址文件（.csv 或每行一个地址的文本文件），- 表示标准输入')
+    parser.add_argument('-o', '--output', default='-', help='结果CSV文件，默认输出到标准输出')
+    parser.add_argument('--column', type=int, default=0, help='地址所在的列（从0开始），默认第0列')
+    parser.add_argument('--csv', action='store_true', help='按CSV格式读取输入（.csv文件自动启用）')
+    parser.add_argument('--skip-header', action='store_true', help='跳过输入的第一行')
+    parser.add_argument('--route-print', metavar='FILE', help='使用保存的 route print 输出代替当前系统路由表')
+    parser.add_argument('--workers', type=int, default=1, help='工作进程数，默认1（不使用进程池）')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help=f'每块地址数，默认{CHUNK_SIZE}')
+    parser.add_argument('--no-numpy', action='store_true', help='不使用numpy向量化查询')
+    args = parser.parse_args(argv)
+
+    start_time = time.time()
+    try:
+        routes = load_routes(args.route_print)
+    except Exception as e:
+        print(f"获取路由表失败: {e}", file=sys.stderr)
+        return 1
+
+    is_csv = args.csv or args.input.lower().endswith('.csv')
+    input_file = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8', errors='ignore', newline='')
+    output_file = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8-sig', newline='')
+    try:
+        total, matched = resolve_file(input_file, output_file, routes, args.column, args.skip_header, is_csv,
+                                      args.workers, max(args.chunk_size, 1), not args.no_numpy)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    mode = "numpy向量化" if (np is not None and not args.no_numpy) else "逐个查询"
+    print(f"共 {len(routes)} 条路由，查询 {total} 个地址，{matched} 个匹配，"
+          f"耗时 {time.time() - start_time:.2f}秒（{mode}，{max(args.workers, 1)}个进程）", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+路由缓存 - 按 (协议版本, 路由表, 数据源) 分别缓存路由数据
+
+每个键有一个代数（generation），路由修改成功后只把受影响的键的代数加一；
+缓存条目记录读取开始时的代数和时间，代数落后或超过有效期即视为过期。
+过期的数据仍可立即返回给界面显示，同时在后台重新读取（stale-while-revalidate）。
+"""
+
+import threading
+import time
+
+# 路由表的通配：界面显示某协议版本的全部路由表
+ALL_TABLES = ''
+# 数据源：当前系统的路由表（Windows为route print，Linux为netlink/procfs）
+SOURCE_SYSTEM = 'system'
+
+
+def route_cache_key(version, table=ALL_TABLES, source=SOURCE_SYSTEM):
+    """缓存键：(协议版本, 路由表, 数据源)"""
+    return (version, table, source)
+
+
+class RouteCache:
+    """带代数和时间戳的路由缓存，线程安全"""
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # {键: (路由, 读取开始时的代数, 读取开始时间)}
+        self._entries = {}
+        # {键: 当前代数}
+        self._generations = {}
+
+    def get(self, key):
+        """返回 (路由, 是否新鲜)；没有缓存时返回 (None, False)
+
+        代数落后（读取后路由被修改过）或超过有效期的数据不新鲜，但仍然返回，
+        调用方可以先显示再在后台重新读取。
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            routes, generation, timestamp = entry
+            fresh = (generation == self._generations.get(key, 0)
+                     and time.time() - timestamp < self.ttl)
+            return routes, fresh
+
+    def begin(self, key):
+        """开始读取：返回当前代数和时间，读取完成后传给 put"""
+        with self._lock:
+            # 登记键，读取期间的修改也能使本次结果过期
+            return self._generations.setdefault(key, 0), time.time()
+
+    def put(self, key, routes, token):
+        """保存读取结果；读取期间路由被修改过时，结果保存但不新鲜"""
+        generation, timestamp = token
+        with self._lock:
+            current = self._entries.get(key)
+            # 较早开始的读取不覆盖较新的结果
+            if current is not None and current[2] > timestamp:
+                return
+            self._entries[key] = (routes, generation, timestamp)
+
+    def seed(self, key, routes):
+        """预置过期的数据（如磁盘快照）：可以立即显示，但首次使用时仍会重新读取"""
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (routes, self._generations.setdefault(key, 0), 0)
+
+    def items(self):
+        """全部缓存条目 [(键, 路由)]，不论是否新鲜"""
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    def invalidate(self, version=None, table=None, source=None):
+        """使匹配的键过期（参数为 None 表示不限）；缓存的数据保留，供重新读取期间显示"""
+        with self._lock:
+            keys = set(self._generations) | set(self._entries)
+            for key in keys:
+                if ((version is None or key[0] == version)
+                        and (table is None or key[1] == table or key[1] == ALL_TABLES)
+                        and (source is None or key[2] == source)):
+                    self._generations[key] = self._generations.get(key, 0) + 1
+
+    def generation(self, key):
+        """键的当前代数"""
+        with self._lock:
+            return self._generations.get(key, 0)
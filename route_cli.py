@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""
+路由管理命令行工具 - 无图形界面，适用于自动化脚本和SSH远程操作
+
+用法:
+    python route_cli.py list [-6] [--format table|csv|json]
+    python route_cli.py add 10.10.0.0 255.255.0.0 192.168.1.1 [--if 12] [--metric 5] [-p]
+    python route_cli.py add 2001:db8:: 32 fe80::1
+    python route_cli.py delete 10.10.0.0 [255.255.0.0]
+    python route_cli.py apply-file changes.txt|routes.csv [--dry-run]
+    python route_cli.py reconcile routes.yaml [--dry-run]
+    python route_cli.py diff saved_routes.csv [-6]
+    python route_cli.py export routes.ndjson|routes.csv|routes.json|routes.rtab [-4|-6]
+    python route_cli.py lookup 8.8.8.8 [2001:db8::1 ...]
+    python route_cli.py history record [--interval 10]
+    python route_cli.py history list [-6]
+    python route_cli.py history show "2024-05-01 09:30:00" [-6] [--format table|csv|json]
+    python route_cli.py metrics [--host 127.0.0.1] [--port 9464] [--interval 30]
+    python route_cli.py daemon [--listen /run/routeconf.sock] [--ttl 60] [--allow-changes]
+    python route_cli.py --daemon /run/routeconf.sock list|add|delete|diff|lookup ...
+    python route_cli.py --daemon /run/routeconf.sock watch
+    python route_cli.py --profile trace.json --profile-format chrome list
+    python route_cli.py --cprofile list.prof list
+
+与图形界面共用 route_core 中的路由读取、输入验证和命令构建逻辑，不导入 tkinter。
+"""
+
+import argparse
+import os
+import sys
+
+from route_core import (route_version, diff_route_lists, get_system_routes, validate_route_data,
+                        build_add_command, build_delete_command, run_route_command)
+from route_io import is_route_file, iter_route_file
+from route_table import ROUTE_FIELDS
+from route_profile import PROFILER, STAGE_LOAD, STAGE_READ, STAGE_PARSE
+
+
+def daemon_client(args):
+    """指定了 --daemon（或环境变量 ROUTECONF_DAEMON）时返回守护进程客户端，否则返回 None"""
+    if not args.daemon:
+        return None
+    client = getattr(args, '_daemon_client', None)
+    if client is None:
+        from route_daemon import DaemonClient
+        client = args._daemon_client = DaemonClient(args.daemon)
+    return client
+
+
+def load_routes(args, version):
+    """读取路由表：指定 --route-print 时离线解析保存的 route print 输出，
+    指定 --daemon 时从守护进程的缓存读取"""
+    with PROFILER.span(STAGE_LOAD):
+        client = daemon_client(args) if not args.route_print else None
+        if client is not None:
+            with PROFILER.span(STAGE_READ) as span:
+                routes = client.routes(version)
+                span.rows = len(routes)
+            return routes
+        if args.route_print:
+            import windows_routes
+            with PROFILER.span(STAGE_READ):
+                with open(args.route_print, 'r', encoding='utf-8', errors='ignore') as f:
+                    output = f.read()
+            with PROFILER.span(STAGE_PARSE) as span:
+                routes = windows_routes.parse_route_print(output, version)
+                span.rows = len(routes)
+            return routes
+        return get_system_routes(version)
+
+
+def format_route(route):
+    """单条路由的一行文本表示"""
+    text = f"{route.get('destination', '')} {route.get('netmask', '')} via {route.get('gateway', '')}"
+    if route.get('interface'):
+        text += f" dev {route['interface']}"
+    if route.get('metric'):
+        text += f" metric {route['metric']}"
+    if route.get('table') and route['table'] != 'main':
+        text += f" table {route['table']}"
+    if route.get('persistent'):
+        text += " (持久)"
+    return text
+
+
+def cmd_list(args):
+    version = "IPv6" if args.ipv6 else "IPv4"
+    print_routes(load_routes(args, version), args.format, args.ipv6)
+    return 0
+
+
+def print_routes(routes, output_format, ipv6):
+    """按 table/csv/json/ndjson 格式输出路由列表；csv/json/ndjson 逐行写出"""
+    out = sys.stdout
+
+    if output_format != 'table':
+        from route_io import RouteWriter
+        with RouteWriter(out, output_format) as writer:
+            writer.write(routes)
+    else:
+        rows = [[route.get(field, '') for field in ROUTE_FIELDS[:5]] + ['持久' if route.get('persistent') else '活动']
+                for route in routes]
+        header = ['目标网络', '子网掩码/前缀' if ipv6 else '子网掩码', '网关', '接口', '跃点数', '类型']
+        widths = [max([len(header[i])] + [len(str(row[i])) for row in rows]) for i in range(len(header))]
+        for row in [header] + rows:
+            out.write('  '.join(str(value).ljust(width) for value, width in zip(row, widths)).rstrip() + '\n')
+
+
+def _route_data(args):
+    """命令行参数转换为与添加路由对话框一致的路由数据"""
+    version = route_version({'destination': args.destination})
+    route_data = {
+        'destination': args.destination,
+        'gateway': args.gateway or '',
+        'interface': args.interface or '',
+        'metric': args.metric or '',
+        'persistent': args.persistent
+    }
+    if version == "IPv4":
+        route_data['netmask'] = args.netmask
+    else:
+        route_data['prefix_length'] = args.netmask
+    return version, route_data
+
+
+def _execute(cmd, dry_run):
+    """执行一条路由命令，返回错误信息，成功时返回 None"""
+    print(cmd)
+    if dry_run:
+        return None
+    result = run_route_command(cmd)
+    if result.returncode != 0:
+        return (result.stderr or result.stdout).strip() or f"返回码 {result.returncode}"
+    return None
+
+
+def _daemon_request(method, *args):
+    """通过守护进程执行修改，返回错误信息，成功时返回 None"""
+    from route_daemon import DaemonError
+
+    try:
+        method(*args)
+    except DaemonError as e:
+        return str(e)
+    return None
+
+
+def _notify_daemon(args):
+    """本进程直接修改了路由后通知守护进程（不等待下一次变化通知或缓存过期）"""
+    client = daemon_client(args)
+    if client is None:
+        return
+    from route_daemon import DaemonError
+
+    try:
+        client.invalidate()
+    except DaemonError as e:
+        print(f"通知守护进程失败: {e}", file=sys.stderr)
+
+
+def cmd_add(args):
+    version, route_data = _route_data(args)
+    error = validate_route_data(route_data, version)
+    if error:
+        print(f"输入错误: {error}", file=sys.stderr)
+        return 1
+    try:
+        cmd = build_add_command(route_data, version)
+    except ValueError as e:
+        print(f"输入错误: {e}", file=sys.stderr)
+        return 1
+
+    client = daemon_client(args)
+    if client is not None and not args.dry_run:
+        print(cmd)
+        error = _daemon_request(client.add, route_data, version)
+    else:
+        error = _execute(cmd, args.dry_run)
+    if error:
+        print(f"添加路由失败: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_delete(args):
+    version = route_version({'destination': args.destination})
+    try:
+        cmd = build_delete_command(args.destination, args.netmask or '', version)
+    except ValueError as e:
+        print(f"输入错误: {e}", file=sys.stderr)
+        return 1
+
+    client = daemon_client(args)
+    if client is not None and not args.dry_run:
+        print(cmd)
+        error = _daemon_request(client.delete, args.destination, args.netmask or '', version)
+    else:
+        error = _execute(cmd, args.dry_run)
+    if error:
+        print(f"删除路由失败: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _read_operations(path, parser):
+    """读取操作文件（每行一条 add/delete 子命令），返回 (路由请求列表, [(行号, 错误信息)])"""
+    import shlex
+
+    requests = []
+    errors = []
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+
+    for line_number, line in enumerate(lines, 1):
+        tokens = shlex.split(line, comments=True)
+        if not tokens:
+            continue
+        if tokens[0] not in ('add', 'delete'):
+            errors.append((line_number, f"不支持的操作: {tokens[0]}"))
+            continue
+        try:
+            line_args = parser.parse_args(tokens)
+        except SystemExit:
+            errors.append((line_number, "参数格式错误"))
+            continue
+
+        if line_args.command == 'add':
+            version, route_data = _route_data(line_args)
+            error = validate_route_data(route_data, version)
+            if error:
+                errors.append((line_number, error.replace('\n', ' ')))
+                continue
+            requests.append({
+                'action': 'add',
+                'destination': line_args.destination,
+                'netmask': line_args.netmask,
+                'gateway': route_data['gateway'],
+                'interface': route_data['interface'],
+                'metric': route_data['metric'],
+                'persistent': line_args.persistent
+            })
+        else:
+            if not line_args.netmask and '/' not in line_args.destination:
+                errors.append((line_number, "批量删除需要指定子网掩码或前缀长度"))
+                continue
+            requests.append({'action': 'delete', 'destination': line_args.destination,
+                             'netmask': line_args.netmask or ''})
+
+    return requests, errors
+
+
+def cmd_apply_file(args):
+    """批量应用文件中的路由：与当前路由表比较后只提交必要的修改
+
+    文件为 list/export 保存的路由列表（.csv/.ndjson/.json/.rtab，可带 action 列），
+    或每行一条 add/delete 子命令的操作文件（# 开头为注释）。
+    """
+    from route_apply import apply_routes, ACTION_ADD, ACTION_REPLACE
+
+    if is_route_file(args.file):
+        # 逐条读取，交给 apply_routes 去重，不整体载入文件
+        requests = iter_route_file(args.file)
+        errors = []
+    else:
+        requests, errors = _read_operations(args.file, build_parser())
+
+    for line_number, message in errors:
+        print(f"第{line_number}行: {message}", file=sys.stderr)
+    if errors:
+        print("操作文件有错误，未做任何修改", file=sys.stderr)
+        return 1
+
+    def progress(done, total):
+        if sys.stderr.isatty():
+            print(f"\r已提交 {done}/{total}", end='' if done < total else '\n', file=sys.stderr)
+
+    result, changes = apply_routes(requests, dry_run=args.dry_run, progress=progress)
+    if changes and not args.dry_run:
+        _notify_daemon(args)
+
+    symbols = {ACTION_ADD: '+', ACTION_REPLACE: '~'}
+    for action, route, current in changes:
+        text = f"{symbols.get(action, '-')} {format_route(route)}"
+        if action == ACTION_REPLACE:
+            text += f" (跃点数 {current.get('metric', '')} -> {route.get('metric', '')})"
+        if args.dry_run or args.verbose:
+            print(text)
+
+    if args.dry_run:
+        print(f"共 {len(changes)} 处修改，{result.skipped} 条无需修改（未执行）", file=sys.stderr)
+        return 0
+
+    print(result.summary(), file=sys.stderr)
+    for action, route, error in result.failures:
+        print(f"  {symbols.get(action, '-')} {format_route(route)}: {error}", file=sys.stderr)
+    return 0 if result.ok else 1
+
+
+def cmd_reconcile(args):
+    """使当前路由表与期望状态文件一致；--dry-run 只显示差异"""
+    import time
+    from route_reconcile import DesiredState, DesiredStateError, plan_reconcile, load_live_routes
+    from route_apply import apply_changes, ACTION_ADD, ACTION_REPLACE
+
+    start_time = time.perf_counter()
+    try:
+        desired = DesiredState.load(args.file)
+    except (DesiredStateError, OSError) as e:
+        print(f"读取期望状态失败: {e}", file=sys.stderr)
+        return 1
+
+    if args.route_print:
+        live_routes = []
+        for version in desired.versions:
+            live_routes.extend(load_routes(args, version))
+    else:
+        live_routes = load_live_routes(desired)
+    changes, unchanged = plan_reconcile(desired, live_routes)
+
+    symbols = {ACTION_ADD: '+', ACTION_REPLACE: '~'}
+    for action, route, current in changes:
+        text = f"{symbols.get(action, '-')} {format_route(route)}"
+        if action == ACTION_REPLACE:
+            text += f" (当前: {format_route(current)})"
+        print(text)
+    print(f"期望 {len(desired.routes)} 条路由，{unchanged} 条一致，需要修改 {len(changes)} 处"
+          f"（{(time.perf_counter() - start_time) * 1000:.0f}毫秒）", file=sys.stderr)
+
+    if args.dry_run or not changes:
+        return 0
+
+    result = apply_changes(changes, unchanged)
+    _notify_daemon(args)
+    print(result.summary(), file=sys.stderr)
+    for action, route, error in result.failures:
+        print(f"  {symbols.get(action, '-')} {format_route(route)}: {error}", file=sys.stderr)
+    return 0 if result.ok else 1
+
+
+def cmd_export(args):
+    """导出路由表：默认依次写出IPv4和IPv6路由"""
+    from route_io import RouteWriter, export_routes, route_file_format
+
+    versions = ["IPv4"] if args.ipv4 else ["IPv6"] if args.ipv6 else ["IPv4", "IPv6"]
+    tables = (load_routes(args, version) for version in versions)
+    if args.file == '-':
+        fmt = args.format or 'ndjson'
+        out = sys.stdout.buffer if fmt == 'rtab' else sys.stdout
+        with RouteWriter(out, fmt) as writer:
+            for routes in tables:
+                writer.write(routes)
+        out.flush()
+        count = writer.count
+    else:
+        count = export_routes(args.file, tables, args.format or route_file_format(args.file))
+    print(f"已导出 {count} 条路由", file=sys.stderr)
+    return 0
+
+
+def cmd_diff(args):
+    """比较路由列表文件与当前路由表：- 仅在文件中，+ 仅在当前路由表中，~ 跃点数不同"""
+    version = "IPv6" if args.ipv6 else "IPv4"
+    saved = (route for route in iter_route_file(args.file) if route_version(route) == version)
+    removed, added, changed = diff_route_lists(saved, load_routes(args, version))
+
+    for route in removed:
+        print(f"- {format_route(route)}")
+    for route in added:
+        print(f"+ {format_route(route)}")
+    for old, route in changed:
+        print(f"~ {format_route(route)} (跃点数 {old.get('metric', '')} -> {route.get('metric', '')})")
+
+    changes = len(removed) + len(added) + len(changed)
+    print(f"共 {changes} 处差异", file=sys.stderr)
+    return 1 if changes else 0
+
+
+def cmd_lookup(args):
+    from route_lookup import RouteLookup, parse_address
+
+    lookups = {}
+    status = 0
+    for address in args.addresses:
+        try:
+            ipv6, _value = parse_address(address)
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            status = 1
+            continue
+        version = "IPv6" if ipv6 else "IPv4"
+        if version not in lookups:
+            lookups[version] = RouteLookup(load_routes(args, version))
+        route = lookups[version].lookup(address)
+        if route is None:
+            print(f"{address} -> 没有匹配的路由")
+            status = 1
+        else:
+            print(f"{address} -> {format_route(route)}")
+    return status
+
+
+def _parse_time(text):
+    """时间参数：Unix时间戳或 YYYY-MM-DD[ HH:MM[:SS]]（本地时间）"""
+    import time
+
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            return time.mktime(time.strptime(text, fmt))
+        except ValueError:
+            continue
+    raise ValueError(f"无法识别的时间: {text}")
+
+
+def _format_time(timestamp):
+    import time
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+
+
+def cmd_history(args):
+    """记录路由历史，或查看历史记录、还原指定时刻的路由表"""
+    import time
+    from route_history import RouteHistory, HistoryRecorder, default_history_path
+    from route_core import SNAPSHOT_MAX_AGE
+
+    history = RouteHistory(args.file or default_history_path())
+    with history:
+        if args.history_command == 'record':
+            recorder = HistoryRecorder(history, lambda version: get_system_routes(version, max_age=SNAPSHOT_MAX_AGE),
+                                       interval=args.interval,
+                                       log=lambda message: print(f"{_format_time(time.time())} {message}", file=sys.stderr))
+            print(f"记录路由历史到 {history.path}，每 {args.interval} 秒一次，按 Ctrl+C 停止", file=sys.stderr)
+            try:
+                recorder.run()
+            except KeyboardInterrupt:
+                pass
+            return 0
+
+        version = "IPv6" if args.ipv6 else "IPv4"
+        if args.history_command == 'list':
+            records = history.records(version)
+            for record in records:
+                kind = '关键帧' if record.keyframe else '增量'
+                print(f"{_format_time(record.timestamp)}  {kind:<4} +{record.added} -{record.removed}  {record.size} 字节")
+            print(f"共 {len(records)} 条{version}记录", file=sys.stderr)
+            return 0
+
+        routes, timestamp = history.routes_at(version, _parse_time(args.time))
+        if routes is None:
+            print(f"{args.time} 之前没有{version}路由历史记录", file=sys.stderr)
+            return 1
+        print(f"{_format_time(timestamp)} 记录的路由表，共 {len(routes)} 条", file=sys.stderr)
+        print_routes(routes, args.format, args.ipv6)
+        return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='route_cli', description='系统路由配置管理（命令行）')
+    parser.add_argument('--route-print', metavar='FILE',
+                        help='读取保存的 route print 输出代替当前系统路由表（list/diff/lookup）')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='命令结束后把各阶段（启动子进程、读取、解析等）的耗时保存到文件')
+    parser.add_argument('--profile-format', choices=('json', 'chrome'), default='json',
+                        help='--profile 的文件格式：json 汇总，或 chrome 跟踪文件（chrome://tracing、Perfetto）')
+    parser.add_argument('--cprofile', metavar='FILE', help='用 cProfile 运行命令，结果保存到文件（pstats格式）')
+    parser.add_argument('--daemon', metavar='ADDR', default=os.environ.get('ROUTECONF_DAEMON'),
+                        help='通过守护进程读取和修改路由（Unix套接字路径或 主机:端口，'
+                             '默认取环境变量 ROUTECONF_DAEMON）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = subparsers.add_parser('list', help='显示路由表')
+    list_parser.add_argument('-6', '--ipv6', action='store_true', help='显示IPv6路由')
+    list_parser.add_argument('--format', choices=('table', 'csv', 'json', 'ndjson'), default='table', help='输出格式')
+    list_parser.set_defaults(func=cmd_list)
+
+    add_parser = subparsers.add_parser('add', help='添加路由')
+    add_parser.add_argument('destination', help='目标网络，如 192.168.100.0 或 2001:db8::')
+    add_parser.add_argument('netmask', help='子网掩码（IPv4）或前缀长度（IPv6）')
+    add_parser.add_argument('gateway', nargs='?', help="网关地址或 On-link")
+    add_parser.add_argument('--if', dest='interface', help='接口编号')
+    add_parser.add_argument('--metric', help='跃点数')
+    add_parser.add_argument('-p', '--persistent', action='store_true', help='持久路由（仅Windows）')
+    add_parser.add_argument('--dry-run', action='store_true', help='只显示命令，不执行')
+    add_parser.set_defaults(func=cmd_add)
+
+    delete_parser = subparsers.add_parser('delete', help='删除路由')
+    delete_parser.add_argument('destination', help='目标网络')
+    delete_parser.add_argument('netmask', nargs='?', help='子网掩码（IPv4）或前缀长度（IPv6）')
+    delete_parser.add_argument('--dry-run', action='store_true', help='只显示命令，不执行')
+    delete_parser.set_defaults(func=cmd_delete)
+
+    export_parser = subparsers.add_parser('export', help='导出路由表（逐行写出，适合大路由表）')
+    export_parser.add_argument('file', help='输出文件：.csv/.ndjson/.jsonl/.json/.rtab（二进制列式），- 为标准输出')
+    export_parser.add_argument('--format', choices=('csv', 'ndjson', 'json', 'rtab'),
+                               help='文件格式（默认按扩展名）')
+    export_group = export_parser.add_mutually_exclusive_group()
+    export_group.add_argument('-4', '--ipv4', action='store_true', help='只导出IPv4路由')
+    export_group.add_argument('-6', '--ipv6', action='store_true', help='只导出IPv6路由')
+    export_parser.set_defaults(func=cmd_export)
+
+    apply_parser = subparsers.add_parser('apply-file', help='批量应用路由（只提交与当前路由表不同的部分）')
+    apply_parser.add_argument('file', help='路由列表（.csv/.ndjson/.json/.rtab）或每行一条 add/delete 子命令的操作文件')
+    apply_parser.add_argument('--dry-run', action='store_true', help='只显示需要的修改，不执行')
+    apply_parser.add_argument('-v', '--verbose', action='store_true', help='显示每一处修改')
+    apply_parser.set_defaults(func=cmd_apply_file)
+
+    reconcile_parser = subparsers.add_parser('reconcile', help='使路由表与期望状态文件（JSON/TOML/YAML）一致')
+    reconcile_parser.add_argument('file', help='期望状态文件（JSON/TOML/YAML）或路由列表（.csv/.ndjson/.rtab）')
+    reconcile_parser.add_argument('--dry-run', action='store_true', help='只显示差异，不执行')
+    reconcile_parser.set_defaults(func=cmd_reconcile)
+
+    diff_parser = subparsers.add_parser('diff', help='比较路由列表文件与当前路由表')
+    diff_parser.add_argument('file', help='list/export 保存的路由列表（.csv/.ndjson/.json/.rtab）')
+    diff_parser.add_argument('-6', '--ipv6', action='store_true', help='比较IPv6路由')
+    diff_parser.set_defaults(func=cmd_diff)
+
+    lookup_parser = subparsers.add_parser('lookup', help='查询目标IP使用的路由')
+    lookup_parser.add_argument('addresses', nargs='+', metavar='address', help='目标IP地址')
+    lookup_parser.set_defaults(func=cmd_lookup)
+
+    history_parser = subparsers.add_parser('history', help='记录路由历史，还原任意时刻的路由表')
+    history_parser.add_argument('--file', help='历史日志文件（默认与图形界面共用）')
+    history_subparsers = history_parser.add_subparsers(dest='history_command', required=True)
+    record_parser = history_subparsers.add_parser('record', help='在前台定期记录路由表的变化')
+    record_parser.add_argument('--interval', type=float, default=10, help='记录间隔（秒，默认 10）')
+    history_list_parser = history_subparsers.add_parser('list', help='列出历史记录')
+    history_list_parser.add_argument('-6', '--ipv6', action='store_true', help='IPv6路由的记录')
+    show_parser = history_subparsers.add_parser('show', help='显示指定时刻的路由表')
+    show_parser.add_argument('time', help='时间：YYYY-MM-DD HH:MM:SS（本地时间）或Unix时间戳')
+    show_parser.add_argument('-6', '--ipv6', action='store_true', help='显示IPv6路由')
+    show_parser.add_argument('--format', choices=('table', 'csv', 'json', 'ndjson'), default='table',
+                             help='输出格式')
+    history_parser.set_defaults(func=cmd_history)
+
+    metrics_parser = subparsers.add_parser('metrics', help='在本地HTTP端口提供 Prometheus/OpenMetrics 路由指标')
+    metrics_parser.add_argument('--host', default='127.0.0.1', help='监听地址（默认 127.0.0.1）')
+    metrics_parser.add_argument('--port', type=int, default=9464, help='监听端口（默认 9464）')
+    metrics_parser.add_argument('--interval', type=float, default=30,
+                                help='定期重新读取路由的间隔（秒，默认 30；Linux下路由变化时立即读取）')
+    metrics_parser.add_argument('--no-watch', action='store_true', help='不订阅路由变化，只定期读取')
+    metrics_parser.set_defaults(func=cmd_metrics)
+
+    daemon_parser = subparsers.add_parser('daemon', help='运行路由守护进程，多个客户端共用一份路由缓存')
+    daemon_parser.add_argument('--listen', metavar='ADDR',
+                               help='监听地址：Unix套接字路径或 127.0.0.1:端口'
+                                    '（默认 /run/routeconf.sock，Windows为 127.0.0.1:8766）')
+    daemon_parser.add_argument('--ttl', type=float, default=60, help='路由缓存有效期（秒，默认 60）')
+    daemon_parser.add_argument('--interval', type=float, default=30,
+                               help='无法订阅路由变化时，有订阅者时的检查间隔（秒，默认 30）')
+    daemon_parser.add_argument('--no-watch', action='store_true', help='不订阅路由变化，只按间隔检查')
+    daemon_parser.add_argument('--allow-changes', action='store_true',
+                               help='TCP监听时也接受添加/删除路由的请求（Unix套接字总是接受，由文件权限控制）')
+    daemon_parser.set_defaults(func=cmd_daemon)
+
+    watch_parser = subparsers.add_parser('watch', help='显示守护进程推送的路由变化（需要 --daemon）')
+    watch_parser.add_argument('-6', '--ipv6', action='store_true', help='只显示IPv6路由的变化')
+    watch_parser.add_argument('-4', '--ipv4', action='store_true', help='只显示IPv4路由的变化')
+    watch_parser.set_defaults(func=cmd_watch)
+
+    return parser
+
+
+def cmd_metrics(args):
+    """以常驻进程在本地HTTP端口提供 Prometheus/OpenMetrics 指标，直到 Ctrl+C"""
+    from route_metrics import RouteMetrics, MetricsExporter
+
+    def log(message):
+        print(message, file=sys.stderr)
+
+    exporter = MetricsExporter(RouteMetrics(log=log), host=args.host, port=args.port,
+                               interval=args.interval, watch=not args.no_watch, log=log).start()
+    try:
+        exporter.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        exporter.stop()
+    return 0
+
+
+def cmd_daemon(args):
+    """运行路由守护进程，直到 Ctrl+C"""
+    from route_daemon import RouteService, RouteDaemon, default_daemon_address, parse_daemon_address
+
+    def log(message):
+        print(message, file=sys.stderr)
+
+    address = args.listen or default_daemon_address()
+    kind, _target = parse_daemon_address(address)
+    service = RouteService(ttl=args.ttl, allow_changes=kind == 'unix' or args.allow_changes, log=log)
+    daemon = RouteDaemon(service, address, interval=args.interval, watch=not args.no_watch, log=log).start()
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+    return 0
+
+
+def cmd_watch(args):
+    """逐行显示守护进程推送的路由变化，直到 Ctrl+C"""
+    client = daemon_client(args)
+    if client is None:
+        print("需要用 --daemon 或环境变量 ROUTECONF_DAEMON 指定守护进程地址", file=sys.stderr)
+        return 1
+
+    versions = {"IPv4", "IPv6"}
+    if args.ipv4 != args.ipv6:
+        versions = {"IPv6" if args.ipv6 else "IPv4"}
+    for event in client.events():
+        if event['type'] == 'resync':
+            print("# 错过了部分变化，请重新读取完整路由表", flush=True)
+        elif event['type'] == 'routes' and event['version'] in versions:
+            for route in event['removed']:
+                print(f"- {format_route(route)}")
+            for route in event['added']:
+                print(f"+ {format_route(route)}")
+            sys.stdout.flush()
+    return 0
+
+
+def save_profile(args):
+    """保存 --profile / --cprofile 指定的性能记录"""
+    try:
+        if args.profile:
+            if args.profile_format == 'chrome':
+                PROFILER.write_chrome_trace(args.profile)
+            else:
+                PROFILER.write_json(args.profile)
+        if args.cprofile and PROFILER.last_cprofile is not None:
+            PROFILER.last_cprofile.dump_stats(args.cprofile)
+    except OSError as e:
+        print(f"保存性能记录失败: {e}", file=sys.stderr)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.cprofile:
+            return PROFILER.run_cprofile(args.func, args)
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    finally:
+        save_profile(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""
+路由核心逻辑 - 与界面无关、可在各模块间共享的公共函数
+
+图形界面和命令行工具共用这里的路由数据读取、输入验证和命令构建逻辑，
+本模块不依赖 tkinter；命令行工具每次调用都会导入本模块，
+较重的标准库模块在用到时才导入，以缩短启动时间。
+"""
+
+import sys
+
+# 一次命令行操作内，读取IPv4和IPv6路由时复用同一次 route print 的最长间隔（秒）
+SNAPSHOT_MAX_AGE = 5
+
+# 逐行读取命令输出时每批读取的字符数（约数）
+READ_BATCH_SIZE = 64 * 1024
+
+
+def route_table_name(route):
+    """路由所属的路由表；Windows持久路由视为独立的 persistent 表"""
+    table = route.get('table')
+    if table:
+        return table
+    return 'persistent' if route.get('persistent', False) else 'main'
+
+
+def route_key(route):
+    """路由的稳定标识：(目标网络, 子网掩码/前缀长度, 网关, 接口, 路由表)
+
+    跃点数不属于标识的一部分，跃点数变化视为同一路由的更新。
+    """
+    return (
+        route.get('destination', ''),
+        route.get('netmask', ''),
+        route.get('gateway', ''),
+        route.get('interface', ''),
+        route_table_name(route)
+    )
+
+
+def route_iid(route):
+    """路由在Treeview中的行标识"""
+    return '|'.join(route_key(route))
+
+
+def route_version(route):
+    """根据目标地址判断路由的协议版本"""
+    return "IPv6" if ':' in route.get('destination', '') else "IPv4"
+
+
+def diff_rows(old_rows, new_rows):
+    """比较两次表格快照 {行标识: 显示值}
+
+    返回 (新增行标识列表, 值变化的行标识列表, 删除的行标识列表)，
+    新增列表按 new_rows 中的顺序排列。
+    """
+    removed = [iid for iid in old_rows if iid not in new_rows]
+    added = []
+    updated = []
+    for iid, values in new_rows.items():
+        old_values = old_rows.get(iid)
+        if old_values is None:
+            added.append(iid)
+        elif old_values != values:
+            updated.append(iid)
+    return added, updated, removed
+
+
+def diff_route_lists(saved, live):
+    """按路由标识比较两个路由列表
+
+    返回 (仅在 saved 中的路由, 仅在 live 中的路由, [(saved中的路由, live中的路由)] 跃点数不同)
+    """
+    saved = {route_key(route): route for route in saved}
+    live = {route_key(route): route for route in live}
+    removed = [route for key, route in saved.items() if key not in live]
+    added = []
+    changed = []
+    for key, route in live.items():
+        old = saved.get(key)
+        if old is None:
+            added.append(route)
+        elif old.get('metric', '') != route.get('metric', ''):
+            changed.append((old, route))
+    return removed, added, changed
+
+
+def get_system_routes(version="IPv4", log=None, max_age=0, progress=None):
+    """读取当前系统的路由表（RouteTable），图形界面和命令行工具共用
+
+    version: "IPv4" 或 "IPv6"
+    log: 可选的进度日志回调
+    max_age: Windows下 max_age 秒内已执行过 route print 时复用其解析结果
+             （一次输出同时包含IPv4、IPv6路由和接口列表）
+    progress: 可选回调 progress(routes)，Windows下命令输出边到达边解析，
+              以逐步增加的 RouteTable 多次调用（在调用线程中执行）
+    """
+    log = log or (lambda message: None)
+
+    if is_windows():
+        import windows_routes
+        log("执行命令: route print" if version == "IPv4" else "执行命令: route print (获取IPv6)")
+        return windows_routes.get_windows_routes(version, max_age, progress)
+
+    if sys.platform.startswith('linux'):
+        import linux_routes
+        import netlink
+        try:
+            log("通过netlink转储路由表 (RTM_GETROUTE)")
+            return netlink.get_routes(version)
+        except OSError as e:
+            log(f"netlink转储失败，改为读取procfs: {e}")
+
+        # procfs只包含main表（IPv6另含local表）
+        log(f"读取内核路由表: /proc/net/{'route' if version == 'IPv4' else 'ipv6_route'}")
+        return linux_routes.get_linux_routes(version)
+
+    # 其他系统暂不支持
+    import platform
+    log(f"当前系统暂不支持读取路由表: {platform.system()}")
+    return []
+
+
+def get_system_interfaces(log=None, max_age=0):
+    """读取当前系统的网络接口列表，图形界面和命令行工具共用
+
+    返回 [{'number', 'name', 'display', 'ips', 'mac'}]；读取失败时抛出异常。
+    max_age: Windows下 max_age 秒内已执行过 route print 时复用其解析结果（与路由表共用）
+    """
+    log = log or (lambda message: None)
+
+    if is_windows():
+        import windows_routes
+        return windows_routes.get_route_print(max_age).interface_list()
+
+    if sys.platform.startswith('linux'):
+        import netlink
+        try:
+            # 通过netlink一次性转储接口和地址，无需启动ip命令
+            return netlink.get_interfaces()
+        except OSError as e:
+            log(f"netlink获取接口失败，改用ip命令: {e}")
+
+    import subprocess
+    result = subprocess.run(['ip', 'addr', 'show'], capture_output=True, text=True, timeout=10)
+    if result.returncode != 0:
+        raise Exception(f"执行ip命令失败: {result.stderr.strip()}")
+    return parse_ip_addr_interfaces(result.stdout)
+
+
+def parse_ip_addr_interfaces(output):
+    """解析 ip addr show 的输出，返回与 get_system_interfaces 格式相同的接口列表"""
+    import re
+
+    interfaces = []
+    current_interface = None
+    for raw_line in output.split('\n'):
+        line = raw_line.strip()
+        if line and ':' in line and not raw_line[:1].isspace():
+            # 接口行: 2: eth0: <BROADCAST,MULTICAST,UP,LOWER_UP>
+            parts = line.split(':', 2)
+            if len(parts) >= 2:
+                current_interface = {
+                    'number': parts[0].strip(),
+                    'name': parts[1].strip(),
+                    'ips': []
+                }
+                interfaces.append(current_interface)
+
+        elif current_interface and 'inet ' in line:
+            # IP地址行: inet 192.168.1.100/24 brd 192.168.1.255 scope global eth0
+            ip_match = re.search(r'inet\s+(\d+\.\d+\.\d+\.\d+)', line)
+            if ip_match:
+                current_interface['ips'].append(ip_match.group(1))
+
+    # 转换为统一格式
+    formatted_interfaces = []
+    for interface in interfaces:
+        display_name = interface['name']
+        if interface['ips']:
+            display_name += f" ({', '.join(interface['ips'][:2])})"
+
+        formatted_interfaces.append({
+            'number': interface['number'],
+            'name': interface['name'],
+            'display': f"{interface['number']} - {display_name}",
+            'ips': interface['ips'],
+            'mac': None
+        })
+    return formatted_interfaces
+
+
+def read_route_file(path):
+    """读取路由列表文件（.csv/.ndjson/.json/.rtab，list/export 的输出），返回路由字典列表
+
+    大文件请用 route_io.iter_route_file 逐条读取。
+    """
+    from route_io import iter_route_file
+
+    return list(iter_route_file(path))
+
+
+def validate_route_data(route_data, version):
+    """验证路由数据的有效性"""
+    import ipaddress
+
+    if version == "IPv4":
+        try:
+            # 验证目标网络
+            dest = route_data.get("destination", "").strip()
+            if not dest:
+                return "请输入目标网络地址"
+
+            # 验证子网掩码
+            mask = route_data.get("netmask", "").strip()
+            if not mask:
+                return "请输入子网掩码"
+
+            try:
+                ipaddress.ip_network(f"{dest}/{mask}", strict=False)
+            except ValueError as e:
+                return f"目标网络或子网掩码格式不正确:\n{str(e)}"
+
+            # 验证网关地址
+            gateway = route_data.get("gateway", "").strip()
+            if gateway and gateway != "On-link":
+                try:
+                    ipaddress.ip_address(gateway)
+                except ValueError as e:
+                    return f"网关地址格式不正确:\n{str(e)}"
+
+            # 验证接口
+            interface = route_data.get("interface", "").strip()
+            if interface:
+                if not interface.isdigit() or int(interface) < 1:
+                    return "接口编号必须是正整数"
+
+            # 验证跃点数
+            metric = route_data.get("metric", "").strip()
+            if metric:
+                if not metric.isdigit() or int(metric) < 0:
+                    return "跃点数必须是非负整数"
+
+        except Exception as e:
+            return f"数据验证过程中发生错误: {str(e)}"
+
+    else:  # IPv6
+        try:
+            # 验证目标网络
+            dest = route_data.get("destination", "").strip()
+            if not dest:
+                return "请输入目标网络地址"
+
+            # 验证前缀长度
+            prefix_len = route_data.get("prefix_length", "").strip()
+            if not prefix_len:
+                return "请输入前缀长度"
+
+            if not prefix_len.isdigit() or not (0 <= int(prefix_len) <= 128):
+                return "前缀长度必须是0-128之间的整数"
+
+            try:
+                ipaddress.ip_network(f"{dest}/{prefix_len}", strict=False)
+            except ValueError as e:
+                return f"目标网络或前缀长度格式不正确:\n{str(e)}"
+
+            # 验证网关地址
+            gateway = route_data.get("gateway", "").strip()
+            if gateway and gateway != "On-link":
+                try:
+                    ipaddress.ip_address(gateway)
+                except ValueError as e:
+                    return f"网关地址格式不正确:\n{str(e)}"
+
+            # 验证接口
+            interface = route_data.get("interface", "").strip()
+            if interface:
+                if not interface.isdigit() or int(interface) < 1:
+                    return "接口编号必须是正整数"
+
+            # 验证跃点数
+            metric = route_data.get("metric", "").strip()
+            if metric:
+                if not metric.isdigit() or int(metric) < 0:
+                    return "跃点数必须是非负整数"
+
+        except Exception as e:
+            return f"数据验证过程中发生错误: {str(e)}"
+
+    return None  # 验证通过
+
+
+def analyze_route_error(stderr, cmd, version):
+    """分析路由错误并提供详细建议"""
+    error_msg = f"路由添加失败:\n\n"
+    error_msg += f"执行的命令: {cmd}\n"
+    error_msg += f"错误信息: {stderr}\n\n"
+    error_msg += "可能的原因及解决方案:\n\n"
+
+    if "Element not found" in stderr:
+        error_msg += "❌ 网关地址不存在或不可达\n"
+        error_msg += "   解决方案:\n"
+        error_msg += "   1. 使用 'On-link' 作为网关\n"
+        error_msg += "   2. 点击'测试命令'检测可用网关\n"
+        error_msg += "   3. 使用系统中已存在的网关地址\n\n"
+
+    elif "access is denied" in stderr.lower() or "拒绝访问" in stderr:
+        error_msg += "❌ 权限不足\n"
+        error_msg += "   解决方案:\n"
+        error_msg += "   1. 右键点击命令提示符，选择'以管理员身份运行'\n"
+        error_msg += "   2. 在管理员命令提示符中运行程序\n\n"
+
+    elif "invalid parameter" in stderr.lower() or "参数无效" in stderr:
+        error_msg += "❌ 参数格式错误\n"
+        error_msg += "   解决方案:\n"
+        error_msg += "   1. 检查IP地址格式是否正确\n"
+        error_msg += "   2. 检查子网掩码或前缀长度\n"
+        error_msg += "   3. 确保所有参数都有值\n\n"
+
+    elif "already exists" in stderr.lower() or "已存在" in stderr:
+        error_msg += "❌ 路由已存在\n"
+        error_msg += "   解决方案:\n"
+        error_msg += "   1. 该路由已经存在，无需重复添加\n"
+        error_msg += "   2. 如需修改，请先删除现有路由\n\n"
+
+    else:
+        error_msg += "❌ 未知错误\n"
+        error_msg += "   通用解决方案:\n"
+        error_msg += "   1. 确保网络连接正常\n"
+        error_msg += "   2. 检查防火墙设置\n"
+        error_msg += "   3. 重启网络适配器\n\n"
+
+    if version == "IPv4":
+        error_msg += "💡 IPv4路由建议:\n"
+        error_msg += "   - 目标网络: 如 192.168.100.0\n"
+        error_msg += "   - 子网掩码: 如 255.255.255.0\n"
+        error_msg += "   - 网关: IP地址或 'On-link'\n\n"
+    else:
+        error_msg += "💡 IPv6路由建议:\n"
+        error_msg += "   - 目标网络: 如 2001:db8::\n"
+        error_msg += "   - 前缀长度: 如 32, 64, 128\n"
+        error_msg += "   - 网关: IPv6地址或 'On-link'\n\n"
+
+    error_msg += "🔧 调试步骤:\n"
+    error_msg += "   1. 点击'测试命令'按钮测试基础功能\n"
+    error_msg += "   2. 查看日志区域的详细错误信息\n"
+    error_msg += "   3. 尝试在命令提示符中手动执行命令"
+
+    return error_msg
+
+
+def is_windows():
+    """当前系统是否为Windows（sys.platform 无需导入 platform 模块）"""
+    return sys.platform == 'win32'
+
+
+def _linux_interface_name(interface):
+    """接口编号转换为Linux接口名"""
+    import socket
+    try:
+        return socket.if_indextoname(int(interface))
+    except (OSError, ValueError):
+        raise ValueError(f"接口编号不存在: {interface}") from None
+
+
+def build_add_command(route_data, version, windows=None):
+    """根据路由数据构建添加路由命令（需先通过 validate_route_data 验证）
+
+    Windows使用 route 命令，Linux使用 ip route；Linux下忽略持久路由选项。
+    """
+    if windows is None:
+        windows = is_windows()
+
+    destination = route_data["destination"].strip()
+    gateway = route_data.get('gateway', '').strip()
+    interface = route_data.get('interface', '').strip()
+    metric = route_data.get('metric', '').strip()
+
+    if windows:
+        if version == "IPv4":
+            cmd = f'route -4 add {destination} mask {route_data["netmask"].strip()} {gateway}'
+        else:
+            prefix_len = route_data.get("prefix_length", "64")
+            if gateway and gateway != 'On-link':
+                cmd = f'route -6 add {destination}/{prefix_len} {gateway}'
+            else:
+                cmd = f'route -6 add {destination}/{prefix_len}'
+        # 添加持久路由参数
+        if route_data.get('persistent', False):
+            cmd += ' -p'
+        # 添加接口参数
+        if interface:
+            cmd += f' IF {interface}'
+        if metric:
+            cmd += f' metric {metric}'
+        return cmd
+
+    import ipaddress
+
+    if version == "IPv4":
+        network = ipaddress.ip_network(f"{destination}/{route_data['netmask'].strip()}", strict=False)
+        cmd = f'ip -4 route add {network}'
+    else:
+        network = ipaddress.ip_network(f"{destination}/{route_data.get('prefix_length', '64')}", strict=False)
+        cmd = f'ip -6 route add {network}'
+    if gateway and gateway != 'On-link':
+        cmd += f' via {gateway}'
+    if interface:
+        cmd += f' dev {_linux_interface_name(interface)}'
+    if metric:
+        cmd += f' metric {metric}'
+    return cmd
+
+
+def build_delete_command(destination, netmask_or_prefix, version, windows=None, gateway=''):
+    """构建删除路由命令
+
+    destination 可以带 "/前缀长度"（IPv6路由表中的写法），此时忽略 netmask_or_prefix。
+    给出 gateway 时只删除经过该网关的路由，不影响同一目标的其他路由。
+    """
+    if windows is None:
+        windows = is_windows()
+
+    if '/' in destination:
+        destination, netmask_or_prefix = destination.split('/', 1)
+    gateway = gateway.strip() if gateway and gateway != 'On-link' else ''
+
+    if windows:
+        if version == "IPv4":
+            cmd = f'route -4 delete {destination}'
+            if netmask_or_prefix:
+                cmd += f' mask {netmask_or_prefix}'
+        elif netmask_or_prefix:
+            cmd = f'route -6 delete {destination}/{netmask_or_prefix}'
+        else:
+            cmd = f'route -6 delete {destination}'
+        return f'{cmd} {gateway}' if gateway else cmd
+
+    if netmask_or_prefix:
+        import ipaddress
+        destination = str(ipaddress.ip_network(f"{destination}/{netmask_or_prefix}", strict=False))
+    cmd = f'ip {"-4" if version == "IPv4" else "-6"} route del {destination}'
+    return f'{cmd} via {gateway}' if gateway else cmd
+
+
+def run_route_command(cmd, windows=None, timeout=10):
+    """执行路由命令，返回 subprocess.CompletedProcess
+
+    Windows下与原有实现一致通过shell执行 route 命令，其他系统直接执行不经过shell。
+    """
+    import shlex
+    import subprocess
+
+    if windows is None:
+        windows = is_windows()
+    return subprocess.run(cmd if windows else shlex.split(cmd),
+                          capture_output=True,
+                          text=True,
+                          shell=windows,
+                          timeout=timeout,
+                          encoding='utf-8',
+                          errors='ignore')
+
+
+# 批量脚本中每组命令结束后输出的标记行：标记 下标 返回码
+_SCRIPT_MARK = '@@route-script@@'
+
+
+def run_route_script(command_groups, windows=None, timeout=10, progress=None):
+    """在同一个进程中依次执行多组路由命令，返回 {组下标: 错误信息}
+
+    每组中的命令依次执行，前一条失败时不再执行后面的命令（如替换时删除失败则不添加）。
+    Windows下写成一个批处理脚本交给一个 cmd 进程执行，其他系统交给一个 sh 进程，
+    不再为每条命令各启动一个进程；timeout 为每组命令的时间。
+    progress(已完成组数, 总组数) 在每组命令结束时调用。
+    """
+    import os
+    import subprocess
+    import tempfile
+
+    if windows is None:
+        windows = is_windows()
+    total = len(command_groups)
+    if not total:
+        return {}
+
+    if windows:
+        lines = ['@echo off']
+        for index, commands in enumerate(command_groups):
+            lines.append(' && '.join(f'{cmd} 2>&1' for cmd in commands))
+            lines.append(f'echo {_SCRIPT_MARK} {index} %ERRORLEVEL%')
+        suffix, newline, argv = '.cmd', '\r\n', ['cmd', '/d', '/q', '/c']
+    else:
+        lines = []
+        for index, commands in enumerate(command_groups):
+            lines.append(' && '.join(f'{cmd} 2>&1' for cmd in commands))
+            lines.append(f'echo "{_SCRIPT_MARK} {index} $?"')
+        suffix, newline, argv = '.sh', '\n', ['sh']
+
+    fd, path = tempfile.mkstemp(suffix=suffix, text=False)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(newline.join(lines) + newline)
+
+        errors = {}
+        output = []
+        done = 0
+        try:
+            for line in iter_command_lines(argv + [path], timeout=timeout * total, shell=False):
+                if not line.startswith(_SCRIPT_MARK):
+                    output.append(line)
+                    continue
+                _mark, index, returncode = line.split()
+                if returncode != '0':
+                    errors[int(index)] = ''.join(output).strip() or f"返回码 {returncode}"
+                output = []
+                done += 1
+                if progress:
+                    progress(done, total)
+        except subprocess.SubprocessError as e:
+            # 脚本中断：尚未报告结果的组都记为失败
+            message = str(e)
+            for index in range(done, total):
+                errors[index] = message
+        return errors
+    finally:
+        os.unlink(path)
+
+
+def iter_command_lines(cmd, timeout=10, encoding='utf-8', shell=None):
+    """执行命令并逐行产出标准输出，输出到达即可开始解析，不必等待命令结束
+
+    超过 timeout 秒时结束进程并抛出 subprocess.TimeoutExpired；
+    返回码非0时抛出 subprocess.CalledProcessError（stderr 为错误输出）。
+    调用方提前停止迭代时进程会被结束。
+    """
+    import subprocess
+    import tempfile
+    import threading
+    import time
+    from route_profile import PROFILER, STAGE_SPAWN, STAGE_READ
+
+    if shell is None:
+        shell = is_windows()
+
+    # 错误输出写入临时文件，避免在读取标准输出期间管道写满而阻塞
+    with tempfile.TemporaryFile() as stderr:
+        with PROFILER.span(STAGE_SPAWN):
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, shell=shell,
+                                       text=True, encoding=encoding, errors='ignore')
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.daemon = True
+        timer.start()
+        # 按批读取并计时（不逐行计时），读取时间不含调用方处理各行的时间
+        read_start = time.perf_counter()
+        read_wall = read_cpu = 0.0
+        read_lines = 0
+        try:
+            with process.stdout:
+                while True:
+                    started = time.perf_counter()
+                    cpu = time.thread_time()
+                    lines = process.stdout.readlines(READ_BATCH_SIZE)
+                    read_wall += time.perf_counter() - started
+                    read_cpu += time.thread_time() - cpu
+                    if not lines:
+                        break
+                    read_lines += len(lines)
+                    yield from lines
+            returncode = process.wait()
+        finally:
+            PROFILER.add(STAGE_READ, read_start, read_wall, read_cpu, read_lines)
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        if returncode != 0:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(returncode, cmd,
+                                                stderr=stderr.read().decode(encoding, errors='ignore'))
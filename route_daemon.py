@@ -0,0 +1,659 @@
+#!/usr/bin/env python3
+"""
+路由守护进程 - 同一台主机上的多个客户端共用一份路由缓存
+
+守护进程负责读取路由表和接口列表并缓存，图形界面、命令行工具和脚本作为客户端连接，
+N 个客户端同时请求过期的路由表时只读取一次（同一协议版本同时只有一次读取），
+响应的序列化结果和最长前缀匹配索引也按读取结果缓存。
+Linux下订阅内核路由变化，其他系统按固定间隔检查；每次读取与上次结果比较，
+把新增和删除的路由推送给订阅者。
+
+接口为HTTP/1.1上的JSON（支持keep-alive），监听Unix套接字或本机TCP端口：
+    GET  /routes?version=IPv4[&format=binary]      路由列表（binary 为 route_snapshot 的列式编码）
+    GET  /interfaces                               网络接口列表
+    GET  /lookup?address=8.8.8.8[&address=...]     最长前缀匹配查询
+    POST /routes     {"action": "add"|"delete", "version", "route": {...}}
+    POST /diff       {"version", "routes": [...]}  与当前路由表比较
+    POST /invalidate {"version": null|"IPv4"|"IPv6"} 客户端自行修改路由后通知
+    GET  /events[?since=序号]                      路由变化推送（每行一个JSON，分块传输的长连接）
+    GET  /status                                   读取次数、请求次数、订阅者数量
+
+用法（通常通过命令行工具启动）:
+    python route_cli.py daemon [--listen /run/routeconf.sock | 127.0.0.1:8766]
+    python route_cli.py --daemon /run/routeconf.sock list
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from route_cache import RouteCache, route_cache_key
+from route_core import (is_windows, route_version, diff_route_lists, get_system_routes, get_system_interfaces,
+                        validate_route_data, build_add_command, build_delete_command, run_route_command,
+                        SNAPSHOT_MAX_AGE)
+from route_table import RouteTable
+
+DEFAULT_SOCKET_PATH = '/run/routeconf.sock'
+DEFAULT_TCP_ADDRESS = '127.0.0.1:8766'
+# 环境变量：图形界面和命令行工具通过此地址的守护进程读取路由
+DAEMON_ENV = 'ROUTECONF_DAEMON'
+
+# 路由和接口缓存的有效期（秒）
+DEFAULT_TTL = 60
+# 没有变化通知时检查路由变化的间隔（秒），只在有订阅者时检查
+DEFAULT_INTERVAL = 30
+# 收到路由变化通知后等待多久再读取（秒）
+CHANGE_DELAY = 0.5
+# 保留的最近变化事件数，断线重连的订阅者可以从中补齐
+EVENT_BUFFER = 1000
+# 推送连接没有事件时的心跳间隔（秒）
+HEARTBEAT_INTERVAL = 15
+
+VERSIONS = ('IPv4', 'IPv6')
+
+CONTENT_TYPE_JSON = 'application/json; charset=utf-8'
+CONTENT_TYPE_TABLE = 'application/x-routeconf-table'
+CONTENT_TYPE_NDJSON = 'application/x-ndjson; charset=utf-8'
+
+
+class DaemonError(Exception):
+    """守护进程请求失败（连接失败或返回错误）"""
+
+
+def default_daemon_address():
+    """默认地址：Windows为本机TCP端口，其他系统为Unix套接字"""
+    return DEFAULT_TCP_ADDRESS if is_windows() else DEFAULT_SOCKET_PATH
+
+
+def parse_daemon_address(address):
+    """地址字符串转换为 ('unix', 路径) 或 ('tcp', (主机, 端口))
+
+    接受 /path/to.sock、unix:/path/to.sock、127.0.0.1:8766、http://127.0.0.1:8766
+    """
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    if address.startswith('/') or address.startswith('.'):
+        return 'unix', address
+    if address.startswith('http://'):
+        address = address[len('http://'):].rstrip('/')
+    host, sep, port = address.rpartition(':')
+    if not sep or not port.isdigit():
+        raise ValueError(f"无效的守护进程地址: {address}")
+    return 'tcp', (host.strip('[]') or '127.0.0.1', int(port))
+
+
+def _json_bytes(value):
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+class _Collected:
+    """一次读取的路由表，以及按需生成并缓存的响应内容和查询索引"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self._lock = threading.Lock()
+        self._json = None
+        self._binary = None
+        self._lookup = None
+
+    def json(self, version):
+        with self._lock:
+            if self._json is None:
+                self._json = _json_bytes({'version': version, 'routes': [dict(route) for route in self.routes]})
+            return self._json
+
+    def binary(self):
+        from route_snapshot import pack_route_table
+
+        with self._lock:
+            if self._binary is None:
+                self._binary = pack_route_table(self.routes)
+            return self._binary
+
+    def lookup(self):
+        from route_lookup import RouteLookup
+
+        with self._lock:
+            if self._lookup is None:
+                self._lookup = RouteLookup(self.routes)
+            return self._lookup
+
+
+class RouteService:
+    """守护进程的路由缓存、读取和变化推送；线程安全"""
+
+    def __init__(self, ttl=DEFAULT_TTL, allow_changes=True, log=None):
+        self.ttl = ttl
+        self.allow_changes = allow_changes
+        self.log = log or (lambda message: None)
+        self.cache = RouteCache(ttl=ttl)
+        self._collect_locks = {version: threading.Lock() for version in VERSIONS}
+        self._previous = {}
+        self._interfaces = None
+        self._interfaces_time = 0
+        self._interfaces_lock = threading.Lock()
+
+        # 变化事件：(序号, 编码后的事件)
+        self._events = deque(maxlen=EVENT_BUFFER)
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self.subscribers = 0
+        self.collections = 0
+        self.requests = 0
+
+    def routes(self, version):
+        """当前路由表（_Collected）；缓存过期时读取，同一协议版本同时只有一次读取"""
+        key = route_cache_key(version)
+        collected, fresh = self.cache.get(key)
+        if fresh:
+            return collected
+        with self._collect_locks[version]:
+            # 等待期间其他客户端可能已经读取完成
+            collected, fresh = self.cache.get(key)
+            if fresh:
+                return collected
+            return self._collect(version)
+
+    def _collect(self, version):
+        key = route_cache_key(version)
+        token = self.cache.begin(key)
+        routes = get_system_routes(version, log=self.log, max_age=SNAPSHOT_MAX_AGE)
+        if not isinstance(routes, RouteTable):
+            routes = RouteTable(routes)
+        collected = _Collected(routes)
+        self.cache.put(key, collected, token)
+        self.collections += 1
+        self._publish_changes(version, routes)
+        return collected
+
+    def _publish_changes(self, version, routes):
+        """与上次读取的结果比较，推送新增和删除的路由"""
+        previous = self._previous.get(version)
+        rows = routes.row_tuples()
+        self._previous[version] = rows
+        if previous is None:
+            return
+        previous_set = set(previous)
+        current_set = set(rows)
+        added = [row for row in rows if row not in previous_set]
+        removed = [row for row in previous if row not in current_set]
+        if not added and not removed:
+            return
+        self.publish({'type': 'routes', 'version': version, 'count': len(routes),
+                      'added': RouteTable.from_row_tuples(added).to_dicts(),
+                      'removed': RouteTable.from_row_tuples(removed).to_dicts()})
+
+    def publish(self, event):
+        """向订阅者推送事件（加上序号和时间）"""
+        with self._condition:
+            self._sequence += 1
+            event = dict(event, seq=self._sequence, time=time.time())
+            self._events.append((self._sequence, _json_bytes(event) + b'\n'))
+            self._condition.notify_all()
+
+    def events_after(self, since, timeout):
+        """序号大于 since 的事件 [(序号, 编码后的事件)]；没有时最多等待 timeout 秒
+
+        since 早于保留的最早事件（或来自重启前的守护进程）时返回 None，订阅者需要重新读取完整路由表。
+        """
+        with self._condition:
+            if since > self._sequence:
+                # 序号来自重启前的守护进程
+                return None
+            if since < self._sequence:
+                if self._events and self._events[0][0] > since + 1:
+                    return None
+            else:
+                self._condition.wait(timeout)
+            return [(sequence, data) for sequence, data in self._events if sequence > since]
+
+    @property
+    def sequence(self):
+        return self._sequence
+
+    def interfaces(self):
+        """网络接口列表（缓存 ttl 秒）"""
+        with self._interfaces_lock:
+            if self._interfaces is None or time.time() - self._interfaces_time >= self.ttl:
+                self._interfaces = get_system_interfaces(log=self.log, max_age=SNAPSHOT_MAX_AGE)
+                self._interfaces_time = time.time()
+            return self._interfaces
+
+    def invalidate(self, version=None):
+        """路由被修改后调用：缓存过期，下次请求时重新读取"""
+        if is_windows():
+            import windows_routes
+            windows_routes.invalidate_route_print()
+        self.cache.invalidate(version)
+        with self._interfaces_lock:
+            self._interfaces = None
+
+    def refresh(self, versions=VERSIONS):
+        """使缓存过期并立即重新读取（有变化时推送给订阅者）"""
+        for version in versions:
+            self.cache.invalidate(version)
+            try:
+                self.routes(version)
+            except Exception as e:
+                self.log(f"读取{version}路由失败: {e}")
+
+    def lookup(self, addresses):
+        """查询各地址使用的路由：[{'address', 'route' 或 None, 'error'}]"""
+        from route_lookup import parse_address
+
+        results = []
+        for address in addresses:
+            try:
+                ipv6, _value = parse_address(address)
+            except ValueError as e:
+                results.append({'address': address, 'route': None, 'error': str(e)})
+                continue
+            route = self.routes("IPv6" if ipv6 else "IPv4").lookup().lookup(address)
+            results.append({'address': address, 'route': dict(route) if route is not None else None})
+        return results
+
+    def diff(self, version, routes):
+        """比较客户端提供的路由列表与当前路由表"""
+        removed, added, changed = diff_route_lists(
+            [route for route in routes if route_version(route) == version], self.routes(version).routes)
+        return {'removed': [dict(route) for route in removed],
+                'added': [dict(route) for route in added],
+                'changed': [{'old': dict(old), 'route': dict(route)} for old, route in changed]}
+
+    def change(self, action, version, route):
+        """添加或删除路由，返回错误信息，成功时返回 None"""
+        if not self.allow_changes:
+            return "守护进程为只读模式，不接受修改路由的请求"
+        try:
+            if action == 'add':
+                error = validate_route_data(route, version)
+                if error:
+                    return error
+                cmd = build_add_command(route, version)
+            elif action == 'delete':
+                cmd = build_delete_command(route.get('destination', ''),
+                                           route.get('netmask') or route.get('prefix_length') or '', version)
+            else:
+                return f"不支持的操作: {action}"
+        except ValueError as e:
+            return str(e)
+
+        self.log(f"执行: {cmd}")
+        result = run_route_command(cmd)
+        self.invalidate(version)
+        if result.returncode != 0:
+            return (result.stderr or result.stdout).strip() or f"返回码 {result.returncode}"
+        # 立即重新读取，订阅者收到这次修改
+        self.refresh((version,))
+        return None
+
+
+def _make_handler(service, stopped):
+    from http.server import BaseHTTPRequestHandler
+    from urllib.parse import urlsplit, parse_qs
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, content_type=CONTENT_TYPE_JSON):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, value, status=200):
+            self._send(status, _json_bytes(value))
+
+        def _error(self, status, message):
+            self._send_json({'error': message}, status)
+
+        def _read_json(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            if not length:
+                return {}
+            return json.loads(self.rfile.read(length).decode('utf-8'))
+
+        def _version(self, value):
+            version = value or "IPv4"
+            if version not in VERSIONS:
+                raise ValueError(f"无效的协议版本: {version}")
+            return version
+
+        def do_GET(self):
+            service.requests += 1
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            try:
+                if url.path == '/routes':
+                    version = self._version(query.get('version', [None])[0])
+                    collected = service.routes(version)
+                    if query.get('format', [''])[0] == 'binary':
+                        self._send(200, collected.binary(), CONTENT_TYPE_TABLE)
+                    else:
+                        self._send(200, collected.json(version))
+                elif url.path == '/interfaces':
+                    self._send_json({'interfaces': service.interfaces()})
+                elif url.path == '/lookup':
+                    self._send_json({'results': service.lookup(query.get('address', []))})
+                elif url.path == '/events':
+                    self._stream_events(int(query.get('since', [service.sequence])[0]))
+                elif url.path == '/status':
+                    self._send_json({'collections': service.collections, 'requests': service.requests,
+                                     'subscribers': service.subscribers, 'sequence': service.sequence,
+                                     'allow_changes': service.allow_changes})
+                else:
+                    self._error(404, f"未知的路径: {url.path}")
+            except ValueError as e:
+                self._error(400, str(e))
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+            except Exception as e:
+                self._error(500, str(e))
+
+        def do_POST(self):
+            service.requests += 1
+            url = urlsplit(self.path)
+            try:
+                request = self._read_json()
+                if url.path == '/routes':
+                    version = self._version(request.get('version'))
+                    error = service.change(request.get('action'), version, request.get('route') or {})
+                    if error:
+                        self._error(400, error)
+                    else:
+                        self._send_json({'ok': True})
+                elif url.path == '/diff':
+                    version = self._version(request.get('version'))
+                    self._send_json(service.diff(version, request.get('routes') or []))
+                elif url.path == '/invalidate':
+                    version = request.get('version')
+                    service.invalidate(self._version(version) if version else None)
+                    self._send_json({'ok': True})
+                else:
+                    self._error(404, f"未知的路径: {url.path}")
+            except ValueError as e:
+                self._error(400, str(e))
+            except Exception as e:
+                self._error(500, str(e))
+
+        def _write_chunk(self, data):
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+            self.wfile.flush()
+
+        def _stream_events(self, since):
+            """推送 since 之后的事件，直到客户端断开或守护进程停止"""
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE_NDJSON)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            self.close_connection = True
+            service.subscribers += 1
+            try:
+                self._write_chunk(_json_bytes({'type': 'hello', 'seq': service.sequence}) + b'\n')
+                while not stopped.is_set():
+                    events = service.events_after(since, HEARTBEAT_INTERVAL)
+                    if events is None:
+                        # 错过的事件已不在缓冲区中，客户端需要重新读取完整路由表
+                        since = service.sequence
+                        self._write_chunk(_json_bytes({'type': 'resync', 'seq': since}) + b'\n')
+                    elif events:
+                        since = events[-1][0]
+                        self._write_chunk(b''.join(data for _sequence, data in events))
+                    else:
+                        self._write_chunk(b'\n')
+                self._write_chunk(b'')
+            finally:
+                service.subscribers -= 1
+
+    return Handler
+
+
+class RouteDaemon:
+    """守护进程：HTTP服务（Unix套接字或TCP）和路由变化检查线程"""
+
+    def __init__(self, service, address=None, interval=DEFAULT_INTERVAL, watch=True, socket_mode=0o600,
+                 log=None):
+        self.service = service
+        self.address = address or default_daemon_address()
+        self.interval = interval
+        self.watch = watch
+        self.socket_mode = socket_mode
+        self.log = log or (lambda message: None)
+        self._stopped = threading.Event()
+        self._wakeup = threading.Event()
+        self._server = None
+        self._watcher = None
+        self._socket_path = None
+
+    def _make_server(self):
+        import socketserver
+        from http.server import ThreadingHTTPServer
+
+        handler = _make_handler(self.service, self._stopped)
+        kind, target = parse_daemon_address(self.address)
+        if kind == 'tcp':
+            server = ThreadingHTTPServer(target, handler)
+        else:
+            self._remove_stale_socket(target)
+
+            class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+                daemon_threads = True
+
+            server = UnixHTTPServer(target, handler)
+            os.chmod(target, self.socket_mode)
+            self._socket_path = target
+        server.daemon_threads = True
+        return server
+
+    def _remove_stale_socket(self, path):
+        """删除上次未正常退出留下的套接字文件；已有守护进程在监听时报错"""
+        import socket
+
+        if not os.path.exists(path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+        else:
+            raise DaemonError(f"已有守护进程在监听: {path}")
+        finally:
+            probe.close()
+
+    def _on_route_events(self, events):
+        versions = set()
+        for action, data in events:
+            if action in ('add', 'delete'):
+                versions.add(route_version(data))
+            elif action == 'resync':
+                versions.update(VERSIONS)
+        if versions:
+            for version in versions:
+                self.service.invalidate(version)
+            self._wakeup.set()
+
+    def start(self):
+        """开始监听，订阅路由变化（Linux）"""
+        if self.watch and not is_windows():
+            try:
+                import netlink
+                self._watcher = netlink.RouteWatcher(self._on_route_events).start()
+            except (ImportError, OSError) as e:
+                self.log(f"无法订阅路由变化，改为每 {self.interval} 秒检查一次: {e}")
+
+        self._server = self._make_server()
+        threading.Thread(target=self._server.serve_forever, name="route-daemon", daemon=True).start()
+        self.log(f"路由守护进程已启动: {self.address}")
+        return self
+
+    def run(self):
+        """在当前线程中循环检查路由变化，直到 stop()
+
+        收到变化通知后立即重新读取；没有通知时只在有订阅者时按间隔检查，
+        没有订阅者时由下一次请求按缓存有效期读取。
+        """
+        while not self._stopped.is_set():
+            notified = self._wakeup.wait(self.interval)
+            if self._stopped.is_set():
+                break
+            if notified:
+                self._stopped.wait(CHANGE_DELAY)
+                self._wakeup.clear()
+                self.service.refresh([version for version in VERSIONS
+                                      if not self.service.cache.get(route_cache_key(version))[1]])
+            elif self.service.subscribers:
+                self.service.refresh()
+
+    def stop(self):
+        """停止服务，删除套接字文件"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._socket_path and os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+            self._socket_path = None
+
+
+class DaemonClient:
+    """守护进程客户端；保持一个keep-alive连接，线程安全"""
+
+    def __init__(self, address=None, timeout=30):
+        self.address = address or default_daemon_address()
+        self.timeout = timeout
+        self._kind, self._target = parse_daemon_address(self.address)
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+        import http.client
+
+        if self._kind == 'tcp':
+            return http.client.HTTPConnection(*self._target, timeout=self.timeout)
+
+        path = self._target
+        timeout = self.timeout
+
+        class UnixHTTPConnection(http.client.HTTPConnection):
+            def connect(self):
+                import socket
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.settimeout(timeout)
+                self.sock.connect(path)
+
+        return UnixHTTPConnection('localhost', timeout=timeout)
+
+    def _request(self, method, path, body=None):
+        """发送请求，返回 (内容类型, 响应内容)；连接被关闭时重新连接一次"""
+        import http.client
+
+        data = _json_bytes(body) if body is not None else None
+        headers = {'Content-Type': CONTENT_TYPE_JSON} if data is not None else {}
+        with self._lock:
+            for attempt in range(2):
+                if self._connection is None:
+                    self._connection = self._connect()
+                try:
+                    self._connection.request(method, path, body=data, headers=headers)
+                    response = self._connection.getresponse()
+                    content = response.read()
+                    break
+                except (http.client.HTTPException, OSError) as e:
+                    self._connection.close()
+                    self._connection = None
+                    if attempt or not isinstance(e, (http.client.RemoteDisconnected, BrokenPipeError,
+                                                     ConnectionResetError)):
+                        raise DaemonError(f"连接守护进程 {self.address} 失败: {e}") from None
+
+        content_type = response.getheader('Content-Type', '')
+        if response.status != 200:
+            try:
+                message = json.loads(content.decode('utf-8')).get('error')
+            except ValueError:
+                message = None
+            raise DaemonError(message or f"守护进程返回 {response.status}")
+        return content_type, content
+
+    def _get_json(self, path):
+        return json.loads(self._request('GET', path)[1].decode('utf-8'))
+
+    def _post_json(self, path, body):
+        return json.loads(self._request('POST', path, body)[1].decode('utf-8'))
+
+    def routes(self, version="IPv4"):
+        """路由表（RouteTable）；以列式编码传输，不逐条解析JSON"""
+        from route_snapshot import unpack_route_table
+
+        _content_type, content = self._request('GET', f'/routes?version={version}&format=binary')
+        return unpack_route_table(memoryview(content))
+
+    def interfaces(self):
+        return self._get_json('/interfaces')['interfaces']
+
+    def lookup(self, addresses):
+        from urllib.parse import urlencode
+        return self._get_json('/lookup?' + urlencode([('address', address) for address in addresses]))['results']
+
+    def diff(self, version, routes):
+        return self._post_json('/diff', {'version': version, 'routes': [dict(route) for route in routes]})
+
+    def add(self, route_data, version):
+        """添加路由；失败时抛出 DaemonError"""
+        self._post_json('/routes', {'action': 'add', 'version': version, 'route': route_data})
+
+    def delete(self, destination, netmask_or_prefix, version):
+        """删除路由；失败时抛出 DaemonError"""
+        self._post_json('/routes', {'action': 'delete', 'version': version,
+                                    'route': {'destination': destination, 'netmask': netmask_or_prefix}})
+
+    def invalidate(self, version=None):
+        """通知守护进程路由已被修改（客户端自行执行了路由命令）"""
+        self._post_json('/invalidate', {'version': version})
+
+    def status(self):
+        return self._get_json('/status')
+
+    def events(self, since=None):
+        """逐个产出推送的事件字典（单独的长连接，不占用请求连接）"""
+        path = '/events' if since is None else f'/events?since={since}'
+        connection = self._connect()
+        connection.timeout = None
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            if response.status != 200:
+                raise DaemonError(f"守护进程返回 {response.status}")
+            while True:
+                line = response.readline()
+                if not line:
+                    return
+                if line.strip():
+                    yield json.loads(line.decode('utf-8'))
+        except OSError as e:
+            raise DaemonError(f"连接守护进程 {self.address} 失败: {e}") from None
+        finally:
+            connection.close()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def client_from_env():
+    """环境变量 ROUTECONF_DAEMON 指定了守护进程地址时返回客户端，否则返回 None"""
+    address = os.environ.get(DAEMON_ENV)
+    return DaemonClient(address) if address else None
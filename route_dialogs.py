@@ -0,0 +1,1338 @@
+#!/usr/bin/env python3
+"""
+路由管理器的对话框 - 添加路由、设备IP信息、路由历史、性能
+
+只在打开对话框时才由 route_manager 导入，不占用程序启动时间。
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+import subprocess
+import re
+import platform
+import threading
+
+from route_probes import Probe
+
+
+class RouteDialog:
+    def __init__(self, parent, title, version="IPv4"):
+        self.result = None
+        self.version = version
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(title)
+        self.dialog.geometry("500x400")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+
+        # 调试信息
+        debug_frame = ttk.LabelFrame(self.dialog, text="调试信息", padding="10")
+        debug_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        debug_text = tk.Text(debug_frame, height=6, wrap=tk.WORD)
+        debug_text.pack(fill=tk.BOTH, expand=True)
+
+        debug_text.insert(tk.END, f"版本: {version}\n")
+        debug_text.insert(tk.END, f"操作系统: {platform.system()}\n")
+        debug_text.insert(tk.END, f"管理员权限: {'需要' if platform.system() == 'Windows' else '可能需要'}\n\n")
+
+        if version == "IPv4":
+            debug_text.insert(tk.END, "IPv4路由示例:\n")
+            debug_text.insert(tk.END, "目标: 192.168.100.0\n")
+            debug_text.insert(tk.END, "子网掩码: 255.255.255.0\n")
+            debug_text.insert(tk.END, "网关: 192.168.1.1\n")
+        else:
+            debug_text.insert(tk.END, "IPv6路由示例:\n")
+            debug_text.insert(tk.END, "目标: 2001:db8::\n")
+            debug_text.insert(tk.END, "前缀长度: 32\n")
+            debug_text.insert(tk.END, "网关: fe80::1\n")
+
+        debug_text.config(state=tk.DISABLED)
+
+        # 输入字段
+        input_frame = ttk.LabelFrame(self.dialog, text="路由信息", padding="10")
+        input_frame.pack(fill=tk.X, padx=10, pady=10)
+
+        if version == "IPv4":
+            fields = [
+                ("目标网络:", "destination", "192.168.100.0"),
+                ("子网掩码:", "netmask", "255.255.255.0"),
+                ("网关:", "gateway", "192.168.1.1"),
+                ("跃点数:", "metric", "")
+            ]
+        else:  # IPv6
+            fields = [
+                ("目标网络:", "destination", "2001:db8::"),
+                ("前缀长度:", "prefix_length", "32"),
+                ("网关:", "gateway", "fe80::1"),
+                ("跃点数:", "metric", "")
+            ]
+
+        self.entries = {}
+        for i, (label, key, default) in enumerate(fields):
+            ttk.Label(input_frame, text=label).grid(row=i, column=0, sticky=tk.W, padx=10, pady=5)
+            entry = ttk.Entry(input_frame, width=40)
+            entry.insert(0, default)
+            entry.grid(row=i, column=1, padx=10, pady=5, sticky=(tk.W, tk.E))
+            self.entries[key] = entry
+
+        input_frame.columnconfigure(1, weight=1)
+
+        # 按钮
+        button_frame = ttk.Frame(self.dialog)
+        button_frame.pack(pady=10)
+
+        ttk.Button(button_frame, text="确定", command=self.ok_clicked).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="取消", command=self.cancel_clicked).pack(side=tk.LEFT, padx=5)
+
+        # 居中显示
+        self.dialog.update_idletasks()
+        x = (self.dialog.winfo_screenwidth() // 2) - (self.dialog.winfo_width() // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (self.dialog.winfo_height() // 2)
+        self.dialog.geometry(f"+{x}+{y}")
+
+    def ok_clicked(self):
+        self.result = {key: entry.get() for key, entry in self.entries.items()}
+        self.dialog.destroy()
+
+    def cancel_clicked(self):
+        self.dialog.destroy()
+
+class EnhancedRouteDialog:
+    """增强的路由对话框，包含接口选择功能"""
+    def __init__(self, parent, title, version, manager):
+        self.result = None
+        self.version = version
+        self.manager = manager
+        self.interface_combo = None
+        self.interface_mapping = {}
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(title)
+        self.dialog.geometry("700x650")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+
+        # 设置对话框样式
+        self.dialog.configure(bg="#f0f0f0")
+
+        # 标题区域
+        title_frame = ttk.Frame(self.dialog)
+        title_frame.pack(fill=tk.X, padx=15, pady=(15, 10))
+
+        title_label = ttk.Label(title_frame, text=f"添加{version}路由",
+                               font=("Arial", 14))
+        title_label.pack(side=tk.LEFT)
+
+        # 使用说明区域
+        help_frame = ttk.LabelFrame(self.dialog, text="使用说明", padding="12")
+        help_frame.pack(fill=tk.X, padx=15, pady=(0, 15))
+
+        if version == "IPv4":
+            help_content = """IPv4路由参数说明：
+• 目标网络：要访问的网络地址，例如 192.168.100.0
+• 子网掩码：网络子网掩码，例如 255.255.255.0
+• 网关地址：路由网关IP地址，或使用 On-link
+• 网络接口：可选，留空则自动选择
+• 跃点数：可选，数值越小优先级越高
+• 持久路由：勾选后系统重启仍保留此路由"""
+        else:
+            help_content = """IPv6路由参数说明：
+• 目标网络：要访问的IPv6网络地址，例如 2001:db8::
+• 前缀长度：网络前缀长度，例如 32、64、128
+• 网关地址：IPv6网关地址，或使用 On-link
+• 网络接口：可选，留空则自动选择
+• 跃点数：可选，数值越小优先级越高
+• 持久路由：勾选后系统重启仍保留此路由"""
+
+        help_text = tk.Text(help_frame, height=7, wrap=tk.WORD, font=("Arial", 9))
+        help_text.pack(fill=tk.X)
+        help_text.config(bg="#f8f9fa", fg="#495057", relief=tk.FLAT)
+        help_text.insert(tk.END, help_content)
+        help_text.config(state=tk.DISABLED)
+
+        # 输入字段区域
+        input_frame = ttk.LabelFrame(self.dialog, text="路由参数配置", padding="15")
+        input_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 15))
+
+        if version == "IPv4":
+            fields = [
+                ("目标网络:", "destination", "192.168.100.0", "例如：192.168.100.0"),
+                ("子网掩码:", "netmask", "255.255.255.0", "例如：255.255.255.0"),
+                ("网关地址:", "gateway", "On-link", "IP地址或 On-link"),
+                ("网络接口:", "interface", "", "可选，留空自动选择"),
+                ("跃点数:", "metric", "", "可选，数值越小优先级越高")
+            ]
+        else:  # IPv6
+            fields = [
+                ("目标网络:", "destination", "2001:db8::", "例如：2001:db8::"),
+                ("前缀长度:", "prefix_length", "32", "例如：32, 64, 128"),
+                ("网关地址:", "gateway", "fe80::1", "IPv6地址或 On-link"),
+                ("网络接口:", "interface", "", "可选，留空自动选择"),
+                ("跃点数:", "metric", "", "可选，数值越小优先级越高")
+            ]
+
+        self.entries = {}
+        for i, (label, key, default, hint) in enumerate(fields):
+            # 标签
+            label_widget = ttk.Label(input_frame, text=label, font=("Arial", 10))
+            label_widget.grid(row=i, column=0, sticky=tk.W, padx=(0, 15), pady=(10, 5))
+
+            if key == "interface":
+                # 接口字段使用下拉框
+                interface_container = ttk.Frame(input_frame)
+                interface_container.grid(row=i, column=1, sticky=(tk.W, tk.E), pady=(10, 5))
+                interface_container.columnconfigure(0, weight=1)
+
+                self.interface_var = tk.StringVar()
+                self.interface_combo = ttk.Combobox(interface_container, textvariable=self.interface_var,
+                                                 font=("Arial", 10), height=8)
+                self.interface_combo.grid(row=0, column=0, sticky=(tk.W, tk.E))
+
+                # 加载状态指示器
+                self.loading_label = ttk.Label(interface_container, text="加载中...",
+                                            font=("Arial", 9), foreground="#6c757d")
+                self.loading_label.grid(row=0, column=1, padx=(10, 0))
+
+                self.interface_combo['values'] = ["正在加载接口信息..."]
+                self.interface_combo.set("正在加载接口信息...")
+                self.interface_combo.config(state='readonly')
+
+                # 启动后台线程加载接口信息
+                threading.Thread(target=self._load_interfaces_async, daemon=True).start()
+
+                self.entries[key] = self.interface_combo
+            else:
+                # 输入框容器
+                entry_container = ttk.Frame(input_frame)
+                entry_container.grid(row=i, column=1, sticky=(tk.W, tk.E), pady=(10, 5))
+                entry_container.columnconfigure(0, weight=1)
+
+                entry = ttk.Entry(entry_container, font=("Arial", 11))
+                entry.insert(0, default)
+                entry.grid(row=0, column=0, sticky=(tk.W, tk.E))
+
+                # 添加提示文本
+                hint_label = ttk.Label(entry_container, text=hint, font=("Arial", 8),
+                                    foreground="#6c757d")
+                hint_label.grid(row=1, column=0, sticky=tk.W, pady=(2, 0))
+
+                self.entries[key] = entry
+
+        input_frame.columnconfigure(1, weight=1)
+
+        # 持久路由选项（单独一行）
+        persistent_frame = ttk.Frame(input_frame)
+        persistent_frame.grid(row=len(fields), column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(15, 0))
+
+        self.persistent_var = tk.BooleanVar()
+        persistent_check = ttk.Checkbutton(persistent_frame,
+                                        text="添加为持久路由（系统重启后保留）",
+                                        variable=self.persistent_var)
+        persistent_check.pack(side=tk.LEFT)
+        self.entries["persistent"] = self.persistent_var
+
+        # 按钮区域
+        button_frame = ttk.Frame(self.dialog)
+        button_frame.pack(fill=tk.X, padx=15, pady=(0, 15))
+
+        # 按钮样式
+        button_style = ttk.Style()
+        button_style.configure("Dialog.TButton", font=("Arial", 10), padding=(20, 8))
+
+        ttk.Button(button_frame, text="确定添加", command=self.ok_clicked,
+                  style="Dialog.TButton").pack(side=tk.RIGHT, padx=(10, 0))
+        ttk.Button(button_frame, text="取消", command=self.cancel_clicked,
+                  style="Dialog.TButton").pack(side=tk.RIGHT)
+
+        # 居中显示
+        self.dialog.update_idletasks()
+        x = (self.dialog.winfo_screenwidth() // 2) - (self.dialog.winfo_width() // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (self.dialog.winfo_height() // 2)
+        self.dialog.geometry(f"+{x}+{y}")
+
+    def _load_interfaces_async(self):
+        """异步加载网络接口信息"""
+        try:
+            # 获取系统接口
+            interfaces = [("自动选择", "")]
+
+            try:
+                system_interfaces = self.manager.get_network_interfaces()
+                for interface in system_interfaces:
+                    display_name = interface['display']
+                    interface_num = interface['number']
+                    interfaces.append((display_name, interface_num))
+            except Exception as e:
+                print(f"获取接口失败: {e}")
+
+            # 在主线程中更新UI
+            self.dialog.after(0, self._update_interface_combo, interfaces)
+
+        except Exception as e:
+            print(f"异步加载接口失败: {e}")
+            # 在主线程中更新UI显示错误
+            self.dialog.after(0, self._update_interface_combo_error)
+
+    def _update_interface_combo(self, interfaces):
+        """在主线程中更新接口下拉框"""
+        try:
+            if self.interface_combo and self.interface_combo.winfo_exists():
+                # 设置下拉框选项
+                self.interface_combo['values'] = [interface[0] for interface in interfaces]
+                self.interface_combo.set("自动选择")
+                self.interface_combo.config(state='normal')
+
+                # 保存接口映射
+                self.interface_mapping = {interface[0]: interface[1] for interface in interfaces}
+
+                # 隐藏加载标签
+                if hasattr(self, 'loading_label') and self.loading_label.winfo_exists():
+                    self.loading_label.config(text="加载完成", foreground="green")
+                    self.dialog.after(1500, lambda: self.loading_label.destroy())
+        except:
+            pass
+
+    def _update_interface_combo_error(self):
+        """在主线程中更新接口下拉框显示错误"""
+        try:
+            if self.interface_combo and self.interface_combo.winfo_exists():
+                self.interface_combo['values'] = ["自动选择", "获取接口信息失败"]
+                self.interface_combo.set("自动选择")
+                self.interface_combo.config(state='normal')
+                self.interface_mapping = {"自动选择": "", "获取接口信息失败": ""}
+
+                # 更新加载标签显示错误
+                if hasattr(self, 'loading_label') and self.loading_label.winfo_exists():
+                    self.loading_label.config(text="加载失败", foreground="red")
+                    self.dialog.after(3000, lambda: self.loading_label.destroy())
+        except:
+            pass
+
+    def ok_clicked(self):
+        # 收集所有输入数据
+        route_data = {}
+        for key, widget in self.entries.items():
+            if isinstance(widget, ttk.Combobox):
+                # 接口下拉框
+                selected_text = widget.get()
+                mapped_value = self.interface_mapping.get(selected_text, "")
+                route_data[key] = mapped_value
+            elif isinstance(widget, tk.BooleanVar):
+                # 持久路由复选框
+                route_data[key] = widget.get()
+            else:
+                # 普通输入框
+                route_data[key] = widget.get().strip()
+
+        self.result = route_data
+        self.dialog.destroy()
+
+    def cancel_clicked(self):
+        self.dialog.destroy()
+
+class IPInfoDialog:
+    """设备IP信息对话框 - 优化版"""
+    def __init__(self, parent, manager):
+        self.manager = manager
+        self.interfaces_data = []
+        self.selected_interface = None
+        # 进行中的接口信息采集（concurrent.futures.Future）
+        self._collection = None
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("设备IP信息")
+        # 调整窗口大小以适应屏幕
+        screen_width = self.dialog.winfo_screenwidth()
+        screen_height = self.dialog.winfo_screenheight()
+        width = min(1200, int(screen_width * 0.9))
+        height = min(800, int(screen_height * 0.85))
+        self.dialog.geometry(f"{width}x{height}")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+
+        # 设置对话框样式
+        self.dialog.configure(bg="#f8f9fa")
+
+        # 设置统一的Arial字体样式
+        self.setup_fonts()
+
+        # 创建主要布局
+        self.setup_layout()
+
+        # 居中显示
+        self.dialog.update_idletasks()
+        x = (screen_width // 2) - (width // 2)
+        y = (screen_height // 2) - (height // 2)
+        self.dialog.geometry(f"+{x}+{y}")
+
+        # 关闭窗口时取消进行中的采集
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close_dialog)
+
+        # 初始化显示
+        self.refresh_interfaces()
+
+    def setup_fonts(self):
+        """设置统一的Arial字体样式"""
+        # 创建样式对象
+        self.style = ttk.Style()
+
+        # 设置通用字体
+        self.font_large = ("Arial", 12, "bold")
+        self.font_medium = ("Arial", 11, "bold")
+        self.font_normal = ("Arial", 10)
+        self.font_small = ("Arial", 9)
+
+        # 配置Treeview样式（只保留必要的）
+        self.style.configure("IPInfo.Treeview",
+                           font=self.font_normal,
+                           rowheight=25)
+        self.style.configure("IPInfo.Treeview.Heading",
+                           font=self.font_medium,
+                           padding=(8, 5))
+
+    def setup_layout(self):
+        """设置界面布局"""
+        # 顶部工具栏
+        toolbar = ttk.Frame(self.dialog)
+        toolbar.pack(fill=tk.X, padx=10, pady=(10, 5))
+
+        # 标题
+        title_label = ttk.Label(toolbar, text="网络接口IP信息", font=self.font_large)
+        title_label.pack(side=tk.LEFT, padx=(10, 20))
+
+        # 创建按钮样式
+        button_style = ttk.Style()
+        button_style.configure("Tool.TButton", font=self.font_normal, padding=(8, 4))
+
+        # 刷新按钮
+        refresh_btn = ttk.Button(toolbar, text="🔄 刷新", command=self.refresh_interfaces,
+                               style="Tool.TButton")
+        refresh_btn.pack(side=tk.RIGHT, padx=(5, 10))
+
+        # 导出按钮
+        export_btn = ttk.Button(toolbar, text="📄 导出", command=self.export_info,
+                               style="Tool.TButton")
+        export_btn.pack(side=tk.RIGHT, padx=(5, 0))
+
+        # 创建主分割区域
+        main_paned = ttk.PanedWindow(self.dialog, orient=tk.HORIZONTAL)
+        main_paned.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        # 左侧接口列表
+        left_frame = ttk.Frame(main_paned)
+        main_paned.add(left_frame, weight=1)
+
+        # 接口列表标题
+        list_title = ttk.Label(left_frame, text="网络接口列表", font=self.font_medium)
+        list_title.pack(pady=(10, 5))
+
+        # 接口列表框架
+        list_frame = ttk.Frame(left_frame)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=(10, 5), pady=(0, 10))
+
+        # 创建接口列表Treeview
+        columns = ("status", "ipv4", "ipv6")
+        self.interface_tree = ttk.Treeview(list_frame, columns=columns, show="tree headings",
+                                       height=15, style="IPInfo.Treeview")
+
+        # 设置列标题
+        self.interface_tree.heading("#0", text="接口名称", anchor=tk.W)
+        self.interface_tree.heading("status", text="状态", anchor=tk.CENTER)
+        self.interface_tree.heading("ipv4", text="IPv4地址", anchor=tk.W)
+        self.interface_tree.heading("ipv6", text="IPv6地址", anchor=tk.W)
+
+        # 设置列宽
+        self.interface_tree.column("#0", width=200, minwidth=150)
+        self.interface_tree.column("status", width=80, minwidth=60)
+        self.interface_tree.column("ipv4", width=140, minwidth=100)
+        self.interface_tree.column("ipv6", width=200, minwidth=150)
+
+        # 添加滚动条
+        list_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.interface_tree.yview)
+        self.interface_tree.configure(yscrollcommand=list_scrollbar.set)
+
+        self.interface_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        list_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # 绑定选择事件
+        self.interface_tree.bind("<<TreeviewSelect>>", self.on_interface_select)
+
+        # 右侧详细信息
+        right_frame = ttk.Frame(main_paned)
+        main_paned.add(right_frame, weight=2)
+
+        # 详细信息标题
+        detail_title = ttk.Label(right_frame, text="详细信息", font=self.font_medium)
+        detail_title.pack(pady=(10, 5))
+
+        # 详细信息框架
+        self.detail_frame = ttk.Frame(right_frame)
+        self.detail_frame.pack(fill=tk.BOTH, expand=True, padx=(5, 10), pady=(0, 10))
+
+        # 创建详细信息显示区域
+        self.setup_detail_area()
+
+        # 底部状态栏
+        status_frame = ttk.Frame(self.dialog)
+        status_frame.pack(fill=tk.X, side=tk.BOTTOM, padx=10, pady=(5, 10))
+
+        self.status_var = tk.StringVar(value="就绪")
+        status_label = ttk.Label(status_frame, textvariable=self.status_var,
+                                relief=tk.SUNKEN, anchor=tk.W)
+        status_label.pack(fill=tk.X)
+
+    def setup_detail_area(self):
+        """设置详细信息显示区域"""
+        # 创建单一的详细信息显示区域
+        self.detail_text = tk.Text(self.detail_frame, wrap=tk.WORD, font=self.font_normal,
+                                  bg="white", fg="black", padx=15, pady=15,
+                                  relief=tk.FLAT, borderwidth=0)
+        detail_scrollbar = ttk.Scrollbar(self.detail_frame, orient=tk.VERTICAL,
+                                         command=self.detail_text.yview)
+        self.detail_text.configure(yscrollcommand=detail_scrollbar.set)
+
+        self.detail_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        detail_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # 初始显示选择提示
+        self.show_selection_hint()
+
+    def show_selection_hint(self):
+        """显示选择提示"""
+        # 清空详细信息文本控件
+        self.detail_text.config(state=tk.NORMAL)
+        self.detail_text.delete(1.0, tk.END)
+
+        # 添加选择提示
+        hint_text = """请从左侧列表中选择一个网络接口
+查看详细信息
+
+操作提示：
+• 点击左侧接口名称查看详细信息
+• 使用 Ctrl+C 复制选中的文本
+• 点击"🔄 刷新"更新网络信息
+• 点击"📄 导出"保存完整报告"""
+
+        self.detail_text.insert(tk.END, hint_text)
+        self.detail_text.config(state=tk.DISABLED)
+
+    def on_interface_select(self, event):
+        """处理接口选择事件"""
+        selection = self.interface_tree.selection()
+        if not selection:
+            return
+
+        item = selection[0]
+        interface_name = self.interface_tree.item(item, "text")
+
+        # 查找接口详细信息
+        selected_interface = None
+        for interface in self.interfaces_data:
+            if interface.get('name') == interface_name:
+                selected_interface = interface
+                break
+
+        if selected_interface:
+            self.display_interface_detail(selected_interface)
+            self.status_var.set(f"已选择: {interface_name}")
+
+    def display_interface_detail(self, interface):
+        """显示接口详细信息"""
+        self.selected_interface = interface
+
+        # 显示完整的接口详细信息
+        self.display_complete_interface_info(interface)
+
+    def display_complete_interface_info(self, interface):
+        """显示完整的接口信息，不做任何过滤"""
+        # 清空并设置详细信息文本
+        self.detail_text.config(state=tk.NORMAL)
+        self.detail_text.delete(1.0, tk.END)
+
+        # 格式化完整信息 - 简洁清晰
+        info_lines = []
+
+        # 基本信息
+        info_lines.append(f"接口名称：{interface.get('name', '未知')}")
+        info_lines.append(f"接口描述：{interface.get('description', '未知')}")
+        info_lines.append(f"连接状态：{interface.get('status', '未知')}")
+        info_lines.append("")
+
+        # 硬件信息
+        info_lines.append("【硬件信息】")
+        mac = interface.get('mac_address', '未获取').strip()
+        if mac:
+            info_lines.append(f"MAC地址：{mac}")
+        else:
+            info_lines.append("MAC地址：未获取")
+        info_lines.append("")
+
+        # IPv4地址
+        info_lines.append("【IPv4地址配置】")
+        if interface.get('ipv4_addresses'):
+            for i, ip in enumerate(interface['ipv4_addresses'], 1):
+                info_lines.append(f"IPv4地址 {i}：{ip}")
+        else:
+            info_lines.append("IPv4地址：无")
+        info_lines.append("")
+
+        # IPv6地址
+        info_lines.append("【IPv6地址配置】")
+        if interface.get('ipv6_addresses'):
+            for i, ipv6 in enumerate(interface['ipv6_addresses'], 1):
+                info_lines.append(f"IPv6地址 {i}：{ipv6}")
+        else:
+            info_lines.append("IPv6地址：无")
+        info_lines.append("")
+
+        # 网络配置
+        info_lines.append("【网络配置】")
+
+        # 默认网关
+        gateway = interface.get('default_gateway', '').strip()
+        info_lines.append(f"默认网关：{gateway if gateway else '未配置'}")
+
+        # DNS服务器
+        dns_servers = interface.get('dns_servers', [])
+        if dns_servers:
+            info_lines.append("DNS服务器：")
+            for dns in dns_servers:
+                info_lines.append(f"  • {dns}")
+        else:
+            info_lines.append("DNS服务器：未配置")
+
+        # DHCP配置
+        dhcp_enabled = interface.get('dhcp_enabled', False)
+        info_lines.append(f"DHCP配置：{'已启用' if dhcp_enabled else '未启用或静态配置'}")
+        if dhcp_enabled:
+            dhcp_server = interface.get('dhcp_server', '').strip()
+            if dhcp_server:
+                info_lines.append(f"DHCP服务器：{dhcp_server}")
+
+        info_lines.append("")
+
+        # 原始配置数据
+        info_lines.append("【原始配置数据】")
+
+        # 显示所有接口属性（排除已显示的主要字段）
+        excluded_keys = {'name', 'description', 'status', 'mac_address', 'ipv4_addresses',
+                        'ipv6_addresses', 'default_gateway', 'dns_servers', 'dhcp_enabled', 'dhcp_server'}
+
+        has_extra_data = False
+        for key, value in interface.items():
+            if key not in excluded_keys and value:
+                has_extra_data = True
+                if isinstance(value, list) and value:
+                    info_lines.append(f"{key}：")
+                    for item in value[:3]:  # 最多显示前3个，避免过长
+                        info_lines.append(f"  • {item}")
+                    if len(value) > 3:
+                        info_lines.append(f"  ... (还有{len(value)-3}个)")
+                elif value:
+                    info_lines.append(f"{key}：{value}")
+
+        if not has_extra_data:
+            info_lines.append("（无额外配置数据）")
+
+        info_lines.append("")
+        info_lines.append(f"生成时间：{self.get_current_time()}")
+
+        # 插入文本
+        self.detail_text.insert(tk.END, '\n'.join(info_lines))
+        self.detail_text.config(state=tk.DISABLED)
+
+    def refresh_interfaces(self):
+        """刷新接口信息（在后台采集，不阻塞界面）"""
+        # 取消尚未完成的上一次采集
+        if self._collection is not None:
+            self._collection.cancel()
+
+        # 清除现有内容
+        for item in self.interface_tree.get_children():
+            self.interface_tree.delete(item)
+        self.status_var.set("正在获取接口信息...")
+
+        self._collection = self.manager.collector.submit(
+            self.interface_probes(),
+            lambda results: self.manager.root.after(0, self._on_interfaces_collected, results))
+
+    def _on_interfaces_collected(self, results):
+        """接口信息采集完成（主线程中执行）"""
+        self._collection = None
+        if not self.dialog.winfo_exists():
+            return
+
+        interfaces = results.get('interfaces')
+        if isinstance(interfaces, subprocess.TimeoutExpired):
+            self.manager.log("获取IP配置信息超时")
+            interfaces = []
+        elif isinstance(interfaces, Exception):
+            self.manager.log(f"获取详细接口信息失败: {interfaces}")
+            interfaces = []
+
+        try:
+            self.interfaces_data = interfaces
+            self.display_interface_list()
+            self.status_var.set(f"已获取 {len(self.interfaces_data)} 个网络接口")
+        except Exception as e:
+            self.show_error(f"获取接口信息失败: {str(e)}")
+            self.status_var.set("获取接口信息失败")
+
+    def display_interface_list(self):
+        """显示接口列表"""
+        if not self.interfaces_data:
+            self.interface_tree.insert("", "end", text="未找到网络接口", values=("", "", ""))
+            return
+
+        # 按连接状态排序：已连接的在前
+        sorted_interfaces = sorted(self.interfaces_data,
+                                 key=lambda x: (0 if x.get('status') == '已连接' else 1, x.get('name', '')))
+
+        for interface in sorted_interfaces:
+            # 准备显示值
+            status = interface.get('status', '未知')
+            if status == '已连接':
+                status_display = "🟢 已连接"
+            elif status == '断开连接':
+                status_display = "🔴 断开"
+            else:
+                status_display = "⚪ 未知"
+
+            # IP地址显示（简化版本）
+            ipv4_display = ""
+            if interface.get('ipv4_addresses'):
+                ipv4_display = interface['ipv4_addresses'][0]
+                if len(interface['ipv4_addresses']) > 1:
+                    ipv4_display += f" (+{len(interface['ipv4_addresses'])-1})"
+
+            ipv6_display = ""
+            if interface.get('ipv6_addresses'):
+                # 只显示第一个IPv6地址，并简化长地址
+                first_ipv6 = interface['ipv6_addresses'][0]
+                if len(first_ipv6) > 20:
+                    ipv6_display = first_ipv6[:18] + "..."
+                else:
+                    ipv6_display = first_ipv6
+                if len(interface['ipv6_addresses']) > 1:
+                    ipv6_display += f" (+{len(interface['ipv6_addresses'])-1})"
+
+            # 插入到树形控件
+            self.interface_tree.insert("", "end",
+                                     text=interface.get('name', '未知接口'),
+                                     values=(status_display, ipv4_display, ipv6_display))
+
+        # 自动选择第一个已连接的接口
+        for i, interface in enumerate(sorted_interfaces):
+            if interface.get('status') == '已连接':
+                items = self.interface_tree.get_children()
+                if items and i < len(items):
+                    self.interface_tree.selection_set(items[i])
+                    self.interface_tree.see(items[i])
+                    self.on_interface_select(None)
+                    break
+
+    def export_info(self):
+        """导出网络接口信息"""
+        if not self.interfaces_data:
+            messagebox.showwarning("提示", "没有可导出的接口信息")
+            return
+
+        try:
+            from tkinter import filedialog
+            filename = filedialog.asksaveasfilename(
+                title="导出网络接口信息",
+                defaultextension=".txt",
+                filetypes=[("文本文件", "*.txt"), ("JSON文件", "*.json"), ("所有文件", "*.*")]
+            )
+
+            if filename and filename.lower().endswith('.json'):
+                # 结构化导出，便于脚本处理
+                import json
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(self.interfaces_data, f, ensure_ascii=False, indent=2)
+                messagebox.showinfo("成功", f"网络接口信息已导出到:\n{filename}")
+                self.status_var.set(f"已导出到: {filename}")
+            elif filename:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    f.write("=" * 50 + "\n")
+                    f.write("网络接口信息报告\n")
+                    f.write(f"生成时间: {self.get_current_time()}\n")
+                    f.write("=" * 50 + "\n\n")
+
+                    for interface in self.interfaces_data:
+                        f.write(f"接口名称: {interface.get('name', '未知')}\n")
+                        f.write(f"连接状态: {interface.get('status', '未知')}\n")
+                        f.write(f"MAC地址: {interface.get('mac_address', '未获取')}\n")
+
+                        if interface.get('ipv4_addresses'):
+                            f.write("IPv4地址:\n")
+                            for ip in interface['ipv4_addresses']:
+                                f.write(f"  - {ip}\n")
+
+                        if interface.get('ipv6_addresses'):
+                            f.write("IPv6地址:\n")
+                            for ipv6 in interface['ipv6_addresses']:
+                                f.write(f"  - {ipv6}\n")
+
+                        if interface.get('default_gateway'):
+                            f.write(f"默认网关: {interface['default_gateway']}\n")
+
+                        if interface.get('dns_servers'):
+                            f.write("DNS服务器:\n")
+                            for dns in interface['dns_servers']:
+                                f.write(f"  - {dns}\n")
+
+                        if interface.get('dhcp_enabled'):
+                            f.write(f"DHCP: 已启用 (服务器: {interface.get('dhcp_server', '未知')})\n")
+                        else:
+                            f.write("DHCP: 未启用或静态配置\n")
+
+                        f.write("-" * 50 + "\n\n")
+
+                messagebox.showinfo("成功", f"网络接口信息已导出到:\n{filename}")
+                self.status_var.set(f"已导出到: {filename}")
+
+        except Exception as e:
+            messagebox.showerror("错误", f"导出失败: {str(e)}")
+            self.status_var.set("导出失败")
+
+    def get_current_time(self):
+        """获取当前时间字符串"""
+        from datetime import datetime
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def show_error(self, error_message):
+        """显示错误信息"""
+        messagebox.showerror("错误", error_message)
+
+    def close_dialog(self):
+        """关闭对话框"""
+        if self._collection is not None:
+            self._collection.cancel()
+        self.dialog.destroy()
+
+    def interface_probes(self):
+        """采集详细接口信息的探测（命令直接执行，不经过shell）"""
+        if self.manager.is_windows:
+            return [Probe('interfaces', ['ipconfig', '/all'], parse=self._parse_ipconfig_output, encoding='gbk')]
+        return [Probe('interfaces', ['ip', 'addr', 'show'], parse=self._parse_ip_addr_output)]
+
+    def _parse_ipconfig_output(self, output):
+        """解析ipconfig输出（字符串或逐行的可迭代对象）"""
+        interfaces = []
+        lines = output.split('\n') if isinstance(output, str) else output
+        current_interface = None
+
+        for line in lines:
+            line = line.strip()
+
+            # 检测新的适配器（扩展匹配范围）
+            if (line.startswith('以太网适配器') or line.startswith('无线') or
+                line.startswith('Ethernet adapter') or line.startswith('Wireless') or
+                line.startswith('Mobile Broadband') or 'adapter' in line.lower() or
+                'Unknown adapter' in line or 'Description' in line and 'Adapter' in line):
+
+                if current_interface:
+                    # 如果有IP地址且状态不是明确的断开连接，则设为已连接
+                    if (current_interface['status'] == '未知' and
+                        (current_interface['ipv4_addresses'] or current_interface['ipv6_addresses'])):
+                        current_interface['status'] = '已连接'
+                    interfaces.append(current_interface)
+
+                # 提取适配器名称
+                adapter_name = line
+                if ':' in line:
+                    adapter_name = line.split(':', 1)[0].strip()
+                elif '.' in line and 'Description' in line:
+                    # 处理以Description开头的行
+                    adapter_name = line.replace('Description . . . . . . . . . . . :', '').strip()
+                    if 'Adapter' in adapter_name:
+                        adapter_name = adapter_name.replace('Adapter', '适配器').strip()
+
+                current_interface = {
+                    'name': adapter_name,
+                    'description': adapter_name,
+                    'status': '未知',
+                    'mac_address': '',
+                    'ipv4_addresses': [],
+                    'ipv6_addresses': [],
+                    'default_gateway': '',
+                    'dns_servers': [],
+                    'dhcp_enabled': False,
+                    'dhcp_server': ''
+                }
+
+            elif current_interface:
+                # 解析各种信息 - 改进状态检测
+
+                # 媒体状态检测（明确的断开连接状态）
+                if ('Media disconnected' in line or
+                    '媒体已断开连接' in line or
+                    ('Media State' in line and 'Media disconnected' in line)):
+                    current_interface['status'] = '断开连接'
+
+                # MAC地址
+                elif ('物理地址' in line or 'Physical Address' in line):
+                    mac = line.split(':', 1)[1].strip() if ':' in line else ''
+                    current_interface['mac_address'] = mac
+
+                # IPv4地址
+                elif ('IPv4 地址' in line or 'IPv4 Address' in line):
+                    ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
+                    if ip_match:
+                        current_interface['ipv4_addresses'].append(ip_match.group(1))
+                        # 如果状态未知但有IP地址，设为已连接
+                        if current_interface['status'] == '未知':
+                            current_interface['status'] = '已连接'
+
+                # IPv6地址
+                elif ('IPv6 地址' in line or 'IPv6 Address' in line or 'Link-local IPv6 Address' in line):
+                    # 提取IPv6地址（改进解析）
+                    ipv6_match = re.search(r'([0-9a-fA-F:]+%?\d*)\s*\(', line)
+                    if not ipv6_match:
+                        ipv6_match = re.search(r'([0-9a-fA-F:]+)', line)
+                    if ipv6_match:
+                        ipv6_addr = ipv6_match.group(1)
+                        # 排除本地链路地址（除非是唯一地址）
+                        if not ipv6_addr.startswith('fe80::') or len(current_interface['ipv6_addresses']) == 0:
+                            current_interface['ipv6_addresses'].append(ipv6_addr)
+                            # 如果状态未知但有IP地址，设为已连接
+                            if current_interface['status'] == '未知':
+                                current_interface['status'] = '已连接'
+
+                # 默认网关
+                elif '默认网关' in line or 'Default Gateway' in line:
+                    gateway = line.split(':', 1)[1].strip() if ':' in line else ''
+                    if gateway:
+                        current_interface['default_gateway'] = gateway
+
+                # DNS服务器
+                elif 'DNS 服务器' in line or 'DNS Servers' in line:
+                    dns = line.split(':', 1)[1].strip() if ':' in line else ''
+                    if dns:
+                        current_interface['dns_servers'].append(dns)
+
+                # DHCP
+                elif 'DHCP 已启用' in line or 'DHCP Enabled' in line:
+                    if '是' in line or 'Yes' in line:
+                        current_interface['dhcp_enabled'] = True
+                elif 'DHCP 服务器' in line or 'DHCP Server' in line:
+                    dhcp_server = line.split(':', 1)[1].strip() if ':' in line else ''
+                    current_interface['dhcp_server'] = dhcp_server
+
+        # 添加最后一个接口
+        if current_interface:
+            # 最终状态判断：如果有IP地址且状态不是明确的断开连接，则设为已连接
+            if (current_interface['status'] == '未知' and
+                (current_interface['ipv4_addresses'] or current_interface['ipv6_addresses'])):
+                current_interface['status'] = '已连接'
+            interfaces.append(current_interface)
+
+        return interfaces
+
+    def _parse_ip_addr_output(self, output):
+        """解析ip addr show输出"""
+        interfaces = []
+        lines = output.split('\n')
+        current_interface = None
+
+        for raw_line in lines:
+            line = raw_line.strip()
+
+            # 接口行不缩进，地址等属性行缩进
+            if line and ':' in line and not raw_line[:1].isspace():
+                # 接口行
+                parts = line.split(':', 2)
+                if len(parts) >= 2:
+                    interface_name = parts[1].strip()
+
+                    current_interface = {
+                        'name': interface_name,
+                        'description': interface_name,
+                        'status': '未知',
+                        'mac_address': '',
+                        'ipv4_addresses': [],
+                        'ipv6_addresses': [],
+                        'default_gateway': '',
+                        'dns_servers': [],
+                        'dhcp_enabled': False,
+                        'dhcp_server': ''
+                    }
+
+                    # 检查状态
+                    if 'UP' in line:
+                        current_interface['status'] = '已连接'
+                    elif 'DOWN' in line:
+                        current_interface['status'] = '断开连接'
+
+                    interfaces.append(current_interface)
+
+            elif current_interface and 'link/ether' in line:
+                # MAC地址
+                mac_match = re.search(r'([0-9a-fA-F]{2}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2})', line)
+                if mac_match:
+                    current_interface['mac_address'] = mac_match.group(1)
+
+            elif current_interface and 'inet ' in line:
+                # IPv4地址
+                ip_match = re.search(r'inet\s+(\d+\.\d+\.\d+\.\d+/\d+)', line)
+                if ip_match:
+                    current_interface['ipv4_addresses'].append(ip_match.group(1))
+
+            elif current_interface and 'inet6 ' in line:
+                # IPv6地址
+                ipv6_match = re.search(r'inet6\s+([0-9a-fA-F:]+/\d+)', line)
+                if ipv6_match:
+                    ipv6_addr = ipv6_match.group(1)
+                    if not ipv6_addr.startswith('fe80::'):
+                        current_interface['ipv6_addresses'].append(ipv6_addr)
+
+        return interfaces
+
+    def display_interfaces(self, interfaces):
+        """显示接口信息"""
+        if not interfaces:
+            no_data_label = ttk.Label(self.scrollable_frame,
+                                    text="未找到网络接口信息",
+                                    font=("Arial", 12))
+            no_data_label.pack(pady=50)
+            return
+
+        for i, interface in enumerate(interfaces):
+            # 接口卡片
+            interface_frame = ttk.LabelFrame(self.scrollable_frame,
+                                           text=interface.get('name', '未知接口'),
+                                           padding="15")
+            interface_frame.pack(fill=tk.X, padx=10, pady=(0, 15))
+
+            # 状态指示器
+            status_color = "green" if interface.get('status') == '已连接' else "red"
+            status_text = interface.get('status', '未知')
+
+            status_frame = ttk.Frame(interface_frame)
+            status_frame.pack(fill=tk.X, pady=(0, 10))
+
+            ttk.Label(status_frame, text="状态:", font=("Arial", 10, "bold")).pack(side=tk.LEFT)
+            status_label = ttk.Label(status_frame, text=status_text,
+                                    font=("Arial", 10), foreground=status_color)
+            status_label.pack(side=tk.LEFT, padx=(5, 0))
+
+            # 网格布局显示信息
+            info_frame = ttk.Frame(interface_frame)
+            info_frame.pack(fill=tk.X)
+
+            row = 0
+
+            # MAC地址
+            if interface.get('mac_address'):
+                self._add_info_row(info_frame, "MAC地址:", interface['mac_address'], row)
+                row += 1
+
+            # IPv4地址
+            if interface.get('ipv4_addresses'):
+                self._add_info_row(info_frame, "IPv4地址:", ', '.join(interface['ipv4_addresses']), row)
+                row += 1
+
+            # IPv6地址
+            if interface.get('ipv6_addresses'):
+                self._add_info_row(info_frame, "IPv6地址:", ', '.join(interface['ipv6_addresses']), row)
+                row += 1
+
+            # 默认网关
+            if interface.get('default_gateway'):
+                self._add_info_row(info_frame, "默认网关:", interface['default_gateway'], row)
+                row += 1
+
+            # DNS服务器
+            if interface.get('dns_servers'):
+                self._add_info_row(info_frame, "DNS服务器:", ', '.join(interface['dns_servers']), row)
+                row += 1
+
+            # DHCP信息
+            if interface.get('dhcp_enabled'):
+                dhcp_text = f"已启用 (服务器: {interface.get('dhcp_server', '未知')})"
+                self._add_info_row(info_frame, "DHCP:", dhcp_text, row)
+
+    def _add_info_row(self, parent, label_text, value_text, row):
+        """添加信息行"""
+        label = ttk.Label(parent, text=label_text, font=("Arial", 10, "bold"))
+        label.grid(row=row, column=0, sticky=tk.W, padx=(0, 10), pady=2)
+
+        value = ttk.Label(parent, text=value_text, font=("Arial", 10))
+        value.grid(row=row, column=1, sticky=tk.W, pady=2)
+
+
+class HistoryDialog:
+    """路由历史对话框 - 拖动时间滑块，还原并显示任意时刻的路由表"""
+
+    COLUMNS = ("目标网络", "子网掩码/前缀长度", "网关", "接口", "跃点数", "类型")
+    # 滑块停止拖动后多久开始还原（毫秒）
+    LOAD_DELAY = 200
+
+    def __init__(self, parent, manager):
+        from virtual_table import VirtualTreeview
+
+        self.manager = manager
+        self.history = manager.get_route_history()
+        self.times = []
+        self._load_after = None
+        # 只显示最近一次请求的还原结果
+        self._load_serial = 0
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("路由历史")
+        self.dialog.geometry("1000x650")
+        self.dialog.transient(parent)
+
+        main_frame = ttk.Frame(self.dialog, padding="12")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # 协议版本和后台记录开关
+        control_frame = ttk.Frame(main_frame)
+        control_frame.pack(fill=tk.X, pady=(0, 8))
+        self.version_var = tk.StringVar(value=manager.version_var.get())
+        for version in ("IPv4", "IPv6"):
+            ttk.Radiobutton(control_frame, text=version, variable=self.version_var, value=version,
+                            command=self.reload_times).pack(side=tk.LEFT, padx=(0, 8))
+        self.recording_var = tk.BooleanVar(value=manager.history_recording)
+        ttk.Checkbutton(control_frame, text="后台记录路由历史", variable=self.recording_var,
+                        command=self.toggle_recording).pack(side=tk.LEFT, padx=(16, 8))
+        ttk.Button(control_frame, text="刷新", command=self.reload_times).pack(side=tk.RIGHT)
+
+        # 时间滑块
+        slider_frame = ttk.Frame(main_frame)
+        slider_frame.pack(fill=tk.X, pady=(0, 8))
+        self.scale = ttk.Scale(slider_frame, from_=0, to=0, orient=tk.HORIZONTAL, command=self.on_scale)
+        self.scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 8))
+        self.time_var = tk.StringVar()
+        ttk.Label(slider_frame, textvariable=self.time_var, width=36).pack(side=tk.LEFT)
+
+        self.info_var = tk.StringVar()
+        ttk.Label(main_frame, textvariable=self.info_var).pack(fill=tk.X, pady=(0, 8))
+
+        # 路由表格（可能有大量路由，使用虚拟滚动）
+        table_frame = ttk.Frame(main_frame)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = VirtualTreeview(table_frame, columns=self.COLUMNS, height=20)
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column, anchor=tk.W)
+            self.tree.column(column, width=200 if column in ("目标网络", "网关") else 110, minwidth=60)
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close_dialog)
+        self.reload_times()
+
+    def toggle_recording(self):
+        self.manager.set_history_recording(self.recording_var.get())
+
+    def reload_times(self):
+        """重新读取记录的时间列表，滑块移到最新的记录"""
+        from route_history import HistoryError
+
+        try:
+            self.times = self.history.times(self.version_var.get())
+        except (OSError, HistoryError) as e:
+            self.times = []
+            messagebox.showerror("错误", f"读取路由历史失败: {e}", parent=self.dialog)
+
+        if not self.times:
+            self.scale.configure(to=0)
+            self.time_var.set("")
+            self.info_var.set(f"还没有{self.version_var.get()}路由历史记录，勾选“后台记录路由历史”开始记录")
+            self.tree.set_source(0, str, lambda row: ())
+            return
+
+        self.scale.configure(to=len(self.times) - 1)
+        self.scale.set(len(self.times) - 1)
+        self.on_scale(len(self.times) - 1)
+
+    def on_scale(self, value):
+        """滑块移动：立即更新时间，停止拖动片刻后再还原路由表"""
+        if not self.times:
+            return
+        position = min(int(round(float(value))), len(self.times) - 1)
+        self.time_var.set(f"{self._format_time(self.times[position])}（第 {position + 1}/{len(self.times)} 条记录）")
+
+        if self._load_after is not None:
+            self.dialog.after_cancel(self._load_after)
+        self._load_after = self.dialog.after(self.LOAD_DELAY, self._load, self.times[position])
+
+    def _load(self, timestamp):
+        self._load_after = None
+        self._load_serial += 1
+        serial = self._load_serial
+        version = self.version_var.get()
+        # 主窗口当前显示的同一协议版本的路由，用于比较
+        current = self.manager._displayed_routes if self.manager._displayed_version == version else None
+        self.info_var.set("正在还原路由表...")
+        threading.Thread(target=self._load_async, args=(serial, version, timestamp, current), daemon=True).start()
+
+    def _load_async(self, serial, version, timestamp, current):
+        """后台还原路由表，并与主窗口当前显示的路由比较"""
+        from route_history import HistoryError
+
+        try:
+            routes, record_time = self.history.routes_at(version, timestamp)
+        except (OSError, HistoryError) as e:
+            self.dialog.after(0, self.info_var.set, f"还原路由表失败: {e}")
+            return
+
+        summary = f"{self._format_time(record_time)} 的{version}路由表，共 {len(routes)} 条"
+        if current is not None:
+            from route_table import RouteTable
+            if not isinstance(current, RouteTable):
+                current = RouteTable(current)
+            then_rows = set(routes.row_tuples())
+            now_rows = set(current.row_tuples())
+            summary += f"；与当前路由表相比：之后新增 {len(now_rows - then_rows)} 条，之后删除 {len(then_rows - now_rows)} 条"
+        self.dialog.after(0, self._show_routes, serial, routes, summary)
+
+    def _show_routes(self, serial, routes, summary):
+        """显示还原的路由表（主线程中执行）"""
+        if serial != self._load_serial or not self.dialog.winfo_exists():
+            return
+        self.info_var.set(summary)
+        self.tree.set_source(len(routes),
+                             lambda row: str(row),
+                             lambda row: self._route_values(routes[row]))
+
+    def _route_values(self, route):
+        return (route.get('destination', ''), route.get('netmask', ''), route.get('gateway', ''),
+                route.get('interface', ''), route.get('metric', ''),
+                '持久' if route.get('persistent', False) else '活动')
+
+    def _format_time(self, timestamp):
+        import time
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+
+    def close_dialog(self):
+        """关闭对话框"""
+        if self._load_after is not None:
+            self.dialog.after_cancel(self._load_after)
+        self._load_serial += 1
+        self.dialog.destroy()
+
+
+class PerformanceDialog:
+    """性能窗口 - 各阶段（启动子进程、读取、解析、缓存、表格显示、枚举接口）的耗时和行数"""
+
+    COLUMNS = ("阶段", "次数", "总耗时ms", "自身ms", "CPU ms", "行数", "最近ms")
+    # 自动刷新间隔（毫秒）
+    REFRESH_INTERVAL = 1000
+
+    def __init__(self, parent, manager):
+        from route_profile import PROFILER
+
+        self.manager = manager
+        self.profiler = PROFILER
+        self._refresh_after = None
+        self._shown_cprofile = None
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("性能")
+        self.dialog.geometry("900x600")
+        self.dialog.transient(parent)
+
+        main_frame = ttk.Frame(self.dialog, padding="12")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        control_frame = ttk.Frame(main_frame)
+        control_frame.pack(fill=tk.X, pady=(0, 8))
+        ttk.Button(control_frame, text="重新加载路由",
+                   command=lambda: manager.refresh_routes(force_refresh=True)).pack(side=tk.LEFT, padx=(0, 8))
+        self.cprofile_var = tk.BooleanVar(value=manager.cprofile_loads)
+        ttk.Checkbutton(control_frame, text="加载路由时记录 cProfile", variable=self.cprofile_var,
+                        command=self.toggle_cprofile).pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(control_frame, text="清除", command=self.clear).pack(side=tk.RIGHT)
+        ttk.Button(control_frame, text="保存cProfile", command=self.save_cprofile).pack(side=tk.RIGHT, padx=(0, 8))
+        ttk.Button(control_frame, text="保存Chrome跟踪", command=self.save_chrome_trace).pack(side=tk.RIGHT, padx=(0, 8))
+        ttk.Button(control_frame, text="保存JSON", command=self.save_json).pack(side=tk.RIGHT, padx=(0, 8))
+
+        # 各阶段汇总
+        self.tree = ttk.Treeview(main_frame, columns=self.COLUMNS, show='headings', height=9)
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column, anchor=tk.W)
+            self.tree.column(column, width=160 if column == "阶段" else 100, minwidth=60)
+        self.tree.pack(fill=tk.X, pady=(0, 8))
+
+        ttk.Label(main_frame, text="自身ms 不含内层阶段：如流式解析 route print 时“解析”不含等待命令输出的时间。"
+                  ).pack(fill=tk.X, pady=(0, 8))
+
+        # 最近一次 cProfile 结果
+        cprofile_frame = ttk.LabelFrame(main_frame, text="cProfile（最近一次加载，按累计耗时）", padding="5")
+        cprofile_frame.pack(fill=tk.BOTH, expand=True)
+        self.cprofile_text = tk.Text(cprofile_frame, wrap=tk.NONE, font=("Consolas", 9))
+        scrollbar = ttk.Scrollbar(cprofile_frame, orient=tk.VERTICAL, command=self.cprofile_text.yview)
+        self.cprofile_text.configure(yscrollcommand=scrollbar.set)
+        self.cprofile_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close_dialog)
+        self.refresh()
+
+    def refresh(self):
+        """更新各阶段汇总和 cProfile 结果，定时重复"""
+        from route_profile import format_cprofile
+
+        self.tree.delete(*self.tree.get_children())
+        for stats in self.profiler.stats():
+            self.tree.insert('', tk.END, values=(
+                stats.label, stats.count, f"{stats.wall * 1000:.1f}", f"{stats.self_wall * 1000:.1f}",
+                f"{stats.self_cpu * 1000:.1f}", stats.rows, f"{stats.last_wall * 1000:.1f}"))
+
+        profile = self.profiler.last_cprofile
+        if profile is not self._shown_cprofile:
+            self._shown_cprofile = profile
+            self.cprofile_text.delete('1.0', tk.END)
+            if profile is not None:
+                self.cprofile_text.insert(tk.END, format_cprofile(profile))
+
+        self._refresh_after = self.dialog.after(self.REFRESH_INTERVAL, self.refresh)
+
+    def toggle_cprofile(self):
+        self.manager.cprofile_loads = self.cprofile_var.get()
+
+    def clear(self):
+        self.profiler.reset()
+        self._shown_cprofile = None
+        self.cprofile_text.delete('1.0', tk.END)
+        self.tree.delete(*self.tree.get_children())
+
+    def _save(self, title, extension, filetypes, write):
+        from tkinter import filedialog
+
+        path = filedialog.asksaveasfilename(parent=self.dialog, title=title, defaultextension=extension,
+                                            filetypes=filetypes)
+        if not path:
+            return
+        try:
+            write(path)
+            self.manager.log(f"性能记录已保存到: {path}")
+        except OSError as e:
+            messagebox.showerror("错误", f"保存失败: {e}", parent=self.dialog)
+
+    def save_json(self):
+        self._save("保存性能记录", ".json", [("JSON", "*.json"), ("所有文件", "*.*")], self.profiler.write_json)
+
+    def save_chrome_trace(self):
+        self._save("保存Chrome跟踪文件", ".json", [("Chrome跟踪", "*.json"), ("所有文件", "*.*")],
+                   self.profiler.write_chrome_trace)
+
+    def save_cprofile(self):
+        profile = self.profiler.last_cprofile
+        if profile is None:
+            messagebox.showinfo("提示", "还没有 cProfile 结果，勾选“加载路由时记录 cProfile”后重新加载路由",
+                                parent=self.dialog)
+            return
+        self._save("保存cProfile结果", ".prof", [("cProfile", "*.prof"), ("所有文件", "*.*")], profile.dump_stats)
+
+    def close_dialog(self):
+        """关闭对话框"""
+        if self._refresh_after is not None:
+            self.dialog.after_cancel(self._refresh_after)
+        self.dialog.destroy()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+路由历史 - 定期记录路由表的变化，可还原任意时刻的路由表
+
+历史保存在只追加的日志文件中，每条记录为一个协议版本的关键帧（完整路由表）
+或增量（与上一条记录相比删除和新增的路由，跃点数变化视为删除旧路由再新增），
+记录内容经 zlib 压缩。路由表没有变化时不写入记录。
+自上一关键帧以来增量中的路由条数超过路由表大小，或增量记录数超过 KEYFRAME_INTERVAL 时，
+写入新的关键帧，还原任意时刻最多需要读取一个关键帧和有限条增量。
+
+文件格式（小端序）:
+    文件头  魔数 b'RTHIST\\0\\0'、格式版本
+    记录    记录头（类型、协议版本、时间戳、内容长度、CRC32、新增条数、删除条数）+ 压缩内容
+            KEYF  关键帧：route_snapshot.pack_route_table 编码的完整路由表
+            DLTA  增量：删除部分的长度 + 删除的路由 + 新增的路由（均为 pack_route_table 编码）
+
+打开日志时只读取记录头建立索引；按时间查找为二分查找，
+还原时读取该时刻之前最近的关键帧，再依次应用其后的增量。
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+
+from route_snapshot import default_snapshot_path, pack_route_table, unpack_route_table
+from route_table import RouteTable
+
+HISTORY_MAGIC = b'RTHIST\0\0'
+HISTORY_FORMAT_VERSION = 1
+HISTORY_FILENAME = 'route_history.log'
+
+# 两个关键帧之间最多的增量记录数
+KEYFRAME_INTERVAL = 1000
+# 后台记录的默认间隔（秒）
+RECORD_INTERVAL = 10
+
+RECORD_KEYFRAME = b'KEYF'
+RECORD_DELTA = b'DLTA'
+
+_FILE_HEADER = struct.Struct('<8sH6x')        # magic, format version
+_RECORD = struct.Struct('<4sB3xdIIII')        # kind, version, timestamp, length, crc32, added, removed
+_DELTA = struct.Struct('<Q')                  # length of the removed part
+_VERSIONS = {'IPv4': 4, 'IPv6': 6}
+_VERSION_NAMES = {4: 'IPv4', 6: 'IPv6'}
+
+
+class HistoryError(Exception):
+    """历史日志无效（不是历史文件、格式版本不符或记录损坏）"""
+
+
+def default_history_path():
+    """历史日志的默认位置：与路由快照在同一目录"""
+    return os.path.join(os.path.dirname(default_snapshot_path()), HISTORY_FILENAME)
+
+
+class HistoryRecord:
+    """一条记录的摘要（不含内容）"""
+
+    __slots__ = ('kind', 'version', 'timestamp', 'added', 'removed', 'size')
+
+    def __init__(self, kind, version, timestamp, added, removed, size):
+        self.kind = kind
+        self.version = version
+        self.timestamp = timestamp
+        self.added = added
+        self.removed = removed
+        self.size = size
+
+    @property
+    def keyframe(self):
+        return self.kind == RECORD_KEYFRAME
+
+
+class _VersionIndex:
+    """一个协议版本的记录索引：时间戳、文件偏移和所依赖的关键帧序号"""
+
+    def __init__(self):
+        self.times = array('d')
+        self.offsets = array('Q')
+        self.keyframes = array('Q')
+        # 自最近关键帧以来增量中的路由条数
+        self.delta_rows = 0
+
+    def append(self, kind, timestamp, offset, changed):
+        if kind == RECORD_KEYFRAME or not self.times:
+            self.keyframes.append(len(self.times))
+            self.delta_rows = 0
+        else:
+            self.keyframes.append(self.keyframes[-1])
+            self.delta_rows += changed
+        self.times.append(timestamp)
+        self.offsets.append(offset)
+
+    def deltas_since_keyframe(self):
+        return len(self.times) - 1 - self.keyframes[-1] if self.times else 0
+
+
+class RouteHistory:
+    """路由历史日志，线程安全；记录和还原可以在不同线程中进行
+
+    同一时间只应有一个进程记录，其他进程可以同时读取（每次读取前索引新追加的记录）。
+    """
+
+    def __init__(self, path, keyframe_interval=KEYFRAME_INTERVAL):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self._lock = threading.RLock()
+        self._indexes = {}
+        # 已建立索引的文件长度
+        self._scanned = 0
+        # 最近一次记录后的路由表 {协议版本: {行: None}}（按插入顺序的集合）
+        self._last = {}
+        self._writer = None
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _scan(self):
+        """读取上次之后追加的记录头，更新索引；末尾不完整的记录（写入中或中途退出）暂不读取"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            offset = self._scanned
+            if offset == 0:
+                header = f.read(_FILE_HEADER.size)
+                if len(header) < _FILE_HEADER.size:
+                    return
+                magic, format_version = _FILE_HEADER.unpack(header)
+                if magic != HISTORY_MAGIC:
+                    raise HistoryError("不是路由历史文件")
+                if format_version != HISTORY_FORMAT_VERSION:
+                    raise HistoryError(f"历史文件格式版本不支持: {format_version}")
+                offset = _FILE_HEADER.size
+
+            f.seek(offset)
+            while offset + _RECORD.size <= size:
+                header = f.read(_RECORD.size)
+                kind, version, timestamp, length, _crc, added, removed = _RECORD.unpack(header)
+                if kind not in (RECORD_KEYFRAME, RECORD_DELTA) or version not in _VERSION_NAMES:
+                    raise HistoryError(f"历史记录损坏（偏移 {offset}）")
+                if offset + _RECORD.size + length > size:
+                    break
+                index = self._indexes.setdefault(_VERSION_NAMES[version], _VersionIndex())
+                index.append(kind, timestamp, offset, added + removed)
+                offset += _RECORD.size + length
+                f.seek(offset)
+            self._scanned = offset
+
+    def _read_record(self, f, offset):
+        """读取并校验一条记录，返回 (记录头, 解压后的内容)"""
+        f.seek(offset)
+        header = _RECORD.unpack(f.read(_RECORD.size))
+        payload = f.read(header[3])
+        if len(payload) != header[3] or zlib.crc32(payload) != header[4]:
+            raise HistoryError(f"历史记录校验和错误（偏移 {offset}）")
+        return header, zlib.decompress(payload)
+
+    def records(self, version):
+        """该协议版本的全部记录摘要（HistoryRecord 列表，按时间排列）"""
+        with self._lock:
+            self._scan()
+            index = self._indexes.get(version)
+            if index is None:
+                return []
+            result = []
+            with open(self.path, 'rb') as f:
+                for offset in index.offsets:
+                    f.seek(offset)
+                    kind, _version, timestamp, length, _crc, added, removed = _RECORD.unpack(f.read(_RECORD.size))
+                    result.append(HistoryRecord(kind, version, timestamp, added, removed, length))
+            return result
+
+    def times(self, version):
+        """该协议版本每条记录的时间戳"""
+        with self._lock:
+            self._scan()
+            index = self._indexes.get(version)
+            return list(index.times) if index is not None else []
+
+    def routes_at(self, version, timestamp):
+        """还原 timestamp 时刻的路由表，返回 (RouteTable, 所用记录的时间戳)；早于第一条记录时返回 (None, None)"""
+        with self._lock:
+            self._scan()
+            index = self._indexes.get(version)
+            position = bisect_right(index.times, timestamp) - 1 if index is not None else -1
+            if position < 0:
+                return None, None
+            rows = self._rows_at(index, position)
+            return RouteTable.from_row_tuples(rows), index.times[position]
+
+    def _rows_at(self, index, position):
+        """读取 position 所依赖的关键帧，并应用其后直到 position 的增量，返回 {行: None}"""
+        with open(self.path, 'rb') as f:
+            keyframe = index.keyframes[position]
+            _header, payload = self._read_record(f, index.offsets[keyframe])
+            rows = dict.fromkeys(unpack_route_table(payload).row_tuples())
+            for record in range(keyframe + 1, position + 1):
+                _header, payload = self._read_record(f, index.offsets[record])
+                removed_length = _DELTA.unpack_from(payload)[0]
+                start = _DELTA.size
+                for row in unpack_route_table(payload[start:start + removed_length]).row_tuples():
+                    rows.pop(row, None)
+                rows.update(dict.fromkeys(unpack_route_table(payload[start + removed_length:]).row_tuples()))
+        return rows
+
+    def record(self, version, routes, timestamp=None):
+        """记录当前路由表，返回写入的记录类型（RECORD_KEYFRAME/RECORD_DELTA），没有变化时返回 None"""
+        if version not in _VERSIONS:
+            raise ValueError(f"不支持的协议版本: {version}")
+        if not isinstance(routes, RouteTable):
+            routes = RouteTable(routes)
+        current = dict.fromkeys(routes.row_tuples())
+
+        with self._lock:
+            self._scan()
+            index = self._indexes.get(version)
+            if timestamp is None:
+                timestamp = time.time()
+            if index is not None and index.times:
+                # 时间戳保持递增，系统时间回拨时也能二分查找
+                timestamp = max(timestamp, index.times[-1])
+
+            last = self._last.get(version)
+            if last is None and index is not None and index.times:
+                # 本次运行的第一次记录：与日志中最后的路由表比较
+                last = self._rows_at(index, len(index.times) - 1)
+
+            if last is None:
+                kind, added, removed = RECORD_KEYFRAME, len(current), 0
+            else:
+                removed_rows = [row for row in last if row not in current]
+                added_rows = [row for row in current if row not in last]
+                if not removed_rows and not added_rows:
+                    self._last[version] = current
+                    return None
+                kind, added, removed = RECORD_DELTA, len(added_rows), len(removed_rows)
+                if (index.deltas_since_keyframe() >= self.keyframe_interval
+                        or index.delta_rows + added + removed > len(current)):
+                    kind, added, removed = RECORD_KEYFRAME, len(current), 0
+
+            if kind == RECORD_KEYFRAME:
+                payload = pack_route_table(routes)
+            else:
+                removed_part = pack_route_table(RouteTable.from_row_tuples(removed_rows))
+                payload = (_DELTA.pack(len(removed_part)) + removed_part
+                           + pack_route_table(RouteTable.from_row_tuples(added_rows)))
+            payload = zlib.compress(payload)
+
+            offset = self._append(_RECORD.pack(kind, _VERSIONS[version], timestamp, len(payload),
+                                               zlib.crc32(payload), added, removed) + payload)
+            self._indexes.setdefault(version, _VersionIndex()).append(kind, timestamp, offset, added + removed)
+            self._last[version] = current
+            return kind
+
+    def _append(self, data):
+        """追加一条记录，返回其偏移"""
+        if self._writer is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._writer = open(self.path, 'ab')
+            if self._scanned < _FILE_HEADER.size:
+                self._writer.truncate(0)
+                self._writer.write(_FILE_HEADER.pack(HISTORY_MAGIC, HISTORY_FORMAT_VERSION))
+                self._scanned = _FILE_HEADER.size
+            elif self._writer.tell() > self._scanned:
+                # 上次写入中途退出留下的不完整记录
+                self._writer.truncate(self._scanned)
+
+        offset = self._scanned
+        self._writer.write(data)
+        self._writer.flush()
+        self._scanned = offset + len(data)
+        return offset
+
+
+class HistoryRecorder:
+    """后台定期记录路由表；trigger() 可在路由变化时提前记录"""
+
+    def __init__(self, history, get_routes, versions=('IPv4', 'IPv6'), interval=RECORD_INTERVAL, log=None):
+        self.history = history
+        self.get_routes = get_routes
+        self.versions = versions
+        self.interval = interval
+        self.log = log or (lambda message: None)
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, name="route-history", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止记录；不等待正在进行的一轮记录，线程在这一轮结束后退出"""
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread = None
+
+    def trigger(self):
+        """请求尽快记录一次（例如收到路由变化通知后）"""
+        self._wakeup.set()
+
+    def record_once(self):
+        """读取并记录各协议版本的路由表；读取失败的版本跳过，不记录为空表"""
+        for version in self.versions:
+            try:
+                routes = self.get_routes(version)
+            except Exception as e:
+                self.log(f"记录路由历史时读取{version}路由失败: {e}")
+                continue
+            kind = self.history.record(version, routes)
+            if kind is not None:
+                self.log(f"已记录{version}路由历史（{'关键帧' if kind == RECORD_KEYFRAME else '增量'}）")
+
+    def run(self):
+        """在当前线程中循环记录，直到 stop()"""
+        while not self._stopped.is_set():
+            try:
+                self.record_once()
+            except (OSError, HistoryError) as e:
+                self.log(f"记录路由历史失败: {e}")
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
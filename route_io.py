@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+路由导出/导入 - 流式读写 CSV、NDJSON、JSON 和二进制列式路由文件
+
+导出时逐行（二进制格式逐块）直接从路由表写入文件，不先拼成整个字符串；
+导入时逐条产出路由字典，JSON数组也是边读边解析，文件再大也只占用一个读取块的内存。
+导入结果可直接交给 route_apply（批量应用）、route_reconcile（期望状态）和 diff 比较。
+
+格式（按扩展名识别）:
+    .csv            表头为 ROUTE_FIELDS，可带 action 列（add/delete）
+    .ndjson/.jsonl  每行一个路由对象
+    .json           路由对象数组（每个对象一行）
+    .rtab           二进制：文件头 + 若干数据块，每块为 route_snapshot 的列式编码（最多 CHUNK_ROWS 条），
+                    块头含长度、CRC32 和行数；最后是长度为0、行数为总行数的结束块，缺少结束块视为文件不完整
+"""
+
+import json
+import os
+import re
+import struct
+import zlib
+
+from route_table import ROUTE_FIELDS, RouteTable
+
+FORMAT_CSV = 'csv'
+FORMAT_NDJSON = 'ndjson'
+FORMAT_JSON = 'json'
+FORMAT_BINARY = 'rtab'
+
+FORMATS = (FORMAT_CSV, FORMAT_NDJSON, FORMAT_JSON, FORMAT_BINARY)
+
+EXTENSIONS = {
+    '.csv': FORMAT_CSV,
+    '.ndjson': FORMAT_NDJSON,
+    '.jsonl': FORMAT_NDJSON,
+    '.json': FORMAT_JSON,
+    '.rtab': FORMAT_BINARY,
+}
+
+STREAM_MAGIC = b'RTSTRM\0\0'
+STREAM_FORMAT_VERSION = 1
+
+_STREAM_HEADER = struct.Struct('<8sH6x')   # magic, format version
+_FRAME = struct.Struct('<QII')              # payload length, crc32, row count
+
+# 二进制格式每块的最大行数
+CHUNK_ROWS = 65536
+# 文本格式每次写入的行数
+WRITE_BATCH_ROWS = 4096
+# 读取JSON数组时每次读取的字符数
+READ_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'\s*')
+
+
+class RouteFileError(ValueError):
+    """路由文件格式错误或内容不完整"""
+
+
+def route_file_format(path):
+    """按扩展名识别路由文件格式；不支持的扩展名抛出 RouteFileError"""
+    extension = os.path.splitext(path)[1].lower()
+    fmt = EXTENSIONS.get(extension)
+    if fmt is None:
+        raise RouteFileError(f"不支持的路由文件格式: {extension or path}（支持 .csv/.ndjson/.jsonl/.json/.rtab）")
+    return fmt
+
+
+def is_route_file(path):
+    """是否为可导入的路由文件（按扩展名）"""
+    return os.path.splitext(path)[1].lower() in EXTENSIONS
+
+
+def _route_dict(route):
+    return {field: route.get(field, '') for field in ROUTE_FIELDS}
+
+
+def _iter_route_dicts(routes):
+    """RouteTable 整行解码，其他可迭代对象补齐缺少的字段"""
+    if isinstance(routes, RouteTable):
+        return routes.iter_dicts()
+    return map(_route_dict, routes)
+
+
+class RouteWriter:
+    """流式写入路由文件；可多次 write()（如先写IPv4再写IPv6路由），最后 close() 写入结尾
+
+    f 为已打开的文件：二进制格式需要以 'wb' 打开，其他格式以文本方式打开（CSV需要 newline=''）。
+    close() 不关闭 f。
+    """
+
+    def __init__(self, f, fmt):
+        if fmt not in FORMATS:
+            raise RouteFileError(f"不支持的导出格式: {fmt}")
+        self.f = f
+        self.fmt = fmt
+        self.count = 0
+        self._closed = False
+        self._pending = None
+
+        if fmt == FORMAT_CSV:
+            import csv
+            self._csv = csv.writer(f)
+            self._csv.writerow(ROUTE_FIELDS)
+        elif fmt == FORMAT_JSON:
+            f.write('[')
+        elif fmt == FORMAT_BINARY:
+            f.write(_STREAM_HEADER.pack(STREAM_MAGIC, STREAM_FORMAT_VERSION))
+
+    def write(self, routes):
+        """写入一批路由（RouteTable 或路由字典的可迭代对象），返回写入的条数"""
+        before = self.count
+        if self.fmt == FORMAT_CSV:
+            self._write_csv(routes)
+        elif self.fmt == FORMAT_BINARY:
+            self._write_binary(routes)
+        else:
+            self._write_json_lines(routes)
+        return self.count - before
+
+    def _write_csv(self, routes):
+        writer = self._csv
+        batch = []
+        for route in _iter_route_dicts(routes):
+            batch.append([route[field] for field in ROUTE_FIELDS])
+            if len(batch) >= WRITE_BATCH_ROWS:
+                writer.writerows(batch)
+                self.count += len(batch)
+                batch = []
+        writer.writerows(batch)
+        self.count += len(batch)
+
+    def _write_json_lines(self, routes):
+        dumps = json.dumps
+        json_array = self.fmt == FORMAT_JSON
+        batch = []
+        for route in _iter_route_dicts(routes):
+            text = dumps(route, ensure_ascii=False)
+            if json_array:
+                # JSON数组中每个对象一行，除第一个对象外前面有逗号
+                batch.append((',\n' if self.count or batch else '\n') + text)
+            else:
+                batch.append(text + '\n')
+            if len(batch) >= WRITE_BATCH_ROWS:
+                self.f.write(''.join(batch))
+                self.count += len(batch)
+                batch = []
+        self.f.write(''.join(batch))
+        self.count += len(batch)
+
+    def _write_binary(self, routes):
+        if isinstance(routes, RouteTable):
+            self._flush_pending()
+            for start in range(0, len(routes), CHUNK_ROWS):
+                self._write_frame(routes.slice(start, start + CHUNK_ROWS))
+            return
+
+        for route in routes:
+            if self._pending is None:
+                self._pending = RouteTable()
+            self._pending.append(route)
+            if len(self._pending) >= CHUNK_ROWS:
+                self._flush_pending()
+        self._flush_pending()
+
+    def _flush_pending(self):
+        if self._pending is not None and len(self._pending):
+            self._write_frame(self._pending)
+        self._pending = None
+
+    def _write_frame(self, table):
+        from route_snapshot import pack_route_table
+
+        data = pack_route_table(table)
+        self.f.write(_FRAME.pack(len(data), zlib.crc32(data), len(table)))
+        self.f.write(data)
+        self.count += len(table)
+
+    def close(self):
+        """写入文件结尾（JSON数组的右括号、二进制格式的结束块）"""
+        if self._closed:
+            return
+        self._closed = True
+        if self.fmt == FORMAT_JSON:
+            self.f.write('\n]\n' if self.count else ']\n')
+        elif self.fmt == FORMAT_BINARY:
+            self._flush_pending()
+            self.f.write(_FRAME.pack(0, 0, self.count & 0xFFFFFFFF))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        return False
+
+
+def open_route_file(path, fmt, mode='r'):
+    """以适合该格式的方式打开路由文件（二进制格式为字节流，CSV带BOM以便Excel识别中文）"""
+    if fmt == FORMAT_BINARY:
+        return open(path, mode + 'b')
+    if fmt == FORMAT_CSV:
+        return open(path, mode, encoding='utf-8-sig', newline='')
+    return open(path, mode, encoding='utf-8')
+
+
+def export_routes(path, tables, fmt=None):
+    """把一个或多个路由表写入文件，返回写入的条数
+
+    tables 为路由表（或路由字典列表）的列表；先写入临时文件，完成后替换目标文件。
+    """
+    fmt = fmt or route_file_format(path)
+    temp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open_route_file(temp_path, fmt, 'w') as f:
+            with RouteWriter(f, fmt) as writer:
+                for routes in tables:
+                    writer.write(routes)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return writer.count
+
+
+def _normalize(route):
+    """导入的路由补齐缺少的字段，persistent 转换为布尔值，metric 转换为字符串"""
+    for field in ROUTE_FIELDS:
+        if route.get(field) is None:
+            route[field] = ''
+    if isinstance(route['persistent'], str):
+        route['persistent'] = route['persistent'].strip().lower() in ('true', '1', 'yes')
+    route['metric'] = str(route['metric'])
+    return route
+
+
+def iter_routes(f, fmt):
+    """从已打开的文件逐条产出路由字典（打开方式见 open_route_file）"""
+    if fmt == FORMAT_CSV:
+        import csv
+        rows = csv.DictReader(f)
+    elif fmt == FORMAT_NDJSON:
+        rows = _iter_ndjson(f)
+    elif fmt == FORMAT_JSON:
+        rows = _iter_json_array(f)
+    elif fmt == FORMAT_BINARY:
+        # 由路由表解码的字典字段已经完整
+        yield from _iter_binary(f)
+        return
+    else:
+        raise RouteFileError(f"不支持的导入格式: {fmt}")
+    for route in rows:
+        yield _normalize(route)
+
+
+def iter_route_file(path, fmt=None):
+    """逐条产出路由文件中的路由字典，格式默认按扩展名识别"""
+    fmt = fmt or route_file_format(path)
+    with open_route_file(path, fmt) as f:
+        yield from iter_routes(f, fmt)
+
+
+def _iter_ndjson(f):
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            route = json.loads(line)
+        except ValueError as e:
+            raise RouteFileError(f"第{line_number}行不是有效的JSON: {e}") from None
+        if not isinstance(route, dict):
+            raise RouteFileError(f"第{line_number}行应为路由对象")
+        yield route
+
+
+def _iter_json_array(f):
+    """逐个解析顶层JSON数组中的对象，每次只读取 READ_CHUNK_SIZE 个字符"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    started = False
+    expect_value = True
+    first = True
+
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position == len(buffer):
+            if eof:
+                raise RouteFileError("JSON路由列表不完整")
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                eof = True
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        char = buffer[position]
+        if not started:
+            if char != '[':
+                raise RouteFileError("JSON路由文件应为路由对象数组")
+            started = True
+            position += 1
+        elif char == ']' and (first or not expect_value):
+            return
+        elif not expect_value:
+            if char != ',':
+                raise RouteFileError(f"JSON格式错误: 路由对象之间应为逗号，实际为 {char!r}")
+            expect_value = True
+            position += 1
+        else:
+            try:
+                route, end = decoder.raw_decode(buffer, position)
+            except ValueError as e:
+                if eof:
+                    raise RouteFileError(f"JSON格式错误: {e}") from None
+                # 对象跨越了读取块的边界，继续读取
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    eof = True
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            if not isinstance(route, dict):
+                raise RouteFileError("JSON路由列表的每一项应为路由对象")
+            yield route
+            position = end
+            expect_value = False
+            first = False
+            if position > READ_CHUNK_SIZE:
+                buffer = buffer[position:]
+                position = 0
+
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise RouteFileError("二进制路由文件不完整")
+    return data
+
+
+def _iter_binary(f):
+    from route_snapshot import SnapshotError, unpack_route_table
+
+    magic, version = _STREAM_HEADER.unpack(_read_exact(f, _STREAM_HEADER.size))
+    if magic != STREAM_MAGIC:
+        raise RouteFileError("不是二进制路由文件")
+    if version != STREAM_FORMAT_VERSION:
+        raise RouteFileError(f"不支持的二进制路由文件版本: {version}")
+
+    total = 0
+    while True:
+        length, crc, rows = _FRAME.unpack(_read_exact(f, _FRAME.size))
+        if not length:
+            if rows != total & 0xFFFFFFFF:
+                raise RouteFileError("二进制路由文件的行数与结束块不符")
+            return
+        data = _read_exact(f, length)
+        if zlib.crc32(data) != crc:
+            raise RouteFileError("二进制路由文件校验和错误")
+        try:
+            table = unpack_route_table(memoryview(data))
+        except (SnapshotError, ValueError, KeyError) as e:
+            raise RouteFileError(f"二进制路由文件内容无效: {e}") from None
+        if len(table) != rows:
+            raise RouteFileError("二进制路由文件数据块的行数不符")
+        total += rows
+        yield from table.iter_dicts()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+最长前缀匹配查询 - "这个IP走哪条路由？"
+
+将已加载的路由按协议版本和路由表转换为互不重叠的有序地址区间，
+每个区间对应该范围内最长前缀（前缀相同时跃点数最小）的路由，
+单次查询只需一次二分查找。
+"""
+
+import socket
+import struct
+from bisect import bisect_right
+
+from route_core import route_table_name
+from route_table import RouteTable, FLAG_IPV6, FLAG_PERSISTENT, METRIC_NONE, METRIC_DEFAULT
+
+# Linux策略路由的默认查找顺序：local -> main -> default
+TABLE_LOOKUP_ORDER = ('local', 'main', 'default')
+
+# 查询结果输出列
+RESULT_HEADER = ("目标IP", "目标网络", "子网掩码/前缀长度", "网关地址", "接口", "跃点数")
+
+_QQ = struct.Struct('!QQ')
+_I = struct.Struct('!I')
+
+
+def parse_address(address):
+    """IP地址字符串转换为 (是否IPv6, 整数值)，无效地址抛出 ValueError"""
+    address = address.strip()
+    try:
+        return False, _I.unpack(socket.inet_pton(socket.AF_INET, address))[0]
+    except OSError:
+        pass
+    try:
+        high, low = _QQ.unpack(socket.inet_pton(socket.AF_INET6, address.split('%', 1)[0]))
+        return True, (high << 64) | low
+    except OSError:
+        raise ValueError(f"无效的IP地址: {address}") from None
+
+
+class PrefixIndex:
+    """单个协议版本、单个路由表的有序区间索引"""
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.starts = []
+        self.ends = []
+        self.rows = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def build(self, prefixes):
+        """prefixes: 可迭代的 (网络地址, 前缀长度, 跃点数, 行号)"""
+        # 同一前缀只保留跃点数最小的路由
+        best = {}
+        for network, prefix, metric, row in prefixes:
+            host_bits = self.bits - prefix
+            network = (network >> host_bits) << host_bits
+            key = (network, prefix)
+            current = best.get(key)
+            if current is None or metric < current[0]:
+                best[key] = (metric, row)
+
+        # 前缀之间只有嵌套或不相交两种关系：按起始地址升序、前缀长度升序扫描，
+        # 用栈维护当前覆盖的前缀，输出互不重叠的区间
+        starts, ends, rows = self.starts, self.ends, self.rows
+        del starts[:], ends[:], rows[:]
+
+        def emit(start, end, row):
+            if start > end:
+                return
+            if rows and rows[-1] == row and ends[-1] + 1 == start:
+                ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+                rows.append(row)
+
+        stack = []
+        cursor = 0
+        for (network, prefix) in sorted(best):
+            end = network + (1 << (self.bits - prefix)) - 1
+            row = best[(network, prefix)][1]
+            while stack and stack[-1][0] < network:
+                top_end, top_row = stack.pop()
+                emit(cursor, top_end, top_row)
+                cursor = top_end + 1
+            if stack:
+                emit(cursor, network - 1, stack[-1][1])
+            stack.append((end, row))
+            cursor = network
+        while stack:
+            top_end, top_row = stack.pop()
+            emit(cursor, top_end, top_row)
+            cursor = top_end + 1
+        return self
+
+    def lookup(self, value):
+        """返回匹配的行号，没有匹配时返回 None"""
+        index = bisect_right(self.starts, value) - 1
+        if index >= 0 and value <= self.ends[index]:
+            return self.rows[index]
+        return None
+
+
+class RouteLookup:
+    """基于已加载路由表的最长前缀匹配查询
+
+    持久路由（Windows重启后才生效的路由配置）不参与查询；
+    跃点数为 "Default" 或为空的路由在同前缀竞争中排在最后。
+    """
+
+    def __init__(self, routes):
+        if not isinstance(routes, RouteTable):
+            routes = RouteTable(routes)
+        self.routes = routes
+        self._indexes = {False: [], True: []}
+        self._build()
+
+    def _build(self):
+        routes = self.routes
+        grouped = {}
+        for row in range(len(routes)):
+            flags = routes.flags[row]
+            if flags & FLAG_PERSISTENT or row in routes._raw:
+                continue
+            ipv6 = bool(flags & FLAG_IPV6)
+            metric = routes.metric[row]
+            if metric in (METRIC_NONE, METRIC_DEFAULT):
+                metric = 1 << 32
+            if ipv6:
+                network = (routes.dest_hi[row] << 64) | routes.dest_lo[row]
+            else:
+                network = routes.dest_lo[row]
+            table = route_table_name(routes[row])
+            grouped.setdefault((ipv6, table), []).append((network, routes.prefix[row], metric, row))
+
+        for (ipv6, table), prefixes in grouped.items():
+            index = PrefixIndex(128 if ipv6 else 32).build(prefixes)
+            self._indexes[ipv6].append((self._table_rank(table), table, index))
+        for indexes in self._indexes.values():
+            indexes.sort(key=lambda item: item[0])
+
+    @staticmethod
+    def _table_rank(table):
+        """路由表查找顺序；Windows活动路由视为main表，其他自定义表排在最后"""
+        if table in TABLE_LOOKUP_ORDER:
+            return TABLE_LOOKUP_ORDER.index(table)
+        return len(TABLE_LOOKUP_ORDER)
+
+    def indexes(self, ipv6):
+        """按查找顺序返回指定协议版本各路由表的 PrefixIndex"""
+        return [index for _rank, _table, index in self._indexes[ipv6]]
+
+    def lookup_row(self, address):
+        """返回匹配路由的行号，没有匹配时返回 None"""
+        ipv6, value = parse_address(address)
+        for _rank, _table, index in self._indexes[ipv6]:
+            row = index.lookup(value)
+            if row is not None:
+                return row
+        return None
+
+    def lookup(self, address):
+        """返回目标地址使用的路由（RouteRow），没有匹配时返回 None"""
+        row = self.lookup_row(address)
+        return self.routes[row] if row is not None else None
+
+    def lookup_many(self, addresses):
+        """批量查询，逐个返回 (地址, 路由或None)；无效地址返回 (地址, None)"""
+        for address in addresses:
+            address = address.strip()
+            if not address:
+                continue
+            try:
+                yield address, self.lookup(address)
+            except ValueError:
+                yield address, None
+
+
+def result_row(address, route):
+    """查询结果转换为输出行（对应 RESULT_HEADER），未匹配时路由字段为空"""
+    if route is None:
+        return (address, '', '', '', '', '')
+    return (address, route.get('destination', ''), route.get('netmask', ''),
+            route.get('gateway', ''), route.get('interface', ''), route.get('metric', ''))
+
+
+def read_addresses(path):
+    """从文本文件逐行读取地址，忽略空行和 # 注释；每行取第一个逗号/空白分隔的字段"""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                yield line.replace(',', ' ').split()[0]
@@ -6,16 +6,29 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import subprocess
-import re
 import sys
 import platform
 import logging
-import ipaddress
 import os
 import ctypes
 import threading
 import time
 
+from virtual_table import VirtualTreeview
+from route_table import RouteTable
+from route_lookup import RouteLookup, RESULT_HEADER, parse_address, read_addresses, result_row
+from route_core import (route_key, route_iid, route_version, diff_rows, get_system_routes, get_system_interfaces,
+                        SNAPSHOT_MAX_AGE,
+                        validate_route_data, analyze_route_error, build_add_command,
+                        build_delete_command, run_route_command)
+from route_io import iter_route_file
+from route_apply import apply_routes, apply_changes
+from route_probes import Probe, ProbeCollector
+from log_sink import QueueLogSink
+from route_cache import RouteCache, route_cache_key
+from route_snapshot import SnapshotError, default_snapshot_path, load_snapshot, save_snapshot
+from route_profile import PROFILER, STAGE_LOAD, STAGE_CACHE, STAGE_RENDER, STAGE_INTERFACES, STAGE_SNAPSHOT
+
 # 隐藏控制台窗口（仅在Windows上运行.py文件时）
 if platform.system().lower() == 'windows' and getattr(sys, 'frozen', False) == False:
     try:
@@ -38,6 +51,14 @@ def is_admin():
     except:
         return False
 
+def close_splash():
+    """关闭打包程序的启动画面（使用 --splash 打包时才有 pyi_splash 模块）"""
+    try:
+        import pyi_splash
+        pyi_splash.close()
+    except ImportError:
+        pass
+
 def restart_as_admin():
     """以管理员身份重启程序"""
     if is_admin():
@@ -57,8 +78,13 @@ def restart_as_admin():
         return False
 
 class RouteManager:
+    # 路由条数超过此值时，路由表格切换为只渲染可见行的虚拟滚动模式
+    VIRTUAL_TABLE_THRESHOLD = 5000
+
     def __init__(self):
         self.root = tk.Tk()
+        # 日志先进入队列，由主线程定时写入日志框；后台线程可以直接调用 self.log
+        self._log_sink = QueueLogSink()
         self.root.title("系统路由配置管理器")
         self.root.geometry("1200x800")
         self.root.minsize(1000, 600)
@@ -68,6 +94,7 @@ class RouteManager:
 
         # 检测操作系统
         self.is_windows = platform.system().lower() == 'windows'
+        self.is_linux = platform.system().lower() == 'linux'
         logger.info(f"操作系统: {platform.system()}")
 
         # 检测管理员权限
@@ -80,21 +107,67 @@ class RouteManager:
         self._interfaces_cache_duration = 30  # 缓存30秒
 
         # 添加路由数据缓存
-        self._routes_cache = None
-        self._routes_cache_time = 0
         self._routes_cache_duration = 60  # 缓存60秒
+        # 按 (协议版本, 路由表, 数据源) 分别缓存，过期数据先显示再在后台重新加载
+        self._route_cache = RouteCache(ttl=self._routes_cache_duration)
 
         # 加载状态标志
         self._is_loading_routes = False
 
+        # 实时路由表（Linux下由netlink监视线程增量维护）{路由标识: 路由}
+        self._route_watcher = None
+        self._live_routes = {}
+        self._pending_route_events = []
+
+        # 表格当前显示内容的快照 {行标识: 显示值}，用于增量刷新
+        self._active_rows = {}
+        self._persistent_rows = {}
+        self._virtual_mode = False
+        # 表格当前显示的协议版本；流式加载中已显示的虚拟表格行号 (活动, 持久)
+        self._displayed_version = None
+        self._partial_rows = None
+
+        # 最近一次显示的路由及按需构建的最长前缀匹配索引
+        self._displayed_routes = None
+        self._route_lookup = None
+
+        # 并发执行路由、接口等探测的后台事件循环
+        self.collector = ProbeCollector()
+
+        # 最近一次读取的路由和接口保存在磁盘快照中，启动时先显示
+        self._snapshot_path = default_snapshot_path()
+        self._snapshot_lock = threading.Lock()
+
+        # 路由历史日志（第一次使用时打开）和后台记录线程
+        self._history = None
+        self._history_recorder = None
+
+        # 加载路由时是否用 cProfile 记录函数级耗时（“性能”窗口中开启）
+        self.cprofile_loads = False
+
+        # 设置了环境变量 ROUTECONF_DAEMON 时作为守护进程的客户端读取路由和接口，
+        # 与其他客户端共用一份缓存；守护进程不可用时改为直接读取
+        self._daemon = None
+        if os.environ.get('ROUTECONF_DAEMON'):
+            from route_daemon import client_from_env
+            self._daemon = client_from_env()
+
+        # 主窗口即将显示，关闭启动画面
+        close_splash()
+
         # 如果没有管理员权限，提示用户
         if self.is_windows and not self.is_admin:
             self.show_admin_prompt()
             return
 
         self.setup_ui()
-        # 延迟异步加载路由数据，不阻塞UI启动
-        self.root.after(100, self._delayed_refresh_routes)
+        # 先显示上次保存的快照，再延迟异步加载实时的路由数据和接口列表
+        self._show_snapshot()
+        self.root.after(100, self._collect_startup_data)
+
+        # Linux下订阅内核路由变化，实时增量更新
+        if self.is_linux:
+            self._start_route_watcher()
 
     def _set_window_icon(self):
         """设置窗口图标"""
@@ -219,6 +292,12 @@ class RouteManager:
     
     def quit_program(self):
         """退出程序"""
+        self._stop_route_watcher()
+        self.set_history_recording(False)
+        if self._history is not None:
+            self._history.close()
+        self.collector.close()
+        self._log_sink.detach()
         self.root.quit()
         self.root.destroy()
         sys.exit(0)
@@ -250,9 +329,25 @@ class RouteManager:
         ttk.Button(button_frame, text="刷新", command=lambda: self.refresh_routes(force_refresh=True), style="Action.TButton").pack(side=tk.LEFT, padx=(0, 8))
         ttk.Button(button_frame, text="添加路由", command=self.add_route, style="Action.TButton").pack(side=tk.LEFT, padx=(0, 8))
         ttk.Button(button_frame, text="删除路由", command=self.delete_route, style="Action.TButton").pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(button_frame, text="批量应用", command=self.apply_routes_from_file, style="Action.TButton").pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(button_frame, text="导出路由", command=self.export_routes_to_file, style="Action.TButton").pack(side=tk.LEFT, padx=(0, 8))
         ttk.Button(button_frame, text="设备IP信息", command=self.show_ip_info, style="Action.TButton").pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(button_frame, text="路由历史", command=self.show_route_history, style="Action.TButton").pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(button_frame, text="性能", command=self.show_performance, style="Action.TButton").pack(side=tk.LEFT, padx=(0, 8))
         ttk.Button(button_frame, text="测试命令", command=self.test_route_command, style="Action.TButton").pack(side=tk.LEFT)
 
+        # 中间路由查询
+        lookup_frame = ttk.Frame(control_frame)
+        lookup_frame.grid(row=0, column=1)
+
+        ttk.Label(lookup_frame, text="查询目标IP：").pack(side=tk.LEFT, padx=(0, 8))
+        self.lookup_var = tk.StringVar()
+        lookup_entry = ttk.Entry(lookup_frame, textvariable=self.lookup_var, width=24)
+        lookup_entry.pack(side=tk.LEFT, padx=(0, 8))
+        lookup_entry.bind('<Return>', lambda e: self.lookup_route())
+        ttk.Button(lookup_frame, text="查询", command=self.lookup_route).pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(lookup_frame, text="批量查询", command=self.lookup_routes_from_file).pack(side=tk.LEFT)
+
         # 右侧IPv版本选择
         version_frame = ttk.Frame(control_frame)
         version_frame.grid(row=0, column=2, sticky=tk.E)
@@ -262,9 +357,9 @@ class RouteManager:
         self.version_var = tk.StringVar(value="IPv4")
 
         ttk.Radiobutton(version_frame, text="IPv4", variable=self.version_var, value="IPv4",
-                       command=lambda: self.refresh_routes(force_refresh=True)).pack(side=tk.LEFT, padx=(0, 15))
+                       command=self.switch_version).pack(side=tk.LEFT, padx=(0, 15))
         ttk.Radiobutton(version_frame, text="IPv6", variable=self.version_var, value="IPv6",
-                       command=lambda: self.refresh_routes(force_refresh=True)).pack(side=tk.LEFT)
+                       command=self.switch_version).pack(side=tk.LEFT)
 
         # 创建路由显示区域 - 使用上下两个独立区域
         routes_container = ttk.Frame(main_frame)
@@ -288,18 +383,17 @@ class RouteManager:
         persistent_label_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(8, 0))
 
         # 活动路由表格
-        active_columns = ("目标网络", "子网掩码/前缀长度", "网关", "接口", "跃点数")
-        self.active_tree = ttk.Treeview(active_label_frame, columns=active_columns, show='headings', height=12)
+        self.active_columns = ("目标网络", "子网掩码/前缀长度", "网关", "接口", "跃点数")
+        self.active_tree = ttk.Treeview(active_label_frame, columns=self.active_columns, show='headings', height=12)
 
         # 设置活动路由列标题和宽度
-        column_widths = {"目标网络": 220, "子网掩码/前缀长度": 150, "网关": 200, "接口": 120, "跃点数": 80}
-        for col in active_columns:
-            self.active_tree.heading(col, text=col, anchor=tk.W)
-            self.active_tree.column(col, width=column_widths.get(col, 120), minwidth=60)
+        self.active_column_widths = {"目标网络": 220, "子网掩码/前缀长度": 150, "网关": 200, "接口": 120, "跃点数": 80}
+        self._update_active_columns_headers()
 
         # 活动路由滚动条
         active_scrollbar = ttk.Scrollbar(active_label_frame, orient=tk.VERTICAL, command=self.active_tree.yview)
         self.active_tree.configure(yscrollcommand=active_scrollbar.set)
+        self.active_scrollbar = active_scrollbar
 
         self.active_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         active_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S), padx=(5, 0))
@@ -320,12 +414,13 @@ class RouteManager:
         self.persistent_tree = ttk.Treeview(persistent_label_frame, columns=self.persistent_columns_ipv4, show='headings', height=6)
 
         # 设置持久路由列标题和宽度
-        persistent_widths = {"目标网络": 240, "子网掩码": 130, "前缀长度": 100, "网关地址": 220, "跃点数": 80}
-        self._update_persistent_columns_headers("IPv4", persistent_widths)
+        self.persistent_widths = {"目标网络": 240, "子网掩码": 130, "前缀长度": 100, "网关地址": 220, "跃点数": 80}
+        self._update_persistent_columns_headers("IPv4", self.persistent_widths)
 
         # 持久路由滚动条
         persistent_scrollbar = ttk.Scrollbar(persistent_label_frame, orient=tk.VERTICAL, command=self.persistent_tree.yview)
         self.persistent_tree.configure(yscrollcommand=persistent_scrollbar.set)
+        self.persistent_scrollbar = persistent_scrollbar
 
         self.persistent_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         persistent_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S), padx=(5, 0))
@@ -355,6 +450,7 @@ class RouteManager:
 
         self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E))
         log_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S), padx=(5, 0))
+        self._log_sink.attach(self.log_text)
 
         # 状态栏
         self.status_var = tk.StringVar()
@@ -370,6 +466,50 @@ class RouteManager:
         status_bar = ttk.Label(status_frame, textvariable=self.status_var, style="Status.TLabel", relief=tk.SOLID, background="#e9ecef")
         status_bar.pack(fill=tk.X)
 
+    def _update_active_columns_headers(self):
+        """设置活动路由表格的列标题和宽度"""
+        for col in self.active_columns:
+            self.active_tree.heading(col, text=col, anchor=tk.W)
+            self.active_tree.column(col, width=self.active_column_widths.get(col, 120), minwidth=60)
+
+    def _set_virtual_mode(self, enabled):
+        """切换路由表格的虚拟滚动模式
+
+        大路由表（如完整的互联网路由表）下，ttk.Treeview为每一行创建条目，
+        内存占用和插入耗时都很高；虚拟模式下只为可见行创建条目。
+        """
+        if enabled == self._virtual_mode:
+            return
+
+        self._virtual_mode = enabled
+        tree_class = VirtualTreeview if enabled else ttk.Treeview
+        self.log(f"路由表格切换为{'虚拟滚动' if enabled else '普通'}模式")
+
+        # 重建活动路由表格
+        parent = self.active_tree.master
+        self.active_tree.destroy()
+        self.active_tree = tree_class(parent, columns=self.active_columns, show='headings', height=12)
+        self._update_active_columns_headers()
+        self._attach_route_tree(self.active_tree, self.active_scrollbar, self.show_active_context_menu)
+
+        # 重建持久路由表格
+        parent = self.persistent_tree.master
+        self.persistent_tree.destroy()
+        self.persistent_tree = tree_class(parent, columns=self.persistent_columns_ipv4, show='headings', height=6)
+        self._update_persistent_columns_headers(self.version_var.get(), self.persistent_widths)
+        self._attach_route_tree(self.persistent_tree, self.persistent_scrollbar, self.show_persistent_context_menu)
+
+        # 新表格为空，清空快照以便完整填充
+        self._active_rows = {}
+        self._persistent_rows = {}
+
+    def _attach_route_tree(self, tree, scrollbar, context_menu_handler):
+        """将路由表格与滚动条、右键菜单关联并放入布局"""
+        scrollbar.configure(command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        tree.bind("<Button-3>", context_menu_handler)
+
     def _update_persistent_columns_headers(self, version, widths=None):
         """更新持久路由表格的列标题"""
         if version == "IPv4":
@@ -393,46 +533,20 @@ class RouteManager:
                     self.persistent_tree.column(col, width=100)
 
     def log(self, message):
-        """添加日志消息"""
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
-        self.root.update()
+        """添加日志消息；任何线程都可以调用，不阻塞、不触发界面重绘"""
+        self._log_sink.write(message)
         logger.info(message)
 
-    def get_routes(self):
-        """获取系统路由表"""
+    def get_routes(self, max_age=0, progress=None, version=None):
+        """获取系统路由表；max_age 秒内执行过的 route print 可直接复用
+
+        progress: 可选回调，命令输出边到达边解析时以逐步增加的路由表调用
+        version: 协议版本，默认为当前选择的版本
+        """
         self.log("正在获取路由表...")
         try:
-            version = self.version_var.get()
-
-            if self.is_windows:
-                if version == "IPv4":
-                    self.log("执行命令: route print")
-                    result = subprocess.run(['route', 'print'],
-                                         capture_output=True,
-                                         text=True,
-                                         shell=True,
-                                         timeout=10,
-                                         encoding='utf-8',
-                                         errors='ignore')
-                    if result.returncode != 0:
-                        raise Exception(f"执行route命令失败: {result.stderr}")
-                    routes = self.parse_windows_routes(result.stdout)
-                else:
-                    self.log("执行命令: route print (获取IPv6)")
-                    result = subprocess.run(['route', 'print'],
-                                         capture_output=True,
-                                         text=True,
-                                         shell=True,
-                                         timeout=10,
-                                         encoding='utf-8',
-                                         errors='ignore')
-                    if result.returncode != 0:
-                        raise Exception(f"执行route命令失败: {result.stderr}")
-                    routes = self.parse_windows_routes_ipv6(result.stdout)
-            else:
-                # Linux/Mac支持
-                pass
+            version = version or self.version_var.get()
+            routes = self._read_system_routes(version, max_age=max_age, progress=progress)
 
             self.log(f"获取到 {len(routes)} 条路由")
             return routes
@@ -442,161 +556,32 @@ class RouteManager:
             messagebox.showerror("错误", f"获取路由表失败: {str(e)}")
             return []
 
+    def _read_system_routes(self, version, max_age=0, progress=None):
+        """读取系统路由表：连接了守护进程时从其缓存读取，失败时直接读取"""
+        if self._daemon is not None:
+            from route_daemon import DaemonError
+            try:
+                return self._daemon.routes(version)
+            except DaemonError as e:
+                self.log(f"守护进程不可用，直接读取路由表: {e}")
+        return get_system_routes(version, log=self.log, max_age=max_age, progress=progress)
+
     def parse_windows_routes(self, output):
         """解析Windows路由表输出，包括持久路由"""
-        routes = []
-        lines = output.split('\n')
-        in_active_routes = False
-        in_persistent_routes = False
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith("Active Routes:"):
-                in_active_routes = True
-                in_persistent_routes = False
-                continue
-            elif line.startswith("Persistent Routes:"):
-                in_active_routes = False
-                in_persistent_routes = True
-                continue
-            elif (line.startswith("Interface List") and in_active_routes):
-                # 只有在路由解析过程中遇到Interface List才退出
-                in_active_routes = False
-                in_persistent_routes = False
-                break
-
-            # 处理活动路由和持久路由
-            if (in_active_routes or in_persistent_routes) and line and not line.startswith("Network") and not line.startswith("Network Address"):
-                parts = re.split(r'\s+', line)
-
-                # 添加更严格的验证，确保这是有效的路由条目
-                if in_persistent_routes:
-                    # 持久路由的格式可能不同
-                    if len(parts) >= 4 and self._is_valid_ip_address(parts[0]) and parts[0] != "Network":
-                        destination = parts[0]
-                        netmask = parts[1]
-                        gateway = parts[2]
-                        metric = parts[3]
-                        # 持久路由可能没有interface信息，设为空
-                        interface = ""
-
-                        routes.append({
-                            'destination': destination,
-                            'netmask': netmask,
-                            'gateway': gateway,
-                            'interface': interface,
-                            'metric': metric,
-                            'persistent': True
-                        })
-                else:
-                    # 活动路由的标准格式
-                    if len(parts) >= 5 and self._is_valid_ip_address(parts[0]) and parts[0] != "Network":
-                        destination = parts[0]
-                        netmask = parts[1]
-                        gateway = parts[2]
-                        interface = parts[3]
-                        metric = parts[4]
-
-                        routes.append({
-                            'destination': destination,
-                            'netmask': netmask,
-                            'gateway': gateway,
-                            'interface': interface,
-                            'metric': metric,
-                            'persistent': False
-                        })
-
-        return routes
+        import windows_routes
+        return windows_routes.parse_windows_routes(output)
 
     def _is_valid_ip_address(self, address):
         """验证是否为有效的IP地址或网络地址"""
-        try:
-            # 检查是否为On-link（这是有效的网关值）
-            if address == "On-link":
-                return True
-
-            # 检查是否为有效的IPv4地址或网络
-            if '.' in address:
-                # IPv4地址验证
-                parts = address.split('.')
-                if len(parts) == 4:
-                    for part in parts:
-                        if not part.isdigit() or int(part) < 0 or int(part) > 255:
-                            return False
-                    return True
-                elif len(parts) <= 4:  # 可能是简化的网络地址
-                    for part in parts:
-                        if not part.isdigit() or int(part) < 0 or int(part) > 255:
-                            return False
-                    return True
-
-            return False
-        except:
-            return False
+        import windows_routes
+        return windows_routes.is_valid_ip_address(address)
 
     def parse_windows_routes_ipv6(self, output):
         """解析Windows IPv6路由表输出，包括持久路由"""
-        routes = []
-        lines = output.split('\n')
-        in_ipv6_active = False
-        in_ipv6_persistent = False
-
-        for line in lines:
-            line = line.strip()
-            if 'IPv6 Route Table' in line:
-                in_ipv6_active = True
-                in_ipv6_persistent = False
-                continue
-            elif in_ipv6_active and ('Persistent Routes:' in line):
-                in_ipv6_active = False
-                in_ipv6_persistent = True
-                continue
-            elif (in_ipv6_active or in_ipv6_persistent) and (line.startswith('Interface List') or line.startswith('IPv4 Route Table')):
-                break
-
-            if (in_ipv6_active or in_ipv6_persistent) and line and not line.startswith('If') and not line.startswith('Network Destination'):
-                parts = [part for part in re.split(r'\s+', line) if part]
-
-                if len(parts) >= 3:
-                    interface_num = parts[0] if parts[0] else ''
-
-                    metric = ''
-                    for i, part in enumerate(parts[1:], 1):
-                        if part.isdigit():
-                            metric = part
-                            network_parts = parts[i+1:]
-                            break
-                    else:
-                        network_parts = parts[1:]
-                        metric = ''
+        import windows_routes
+        return windows_routes.parse_windows_routes_ipv6(output)
 
-                    if network_parts:
-                        destination = network_parts[0]
-                        gateway = network_parts[1] if len(network_parts) > 1 else 'On-link'
-                    else:
-                        destination = ''
-                        gateway = 'On-link'
-
-                    prefix_length = ''
-                    if '/' in destination:
-                        try:
-                            prefix_length = destination.split('/')[1]
-                        except:
-                            prefix_length = ''
-
-                    if destination:
-                        routes.append({
-                            'destination': destination,
-                            'netmask': prefix_length,
-                            'gateway': gateway,
-                            'interface': interface_num,
-                            'metric': metric,
-                            'persistent': in_ipv6_persistent
-                        })
-
-        return routes
-
-    def _delayed_refresh_routes(self):
+    def _delayed_refresh_routes(self, max_age=0):
         """延迟异步刷新路由表，不阻塞UI启动"""
         if self._is_loading_routes:
             return  # 避免重复加载
@@ -606,112 +591,484 @@ class RouteManager:
         self.log("开始异步加载路由数据...")
 
         # 启动后台线程加载路由
-        threading.Thread(target=self._load_routes_async, daemon=True).start()
+        version = self.version_var.get()
+        threading.Thread(target=self._load_routes_async, args=(version, max_age), daemon=True).start()
+
+    def _collect_startup_data(self):
+        """启动时同时加载路由表和接口列表，总耗时取决于较慢的一项
+
+        Windows下两者共用同一次 route print：先执行的一方运行命令，另一方复用解析结果。
+        """
+        if self._is_loading_routes:
+            return
+
+        self._is_loading_routes = True
+        self.status_var.set("正在加载路由信息...")
+        self.log("开始异步加载路由数据和接口信息...")
+        version = self.version_var.get()
+
+        probes = [
+            Probe('routes', func=lambda: self._load_routes_async(version, self._routes_cache_duration)),
+            Probe('interfaces', func=self.get_network_interfaces)
+        ]
+        self.collector.submit(probes, lambda results: self.root.after(0, self._on_startup_collected, results))
 
-    def _load_routes_async(self):
-        """异步加载路由数据"""
+    def _show_snapshot(self):
+        """启动时显示磁盘快照中的路由，并作为过期缓存预置，实时数据读取完成后替换"""
         try:
-            # 检查缓存是否有效
-            current_time = time.time()
-            if (self._routes_cache is not None and
-                current_time - self._routes_cache_time < self._routes_cache_duration):
-                self.log("使用缓存的路由数据")
-                self.root.after(0, self._update_routes_display, self._routes_cache)
-                return
+            snapshot = load_snapshot(self._snapshot_path)
+        except (OSError, SnapshotError) as e:
+            self.log(f"读取路由快照失败: {e}")
+            return
+        if snapshot is None or not snapshot.matches_host():
+            return
+
+        for version, routes in snapshot.routes.items():
+            self._route_cache.seed(route_cache_key(version), routes)
+        if snapshot.interfaces and self._interfaces_cache is None:
+            # 接口缓存已过期，只在实时读取失败时使用
+            self._interfaces_cache = snapshot.interfaces
+            self._interfaces_cache_time = 0
+
+        saved_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot.saved_at))
+        self.log(f"显示 {saved_at} 保存的路由快照，正在后台读取实时数据")
+        routes = snapshot.routes.get(self.version_var.get())
+        if routes is not None:
+            self._update_routes_display(routes, self.version_var.get(), revalidating=True)
+            # 实时数据由随后的 _collect_startup_data 加载
+            self._is_loading_routes = False
+            self.status_var.set(f"显示 {saved_at} 的路由快照，正在获取实时路由信息...")
+
+    def _save_snapshot(self):
+        """把缓存的路由（各协议版本）和接口列表保存到磁盘快照（后台线程中调用）"""
+        routes = {key[0]: value for key, value in self._route_cache.items()
+                  if key == route_cache_key(key[0])}
+        interfaces = self._interfaces_cache
+        try:
+            with self._snapshot_lock, PROFILER.span(STAGE_SNAPSHOT, sum(map(len, routes.values()))):
+                save_snapshot(self._snapshot_path, routes, interfaces)
+        except (OSError, ValueError) as e:
+            self.log(f"保存路由快照失败: {e}")
+
+    def _on_startup_collected(self, results):
+        """启动探测全部结束（主线程中执行）；路由由 _load_routes_async 自行显示"""
+        for name, result in results.items():
+            if isinstance(result, Exception):
+                self.log(f"启动探测 {name} 失败: {result}")
+
+    def _load_routes_async(self, version, max_age=0):
+        """异步加载路由数据（后台线程中执行），记录总耗时；开启 cProfile 时在分析器中运行"""
+        with PROFILER.span(STAGE_LOAD):
+            if self.cprofile_loads:
+                PROFILER.run_cprofile(self._load_routes, version, max_age)
+            else:
+                self._load_routes(version, max_age)
+
+    def _load_routes(self, version, max_age=0):
+        """加载路由数据
+
+        缓存新鲜时直接显示；缓存过期时先显示缓存数据，同时重新读取，读取完成后再更新表格。
+        """
+        key = route_cache_key(version)
+        try:
+            with PROFILER.span(STAGE_CACHE):
+                cached, fresh = self._route_cache.get(key)
+            if cached is not None:
+                self.root.after(0, self._update_routes_display, cached, version, not fresh)
+                if fresh:
+                    self.log("使用缓存的路由数据")
+                    return
+                self.log("先显示缓存的路由数据，后台重新加载")
 
             # 更新状态显示加载进度
             self.root.after(0, lambda: self.status_var.set("正在获取系统路由信息..."))
 
-            # 获取路由数据
-            routes = self.get_routes()
-
-            # 更新状态显示解析进度
-            self.root.after(0, lambda: self.status_var.set("正在解析路由数据..."))
+            # 获取路由数据；已解析的路由分批交给主线程，大路由表不必等命令结束才显示
+            # （已显示缓存数据时不逐批显示，避免新旧数据混在一起）
+            shown = [0]
+
+            def progress(partial_routes):
+                count = len(partial_routes)
+                if count > shown[0]:
+                    self.root.after(0, self._show_partial_routes, partial_routes, shown[0], count, version)
+                    shown[0] = count
+
+            # 直接读取而不经过 get_routes：读取失败时抛出异常，不把空结果写入缓存，
+            # 缓存中的数据保持过期状态，已显示的数据也不清空
+            token = self._route_cache.begin(key)
+            self.log("正在获取路由表...")
+            routes = self._read_system_routes(version, max_age=max_age,
+                                              progress=progress if cached is None else None)
+            self.log(f"获取到 {len(routes)} 条路由")
 
-            # 更新缓存
-            self._routes_cache = routes
-            self._routes_cache_time = current_time
+            # 更新缓存；读取期间路由被修改过时结果不新鲜，下次显示时会再次读取
+            self._route_cache.put(key, routes, token)
 
             # 在主线程中更新UI
-            self.root.after(0, self._update_routes_display, routes)
+            self.root.after(0, self._update_routes_display, routes, version)
+
+            # 保存快照，下次启动时先显示
+            if routes:
+                self._save_snapshot()
 
         except Exception as e:
             logger.error(f"异步加载路由失败: {e}")
             self.root.after(0, self._show_load_error, str(e))
 
-    def _update_routes_display(self, routes):
-        """更新路由显示（主线程中执行）"""
+    def _update_routes_display(self, routes, version=None, revalidating=False):
+        """更新路由显示（主线程中执行）
+
+        与上一次显示的快照比较，只插入、更新或删除发生变化的行，
+        已选中的行和滚动位置在刷新后保持不变。
+        version: 路由所属的协议版本，与当前选择的版本不同时（加载期间切换了版本）不显示；
+        revalidating: 显示的是过期的缓存数据，后台仍在重新加载。
+        """
         try:
-            self._is_loading_routes = False
-            self.status_var.set("就绪")
+            self._is_loading_routes = revalidating
+            if version is not None and version != self.version_var.get():
+                # 加载期间切换了协议版本，结果已进入缓存；加载当前选择的版本
+                if not revalidating:
+                    self.switch_version()
+                return
+
+            if revalidating:
+                self.status_var.set("正在后台更新路由信息...")
+            else:
+                self.status_var.set("就绪")
             self.log(f"路由数据加载完成，共 {len(routes)} 条路由")
 
-            # 清除现有条目
-            for item in self.active_tree.get_children():
-                self.active_tree.delete(item)
-            for item in self.persistent_tree.get_children():
-                self.persistent_tree.delete(item)
+            # 大路由表使用虚拟滚动表格
+            self._set_virtual_mode(len(routes) > self.VIRTUAL_TABLE_THRESHOLD)
 
             # 更新持久路由列标题
             version = self.version_var.get()
             self._update_persistent_columns_headers(version)
 
-            # 分离活动路由和持久路由
-            active_routes = []
-            persistent_routes = []
+            # 只有订阅了路由变化时才需要按标识索引的实时路由表
+            if self._route_watcher is not None:
+                self._live_routes = {route_key(route): route for route in routes}
 
-            for route in routes:
-                if route.get('persistent', False):
-                    persistent_routes.append(route)
-                else:
-                    active_routes.append(route)
-
-            # 显示活动路由
-            for route in active_routes:
-                if version == "IPv4":
-                    values = (
-                        route.get('destination', ''),
-                        route.get('netmask', ''),
-                        route.get('gateway', ''),
-                        route.get('interface', ''),
-                        route.get('metric', '')
-                    )
-                else:  # IPv6
-                    values = (
-                        route.get('destination', ''),
-                        route.get('netmask', ''),
-                        route.get('gateway', ''),
-                        route.get('interface', ''),
-                        route.get('metric', '')
-                    )
-                self.active_tree.insert('', tk.END, values=values)
-
-            # 显示持久路由
-            for route in persistent_routes:
-                if version == "IPv4":
-                    values = (
-                        route.get('destination', ''),
-                        route.get('netmask', ''),
-                        route.get('gateway', ''),
-                        route.get('interface', ''),
-                        route.get('metric', '')
-                    )
-                else:  # IPv6
-                    values = (
-                        route.get('destination', ''),
-                        route.get('netmask', ''),
-                        route.get('gateway', ''),
-                        route.get('interface', ''),
-                        route.get('metric', '')
-                    )
-                self.persistent_tree.insert('', tk.END, values=values)
-
-            self.log(f"显示 {len(active_routes)} 条活动路由，{len(persistent_routes)} 条持久路由")
+            # 路由查询索引在下次查询时重建
+            self._displayed_routes = routes
+            self._displayed_version = self.version_var.get()
+            self._partial_rows = None
+            self._route_lookup = None
+
+            if self._virtual_mode:
+                with PROFILER.span(STAGE_RENDER, len(routes)):
+                    active_count, persistent_count = self._fill_virtual_trees(routes)
+                self.log(f"显示 {active_count} 条活动路由，{persistent_count} 条持久路由")
+            else:
+                with PROFILER.span(STAGE_RENDER, len(routes)):
+                    # 分离活动路由和持久路由，按路由标识建立新快照
+                    active_rows = {}
+                    persistent_rows = {}
+                    for route in routes:
+                        if route.get('persistent', False):
+                            persistent_rows[route_iid(route)] = self._route_values(route)
+                        else:
+                            active_rows[route_iid(route)] = self._route_values(route)
+
+                    active_changes = self._sync_tree_rows(self.active_tree, self._active_rows, active_rows)
+                    persistent_changes = self._sync_tree_rows(self.persistent_tree, self._persistent_rows,
+                                                              persistent_rows)
+                self._active_rows = active_rows
+                self._persistent_rows = persistent_rows
+
+                self.log(f"显示 {len(active_rows)} 条活动路由，{len(persistent_rows)} 条持久路由")
+                added, updated, removed = (a + b for a, b in zip(active_changes, persistent_changes))
+                self.log(f"表格变化: 新增 {added} 条，更新 {updated} 条，删除 {removed} 条")
+
+            # 应用加载期间收到的路由变化
+            if self._pending_route_events:
+                pending_events = self._pending_route_events
+                self._pending_route_events = []
+                self._apply_route_events(pending_events)
 
         except Exception as e:
             self.log(f"更新路由显示失败: {str(e)}")
             self.status_var.set("更新路由显示失败")
 
+    def _fill_virtual_trees(self, routes):
+        """虚拟滚动模式下直接以RouteTable为数据源，显示时才生成可见行的字段"""
+        if not isinstance(routes, RouteTable):
+            routes = RouteTable(routes)
+
+        return [self._set_virtual_source(tree, routes, routes.rows_where(persistent))
+                for tree, persistent in ((self.active_tree, False), (self.persistent_tree, True))]
+
+    def _set_virtual_source(self, tree, routes, rows):
+        """以 routes 中 rows 所列的行作为虚拟表格的数据源，返回行数"""
+        tree.set_source(len(rows),
+                        lambda i: route_iid(routes[rows[i]]),
+                        lambda i: self._route_values(routes[rows[i]]))
+
+        # 虚拟表格不使用行快照
+        self._active_rows = None
+        self._persistent_rows = None
+        return len(rows)
+
+    def _show_partial_routes(self, routes, start, stop, version=None):
+        """显示流式解析中已得到的第 start 到 stop 行路由（主线程中执行）
+
+        只追加和更新行，不删除；加载完成后 _update_routes_display 按完整结果同步表格。
+        """
+        if not self._is_loading_routes or (version is not None and version != self.version_var.get()):
+            return
+
+        try:
+            with PROFILER.span(STAGE_RENDER, stop - start):
+                version = self.version_var.get()
+                if start == 0:
+                    self._update_persistent_columns_headers(version)
+                    self._partial_rows = None
+                if stop > self.VIRTUAL_TABLE_THRESHOLD and not self._virtual_mode:
+                    # 已确定是大路由表，改用虚拟表格从头显示
+                    self._set_virtual_mode(True)
+                    self._partial_rows = None
+
+                if self._virtual_mode:
+                    if self._partial_rows is None:
+                        self._partial_rows = (routes.rows_where(False, 0, stop), routes.rows_where(True, 0, stop))
+                    else:
+                        self._partial_rows[0].extend(routes.rows_where(False, start, stop))
+                        self._partial_rows[1].extend(routes.rows_where(True, start, stop))
+                    self._set_virtual_source(self.active_tree, routes, self._partial_rows[0])
+                    self._set_virtual_source(self.persistent_tree, routes, self._partial_rows[1])
+                else:
+                    if start == 0 and self._displayed_version != version:
+                        # 表格中是另一协议版本的路由，先清空
+                        self._sync_tree_rows(self.active_tree, self._active_rows, {})
+                        self._sync_tree_rows(self.persistent_tree, self._persistent_rows, {})
+                        self._active_rows = {}
+                        self._persistent_rows = {}
+                        self._displayed_version = version
+
+                    for tree, rows, persistent in ((self.active_tree, self._active_rows, False),
+                                                   (self.persistent_tree, self._persistent_rows, True)):
+                        for index in routes.rows_where(persistent, start, stop):
+                            route = routes[index]
+                            iid = route_iid(route)
+                            values = self._route_values(route)
+                            if iid not in rows:
+                                tree.insert('', tk.END, iid=iid, values=values)
+                            elif rows[iid] != values:
+                                tree.item(iid, values=values)
+                            rows[iid] = values
+
+            self.status_var.set(f"正在加载路由信息... 已解析 {stop} 条")
+
+        except Exception as e:
+            logger.error(f"显示部分路由失败: {e}")
+
+    def _sync_tree_rows(self, tree, old_rows, new_rows):
+        """按快照差异增量更新表格，返回 (新增, 更新, 删除) 行数"""
+        added, updated, removed = diff_rows(old_rows, new_rows)
+
+        # 记录滚动位置，选中状态随稳定的行标识自动保留
+        first_visible = tree.yview()[0]
+
+        if removed:
+            tree.delete(*removed)
+
+        for iid in updated:
+            tree.item(iid, values=new_rows[iid])
+
+        if added:
+            # 按新快照中的顺序插入到对应位置
+            added_set = set(added)
+            for index, iid in enumerate(new_rows):
+                if iid in added_set:
+                    tree.insert('', index, iid=iid, values=new_rows[iid])
+
+        tree.yview_moveto(first_visible)
+        return len(added), len(updated), len(removed)
+
+    def _start_route_watcher(self):
+        """启动netlink路由监视线程"""
+        import netlink
+
+        try:
+            self._route_watcher = netlink.RouteWatcher(self._on_route_events).start()
+            self.log("已订阅内核路由变化通知，路由表将实时更新")
+        except OSError as e:
+            self._route_watcher = None
+            self.log(f"无法订阅路由变化通知，需手动刷新: {e}")
+
+    def _stop_route_watcher(self):
+        """停止netlink路由监视线程"""
+        if self._route_watcher is not None:
+            self._route_watcher.stop()
+            self._route_watcher = None
+
+    def _on_route_events(self, events):
+        """监视线程回调：切换到主线程应用增量事件"""
+        self.root.after(0, self._apply_route_events, events)
+        # 路由变化后尽快记录路由历史
+        if self._history_recorder is not None:
+            self._history_recorder.trigger()
+
+    def _apply_route_events(self, events):
+        """将路由增量事件应用到实时路由表和表格（主线程中执行）"""
+        if self._is_loading_routes:
+            # 完整加载进行中，暂存事件，加载完成后再应用（增删操作均为幂等）
+            self._pending_route_events.extend(events)
+            return
+
+        version = self.version_var.get()
+        added = 0
+        removed = 0
+
+        for action, data in events:
+            if action == 'resync':
+                self.log("路由变化事件丢失，重新加载路由表")
+                self.refresh_routes(force_refresh=True)
+                return
+
+            if action in ('link', 'link_delete', 'addr', 'addr_delete'):
+                # 接口或地址变化，接口缓存失效
+                self._interfaces_cache = None
+                continue
+
+            # 路由变化使该协议版本的缓存过期（当前表格由增量事件保持最新）
+            self._route_cache.invalidate(version=route_version(data))
+            if route_version(data) != version:
+                continue
+
+            key = route_key(data)
+            iid = route_iid(data)
+            if data.get('persistent', False):
+                tree, rows = self.persistent_tree, self._persistent_rows
+            else:
+                tree, rows = self.active_tree, self._active_rows
+
+            # 虚拟滚动模式下没有行快照，直接查询表格
+            if action == 'add':
+                self._live_routes[key] = data
+                values = self._route_values(data)
+                if (iid in rows) if rows is not None else tree.exists(iid):
+                    tree.item(iid, values=values)
+                else:
+                    tree.insert('', tk.END, iid=iid, values=values)
+                if rows is not None:
+                    rows[iid] = values
+                added += 1
+            elif action == 'delete':
+                if self._live_routes.pop(key, None) is not None:
+                    removed += 1
+                if (rows.pop(iid, None) is not None) if rows is not None else tree.exists(iid):
+                    tree.delete(iid)
+
+        if added or removed:
+            # 表格内容由增量事件保持最新
+            self._route_lookup = None
+            self.status_var.set(f"路由表已实时更新: 新增/更新 {added} 条，删除 {removed} 条，共 {len(self._live_routes)} 条")
+            logger.debug(f"应用路由增量事件: +{added} -{removed}")
+
+    def _get_route_lookup(self):
+        """返回当前显示路由的最长前缀匹配索引，路由变化后按需重建"""
+        if self._route_lookup is None:
+            if self._route_watcher is not None:
+                routes = self._live_routes.values()
+            else:
+                routes = self._displayed_routes or []
+            start_time = time.time()
+            self._route_lookup = RouteLookup(routes)
+            logger.debug(f"构建路由查询索引耗时: {time.time() - start_time:.3f}秒")
+        return self._route_lookup
+
+    def lookup_route(self):
+        """查询目标IP使用的路由，并在活动路由表格中选中该路由"""
+        address = self.lookup_var.get().strip()
+        if not address:
+            messagebox.showwarning("提示", "请输入要查询的目标IP地址")
+            return
+
+        try:
+            ipv6, _value = parse_address(address)
+        except ValueError as e:
+            messagebox.showerror("错误", str(e))
+            return
+
+        version = self.version_var.get()
+        if ("IPv6" if ipv6 else "IPv4") != version:
+            messagebox.showwarning("提示", f"当前显示的是{version}路由，请先切换协议版本后再查询 {address}")
+            return
+
+        route = self._get_route_lookup().lookup(address)
+        if route is None:
+            self.status_var.set(f"{address} 没有匹配的路由")
+            self.log(f"路由查询: {address} 没有匹配的路由")
+            return
+
+        iid = route_iid(route)
+        if self.active_tree.exists(iid):
+            self.active_tree.selection_set(iid)
+            self.active_tree.see(iid)
+
+        message = (f"{address} 匹配路由 {route.get('destination', '')} {route.get('netmask', '')}，"
+                   f"网关 {route.get('gateway', '')}，接口 {route.get('interface', '')}，"
+                   f"跃点数 {route.get('metric', '')}")
+        self.status_var.set(message)
+        self.log(f"路由查询: {message}")
+
+    def lookup_routes_from_file(self):
+        """从文本文件读取IP地址（每行一个）批量查询，结果保存为CSV文件"""
+        from tkinter import filedialog
+        import csv
+
+        source = filedialog.askopenfilename(
+            title="选择IP地址列表文件",
+            filetypes=[("文本文件", "*.txt *.csv"), ("所有文件", "*.*")]
+        )
+        if not source:
+            return
+
+        target = filedialog.asksaveasfilename(
+            title="保存查询结果",
+            defaultextension=".csv",
+            filetypes=[("CSV文件", "*.csv"), ("所有文件", "*.*")]
+        )
+        if not target:
+            return
+
+        try:
+            lookup = self._get_route_lookup()
+            total = 0
+            matched = 0
+            with open(target, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(RESULT_HEADER)
+                for address, route in lookup.lookup_many(read_addresses(source)):
+                    total += 1
+                    if route is not None:
+                        matched += 1
+                    writer.writerow(result_row(address, route))
+
+            self.log(f"批量路由查询完成: {total} 个地址，{matched} 个匹配，结果已保存到 {target}")
+            self.status_var.set(f"批量查询完成，结果已保存到: {target}")
+        except Exception as e:
+            self.log(f"批量路由查询失败: {str(e)}")
+            messagebox.showerror("错误", f"批量查询失败: {str(e)}")
+
+    def _route_values(self, route):
+        """构建路由在表格中的显示值"""
+        if route.get('persistent', False):
+            # 持久路由表格: 目标网络, 子网掩码/前缀长度, 网关地址, 跃点数
+            return (
+                route.get('destination', ''),
+                route.get('netmask', ''),
+                route.get('gateway', ''),
+                route.get('metric', '')
+            )
+        return (
+            route.get('destination', ''),
+            route.get('netmask', ''),
+            route.get('gateway', ''),
+            route.get('interface', ''),
+            route.get('metric', '')
+        )
+
     def _show_load_error(self, error_message):
         """显示加载错误（主线程中执行）"""
         self._is_loading_routes = False
@@ -725,15 +1082,44 @@ class RouteManager:
             self.log("路由正在加载中，请稍候...")
             return
 
-        # 如果是强制刷新，清除缓存
+        # 如果是强制刷新，使当前协议版本的缓存过期（重新加载期间仍显示原数据）
         if force_refresh:
-            self._routes_cache = None
-            self._routes_cache_time = 0
-            self.log("强制刷新路由数据，清除缓存")
+            self._route_cache.invalidate(version=self.version_var.get())
+            self.log("强制刷新路由数据，缓存已过期")
 
         # 使用异步加载
         self._delayed_refresh_routes()
 
+    def switch_version(self):
+        """切换协议版本：有缓存时立即显示，过期时在后台重新加载
+
+        Windows下重新加载复用最近一次 route print 的解析结果，不重新执行命令。
+        """
+        version = self.version_var.get()
+        if self._is_loading_routes:
+            # 正在加载另一协议版本：先显示缓存，加载结束后再加载当前版本
+            cached, _fresh = self._route_cache.get(route_cache_key(version))
+            if cached is not None:
+                self._update_routes_display(cached, version, revalidating=True)
+            return
+
+        self._delayed_refresh_routes(max_age=self._routes_cache_duration)
+
+    def _invalidate_routes(self, version=None):
+        """路由修改成功后，只使该协议版本（None 为全部版本）的缓存和共用的 route print 结果过期"""
+        self._route_cache.invalidate(version=version)
+        if self._history_recorder is not None:
+            self._history_recorder.trigger()
+        if self.is_windows:
+            import windows_routes
+            windows_routes.invalidate_route_print()
+        if self._daemon is not None:
+            from route_daemon import DaemonError
+            try:
+                self._daemon.invalidate(version)
+            except DaemonError as e:
+                self.log(f"通知守护进程失败: {e}")
+
     def test_route_command(self):
         """测试route命令"""
         self.log("=== 测试Route命令 ===")
@@ -778,6 +1164,16 @@ class RouteManager:
         except Exception as e:
             self.log(f"命令执行异常: {str(e)}")
 
+    def _read_system_interfaces(self):
+        """读取网络接口列表：连接了守护进程时从其缓存读取，失败时直接读取"""
+        if self._daemon is not None:
+            from route_daemon import DaemonError
+            try:
+                return self._daemon.interfaces()
+            except DaemonError as e:
+                self.log(f"守护进程不可用，直接读取接口列表: {e}")
+        return get_system_interfaces(log=self.log, max_age=self._interfaces_cache_duration)
+
     def get_network_interfaces(self, force_refresh=False):
         """获取系统网络接口列表（带缓存）"""
         current_time = time.time()
@@ -792,12 +1188,10 @@ class RouteManager:
         # 缓存失效或强制刷新，重新获取
         interfaces = []
         try:
-            if self.is_windows:
-                # 获取详细接口信息
-                interfaces = self._get_windows_interfaces()
-            else:
-                # Linux/Mac系统
-                interfaces = self._get_unix_interfaces()
+            with PROFILER.span(STAGE_INTERFACES) as span:
+                # Windows下与路由表共用 route print 的解析结果，Linux下通过netlink转储
+                interfaces = self._read_system_interfaces()
+                span.rows = len(interfaces)
 
             # 按接口编号排序
             interfaces.sort(key=lambda x: x['number'])
@@ -817,158 +1211,13 @@ class RouteManager:
 
         return interfaces
 
-    def _get_windows_interfaces(self):
-        """获取Windows系统的网络接口信息（优化版）"""
-        interfaces = []
-
-        try:
-            # 使用route print获取接口编号和基本信息
-            route_result = subprocess.run(['route', 'print'],
-                                       capture_output=True,
-                                       text=True,
-                                       shell=True,
-                                       timeout=5,  # 减少超时时间
-                                       encoding='utf-8',
-                                       errors='ignore')
-
-            if route_result.returncode == 0:
-                lines = route_result.stdout.split('\n')
-                in_interface_list = False
-
-                # 预编译正则表达式提高性能
-                mac_pattern = re.compile(r'([0-9A-Fa-f]{2}[-\s][0-9A-Fa-f]{2}[-\s][0-9A-Fa-f]{2}[-\s][0-9A-Fa-f]{2}[-\s][0-9A-Fa-f]{2}[-\s][0-9A-Fa-f]{2})')
-                ip_pattern = re.compile(r'(\d+\.\d+\.\d+\.\d+)')
-
-                for line in lines:
-                    line = line.strip()
-                    if 'Interface List' in line:
-                        in_interface_list = True
-                        continue
-                    elif in_interface_list and ('================================================================' in line or 'IPv4 Route Table' in line or 'IPv6 Route Table' in line):
-                        break
-
-                    if in_interface_list and line and ('....' in line or '...' in line):
-                        # 优化接口信息解析
-                        if '....' in line:
-                            parts = line.split('....', 1)  # 只分割第一个
-                        else:
-                            parts = line.split('...', 1)
-
-                        if len(parts) >= 2:
-                            interface_num = parts[0].strip()
-                            rest_part = parts[1].strip()
-
-                            # 提取真正的接口编号（去除MAC地址前缀）
-                            if '....' in interface_num:
-                                interface_num = interface_num.split('....')[0].strip()
-                            elif '...' in interface_num:
-                                interface_num = interface_num.split('...')[0].strip()
-
-                            # 提取接口名称
-                            interface_name = ''
-                            if '......' in rest_part:
-                                interface_name = rest_part.split('......')[-1].strip()
-                            else:
-                                interface_name = rest_part.strip()
-
-                            # 清理接口名称，移除MAC地址和其他特殊字符
-                            interface_name = interface_name.lstrip('.:').strip()
-                            interface_name = mac_pattern.sub('', interface_name).strip()
-
-                            # 简化IP地址获取 - 只从route print输出中提取
-                            ips = []
-                            for ip_line in lines:
-                                if interface_num in ip_line:
-                                    ip_match = ip_pattern.search(ip_line)
-                                    if ip_match:
-                                        ip = ip_match.group(1)
-                                        if ip not in ['127.0.0.1', '0.0.0.0', '255.255.255.255'] and ip not in ips:
-                                            ips.append(ip)
-                                            if len(ips) >= 2:  # 只取前2个IP
-                                                break
-
-                            # 构建显示名称
-                            if interface_name:
-                                display_name = interface_name
-                            else:
-                                display_name = f"接口 {interface_num}"
-
-                            if ips:
-                                display_name += f" ({', '.join(ips)})"
-
-                            interfaces.append({
-                                'number': interface_num,
-                                'name': interface_name if interface_name else f"接口 {interface_num}",
-                                'display': f"{interface_num} - {display_name}",
-                                'ips': ips,
-                                'mac': None
-                            })
-
-        except subprocess.TimeoutExpired:
-            self.log("获取接口信息超时")
-        except Exception as e:
-            self.log(f"获取Windows接口信息失败: {e}")
-
-        return interfaces
-
-  
-    def _get_unix_interfaces(self):
-        """获取Unix/Linux系统的网络接口信息"""
-        interfaces = []
-        try:
-            # 获取接口信息
-            result = subprocess.run(['ip', 'addr', 'show'], capture_output=True, text=True, shell=True, timeout=10)
-            if result.returncode == 0:
-                lines = result.stdout.split('\n')
-                current_interface = None
-
-                for line in lines:
-                    line = line.strip()
-                    if line and ':' in line and not line.startswith(' '):
-                        # 接口行: 2: eth0: <BROADCAST,MULTICAST,UP,LOWER_UP>
-                        parts = line.split(':', 2)
-                        if len(parts) >= 2:
-                            interface_num = parts[0].strip()
-                            interface_name = parts[1].strip()
-                            current_interface = {
-                                'number': interface_num,
-                                'name': interface_name,
-                                'ips': []
-                            }
-                            interfaces.append(current_interface)
-
-                    elif current_interface and 'inet ' in line:
-                        # IP地址行: inet 192.168.1.100/24 brd 192.168.1.255 scope global eth0
-                        ip_match = re.search(r'inet\s+(\d+\.\d+\.\d+\.\d+)', line)
-                        if ip_match:
-                            current_interface['ips'].append(ip_match.group(1))
-
-        except Exception as e:
-            self.log(f"获取Unix接口信息失败: {e}")
-
-        # 转换为统一格式
-        formatted_interfaces = []
-        for interface in interfaces:
-            display_name = interface['name']
-            if interface['ips']:
-                display_name += f" ({', '.join(interface['ips'][:2])})"
-
-            formatted_interfaces.append({
-                'number': interface['number'],
-                'name': interface['name'],
-                'display': f"{interface['number']} - {display_name}",
-                'ips': interface['ips'],
-                'mac': None
-            })
-
-        return formatted_interfaces
-
     def add_route(self):
         """添加新路由 - 修复版"""
         version = self.version_var.get()
         self.log(f"=== 开始添加{version}路由 ===")
 
-        # 创建路由对话框
+        # 创建路由对话框（对话框模块在第一次打开时才导入）
+        from route_dialogs import EnhancedRouteDialog
         dialog = EnhancedRouteDialog(self.root, f"添加{version}路由", version, self)
         self.log("路由对话框已创建")
 
@@ -995,30 +1244,7 @@ class RouteManager:
         # 构建命令
         try:
             if self.is_windows:
-                if version == "IPv4":
-                    cmd = f'route -4 add {route_data["destination"]} mask {route_data["netmask"]} {route_data["gateway"]}'
-                    # 添加持久路由参数
-                    if route_data.get('persistent', False):
-                        cmd += ' -p'
-                    # 添加接口参数
-                    if route_data.get('interface'):
-                        cmd += f' IF {route_data["interface"]}'
-                    if route_data.get('metric'):
-                        cmd += f' metric {route_data["metric"]}'
-                else:
-                    prefix_len = route_data.get("prefix_length", "64")
-                    if route_data.get('gateway') and route_data['gateway'] != 'On-link':
-                        cmd = f'route -6 add {route_data["destination"]}/{prefix_len} {route_data["gateway"]}'
-                    else:
-                        cmd = f'route -6 add {route_data["destination"]}/{prefix_len}'
-                    # 添加持久路由参数
-                    if route_data.get('persistent', False):
-                        cmd += ' -p'
-                    # 添加接口参数
-                    if route_data.get('interface'):
-                        cmd += f' IF {route_data["interface"]}'
-                    if route_data.get('metric'):
-                        cmd += f' metric {route_data["metric"]}'
+                cmd = build_add_command(route_data, version, windows=True)
 
                 self.log(f"准备执行命令: {cmd}")
 
@@ -1028,18 +1254,13 @@ class RouteManager:
                     return
 
                 # 执行命令
-                result = subprocess.run(cmd,
-                                      capture_output=True,
-                                      text=True,
-                                      shell=True,
-                                      timeout=10,
-                                      encoding='utf-8',
-                                      errors='ignore')
+                result = run_route_command(cmd, windows=True)
 
                 if result.returncode == 0:
                     self.log("命令执行成功!")
                     self.log(f"输出: {result.stdout}")
                     messagebox.showinfo("成功", "路由添加成功")
+                    self._invalidate_routes(version)
                     self.refresh_routes()
                 else:
                     self.log(f"命令执行失败! 返回码: {result.returncode}")
@@ -1079,153 +1300,149 @@ class RouteManager:
 
     def validate_route_data(self, route_data, version):
         """验证路由数据的有效性"""
-        if version == "IPv4":
-            try:
-                # 验证目标网络
-                dest = route_data.get("destination", "").strip()
-                if not dest:
-                    return "请输入目标网络地址"
+        return validate_route_data(route_data, version)
 
-                # 验证子网掩码
-                mask = route_data.get("netmask", "").strip()
-                if not mask:
-                    return "请输入子网掩码"
+    def analyze_route_error(self, stderr, cmd, version):
+        """分析路由错误并提供详细建议"""
+        return analyze_route_error(stderr, cmd, version)
 
-                try:
-                    ipaddress.ip_network(f"{dest}/{mask}", strict=False)
-                except ValueError as e:
-                    return f"目标网络或子网掩码格式不正确:\n{str(e)}"
-
-                # 验证网关地址
-                gateway = route_data.get("gateway", "").strip()
-                if gateway and gateway != "On-link":
-                    try:
-                        ipaddress.ip_address(gateway)
-                    except ValueError as e:
-                        return f"网关地址格式不正确:\n{str(e)}"
-
-                # 验证接口
-                interface = route_data.get("interface", "").strip()
-                if interface:
-                    if not interface.isdigit() or int(interface) < 1:
-                        return "接口编号必须是正整数"
-
-                # 验证跃点数
-                metric = route_data.get("metric", "").strip()
-                if metric:
-                    if not metric.isdigit() or int(metric) < 0:
-                        return "跃点数必须是非负整数"
+    def apply_routes_from_file(self):
+        """从路由列表文件批量应用路由：只提交与当前路由表不同的部分，结束后统一报告失败"""
+        from tkinter import filedialog
 
-            except Exception as e:
-                return f"数据验证过程中发生错误: {str(e)}"
+        filename = filedialog.askopenfilename(
+            title="选择路由列表文件",
+            filetypes=[("路由列表", "*.csv *.ndjson *.jsonl *.json *.rtab"), ("所有文件", "*.*")]
+        )
+        if not filename:
+            return
 
-        else:  # IPv6
-            try:
-                # 验证目标网络
-                dest = route_data.get("destination", "").strip()
-                if not dest:
-                    return "请输入目标网络地址"
+        self.log(f"=== 批量应用路由: {filename} ===")
+        self.status_var.set("正在读取路由列表并比较...")
+        thread = threading.Thread(target=self._plan_routes_async, args=(filename,), daemon=True)
+        thread.start()
+
+    def _plan_routes_async(self, filename):
+        """后台线程中读取路由列表并计算修改集，结果交回主线程确认"""
+        try:
+            # 逐条读取文件，由 apply_routes 去重后与当前路由表比较
+            preview, changes = apply_routes(iter_route_file(filename), dry_run=True)
+        except Exception as e:
+            self.root.after(0, self._show_plan_error, e)
+            return
+        self.root.after(0, self._confirm_apply_changes, preview, changes)
+
+    def _show_plan_error(self, error):
+        """显示读取路由列表失败（主线程中执行）"""
+        self.log(f"读取路由列表失败: {str(error)}")
+        self.status_var.set("读取路由列表失败")
+        messagebox.showerror("错误", f"读取路由列表失败: {str(error)}")
+
+    def _confirm_apply_changes(self, preview, changes):
+        """确认后在后台线程中提交修改（主线程中执行）"""
+        self.log(f"需要修改 {len(changes)} 处，{preview.skipped} 条无需修改")
+        if not changes:
+            self.status_var.set("路由表已与文件一致")
+            messagebox.showinfo("提示", "路由表已与文件一致，无需修改")
+            return
 
-                # 验证前缀长度
-                prefix_len = route_data.get("prefix_length", "").strip()
-                if not prefix_len:
-                    return "请输入前缀长度"
+        if not messagebox.askyesno("确认操作", f"将提交 {len(changes)} 处路由修改（{preview.skipped} 条无需修改），确定继续吗？"):
+            self.log("用户确认取消")
+            self.status_var.set("已取消批量应用")
+            return
 
-                if not prefix_len.isdigit() or not (0 <= int(prefix_len) <= 128):
-                    return "前缀长度必须是0-128之间的整数"
+        self.status_var.set(f"正在批量应用路由: 0/{len(changes)}")
+        thread = threading.Thread(target=self._apply_changes_async, args=(changes, preview.skipped), daemon=True)
+        thread.start()
 
-                try:
-                    ipaddress.ip_network(f"{dest}/{prefix_len}", strict=False)
-                except ValueError as e:
-                    return f"目标网络或前缀长度格式不正确:\n{str(e)}"
-
-                # 验证网关地址
-                gateway = route_data.get("gateway", "").strip()
-                if gateway and gateway != "On-link":
-                    try:
-                        ipaddress.ip_address(gateway)
-                    except ValueError as e:
-                        return f"网关地址格式不正确:\n{str(e)}"
-
-                # 验证接口
-                interface = route_data.get("interface", "").strip()
-                if interface:
-                    if not interface.isdigit() or int(interface) < 1:
-                        return "接口编号必须是正整数"
-
-                # 验证跃点数
-                metric = route_data.get("metric", "").strip()
-                if metric:
-                    if not metric.isdigit() or int(metric) < 0:
-                        return "跃点数必须是非负整数"
+    def export_routes_to_file(self):
+        """导出当前显示的路由表（CSV/NDJSON/JSON/二进制列式），在后台线程中逐行写出"""
+        from tkinter import filedialog
+        from route_io import RouteFileError, route_file_format
 
-            except Exception as e:
-                return f"数据验证过程中发生错误: {str(e)}"
+        if self._route_watcher is not None:
+            # 订阅了路由变化时显示的是实时更新后的路由，_displayed_routes 只是订阅开始时的快照
+            routes = list(self._live_routes.values())
+        else:
+            routes = self._displayed_routes
+        if not routes:
+            messagebox.showwarning("提示", "没有可导出的路由")
+            return
 
-        return None  # 验证通过
+        target = filedialog.asksaveasfilename(
+            title=f"导出{self._displayed_version or ''}路由",
+            defaultextension=".csv",
+            filetypes=[("CSV文件", "*.csv"), ("NDJSON文件", "*.ndjson *.jsonl"), ("JSON文件", "*.json"),
+                       ("二进制路由表", "*.rtab"), ("所有文件", "*.*")]
+        )
+        if not target:
+            return
 
-    def analyze_route_error(self, stderr, cmd, version):
-        """分析路由错误并提供详细建议"""
-        error_msg = f"路由添加失败:\n\n"
-        error_msg += f"执行的命令: {cmd}\n"
-        error_msg += f"错误信息: {stderr}\n\n"
-        error_msg += "可能的原因及解决方案:\n\n"
-
-        if "Element not found" in stderr:
-            error_msg += "❌ 网关地址不存在或不可达\n"
-            error_msg += "   解决方案:\n"
-            error_msg += "   1. 使用 'On-link' 作为网关\n"
-            error_msg += "   2. 点击'测试命令'检测可用网关\n"
-            error_msg += "   3. 使用系统中已存在的网关地址\n\n"
-
-        elif "access is denied" in stderr.lower() or "拒绝访问" in stderr:
-            error_msg += "❌ 权限不足\n"
-            error_msg += "   解决方案:\n"
-            error_msg += "   1. 右键点击命令提示符，选择'以管理员身份运行'\n"
-            error_msg += "   2. 在管理员命令提示符中运行程序\n\n"
-
-        elif "invalid parameter" in stderr.lower() or "参数无效" in stderr:
-            error_msg += "❌ 参数格式错误\n"
-            error_msg += "   解决方案:\n"
-            error_msg += "   1. 检查IP地址格式是否正确\n"
-            error_msg += "   2. 检查子网掩码或前缀长度\n"
-            error_msg += "   3. 确保所有参数都有值\n\n"
-
-        elif "already exists" in stderr.lower() or "已存在" in stderr:
-            error_msg += "❌ 路由已存在\n"
-            error_msg += "   解决方案:\n"
-            error_msg += "   1. 该路由已经存在，无需重复添加\n"
-            error_msg += "   2. 如需修改，请先删除现有路由\n\n"
+        try:
+            fmt = route_file_format(target)
+        except RouteFileError as e:
+            messagebox.showerror("错误", str(e))
+            return
 
-        else:
-            error_msg += "❌ 未知错误\n"
-            error_msg += "   通用解决方案:\n"
-            error_msg += "   1. 确保网络连接正常\n"
-            error_msg += "   2. 检查防火墙设置\n"
-            error_msg += "   3. 重启网络适配器\n\n"
+        self.status_var.set(f"正在导出 {len(routes)} 条路由...")
+        thread = threading.Thread(target=self._export_routes_async, args=(target, routes, fmt), daemon=True)
+        thread.start()
 
-        if version == "IPv4":
-            error_msg += "💡 IPv4路由建议:\n"
-            error_msg += "   - 目标网络: 如 192.168.100.0\n"
-            error_msg += "   - 子网掩码: 如 255.255.255.0\n"
-            error_msg += "   - 网关: IP地址或 'On-link'\n\n"
-        else:
-            error_msg += "💡 IPv6路由建议:\n"
-            error_msg += "   - 目标网络: 如 2001:db8::\n"
-            error_msg += "   - 前缀长度: 如 32, 64, 128\n"
-            error_msg += "   - 网关: IPv6地址或 'On-link'\n\n"
+    def _export_routes_async(self, target, routes, fmt):
+        """后台线程中导出路由"""
+        from route_io import export_routes
 
-        error_msg += "🔧 调试步骤:\n"
-        error_msg += "   1. 点击'测试命令'按钮测试基础功能\n"
-        error_msg += "   2. 查看日志区域的详细错误信息\n"
-        error_msg += "   3. 尝试在命令提示符中手动执行命令"
+        try:
+            count = export_routes(target, [routes], fmt)
+        except Exception as e:
+            logger.error(f"导出路由失败: {e}")
+            self.root.after(0, self.status_var.set, "导出路由失败")
+            self.root.after(0, messagebox.showerror, "错误", f"导出路由失败: {str(e)}")
+            return
+        self.log(f"已导出 {count} 条路由: {target}")
+        self.root.after(0, self.status_var.set, f"已导出 {count} 条路由到: {target}")
 
-        return error_msg
+    def _apply_changes_async(self, changes, skipped):
+        """后台线程中提交路由修改"""
+        def progress(done, total):
+            self.root.after(0, self.status_var.set, f"正在批量应用路由: {done}/{total}")
+
+        try:
+            result = apply_changes(changes, skipped, progress)
+            self.root.after(0, self._show_apply_result, result)
+        except Exception as e:
+            logger.error(f"批量应用路由失败: {e}")
+            self.root.after(0, self.status_var.set, "批量应用路由失败")
+            self.root.after(0, messagebox.showerror, "错误", f"批量应用路由失败: {str(e)}")
+
+    def _show_apply_result(self, result):
+        """汇总显示批量应用结果（主线程中执行）"""
+        summary = result.summary()
+        self.log(f"批量应用完成: {summary}")
+        for action, route, error in result.failures:
+            self.log(f"  失败 [{action}] {route.get('destination', '')} {route.get('netmask', '')} "
+                     f"{route.get('gateway', '')}: {error}")
+        self.status_var.set(f"批量应用完成: {summary}")
+
+        if result.ok:
+            messagebox.showinfo("成功", f"批量应用完成\n\n{summary}")
+        else:
+            details = "\n".join(f"{route.get('destination', '')} {route.get('netmask', '')}: {error}"
+                                for _action, route, error in result.failures[:10])
+            if len(result.failures) > 10:
+                details += f"\n……其余 {len(result.failures) - 10} 条见日志"
+            messagebox.showwarning("部分路由应用失败", f"{summary}\n\n{details}")
+
+        # 订阅了路由变化时表格已实时更新
+        if self._route_watcher is None:
+            self._invalidate_routes()
+            self.refresh_routes()
 
     def show_ip_info(self):
         """显示设备IP信息"""
         try:
             self.log("正在打开设备IP信息窗口...")
+            from route_dialogs import IPInfoDialog
             ip_dialog = IPInfoDialog(self.root, self)
             self.root.wait_window(ip_dialog.dialog)
             self.log("设备IP信息窗口已关闭")
@@ -1233,6 +1450,49 @@ class RouteManager:
             self.log(f"打开IP信息窗口失败: {str(e)}")
             messagebox.showerror("错误", f"打开IP信息窗口失败: {str(e)}")
 
+    def show_route_history(self):
+        """显示路由历史窗口（拖动时间滑块还原任意时刻的路由表）"""
+        try:
+            from route_dialogs import HistoryDialog
+            HistoryDialog(self.root, self)
+        except Exception as e:
+            self.log(f"打开路由历史窗口失败: {str(e)}")
+            messagebox.showerror("错误", f"打开路由历史窗口失败: {str(e)}")
+
+    def show_performance(self):
+        """显示性能窗口（各阶段耗时、cProfile 结果）"""
+        try:
+            from route_dialogs import PerformanceDialog
+            PerformanceDialog(self.root, self)
+        except Exception as e:
+            self.log(f"打开性能窗口失败: {str(e)}")
+            messagebox.showerror("错误", f"打开性能窗口失败: {str(e)}")
+
+    def get_route_history(self):
+        """路由历史日志（第一次使用时打开）"""
+        if self._history is None:
+            from route_history import RouteHistory, default_history_path
+            self._history = RouteHistory(default_history_path())
+        return self._history
+
+    @property
+    def history_recording(self):
+        return self._history_recorder is not None
+
+    def set_history_recording(self, enabled):
+        """开始或停止在后台记录路由历史（定期记录，路由变化时提前记录）"""
+        if enabled and self._history_recorder is None:
+            from route_history import HistoryRecorder
+            self._history_recorder = HistoryRecorder(
+                self.get_route_history(),
+                lambda version: self._read_system_routes(version, max_age=SNAPSHOT_MAX_AGE),
+                log=self.log).start()
+            self.log(f"开始记录路由历史: {self._history.path}")
+        elif not enabled and self._history_recorder is not None:
+            self._history_recorder.stop()
+            self._history_recorder = None
+            self.log("停止记录路由历史")
+
     def show_active_context_menu(self, event):
         """显示活动路由右键菜单"""
         # 确保右键点击的项目被选中
@@ -1294,26 +1554,15 @@ class RouteManager:
 
             try:
                 if self.is_windows:
-                    if version == "IPv4":
-                        cmd = f'route -4 delete {destination}'
-                    else:
-                        if netmask_or_prefix:
-                            cmd = f'route -6 delete {destination}/{netmask_or_prefix}'
-                        else:
-                            cmd = f'route -6 delete {destination}'
+                    cmd = build_delete_command(destination, netmask_or_prefix, version, windows=True)
 
                     self.log(f"执行删除命令: {cmd}")
-                    result = subprocess.run(cmd,
-                                          capture_output=True,
-                                          text=True,
-                                          shell=True,
-                                          timeout=10,
-                                          encoding='utf-8',
-                                          errors='ignore')
+                    result = run_route_command(cmd, windows=True)
 
                     if result.returncode == 0:
                         self.log("删除成功")
                         messagebox.showinfo("成功", "路由删除成功")
+                        self._invalidate_routes(version)
                         self.refresh_routes()
                     else:
                         self.log(f"删除失败: {result.stderr}")
@@ -1327,1080 +1576,6 @@ class RouteManager:
         """运行应用程序"""
         self.root.mainloop()
 
-class RouteDialog:
-    def __init__(self, parent, title, version="IPv4"):
-        self.result = None
-        self.version = version
-
-        self.dialog = tk.Toplevel(parent)
-        self.dialog.title(title)
-        self.dialog.geometry("500x400")
-        self.dialog.transient(parent)
-        self.dialog.grab_set()
-
-        # 调试信息
-        debug_frame = ttk.LabelFrame(self.dialog, text="调试信息", padding="10")
-        debug_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-        debug_text = tk.Text(debug_frame, height=6, wrap=tk.WORD)
-        debug_text.pack(fill=tk.BOTH, expand=True)
-
-        debug_text.insert(tk.END, f"版本: {version}\n")
-        debug_text.insert(tk.END, f"操作系统: {platform.system()}\n")
-        debug_text.insert(tk.END, f"管理员权限: {'需要' if platform.system() == 'Windows' else '可能需要'}\n\n")
-
-        if version == "IPv4":
-            debug_text.insert(tk.END, "IPv4路由示例:\n")
-            debug_text.insert(tk.END, "目标: 192.168.100.0\n")
-            debug_text.insert(tk.END, "子网掩码: 255.255.255.0\n")
-            debug_text.insert(tk.END, "网关: 192.168.1.1\n")
-        else:
-            debug_text.insert(tk.END, "IPv6路由示例:\n")
-            debug_text.insert(tk.END, "目标: 2001:db8::\n")
-            debug_text.insert(tk.END, "前缀长度: 32\n")
-            debug_text.insert(tk.END, "网关: fe80::1\n")
-
-        debug_text.config(state=tk.DISABLED)
-
-        # 输入字段
-        input_frame = ttk.LabelFrame(self.dialog, text="路由信息", padding="10")
-        input_frame.pack(fill=tk.X, padx=10, pady=10)
-
-        if version == "IPv4":
-            fields = [
-                ("目标网络:", "destination", "192.168.100.0"),
-                ("子网掩码:", "netmask", "255.255.255.0"),
-                ("网关:", "gateway", "192.168.1.1"),
-                ("跃点数:", "metric", "")
-            ]
-        else:  # IPv6
-            fields = [
-                ("目标网络:", "destination", "2001:db8::"),
-                ("前缀长度:", "prefix_length", "32"),
-                ("网关:", "gateway", "fe80::1"),
-                ("跃点数:", "metric", "")
-            ]
-
-        self.entries = {}
-        for i, (label, key, default) in enumerate(fields):
-            ttk.Label(input_frame, text=label).grid(row=i, column=0, sticky=tk.W, padx=10, pady=5)
-            entry = ttk.Entry(input_frame, width=40)
-            entry.insert(0, default)
-            entry.grid(row=i, column=1, padx=10, pady=5, sticky=(tk.W, tk.E))
-            self.entries[key] = entry
-
-        input_frame.columnconfigure(1, weight=1)
-
-        # 按钮
-        button_frame = ttk.Frame(self.dialog)
-        button_frame.pack(pady=10)
-
-        ttk.Button(button_frame, text="确定", command=self.ok_clicked).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="取消", command=self.cancel_clicked).pack(side=tk.LEFT, padx=5)
-
-        # 居中显示
-        self.dialog.update_idletasks()
-        x = (self.dialog.winfo_screenwidth() // 2) - (self.dialog.winfo_width() // 2)
-        y = (self.dialog.winfo_screenheight() // 2) - (self.dialog.winfo_height() // 2)
-        self.dialog.geometry(f"+{x}+{y}")
-
-    def ok_clicked(self):
-        self.result = {key: entry.get() for key, entry in self.entries.items()}
-        self.dialog.destroy()
-
-    def cancel_clicked(self):
-        self.dialog.destroy()
-
-class EnhancedRouteDialog:
-    """增强的路由对话框，包含接口选择功能"""
-    def __init__(self, parent, title, version, manager):
-        self.result = None
-        self.version = version
-        self.manager = manager
-        self.interface_combo = None
-        self.interface_mapping = {}
-
-        self.dialog = tk.Toplevel(parent)
-        self.dialog.title(title)
-        self.dialog.geometry("700x650")
-        self.dialog.transient(parent)
-        self.dialog.grab_set()
-
-        # 设置对话框样式
-        self.dialog.configure(bg="#f0f0f0")
-
-        # 标题区域
-        title_frame = ttk.Frame(self.dialog)
-        title_frame.pack(fill=tk.X, padx=15, pady=(15, 10))
-
-        title_label = ttk.Label(title_frame, text=f"添加{version}路由",
-                               font=("Arial", 14))
-        title_label.pack(side=tk.LEFT)
-
-        # 使用说明区域
-        help_frame = ttk.LabelFrame(self.dialog, text="使用说明", padding="12")
-        help_frame.pack(fill=tk.X, padx=15, pady=(0, 15))
-
-        if version == "IPv4":
-            help_content = """IPv4路由参数说明：
-• 目标网络：要访问的网络地址，例如 192.168.100.0
-• 子网掩码：网络子网掩码，例如 255.255.255.0
-• 网关地址：路由网关IP地址，或使用 On-link
-• 网络接口：可选，留空则自动选择
-• 跃点数：可选，数值越小优先级越高
-• 持久路由：勾选后系统重启仍保留此路由"""
-        else:
-            help_content = """IPv6路由参数说明：
-• 目标网络：要访问的IPv6网络地址，例如 2001:db8::
-• 前缀长度：网络前缀长度，例如 32、64、128
-• 网关地址：IPv6网关地址，或使用 On-link
-• 网络接口：可选，留空则自动选择
-• 跃点数：可选，数值越小优先级越高
-• 持久路由：勾选后系统重启仍保留此路由"""
-
-        help_text = tk.Text(help_frame, height=7, wrap=tk.WORD, font=("Arial", 9))
-        help_text.pack(fill=tk.X)
-        help_text.config(bg="#f8f9fa", fg="#495057", relief=tk.FLAT)
-        help_text.insert(tk.END, help_content)
-        help_text.config(state=tk.DISABLED)
-
-        # 输入字段区域
-        input_frame = ttk.LabelFrame(self.dialog, text="路由参数配置", padding="15")
-        input_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 15))
-
-        if version == "IPv4":
-            fields = [
-                ("目标网络:", "destination", "192.168.100.0", "例如：192.168.100.0"),
-                ("子网掩码:", "netmask", "255.255.255.0", "例如：255.255.255.0"),
-                ("网关地址:", "gateway", "On-link", "IP地址或 On-link"),
-                ("网络接口:", "interface", "", "可选，留空自动选择"),
-                ("跃点数:", "metric", "", "可选，数值越小优先级越高")
-            ]
-        else:  # IPv6
-            fields = [
-                ("目标网络:", "destination", "2001:db8::", "例如：2001:db8::"),
-                ("前缀长度:", "prefix_length", "32", "例如：32, 64, 128"),
-                ("网关地址:", "gateway", "fe80::1", "IPv6地址或 On-link"),
-                ("网络接口:", "interface", "", "可选，留空自动选择"),
-                ("跃点数:", "metric", "", "可选，数值越小优先级越高")
-            ]
-
-        self.entries = {}
-        for i, (label, key, default, hint) in enumerate(fields):
-            # 标签
-            label_widget = ttk.Label(input_frame, text=label, font=("Arial", 10))
-            label_widget.grid(row=i, column=0, sticky=tk.W, padx=(0, 15), pady=(10, 5))
-
-            if key == "interface":
-                # 接口字段使用下拉框
-                interface_container = ttk.Frame(input_frame)
-                interface_container.grid(row=i, column=1, sticky=(tk.W, tk.E), pady=(10, 5))
-                interface_container.columnconfigure(0, weight=1)
-
-                self.interface_var = tk.StringVar()
-                self.interface_combo = ttk.Combobox(interface_container, textvariable=self.interface_var,
-                                                 font=("Arial", 10), height=8)
-                self.interface_combo.grid(row=0, column=0, sticky=(tk.W, tk.E))
-
-                # 加载状态指示器
-                self.loading_label = ttk.Label(interface_container, text="加载中...",
-                                            font=("Arial", 9), foreground="#6c757d")
-                self.loading_label.grid(row=0, column=1, padx=(10, 0))
-
-                self.interface_combo['values'] = ["正在加载接口信息..."]
-                self.interface_combo.set("正在加载接口信息...")
-                self.interface_combo.config(state='readonly')
-
-                # 启动后台线程加载接口信息
-                threading.Thread(target=self._load_interfaces_async, daemon=True).start()
-
-                self.entries[key] = self.interface_combo
-            else:
-                # 输入框容器
-                entry_container = ttk.Frame(input_frame)
-                entry_container.grid(row=i, column=1, sticky=(tk.W, tk.E), pady=(10, 5))
-                entry_container.columnconfigure(0, weight=1)
-
-                entry = ttk.Entry(entry_container, font=("Arial", 11))
-                entry.insert(0, default)
-                entry.grid(row=0, column=0, sticky=(tk.W, tk.E))
-
-                # 添加提示文本
-                hint_label = ttk.Label(entry_container, text=hint, font=("Arial", 8),
-                                    foreground="#6c757d")
-                hint_label.grid(row=1, column=0, sticky=tk.W, pady=(2, 0))
-
-                self.entries[key] = entry
-
-        input_frame.columnconfigure(1, weight=1)
-
-        # 持久路由选项（单独一行）
-        persistent_frame = ttk.Frame(input_frame)
-        persistent_frame.grid(row=len(fields), column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(15, 0))
-
-        self.persistent_var = tk.BooleanVar()
-        persistent_check = ttk.Checkbutton(persistent_frame,
-                                        text="添加为持久路由（系统重启后保留）",
-                                        variable=self.persistent_var)
-        persistent_check.pack(side=tk.LEFT)
-        self.entries["persistent"] = self.persistent_var
-
-        # 按钮区域
-        button_frame = ttk.Frame(self.dialog)
-        button_frame.pack(fill=tk.X, padx=15, pady=(0, 15))
-
-        # 按钮样式
-        button_style = ttk.Style()
-        button_style.configure("Dialog.TButton", font=("Arial", 10), padding=(20, 8))
-
-        ttk.Button(button_frame, text="确定添加", command=self.ok_clicked,
-                  style="Dialog.TButton").pack(side=tk.RIGHT, padx=(10, 0))
-        ttk.Button(button_frame, text="取消", command=self.cancel_clicked,
-                  style="Dialog.TButton").pack(side=tk.RIGHT)
-
-        # 居中显示
-        self.dialog.update_idletasks()
-        x = (self.dialog.winfo_screenwidth() // 2) - (self.dialog.winfo_width() // 2)
-        y = (self.dialog.winfo_screenheight() // 2) - (self.dialog.winfo_height() // 2)
-        self.dialog.geometry(f"+{x}+{y}")
-
-    def _load_interfaces_async(self):
-        """异步加载网络接口信息"""
-        try:
-            # 获取系统接口
-            interfaces = [("自动选择", "")]
-
-            try:
-                system_interfaces = self.manager.get_network_interfaces()
-                for interface in system_interfaces:
-                    display_name = interface['display']
-                    interface_num = interface['number']
-                    interfaces.append((display_name, interface_num))
-            except Exception as e:
-                print(f"获取接口失败: {e}")
-
-            # 在主线程中更新UI
-            self.dialog.after(0, self._update_interface_combo, interfaces)
-
-        except Exception as e:
-            print(f"异步加载接口失败: {e}")
-            # 在主线程中更新UI显示错误
-            self.dialog.after(0, self._update_interface_combo_error)
-
-    def _update_interface_combo(self, interfaces):
-        """在主线程中更新接口下拉框"""
-        try:
-            if self.interface_combo and self.interface_combo.winfo_exists():
-                # 设置下拉框选项
-                self.interface_combo['values'] = [interface[0] for interface in interfaces]
-                self.interface_combo.set("自动选择")
-                self.interface_combo.config(state='normal')
-
-                # 保存接口映射
-                self.interface_mapping = {interface[0]: interface[1] for interface in interfaces}
-
-                # 隐藏加载标签
-                if hasattr(self, 'loading_label') and self.loading_label.winfo_exists():
-                    self.loading_label.config(text="加载完成", foreground="green")
-                    self.dialog.after(1500, lambda: self.loading_label.destroy())
-        except:
-            pass
-
-    def _update_interface_combo_error(self):
-        """在主线程中更新接口下拉框显示错误"""
-        try:
-            if self.interface_combo and self.interface_combo.winfo_exists():
-                self.interface_combo['values'] = ["自动选择", "获取接口信息失败"]
-                self.interface_combo.set("自动选择")
-                self.interface_combo.config(state='normal')
-                self.interface_mapping = {"自动选择": "", "获取接口信息失败": ""}
-
-                # 更新加载标签显示错误
-                if hasattr(self, 'loading_label') and self.loading_label.winfo_exists():
-                    self.loading_label.config(text="加载失败", foreground="red")
-                    self.dialog.after(3000, lambda: self.loading_label.destroy())
-        except:
-            pass
-
-    def ok_clicked(self):
-        # 收集所有输入数据
-        route_data = {}
-        for key, widget in self.entries.items():
-            if isinstance(widget, ttk.Combobox):
-                # 接口下拉框
-                selected_text = widget.get()
-                mapped_value = self.interface_mapping.get(selected_text, "")
-                route_data[key] = mapped_value
-            elif isinstance(widget, tk.BooleanVar):
-                # 持久路由复选框
-                route_data[key] = widget.get()
-            else:
-                # 普通输入框
-                route_data[key] = widget.get().strip()
-
-        self.result = route_data
-        self.dialog.destroy()
-
-    def cancel_clicked(self):
-        self.dialog.destroy()
-
-class IPInfoDialog:
-    """设备IP信息对话框 - 优化版"""
-    def __init__(self, parent, manager):
-        self.manager = manager
-        self.interfaces_data = []
-        self.selected_interface = None
-
-        self.dialog = tk.Toplevel(parent)
-        self.dialog.title("设备IP信息")
-        # 调整窗口大小以适应屏幕
-        screen_width = self.dialog.winfo_screenwidth()
-        screen_height = self.dialog.winfo_screenheight()
-        width = min(1200, int(screen_width * 0.9))
-        height = min(800, int(screen_height * 0.85))
-        self.dialog.geometry(f"{width}x{height}")
-        self.dialog.transient(parent)
-        self.dialog.grab_set()
-
-        # 设置对话框样式
-        self.dialog.configure(bg="#f8f9fa")
-
-        # 设置统一的Arial字体样式
-        self.setup_fonts()
-
-        # 创建主要布局
-        self.setup_layout()
-
-        # 居中显示
-        self.dialog.update_idletasks()
-        x = (screen_width // 2) - (width // 2)
-        y = (screen_height // 2) - (height // 2)
-        self.dialog.geometry(f"+{x}+{y}")
-
-        # 初始化显示
-        self.refresh_interfaces()
-
-    def setup_fonts(self):
-        """设置统一的Arial字体样式"""
-        # 创建样式对象
-        self.style = ttk.Style()
-
-        # 设置通用字体
-        self.font_large = ("Arial", 12, "bold")
-        self.font_medium = ("Arial", 11, "bold")
-        self.font_normal = ("Arial", 10)
-        self.font_small = ("Arial", 9)
-
-        # 配置Treeview样式（只保留必要的）
-        self.style.configure("IPInfo.Treeview",
-                           font=self.font_normal,
-                           rowheight=25)
-        self.style.configure("IPInfo.Treeview.Heading",
-                           font=self.font_medium,
-                           padding=(8, 5))
-
-    def setup_layout(self):
-        """设置界面布局"""
-        # 顶部工具栏
-        toolbar = ttk.Frame(self.dialog)
-        toolbar.pack(fill=tk.X, padx=10, pady=(10, 5))
-
-        # 标题
-        title_label = ttk.Label(toolbar, text="网络接口IP信息", font=self.font_large)
-        title_label.pack(side=tk.LEFT, padx=(10, 20))
-
-        # 创建按钮样式
-        button_style = ttk.Style()
-        button_style.configure("Tool.TButton", font=self.font_normal, padding=(8, 4))
-
-        # 刷新按钮
-        refresh_btn = ttk.Button(toolbar, text="🔄 刷新", command=self.refresh_interfaces,
-                               style="Tool.TButton")
-        refresh_btn.pack(side=tk.RIGHT, padx=(5, 10))
-
-        # 导出按钮
-        export_btn = ttk.Button(toolbar, text="📄 导出", command=self.export_info,
-                               style="Tool.TButton")
-        export_btn.pack(side=tk.RIGHT, padx=(5, 0))
-
-        # 创建主分割区域
-        main_paned = ttk.PanedWindow(self.dialog, orient=tk.HORIZONTAL)
-        main_paned.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-
-        # 左侧接口列表
-        left_frame = ttk.Frame(main_paned)
-        main_paned.add(left_frame, weight=1)
-
-        # 接口列表标题
-        list_title = ttk.Label(left_frame, text="网络接口列表", font=self.font_medium)
-        list_title.pack(pady=(10, 5))
-
-        # 接口列表框架
-        list_frame = ttk.Frame(left_frame)
-        list_frame.pack(fill=tk.BOTH, expand=True, padx=(10, 5), pady=(0, 10))
-
-        # 创建接口列表Treeview
-        columns = ("status", "ipv4", "ipv6")
-        self.interface_tree = ttk.Treeview(list_frame, columns=columns, show="tree headings",
-                                       height=15, style="IPInfo.Treeview")
-
-        # 设置列标题
-        self.interface_tree.heading("#0", text="接口名称", anchor=tk.W)
-        self.interface_tree.heading("status", text="状态", anchor=tk.CENTER)
-        self.interface_tree.heading("ipv4", text="IPv4地址", anchor=tk.W)
-        self.interface_tree.heading("ipv6", text="IPv6地址", anchor=tk.W)
-
-        # 设置列宽
-        self.interface_tree.column("#0", width=200, minwidth=150)
-        self.interface_tree.column("status", width=80, minwidth=60)
-        self.interface_tree.column("ipv4", width=140, minwidth=100)
-        self.interface_tree.column("ipv6", width=200, minwidth=150)
-
-        # 添加滚动条
-        list_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.interface_tree.yview)
-        self.interface_tree.configure(yscrollcommand=list_scrollbar.set)
-
-        self.interface_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        list_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        # 绑定选择事件
-        self.interface_tree.bind("<<TreeviewSelect>>", self.on_interface_select)
-
-        # 右侧详细信息
-        right_frame = ttk.Frame(main_paned)
-        main_paned.add(right_frame, weight=2)
-
-        # 详细信息标题
-        detail_title = ttk.Label(right_frame, text="详细信息", font=self.font_medium)
-        detail_title.pack(pady=(10, 5))
-
-        # 详细信息框架
-        self.detail_frame = ttk.Frame(right_frame)
-        self.detail_frame.pack(fill=tk.BOTH, expand=True, padx=(5, 10), pady=(0, 10))
-
-        # 创建详细信息显示区域
-        self.setup_detail_area()
-
-        # 底部状态栏
-        status_frame = ttk.Frame(self.dialog)
-        status_frame.pack(fill=tk.X, side=tk.BOTTOM, padx=10, pady=(5, 10))
-
-        self.status_var = tk.StringVar(value="就绪")
-        status_label = ttk.Label(status_frame, textvariable=self.status_var,
-                                relief=tk.SUNKEN, anchor=tk.W)
-        status_label.pack(fill=tk.X)
-
-    def setup_detail_area(self):
-        """设置详细信息显示区域"""
-        # 创建单一的详细信息显示区域
-        self.detail_text = tk.Text(self.detail_frame, wrap=tk.WORD, font=self.font_normal,
-                                  bg="white", fg="black", padx=15, pady=15,
-                                  relief=tk.FLAT, borderwidth=0)
-        detail_scrollbar = ttk.Scrollbar(self.detail_frame, orient=tk.VERTICAL,
-                                         command=self.detail_text.yview)
-        self.detail_text.configure(yscrollcommand=detail_scrollbar.set)
-
-        self.detail_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        detail_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        # 初始显示选择提示
-        self.show_selection_hint()
-
-    def show_selection_hint(self):
-        """显示选择提示"""
-        # 清空详细信息文本控件
-        self.detail_text.config(state=tk.NORMAL)
-        self.detail_text.delete(1.0, tk.END)
-
-        # 添加选择提示
-        hint_text = """请从左侧列表中选择一个网络接口
-查看详细信息
-
-操作提示：
-• 点击左侧接口名称查看详细信息
-• 使用 Ctrl+C 复制选中的文本
-• 点击"🔄 刷新"更新网络信息
-• 点击"📄 导出"保存完整报告"""
-
-        self.detail_text.insert(tk.END, hint_text)
-        self.detail_text.config(state=tk.DISABLED)
-
-    def on_interface_select(self, event):
-        """处理接口选择事件"""
-        selection = self.interface_tree.selection()
-        if not selection:
-            return
-
-        item = selection[0]
-        interface_name = self.interface_tree.item(item, "text")
-
-        # 查找接口详细信息
-        selected_interface = None
-        for interface in self.interfaces_data:
-            if interface.get('name') == interface_name:
-                selected_interface = interface
-                break
-
-        if selected_interface:
-            self.display_interface_detail(selected_interface)
-            self.status_var.set(f"已选择: {interface_name}")
-
-    def display_interface_detail(self, interface):
-        """显示接口详细信息"""
-        self.selected_interface = interface
-
-        # 显示完整的接口详细信息
-        self.display_complete_interface_info(interface)
-
-    def display_complete_interface_info(self, interface):
-        """显示完整的接口信息，不做任何过滤"""
-        # 清空并设置详细信息文本
-        self.detail_text.config(state=tk.NORMAL)
-        self.detail_text.delete(1.0, tk.END)
-
-        # 格式化完整信息 - 简洁清晰
-        info_lines = []
-
-        # 基本信息
-        info_lines.append(f"接口名称：{interface.get('name', '未知')}")
-        info_lines.append(f"接口描述：{interface.get('description', '未知')}")
-        info_lines.append(f"连接状态：{interface.get('status', '未知')}")
-        info_lines.append("")
-
-        # 硬件信息
-        info_lines.append("【硬件信息】")
-        mac = interface.get('mac_address', '未获取').strip()
-        if mac:
-            info_lines.append(f"MAC地址：{mac}")
-        else:
-            info_lines.append("MAC地址：未获取")
-        info_lines.append("")
-
-        # IPv4地址
-        info_lines.append("【IPv4地址配置】")
-        if interface.get('ipv4_addresses'):
-            for i, ip in enumerate(interface['ipv4_addresses'], 1):
-                info_lines.append(f"IPv4地址 {i}：{ip}")
-        else:
-            info_lines.append("IPv4地址：无")
-        info_lines.append("")
-
-        # IPv6地址
-        info_lines.append("【IPv6地址配置】")
-        if interface.get('ipv6_addresses'):
-            for i, ipv6 in enumerate(interface['ipv6_addresses'], 1):
-                info_lines.append(f"IPv6地址 {i}：{ipv6}")
-        else:
-            info_lines.append("IPv6地址：无")
-        info_lines.append("")
-
-        # 网络配置
-        info_lines.append("【网络配置】")
-
-        # 默认网关
-        gateway = interface.get('default_gateway', '').strip()
-        info_lines.append(f"默认网关：{gateway if gateway else '未配置'}")
-
-        # DNS服务器
-        dns_servers = interface.get('dns_servers', [])
-        if dns_servers:
-            info_lines.append("DNS服务器：")
-            for dns in dns_servers:
-                info_lines.append(f"  • {dns}")
-        else:
-            info_lines.append("DNS服务器：未配置")
-
-        # DHCP配置
-        dhcp_enabled = interface.get('dhcp_enabled', False)
-        info_lines.append(f"DHCP配置：{'已启用' if dhcp_enabled else '未启用或静态配置'}")
-        if dhcp_enabled:
-            dhcp_server = interface.get('dhcp_server', '').strip()
-            if dhcp_server:
-                info_lines.append(f"DHCP服务器：{dhcp_server}")
-
-        info_lines.append("")
-
-        # 原始配置数据
-        info_lines.append("【原始配置数据】")
-
-        # 显示所有接口属性（排除已显示的主要字段）
-        excluded_keys = {'name', 'description', 'status', 'mac_address', 'ipv4_addresses',
-                        'ipv6_addresses', 'default_gateway', 'dns_servers', 'dhcp_enabled', 'dhcp_server'}
-
-        has_extra_data = False
-        for key, value in interface.items():
-            if key not in excluded_keys and value:
-                has_extra_data = True
-                if isinstance(value, list) and value:
-                    info_lines.append(f"{key}：")
-                    for item in value[:3]:  # 最多显示前3个，避免过长
-                        info_lines.append(f"  • {item}")
-                    if len(value) > 3:
-                        info_lines.append(f"  ... (还有{len(value)-3}个)")
-                elif value:
-                    info_lines.append(f"{key}：{value}")
-
-        if not has_extra_data:
-            info_lines.append("（无额外配置数据）")
-
-        info_lines.append("")
-        info_lines.append(f"生成时间：{self.get_current_time()}")
-
-        # 插入文本
-        self.detail_text.insert(tk.END, '\n'.join(info_lines))
-        self.detail_text.config(state=tk.DISABLED)
-
-    def refresh_interfaces(self):
-        """刷新接口信息"""
-        # 清除现有内容
-        for item in self.interface_tree.get_children():
-            self.interface_tree.delete(item)
-
-        # 获取接口信息
-        try:
-            self.interfaces_data = self.get_detailed_interfaces()
-            self.display_interface_list()
-            self.status_var.set(f"已获取 {len(self.interfaces_data)} 个网络接口")
-        except Exception as e:
-            self.show_error(f"获取接口信息失败: {str(e)}")
-            self.status_var.set("获取接口信息失败")
-
-    def display_interface_list(self):
-        """显示接口列表"""
-        if not self.interfaces_data:
-            self.interface_tree.insert("", "end", text="未找到网络接口", values=("", "", ""))
-            return
-
-        # 按连接状态排序：已连接的在前
-        sorted_interfaces = sorted(self.interfaces_data,
-                                 key=lambda x: (0 if x.get('status') == '已连接' else 1, x.get('name', '')))
-
-        for interface in sorted_interfaces:
-            # 准备显示值
-            status = interface.get('status', '未知')
-            if status == '已连接':
-                status_display = "🟢 已连接"
-            elif status == '断开连接':
-                status_display = "🔴 断开"
-            else:
-                status_display = "⚪ 未知"
-
-            # IP地址显示（简化版本）
-            ipv4_display = ""
-            if interface.get('ipv4_addresses'):
-                ipv4_display = interface['ipv4_addresses'][0]
-                if len(interface['ipv4_addresses']) > 1:
-                    ipv4_display += f" (+{len(interface['ipv4_addresses'])-1})"
-
-            ipv6_display = ""
-            if interface.get('ipv6_addresses'):
-                # 只显示第一个IPv6地址，并简化长地址
-                first_ipv6 = interface['ipv6_addresses'][0]
-                if len(first_ipv6) > 20:
-                    ipv6_display = first_ipv6[:18] + "..."
-                else:
-                    ipv6_display = first_ipv6
-                if len(interface['ipv6_addresses']) > 1:
-                    ipv6_display += f" (+{len(interface['ipv6_addresses'])-1})"
-
-            # 插入到树形控件
-            self.interface_tree.insert("", "end",
-                                     text=interface.get('name', '未知接口'),
-                                     values=(status_display, ipv4_display, ipv6_display))
-
-        # 自动选择第一个已连接的接口
-        for i, interface in enumerate(sorted_interfaces):
-            if interface.get('status') == '已连接':
-                items = self.interface_tree.get_children()
-                if items and i < len(items):
-                    self.interface_tree.selection_set(items[i])
-                    self.interface_tree.see(items[i])
-                    self.on_interface_select(None)
-                    break
-
-    def export_info(self):
-        """导出网络接口信息"""
-        if not self.interfaces_data:
-            messagebox.showwarning("提示", "没有可导出的接口信息")
-            return
-
-        try:
-            from tkinter import filedialog
-            filename = filedialog.asksaveasfilename(
-                title="导出网络接口信息",
-                defaultextension=".txt",
-                filetypes=[("文本文件", "*.txt"), ("所有文件", "*.*")]
-            )
-
-            if filename:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write("=" * 50 + "\n")
-                    f.write("网络接口信息报告\n")
-                    f.write(f"生成时间: {self.get_current_time()}\n")
-                    f.write("=" * 50 + "\n\n")
-
-                    for interface in self.interfaces_data:
-                        f.write(f"接口名称: {interface.get('name', '未知')}\n")
-                        f.write(f"连接状态: {interface.get('status', '未知')}\n")
-                        f.write(f"MAC地址: {interface.get('mac_address', '未获取')}\n")
-
-                        if interface.get('ipv4_addresses'):
-                            f.write("IPv4地址:\n")
-                            for ip in interface['ipv4_addresses']:
-                                f.write(f"  - {ip}\n")
-
-                        if interface.get('ipv6_addresses'):
-                            f.write("IPv6地址:\n")
-                            for ipv6 in interface['ipv6_addresses']:
-                                f.write(f"  - {ipv6}\n")
-
-                        if interface.get('default_gateway'):
-                            f.write(f"默认网关: {interface['default_gateway']}\n")
-
-                        if interface.get('dns_servers'):
-                            f.write("DNS服务器:\n")
-                            for dns in interface['dns_servers']:
-                                f.write(f"  - {dns}\n")
-
-                        if interface.get('dhcp_enabled'):
-                            f.write(f"DHCP: 已启用 (服务器: {interface.get('dhcp_server', '未知')})\n")
-                        else:
-                            f.write("DHCP: 未启用或静态配置\n")
-
-                        f.write("-" * 50 + "\n\n")
-
-                messagebox.showinfo("成功", f"网络接口信息已导出到:\n{filename}")
-                self.status_var.set(f"已导出到: {filename}")
-
-        except Exception as e:
-            messagebox.showerror("错误", f"导出失败: {str(e)}")
-            self.status_var.set("导出失败")
-
-    def get_current_time(self):
-        """获取当前时间字符串"""
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    def show_error(self, error_message):
-        """显示错误信息"""
-        messagebox.showerror("错误", error_message)
-
-    def close_dialog(self):
-        """关闭对话框"""
-        self.dialog.destroy()
-
-    def get_detailed_interfaces(self):
-        """获取详细的网络接口信息"""
-        interfaces = []
-
-        try:
-            if self.manager.is_windows:
-                interfaces = self._get_windows_detailed_interfaces()
-            else:
-                interfaces = self._get_unix_detailed_interfaces()
-        except Exception as e:
-            self.manager.log(f"获取详细接口信息失败: {e}")
-
-        return interfaces
-
-    def _get_windows_detailed_interfaces(self):
-        """获取Windows系统的详细网络接口信息"""
-        interfaces = []
-
-        try:
-            # 获取IP配置信息
-            ipconfig_result = subprocess.run(['ipconfig', '/all'],
-                                           capture_output=True,
-                                           text=True,
-                                           shell=True,
-                                           timeout=10,
-                                           encoding='gbk',
-                                           errors='ignore')
-
-            if ipconfig_result.returncode == 0:
-                interfaces = self._parse_ipconfig_output(ipconfig_result.stdout)
-
-        except subprocess.TimeoutExpired:
-            self.manager.log("获取IP配置信息超时")
-        except Exception as e:
-            self.manager.log(f"获取Windows详细接口信息失败: {e}")
-
-        return interfaces
-
-    def _parse_ipconfig_output(self, output):
-        """解析ipconfig输出"""
-        interfaces = []
-        lines = output.split('\n')
-        current_interface = None
-
-        for line in lines:
-            line = line.strip()
-
-            # 检测新的适配器（扩展匹配范围）
-            if (line.startswith('以太网适配器') or line.startswith('无线') or
-                line.startswith('Ethernet adapter') or line.startswith('Wireless') or
-                line.startswith('Mobile Broadband') or 'adapter' in line.lower() or
-                'Unknown adapter' in line or 'Description' in line and 'Adapter' in line):
-
-                if current_interface:
-                    # 如果有IP地址且状态不是明确的断开连接，则设为已连接
-                    if (current_interface['status'] == '未知' and
-                        (current_interface['ipv4_addresses'] or current_interface['ipv6_addresses'])):
-                        current_interface['status'] = '已连接'
-                    interfaces.append(current_interface)
-
-                # 提取适配器名称
-                adapter_name = line
-                if ':' in line:
-                    adapter_name = line.split(':', 1)[0].strip()
-                elif '.' in line and 'Description' in line:
-                    # 处理以Description开头的行
-                    adapter_name = line.replace('Description . . . . . . . . . . . :', '').strip()
-                    if 'Adapter' in adapter_name:
-                        adapter_name = adapter_name.replace('Adapter', '适配器').strip()
-
-                current_interface = {
-                    'name': adapter_name,
-                    'description': adapter_name,
-                    'status': '未知',
-                    'mac_address': '',
-                    'ipv4_addresses': [],
-                    'ipv6_addresses': [],
-                    'default_gateway': '',
-                    'dns_servers': [],
-                    'dhcp_enabled': False,
-                    'dhcp_server': ''
-                }
-
-            elif current_interface:
-                # 解析各种信息 - 改进状态检测
-
-                # 媒体状态检测（明确的断开连接状态）
-                if ('Media disconnected' in line or
-                    '媒体已断开连接' in line or
-                    ('Media State' in line and 'Media disconnected' in line)):
-                    current_interface['status'] = '断开连接'
-
-                # MAC地址
-                elif ('物理地址' in line or 'Physical Address' in line):
-                    mac = line.split(':', 1)[1].strip() if ':' in line else ''
-                    current_interface['mac_address'] = mac
-
-                # IPv4地址
-                elif ('IPv4 地址' in line or 'IPv4 Address' in line):
-                    ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
-                    if ip_match:
-                        current_interface['ipv4_addresses'].append(ip_match.group(1))
-                        # 如果状态未知但有IP地址，设为已连接
-                        if current_interface['status'] == '未知':
-                            current_interface['status'] = '已连接'
-
-                # IPv6地址
-                elif ('IPv6 地址' in line or 'IPv6 Address' in line or 'Link-local IPv6 Address' in line):
-                    # 提取IPv6地址（改进解析）
-                    ipv6_match = re.search(r'([0-9a-fA-F:]+%?\d*)\s*\(', line)
-                    if not ipv6_match:
-                        ipv6_match = re.search(r'([0-9a-fA-F:]+)', line)
-                    if ipv6_match:
-                        ipv6_addr = ipv6_match.group(1)
-                        # 排除本地链路地址（除非是唯一地址）
-                        if not ipv6_addr.startswith('fe80::') or len(current_interface['ipv6_addresses']) == 0:
-                            current_interface['ipv6_addresses'].append(ipv6_addr)
-                            # 如果状态未知但有IP地址，设为已连接
-                            if current_interface['status'] == '未知':
-                                current_interface['status'] = '已连接'
-
-                # 默认网关
-                elif '默认网关' in line or 'Default Gateway' in line:
-                    gateway = line.split(':', 1)[1].strip() if ':' in line else ''
-                    if gateway:
-                        current_interface['default_gateway'] = gateway
-
-                # DNS服务器
-                elif 'DNS 服务器' in line or 'DNS Servers' in line:
-                    dns = line.split(':', 1)[1].strip() if ':' in line else ''
-                    if dns:
-                        current_interface['dns_servers'].append(dns)
-
-                # DHCP
-                elif 'DHCP 已启用' in line or 'DHCP Enabled' in line:
-                    if '是' in line or 'Yes' in line:
-                        current_interface['dhcp_enabled'] = True
-                elif 'DHCP 服务器' in line or 'DHCP Server' in line:
-                    dhcp_server = line.split(':', 1)[1].strip() if ':' in line else ''
-                    current_interface['dhcp_server'] = dhcp_server
-
-        # 添加最后一个接口
-        if current_interface:
-            # 最终状态判断：如果有IP地址且状态不是明确的断开连接，则设为已连接
-            if (current_interface['status'] == '未知' and
-                (current_interface['ipv4_addresses'] or current_interface['ipv6_addresses'])):
-                current_interface['status'] = '已连接'
-            interfaces.append(current_interface)
-
-        return interfaces
-
-    def _get_unix_detailed_interfaces(self):
-        """获取Unix/Linux系统的详细网络接口信息"""
-        interfaces = []
-
-        try:
-            # 获取基本接口信息
-            ip_result = subprocess.run(['ip', 'addr', 'show'],
-                                     capture_output=True,
-                                     text=True,
-                                     shell=True,
-                                     timeout=10)
-
-            if ip_result.returncode == 0:
-                interfaces = self._parse_ip_addr_output(ip_result.stdout)
-
-        except Exception as e:
-            self.manager.log(f"获取Unix详细接口信息失败: {e}")
-
-        return interfaces
-
-    def _parse_ip_addr_output(self, output):
-        """解析ip addr show输出"""
-        interfaces = []
-        lines = output.split('\n')
-        current_interface = None
-
-        for line in lines:
-            line = line.strip()
-
-            if line and ':' in line and not line.startswith(' '):
-                # 接口行
-                parts = line.split(':', 2)
-                if len(parts) >= 2:
-                    interface_name = parts[1].strip()
-
-                    current_interface = {
-                        'name': interface_name,
-                        'description': interface_name,
-                        'status': '未知',
-                        'mac_address': '',
-                        'ipv4_addresses': [],
-                        'ipv6_addresses': [],
-                        'default_gateway': '',
-                        'dns_servers': [],
-                        'dhcp_enabled': False,
-                        'dhcp_server': ''
-                    }
-
-                    # 检查状态
-                    if 'UP' in line:
-                        current_interface['status'] = '已连接'
-                    elif 'DOWN' in line:
-                        current_interface['status'] = '断开连接'
-
-                    interfaces.append(current_interface)
-
-            elif current_interface and 'link/ether' in line:
-                # MAC地址
-                mac_match = re.search(r'([0-9a-fA-F]{2}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2})', line)
-                if mac_match:
-                    current_interface['mac_address'] = mac_match.group(1)
-
-            elif current_interface and 'inet ' in line:
-                # IPv4地址
-                ip_match = re.search(r'inet\s+(\d+\.\d+\.\d+\.\d+/\d+)', line)
-                if ip_match:
-                    current_interface['ipv4_addresses'].append(ip_match.group(1))
-
-            elif current_interface and 'inet6 ' in line:
-                # IPv6地址
-                ipv6_match = re.search(r'inet6\s+([0-9a-fA-F:]+/\d+)', line)
-                if ipv6_match:
-                    ipv6_addr = ipv6_match.group(1)
-                    if not ipv6_addr.startswith('fe80::'):
-                        current_interface['ipv6_addresses'].append(ipv6_addr)
-
-        return interfaces
-
-    def display_interfaces(self, interfaces):
-        """显示接口信息"""
-        if not interfaces:
-            no_data_label = ttk.Label(self.scrollable_frame,
-                                    text="未找到网络接口信息",
-                                    font=("Arial", 12))
-            no_data_label.pack(pady=50)
-            return
-
-        for i, interface in enumerate(interfaces):
-            # 接口卡片
-            interface_frame = ttk.LabelFrame(self.scrollable_frame,
-                                           text=interface.get('name', '未知接口'),
-                                           padding="15")
-            interface_frame.pack(fill=tk.X, padx=10, pady=(0, 15))
-
-            # 状态指示器
-            status_color = "green" if interface.get('status') == '已连接' else "red"
-            status_text = interface.get('status', '未知')
-
-            status_frame = ttk.Frame(interface_frame)
-            status_frame.pack(fill=tk.X, pady=(0, 10))
-
-            ttk.Label(status_frame, text="状态:", font=("Arial", 10, "bold")).pack(side=tk.LEFT)
-            status_label = ttk.Label(status_frame, text=status_text,
-                                    font=("Arial", 10), foreground=status_color)
-            status_label.pack(side=tk.LEFT, padx=(5, 0))
-
-            # 网格布局显示信息
-            info_frame = ttk.Frame(interface_frame)
-            info_frame.pack(fill=tk.X)
-
-            row = 0
-
-            # MAC地址
-            if interface.get('mac_address'):
-                self._add_info_row(info_frame, "MAC地址:", interface['mac_address'], row)
-                row += 1
-
-            # IPv4地址
-            if interface.get('ipv4_addresses'):
-                self._add_info_row(info_frame, "IPv4地址:", ', '.join(interface['ipv4_addresses']), row)
-                row += 1
-
-            # IPv6地址
-            if interface.get('ipv6_addresses'):
-                self._add_info_row(info_frame, "IPv6地址:", ', '.join(interface['ipv6_addresses']), row)
-                row += 1
-
-            # 默认网关
-            if interface.get('default_gateway'):
-                self._add_info_row(info_frame, "默认网关:", interface['default_gateway'], row)
-                row += 1
-
-            # DNS服务器
-            if interface.get('dns_servers'):
-                self._add_info_row(info_frame, "DNS服务器:", ', '.join(interface['dns_servers']), row)
-                row += 1
-
-            # DHCP信息
-            if interface.get('dhcp_enabled'):
-                dhcp_text = f"已启用 (服务器: {interface.get('dhcp_server', '未知')})"
-                self._add_info_row(info_frame, "DHCP:", dhcp_text, row)
-
-    def _add_info_row(self, parent, label_text, value_text, row):
-        """添加信息行"""
-        label = ttk.Label(parent, text=label_text, font=("Arial", 10, "bold"))
-        label.grid(row=row, column=0, sticky=tk.W, padx=(0, 10), pady=2)
-
-        value = ttk.Label(parent, text=value_text, font=("Arial", 10))
-        value.grid(row=row, column=1, sticky=tk.W, pady=2)
-
-    def show_error(self, error_message):
-        """显示错误信息"""
-        error_label = ttk.Label(self.scrollable_frame,
-                              text=f"错误: {error_message}",
-                              font=("Arial", 12), foreground="red")
-        error_label.pack(pady=50)
-
-    def close_dialog(self):
-        """关闭对话框"""
-        self.dialog.destroy()
-
 if __name__ == "__main__":
     print("启动系统路由配置管理器...")
     print("程序包含详细的错误提示和调试日志")
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+路由表健康指标导出 - 以无界面的常驻进程在本地HTTP端口提供 Prometheus/OpenMetrics 指标
+
+指标包括各协议版本/路由表/接口的路由条数、是否有默认路由、路由变化次数、
+最近一次读取的耗时，以及各阶段（读取、解析等）的累计耗时。
+路由和接口通过与图形界面相同的 route_core.get_system_routes / get_system_interfaces 读取；
+只在路由变化（Linux下netlink通知）或定期检查时重新读取，并立即生成指标文本，
+抓取请求直接返回内存中的文本，1秒的抓取间隔也不会增加读取路由表的次数。
+
+用法（通常通过命令行工具启动）:
+    python route_cli.py metrics --port 9464
+    curl http://127.0.0.1:9464/metrics
+"""
+
+import threading
+import time
+from collections import Counter
+
+from route_core import get_system_routes, get_system_interfaces, is_windows, SNAPSHOT_MAX_AGE
+from route_profile import PROFILER
+from route_table import RouteTable, FLAG_PERSISTENT
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 9464
+# 没有变化通知时定期重新读取的间隔（秒）
+DEFAULT_INTERVAL = 30
+# 收到路由变化通知后等待多久再读取（秒），一次批量修改只读取一次
+CHANGE_DELAY = 1.0
+
+VERSIONS = ('IPv4', 'IPv6')
+
+CONTENT_TYPE_TEXT = 'text/plain; version=0.0.4; charset=utf-8'
+CONTENT_TYPE_OPENMETRICS = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+
+def _escape(value):
+    """标签值转义（反斜杠、双引号、换行）"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def render_metrics(families, openmetrics=False):
+    """生成指标文本
+
+    families: [(名称, 类型, 说明, [(标签字典, 值)])]；计数器的名称不含 _total 后缀。
+    openmetrics: True 时生成 OpenMetrics 格式（计数器类型行不带 _total，末尾有 # EOF）
+    """
+    lines = []
+    for name, metric_type, help_text, samples in families:
+        sample_name = name + '_total' if metric_type == 'counter' else name
+        family_name = name if openmetrics else sample_name
+        lines.append(f"# HELP {family_name} {help_text}")
+        lines.append(f"# TYPE {family_name} {metric_type}")
+        for labels, value in samples:
+            if labels:
+                label_text = ','.join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+                lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{sample_name} {_format_value(value)}")
+    if openmetrics:
+        lines.append('# EOF')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class _VersionState:
+    """一个协议版本的统计"""
+
+    def __init__(self):
+        self.rows = None
+        self.counts = Counter()
+        self.interface_counts = Counter()
+        self.default_route = 0
+        self.added = 0
+        self.removed = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.duration = 0.0
+        self.timestamp = 0.0
+
+
+class RouteMetrics:
+    """读取路由和接口，维护统计，并预先生成指标文本；线程安全"""
+
+    def __init__(self, versions=VERSIONS, get_routes=None, get_interfaces=None, log=None):
+        self.versions = versions
+        # Windows下IPv4、IPv6和接口列表共用同一次 route print
+        self.get_routes = get_routes or (lambda version: get_system_routes(version, max_age=SNAPSHOT_MAX_AGE))
+        self.get_interfaces = get_interfaces or (lambda: get_system_interfaces(max_age=SNAPSHOT_MAX_AGE))
+        self.log = log or (lambda message: None)
+        self._lock = threading.Lock()
+        self._states = {version: _VersionState() for version in versions}
+        self._interfaces = None
+        self._interface_errors = 0
+        self._started = time.time()
+        self._text = b''
+        self._openmetrics = b''
+        self._render()
+
+    def refresh(self):
+        """重新读取各协议版本的路由和接口列表，更新统计并重新生成指标文本"""
+        for version in self.versions:
+            state = self._states[version]
+            started = time.perf_counter()
+            try:
+                routes = self.get_routes(version)
+            except Exception as e:
+                with self._lock:
+                    state.errors += 1
+                self.log(f"读取{version}路由失败: {e}")
+                continue
+            duration = time.perf_counter() - started
+            if not isinstance(routes, RouteTable):
+                routes = RouteTable(routes)
+            counts, interface_counts, default_route = self._count(routes)
+
+            # 与上次读取的路由表比较，统计变化条数（只保存每行的哈希值，大路由表也不占用多少内存）
+            rows = set(map(hash, routes.row_tuples()))
+            with self._lock:
+                if state.rows is not None:
+                    state.added += len(rows - state.rows)
+                    state.removed += len(state.rows - rows)
+                state.rows = rows
+                state.counts = counts
+                state.interface_counts = interface_counts
+                state.default_route = default_route
+                state.refreshes += 1
+                state.duration = duration
+                state.timestamp = time.time()
+
+        try:
+            interfaces = self.get_interfaces()
+        except Exception as e:
+            interfaces = None
+            self.log(f"读取网络接口失败: {e}")
+        with self._lock:
+            if interfaces is None:
+                self._interface_errors += 1
+            else:
+                self._interfaces = interfaces
+
+        self._render()
+
+    @staticmethod
+    def _count(routes):
+        """按 (路由表, 类型) 和接口统计路由条数，并检查是否有默认路由"""
+        strings = routes.strings()
+        by_table = Counter(zip(routes.table, routes.flags))
+        counts = Counter()
+        for (table, flags), count in by_table.items():
+            counts[(strings[table], 'persistent' if flags & FLAG_PERSISTENT else 'active')] += count
+        interface_counts = Counter({strings[interface]: count
+                                    for interface, count in Counter(routes.interface).items()})
+
+        default_route = 0
+        raw = routes.raw_routes()
+        for index, (prefix, high, low) in enumerate(zip(routes.prefix, routes.dest_hi, routes.dest_lo)):
+            if prefix == 0 and high == 0 and low == 0 and index not in raw:
+                default_route = 1
+                break
+        return counts, interface_counts, default_route
+
+    def _families(self):
+        """当前统计对应的指标（调用方持有锁）"""
+        routes, interface_routes, default_route = [], [], []
+        changes, refreshes, errors, durations, timestamps = [], [], [], [], []
+        for version, state in self._states.items():
+            family = version.lower()
+            for (table, route_type), count in sorted(state.counts.items()):
+                routes.append(({'family': family, 'table': table, 'type': route_type}, count))
+            for interface, count in sorted(state.interface_counts.items()):
+                interface_routes.append(({'family': family, 'interface': interface}, count))
+            if state.rows is not None:
+                default_route.append(({'family': family}, state.default_route))
+                durations.append(({'family': family}, state.duration))
+                timestamps.append(({'family': family}, state.timestamp))
+            changes.append(({'family': family, 'change': 'added'}, state.added))
+            changes.append(({'family': family, 'change': 'removed'}, state.removed))
+            refreshes.append(({'family': family}, state.refreshes))
+            errors.append(({'family': family}, state.errors))
+
+        families = [
+            ('routeconf_routes', 'gauge', '路由条数（按协议版本、路由表、活动/持久）', routes),
+            ('routeconf_interface_routes', 'gauge', '各接口的路由条数', interface_routes),
+            ('routeconf_default_route', 'gauge', '是否有默认路由（1有，0没有）', default_route),
+            ('routeconf_route_changes', 'counter', '与上次读取相比新增/删除的路由条数（rate()即路由变化速率）', changes),
+            ('routeconf_refresh_duration_seconds', 'gauge', '最近一次读取路由表的耗时（秒）', durations),
+            ('routeconf_last_refresh_timestamp_seconds', 'gauge', '最近一次成功读取路由表的时间（Unix时间）', timestamps),
+            ('routeconf_refreshes', 'counter', '读取路由表的次数', refreshes),
+            ('routeconf_refresh_errors', 'counter', '读取路由表失败的次数', errors),
+        ]
+
+        if self._interfaces is not None:
+            families.append(('routeconf_interfaces', 'gauge', '网络接口数量', [({}, len(self._interfaces))]))
+            families.append(('routeconf_interface_addresses', 'gauge', '各接口的IPv4地址数量',
+                             [({'interface': interface['name']}, len(interface.get('ips') or []))
+                              for interface in self._interfaces]))
+        families.append(('routeconf_interface_errors', 'counter', '读取网络接口失败的次数',
+                         [({}, self._interface_errors)]))
+
+        # 各阶段（启动子进程、读取、解析等）的累计耗时，与图形界面“性能”窗口相同
+        stats = PROFILER.stats()
+        families += [
+            ('routeconf_stage_seconds', 'counter', '各阶段的累计耗时（秒，不含内层阶段）',
+             [({'stage': s.stage}, s.self_wall) for s in stats]),
+            ('routeconf_stage_cpu_seconds', 'counter', '各阶段的累计CPU时间（秒，不含内层阶段）',
+             [({'stage': s.stage}, s.self_cpu) for s in stats]),
+            ('routeconf_stage_calls', 'counter', '各阶段的执行次数', [({'stage': s.stage}, s.count) for s in stats]),
+            ('routeconf_stage_rows', 'counter', '各阶段处理的行数', [({'stage': s.stage}, s.rows) for s in stats]),
+            ('routeconf_stage_last_seconds', 'gauge', '各阶段最近一次的耗时（秒）',
+             [({'stage': s.stage}, s.last_wall) for s in stats]),
+            ('routeconf_exporter_start_time_seconds', 'gauge', '导出进程的启动时间（Unix时间）',
+             [({}, self._started)]),
+        ]
+        return families
+
+    def _render(self):
+        with self._lock:
+            families = self._families()
+            self._text = render_metrics(families)
+            self._openmetrics = render_metrics(families, openmetrics=True)
+
+    def text(self, openmetrics=False):
+        """最近一次生成的指标文本（bytes）"""
+        return self._openmetrics if openmetrics else self._text
+
+
+class MetricsExporter:
+    """HTTP指标服务和后台刷新线程；Linux下订阅路由变化，变化时重新读取"""
+
+    def __init__(self, metrics, host=DEFAULT_HOST, port=DEFAULT_PORT, interval=DEFAULT_INTERVAL,
+                 watch=True, log=None):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.watch = watch
+        self.log = log or (lambda message: None)
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._server = None
+        self._watcher = None
+
+    def trigger(self):
+        """请求尽快重新读取（例如收到路由变化通知后）"""
+        self._wakeup.set()
+
+    def _on_route_events(self, events):
+        self.trigger()
+
+    def _make_server(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+                    body = metrics.text(openmetrics)
+                    content_type = CONTENT_TYPE_OPENMETRICS if openmetrics else CONTENT_TYPE_TEXT
+                    self.send_response(200)
+                elif path == '/':
+                    body = '<html><body><a href="/metrics">metrics</a></body></html>'.encode('utf-8')
+                    content_type = 'text/html; charset=utf-8'
+                    self.send_response(200)
+                else:
+                    body = b'not found\n'
+                    content_type = 'text/plain; charset=utf-8'
+                    self.send_response(404)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((self.host, self.port), Handler)
+        server.daemon_threads = True
+        return server
+
+    def start(self):
+        """订阅路由变化，读取一次路由，开始提供HTTP服务（后台线程）"""
+        # 先订阅再读取，避免遗漏期间的变化
+        if self.watch and not is_windows():
+            try:
+                import netlink
+                self._watcher = netlink.RouteWatcher(self._on_route_events).start()
+            except (ImportError, OSError) as e:
+                self.log(f"无法订阅路由变化，改为每 {self.interval} 秒读取一次: {e}")
+
+        self.metrics.refresh()
+        self._server = self._make_server()
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        self.log(f"指标服务已启动: http://{self.host}:{self.port}/metrics")
+        return self
+
+    def run(self):
+        """在当前线程中循环：路由变化或定期重新读取，直到 stop()"""
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            if self._stopped.is_set():
+                break
+            if self._wakeup.is_set():
+                # 等待一批修改结束
+                self._stopped.wait(CHANGE_DELAY)
+            self._wakeup.clear()
+            try:
+                self.metrics.refresh()
+            except Exception as e:
+                self.log(f"更新指标失败: {e}")
+
+    def stop(self):
+        """停止刷新和HTTP服务"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+并发采集 - 同时执行路由表、接口、ipconfig 等探测，总耗时取决于最慢的一项
+
+探测在后台线程的 asyncio 事件循环中运行：
+命令探测通过 asyncio.create_subprocess_exec 执行（不经过shell），输出在线程池中解析；
+函数探测（如流式解析 route print、netlink 转储）在线程池中执行。
+同一批探测共用一个截止时间，并可以整体取消；取消或超时时命令探测的进程会被结束，
+函数探测无法中断，其结果被丢弃。
+asyncio 在第一次提交探测时才导入，不占用程序启动时间。
+"""
+
+import subprocess
+import threading
+
+# 一批探测的默认截止时间（秒）
+PROBE_TIMEOUT = 10
+
+
+class Probe:
+    """一项探测：命令（argv，输出交给 parse 解析）或阻塞函数（func）"""
+
+    def __init__(self, name, argv=None, parse=None, func=None, encoding='utf-8'):
+        if (argv is None) == (func is None):
+            raise ValueError("探测需要指定命令或函数之一")
+        self.name = name
+        self.argv = argv
+        self.parse = parse
+        self.func = func
+        self.encoding = encoding
+
+
+async def _run_command(probe, loop):
+    """执行命令探测，返回解析结果（未指定 parse 时返回输出文本）"""
+    import asyncio
+
+    process = await asyncio.create_subprocess_exec(*probe.argv,
+                                                   stdout=asyncio.subprocess.PIPE,
+                                                   stderr=asyncio.subprocess.PIPE)
+    try:
+        stdout, stderr = await process.communicate()
+    finally:
+        # 取消或超时时结束进程
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, probe.argv,
+                                            stderr=stderr.decode(probe.encoding, errors='ignore'))
+
+    output = stdout.decode(probe.encoding, errors='ignore')
+    if probe.parse is None:
+        return output
+    return await loop.run_in_executor(None, probe.parse, output)
+
+
+async def _run_probe(probe):
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    if probe.func is not None:
+        return await loop.run_in_executor(None, probe.func)
+    return await _run_command(probe, loop)
+
+
+async def collect(probes, timeout=PROBE_TIMEOUT):
+    """并发执行一批探测，返回 {名称: 结果或异常}
+
+    timeout 秒内未完成的探测被取消，结果为 subprocess.TimeoutExpired；
+    collect 本身被取消时所有探测一起取消。
+    """
+    import asyncio
+
+    tasks = {probe.name: asyncio.ensure_future(_run_probe(probe)) for probe in probes}
+    if not tasks:
+        return {}
+
+    try:
+        _done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+    except asyncio.CancelledError:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.wait(tasks.values())
+        raise
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        # 等待被取消的命令探测结束进程
+        await asyncio.wait(pending)
+
+    results = {}
+    for name, task in tasks.items():
+        if task in pending:
+            results[name] = subprocess.TimeoutExpired(name, timeout)
+        elif task.exception() is not None:
+            results[name] = task.exception()
+        else:
+            results[name] = task.result()
+    return results
+
+
+class ProbeCollector:
+    """在后台线程的 asyncio 事件循环中执行成批的探测"""
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self):
+        import asyncio
+
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name="probe-collector", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, probes, callback, timeout=PROBE_TIMEOUT):
+        """提交一批探测，全部结束或超时后以 {名称: 结果或异常} 调用 callback
+
+        callback 在采集线程中调用，图形界面中应通过 root.after 切回主线程。
+        返回 concurrent.futures.Future，调用其 cancel() 取消整批探测（取消后不再调用 callback）。
+        """
+        import asyncio
+
+        future = asyncio.run_coroutine_threadsafe(collect(probes, timeout), self._get_loop())
+
+        def done(future):
+            if not future.cancelled():
+                callback(future.result())
+
+        future.add_done_callback(done)
+        return future
+
+    def close(self):
+        """停止事件循环"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+热路径性能记录 - 按阶段记录读取、解析、显示路由的耗时
+
+每个阶段（启动子进程、读取命令输出、解析、缓存查找、表格差异/插入、枚举接口等）
+记录墙钟时间、CPU时间（当前线程）和处理的行数。阶段可以嵌套：外层阶段的“自身耗时”
+不含内层阶段，例如流式解析 route print 时解析的自身耗时不含等待命令输出的时间。
+记录结果可以汇总显示（图形界面的“性能”窗口），也可以保存为JSON或
+Chrome跟踪文件（chrome://tracing、Perfetto 打开）。
+
+cProfile 是可选的函数级分析，开销较大，只在需要时对单次加载开启。
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+# 阶段名称
+STAGE_LOAD = 'load'
+STAGE_CACHE = 'cache'
+STAGE_SPAWN = 'spawn'
+STAGE_READ = 'read'
+STAGE_PARSE = 'parse'
+STAGE_RENDER = 'render'
+STAGE_INTERFACES = 'interfaces'
+STAGE_SNAPSHOT = 'snapshot'
+
+STAGE_LABELS = {
+    STAGE_LOAD: '加载路由（合计）',
+    STAGE_CACHE: '缓存查找',
+    STAGE_SPAWN: '启动子进程',
+    STAGE_READ: '读取输出/转储',
+    STAGE_PARSE: '解析',
+    STAGE_RENDER: '表格差异/插入',
+    STAGE_INTERFACES: '枚举接口',
+    STAGE_SNAPSHOT: '保存快照',
+}
+
+# 保留的最近记录条数（Chrome跟踪文件中的事件）
+MAX_SPANS = 5000
+
+
+class Span:
+    """一次阶段记录"""
+
+    __slots__ = ('stage', 'start', 'wall', 'cpu', 'self_wall', 'self_cpu', 'rows', 'thread')
+
+    def __init__(self, stage, start, wall, cpu, self_wall, self_cpu, rows, thread):
+        self.stage = stage
+        self.start = start
+        self.wall = wall
+        self.cpu = cpu
+        self.self_wall = self_wall
+        self.self_cpu = self_cpu
+        self.rows = rows
+        self.thread = thread
+
+    def to_dict(self):
+        return {'stage': self.stage, 'start': self.start, 'wall': self.wall, 'cpu': self.cpu,
+                'self_wall': self.self_wall, 'self_cpu': self.self_cpu, 'rows': self.rows,
+                'thread': self.thread}
+
+
+class StageStats:
+    """一个阶段的汇总"""
+
+    __slots__ = ('stage', 'count', 'wall', 'cpu', 'self_wall', 'self_cpu', 'rows', 'last_wall')
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.count = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.self_wall = 0.0
+        self.self_cpu = 0.0
+        self.rows = 0
+        self.last_wall = 0.0
+
+    @property
+    def label(self):
+        return STAGE_LABELS.get(self.stage, self.stage)
+
+    def to_dict(self):
+        return {'stage': self.stage, 'label': self.label, 'count': self.count, 'wall': self.wall,
+                'cpu': self.cpu, 'self_wall': self.self_wall, 'self_cpu': self.self_cpu,
+                'rows': self.rows, 'last_wall': self.last_wall}
+
+
+class _SpanContext:
+    """profiler.span() 返回的上下文；在 with 块中设置 rows 记录处理的行数"""
+
+    __slots__ = ('_profiler', 'stage', 'rows', '_start', '_cpu', 'child_wall', 'child_cpu')
+
+    def __init__(self, profiler, stage, rows):
+        self._profiler = profiler
+        self.stage = stage
+        self.rows = rows
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+
+    def __enter__(self):
+        self._profiler._stack().append(self)
+        self._cpu = time.thread_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._start
+        cpu = time.thread_time() - self._cpu
+        stack = self._profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].child_wall += wall
+            stack[-1].child_cpu += cpu
+        self._profiler._record(self.stage, self._start, wall, cpu,
+                               wall - self.child_wall, cpu - self.child_cpu, self.rows)
+        return False
+
+
+class Profiler:
+    """按阶段记录耗时，线程安全；enabled 为 False 时不记录"""
+
+    def __init__(self, max_spans=MAX_SPANS):
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        self._spans = deque(maxlen=max_spans)
+        self._stats = {}
+        self._cprofile_lock = threading.Lock()
+        self.last_cprofile = None
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, stage, start, wall, cpu, self_wall, self_cpu, rows):
+        if not self.enabled:
+            return
+        span = Span(stage, start - self._origin, wall, cpu, self_wall, self_cpu, rows,
+                    threading.get_ident())
+        with self._lock:
+            self._spans.append(span)
+            stats = self._stats.get(stage)
+            if stats is None:
+                stats = self._stats[stage] = StageStats(stage)
+            stats.count += 1
+            stats.wall += wall
+            stats.cpu += cpu
+            stats.self_wall += self_wall
+            stats.self_cpu += self_cpu
+            stats.rows += rows or 0
+            stats.last_wall = wall
+
+    def span(self, stage, rows=None):
+        """记录 with 块的耗时：with profiler.span(STAGE_PARSE) as span: ...; span.rows = n"""
+        return _SpanContext(self, stage, rows)
+
+    def add(self, stage, start, wall, cpu=0.0, rows=None):
+        """记录在别处累计的耗时（如分批读取命令输出的总等待时间）
+
+        start 为 time.perf_counter() 的值；计入当前线程正在记录的外层阶段的内层耗时。
+        """
+        stack = self._stack()
+        if stack:
+            stack[-1].child_wall += wall
+            stack[-1].child_cpu += cpu
+        self._record(stage, start, wall, cpu, wall, cpu, rows)
+
+    def stats(self):
+        """各阶段的汇总（StageStats 副本），按 STAGE_LABELS 中的顺序"""
+        order = {stage: index for index, stage in enumerate(STAGE_LABELS)}
+        with self._lock:
+            result = []
+            for stats in self._stats.values():
+                copy = StageStats(stats.stage)
+                for name in StageStats.__slots__[1:]:
+                    setattr(copy, name, getattr(stats, name))
+                result.append(copy)
+        result.sort(key=lambda s: (order.get(s.stage, len(order)), s.stage))
+        return result
+
+    def spans(self):
+        """最近的记录（Span 列表，按结束顺序）"""
+        with self._lock:
+            return list(self._spans)
+
+    def reset(self):
+        """清除所有记录"""
+        with self._lock:
+            self._spans.clear()
+            self._stats.clear()
+        self.last_cprofile = None
+
+    def to_dict(self):
+        """汇总和最近的记录，可保存为JSON"""
+        return {'stages': [stats.to_dict() for stats in self.stats()],
+                'spans': [span.to_dict() for span in self.spans()]}
+
+    def write_json(self, path):
+        """把汇总和记录保存为JSON文件"""
+        import json
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def chrome_trace(self):
+        """Chrome跟踪格式（Trace Event Format）的事件字典，时间单位为微秒"""
+        pid = os.getpid()
+        events = []
+        for span in self.spans():
+            args = {'cpu_ms': round(span.cpu * 1000, 3), 'self_ms': round(span.self_wall * 1000, 3)}
+            if span.rows is not None:
+                args['rows'] = span.rows
+            events.append({'name': STAGE_LABELS.get(span.stage, span.stage), 'cat': span.stage, 'ph': 'X',
+                           'ts': round(span.start * 1e6, 1), 'dur': round(span.wall * 1e6, 1),
+                           'pid': pid, 'tid': span.thread, 'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        """保存为Chrome跟踪文件"""
+        import json
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+    def run_cprofile(self, func, *args, **kwargs):
+        """在 cProfile 下调用 func，分析器（cProfile.Profile）保存在 last_cprofile
+
+        同一时间只能有一个 cProfile 分析器，已有分析正在进行时直接调用 func。
+        """
+        if not self._cprofile_lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            import cProfile
+
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(func, *args, **kwargs)
+            finally:
+                self.last_cprofile = profile
+        finally:
+            self._cprofile_lock.release()
+
+
+def format_stats(stats):
+    """各阶段汇总的文本表格"""
+    lines = [f"{'阶段':<14} {'次数':>6} {'总耗时ms':>10} {'自身ms':>10} {'CPU ms':>10} {'行数':>10} {'最近ms':>10}"]
+    for s in stats:
+        lines.append(f"{s.label:<14} {s.count:>6} {s.wall * 1000:>10.1f} {s.self_wall * 1000:>10.1f} "
+                     f"{s.self_cpu * 1000:>10.1f} {s.rows:>10} {s.last_wall * 1000:>10.1f}")
+    return '\n'.join(lines)
+
+
+def format_cprofile(profile, limit=30, sort='cumulative'):
+    """cProfile 分析结果中耗时最多的函数（文本）"""
+    import io
+    import pstats
+
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+# 程序共用的记录器
+PROFILER = Profiler()
+
+
+def span(stage, rows=None):
+    """在共用的记录器中记录 with 块的耗时"""
+    return PROFILER.span(stage, rows)
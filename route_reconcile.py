@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+声明式路由配置 - 使当前路由表与期望状态文件一致
+
+期望状态文件（JSON / TOML / YAML）示例:
+
+    # routes.yaml
+    tables: [main]              # 管理的路由表，默认 main
+    scope:                      # 管理范围：范围内不在 routes 中的路由会被删除
+      - 10.0.0.0/8
+    routes:
+      - destination: 10.10.0.0/16
+        gateway: 192.168.1.1
+        metric: 10
+      - destination: 2001:db8::/32
+        interface: eth0
+
+未声明 scope 时只添加和替换，不删除任何路由，避免误删默认路由、直连路由等系统路由。
+比较以 (目标网络, 子网掩码/前缀长度, 网关, 路由表) 为键，用字典和集合运算完成，整体为 O(n)；
+修改通过 route_apply 提交。
+"""
+
+import os
+import socket
+import struct
+
+from route_core import (route_table_name, route_version, validate_route_data, get_system_routes,
+                        SNAPSHOT_MAX_AGE)
+from route_apply import ACTION_ADD, ACTION_REPLACE, ACTION_DELETE
+
+_I = struct.Struct('!I')
+
+
+class DesiredStateError(ValueError):
+    """期望状态文件格式错误"""
+
+
+def _load_document(path):
+    """按扩展名读取 JSON / TOML / YAML 文档"""
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == '.json':
+        import json
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    if extension == '.toml':
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise DesiredStateError("读取TOML文件需要 Python 3.11+ 或安装 tomli") from None
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+
+    if extension in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise DesiredStateError("读取YAML文件需要安装 PyYAML") from None
+        with open(path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)
+
+    raise DesiredStateError(f"不支持的文件格式: {extension}"
+                            f"（支持 .json/.toml/.yaml，以及路由列表 .csv/.ndjson/.jsonl/.rtab）")
+
+
+def _prefix_to_netmask(prefix):
+    return socket.inet_ntoa(_I.pack((0xffffffff << (32 - prefix)) & 0xffffffff))
+
+
+def _parse_network(text):
+    """CIDR字符串转换为 (是否IPv6, 网络整数, 前缀长度)"""
+    address, _, prefix = text.strip().partition('/')
+    ipv6 = ':' in address
+    family = socket.AF_INET6 if ipv6 else socket.AF_INET
+    bits = 128 if ipv6 else 32
+    try:
+        value = int.from_bytes(socket.inet_pton(family, address), 'big')
+        prefix = int(prefix) if prefix else bits
+    except (OSError, ValueError):
+        raise DesiredStateError(f"无效的网络地址: {text}") from None
+    if not 0 <= prefix <= bits:
+        raise DesiredStateError(f"无效的前缀长度: {text}")
+    return ipv6, value >> (bits - prefix) << (bits - prefix), prefix
+
+
+def normalize_desired_route(entry):
+    """期望状态中的一条路由转换为路由字典（与路由表字段一致）"""
+    if not isinstance(entry, dict) or not entry.get('destination'):
+        raise DesiredStateError(f"路由缺少 destination: {entry!r}")
+
+    destination = str(entry['destination']).strip()
+    netmask = str(entry.get('netmask', entry.get('prefix_length', '')) or '').strip()
+    gateway = str(entry.get('gateway', '') or '').strip() or 'On-link'
+    interface = str(entry.get('interface', '') or '').strip()
+    metric = str(entry.get('metric', '') if entry.get('metric') is not None else '').strip()
+
+    address, _, prefix = destination.partition('/')
+    if ':' in address:
+        version = "IPv6"
+        route_data = {'destination': address, 'prefix_length': prefix or netmask}
+    else:
+        version = "IPv4"
+        if prefix:
+            if not prefix.isdigit() or int(prefix) > 32:
+                raise DesiredStateError(f"无效的前缀长度: {destination}")
+            netmask = _prefix_to_netmask(int(prefix))
+        route_data = {'destination': address, 'netmask': netmask}
+
+    # 接口为接口名时不参与编号验证
+    route_data.update({'gateway': gateway, 'metric': metric,
+                       'interface': interface if interface.isdigit() else ''})
+    error = validate_route_data(route_data, version)
+    if error:
+        raise DesiredStateError(f"{destination}: {error}")
+
+    # 统一为路由表中的规范写法：网络地址、压缩的IPv6地址
+    import ipaddress
+    if version == "IPv6":
+        network = ipaddress.ip_network(f"{address}/{route_data['prefix_length']}", strict=False)
+        destination = f"{network.network_address}/{network.prefixlen}"
+        netmask = str(network.prefixlen)
+    else:
+        destination = str(ipaddress.ip_network(f"{address}/{netmask}", strict=False).network_address)
+    if gateway != 'On-link':
+        gateway = str(ipaddress.ip_address(gateway))
+
+    return {
+        'destination': destination,
+        'netmask': netmask,
+        'gateway': gateway,
+        'interface': interface,
+        'metric': metric,
+        'persistent': bool(entry.get('persistent', False)),
+        'table': str(entry.get('table', '') or '')
+    }
+
+
+class DesiredState:
+    """期望状态：路由列表、管理的路由表和管理范围"""
+
+    def __init__(self, routes, tables=('main',), scope=()):
+        self.routes = [normalize_desired_route(route) for route in routes]
+        self.tables = set(tables or ('main',))
+        self.scope = [_parse_network(network) for network in scope]
+
+    @classmethod
+    def load(cls, path):
+        """读取期望状态文件；文件内容也可以只是路由列表
+
+        .csv/.ndjson/.jsonl/.rtab 路由列表文件（list/export 的输出）逐条读取，不整体载入内存。
+        """
+        from route_io import EXTENSIONS, FORMAT_JSON, RouteFileError, iter_route_file
+
+        fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+        if fmt is not None and fmt != FORMAT_JSON:
+            try:
+                return cls(iter_route_file(path, fmt))
+            except RouteFileError as e:
+                raise DesiredStateError(str(e)) from None
+
+        document = _load_document(path)
+        if isinstance(document, list):
+            return cls(document)
+        if not isinstance(document, dict):
+            raise DesiredStateError("期望状态文件应为路由列表或包含 routes 的对象")
+
+        tables = document.get('tables', ['main'])
+        if isinstance(tables, str):
+            tables = [tables]
+        return cls(document.get('routes', []) or [], [str(table) for table in tables],
+                   document.get('scope', []) or [])
+
+    @property
+    def versions(self):
+        """期望状态涉及的协议版本"""
+        versions = {route_version(route) for route in self.routes}
+        versions.update("IPv6" if ipv6 else "IPv4" for ipv6, _network, _prefix in self.scope)
+        return sorted(versions)
+
+    def manages(self, route):
+        """当前路由是否在管理范围内（范围内不在期望状态中的路由会被删除）"""
+        if not self.scope or route_table_name(route) not in self.tables:
+            return False
+        try:
+            ipv6, network, prefix = _route_network(route)
+        except DesiredStateError:
+            return False
+
+        bits = 128 if ipv6 else 32
+        for scope_ipv6, scope_network, scope_prefix in self.scope:
+            if scope_ipv6 == ipv6 and prefix >= scope_prefix \
+                    and network >> (bits - scope_prefix) == scope_network >> (bits - scope_prefix):
+                return True
+        return False
+
+
+def _route_network(route):
+    """路由的 (是否IPv6, 网络整数, 前缀长度)"""
+    destination = route.get('destination', '')
+    if ':' in destination:
+        return _parse_network(destination)
+    try:
+        mask = _I.unpack(socket.inet_aton(route.get('netmask', '')))[0]
+    except OSError:
+        raise DesiredStateError(f"无效的子网掩码: {route.get('netmask', '')}") from None
+    return _parse_network(f"{destination}/{bin(mask).count('1')}")
+
+
+def reconcile_key(route):
+    """期望状态比较的键：(目标网络, 子网掩码/前缀长度, 网关, 路由表)，接口和跃点数是可替换的属性"""
+    return (route.get('destination', ''), route.get('netmask', ''),
+            route.get('gateway', ''), route_table_name(route))
+
+
+def plan_reconcile(desired, live_routes):
+    """计算使当前路由表与期望状态一致的修改
+
+    返回 (修改列表 [(动作, 路由, 当前路由或None)]，与 route_apply.plan_changes 格式一致, 无需修改的条数)
+    """
+    desired_routes = {reconcile_key(route): route for route in desired.routes}
+    live = {}
+    managed = set()
+    for route in live_routes:
+        key = reconcile_key(route)
+        live.setdefault(key, route)
+        if desired.manages(route):
+            managed.add(key)
+
+    desired_keys = desired_routes.keys()
+    changes = []
+    unchanged = 0
+
+    for key in desired_keys - live.keys():
+        changes.append((ACTION_ADD, desired_routes[key], None))
+
+    for key in desired_keys & live.keys():
+        route = desired_routes[key]
+        current = live[key]
+        if (route['metric'] and route['metric'] != current.get('metric', '')) or \
+                (route['interface'] and not route['interface'].isdigit()
+                 and route['interface'] != current.get('interface', '')):
+            changes.append((ACTION_REPLACE, route, dict(current)))
+        else:
+            unchanged += 1
+
+    for key in managed - desired_keys:
+        current = dict(live[key])
+        changes.append((ACTION_DELETE, current, current))
+
+    # 先删除后添加，输出顺序稳定
+    order = {ACTION_DELETE: 0, ACTION_REPLACE: 1, ACTION_ADD: 2}
+    changes.sort(key=lambda change: (order[change[0]], change[1].get('destination', '')))
+    return changes, unchanged
+
+
+def load_live_routes(desired, log=None):
+    """通过 get_system_routes 读取期望状态涉及的协议版本的当前路由"""
+    routes = []
+    for version in desired.versions:
+        # Windows下两个协议版本共用同一次 route print
+        routes.extend(get_system_routes(version, log=log, max_age=SNAPSHOT_MAX_AGE))
+    return routes
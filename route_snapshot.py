@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+路由快照 - 把最近一次读取的路由表和接口列表保存为紧凑的二进制文件
+
+程序启动时先显示快照中的数据，再在后台读取实时数据并替换，
+route print 需要数秒的主机上第一帧界面也能看到路由。
+
+文件格式（小端序）:
+    文件头  魔数 b'RTSNAP\\0\\0'、格式版本、段数、正文长度、正文的CRC32
+    正文    若干段，每段为 标签(4字节) + 长度(8字节) + 数据，数据按8字节对齐
+            META  JSON：保存时间、系统、主机名
+            IFCE  JSON：接口列表
+            RT4 / RT6  一个协议版本的路由表：行数、JSON头长度、JSON头（字符串池、
+                       无法紧凑保存的路由），之后是 RouteTable 的各列数组原始字节
+
+列数组按8字节对齐存放，读取时通过 mmap 映射文件后直接按偏移复制成数组，
+不需要逐条解析；格式版本或校验和不符的文件视为无效。
+"""
+
+import json
+import mmap
+import os
+import platform
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from route_table import COLUMN_TYPES, RouteTable
+
+SNAPSHOT_MAGIC = b'RTSNAP\0\0'
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_FILENAME = 'route_snapshot.bin'
+
+_HEADER = struct.Struct('<8sHHQI')        # magic, format version, section count, body length, crc32
+_SECTION = struct.Struct('<4sQ')          # tag, length
+_TABLE_HEADER = struct.Struct('<QI')      # row count, json length
+
+_TAG_META = b'META'
+_TAG_INTERFACES = b'IFCE'
+_TABLE_TAGS = {'IPv4': b'RT4 ', 'IPv6': b'RT6 '}
+
+
+class SnapshotError(Exception):
+    """快照文件无效（格式版本不符、校验和错误或内容损坏）"""
+
+
+def default_snapshot_path():
+    """快照文件的默认位置：Windows为 %LOCALAPPDATA%\\RouteManager，其他系统为 ~/.cache/routeconf"""
+    if sys.platform == 'win32':
+        base = os.path.join(os.environ.get('LOCALAPPDATA') or os.path.expanduser('~'), 'RouteManager')
+    else:
+        base = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'routeconf')
+    return os.path.join(base, SNAPSHOT_FILENAME)
+
+
+class Snapshot:
+    """读取到的快照：routes {协议版本: RouteTable}、interfaces 接口列表、saved_at 保存时间"""
+
+    def __init__(self, routes, interfaces, saved_at, system='', host=''):
+        self.routes = routes
+        self.interfaces = interfaces
+        self.saved_at = saved_at
+        self.system = system
+        self.host = host
+
+    def matches_host(self):
+        """是否为本机保存的快照（主目录在多台主机间共享时不使用其他主机的快照）"""
+        return self.system == platform.system() and self.host == platform.node()
+
+
+def _padding(length):
+    return b'\0' * (-length % 8)
+
+
+def _section(tag, data):
+    return _SECTION.pack(tag, len(data)) + data + _padding(len(data))
+
+
+def _column_bytes(column):
+    """列数组的小端序字节"""
+    if sys.byteorder != 'little' and column.itemsize > 1:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def pack_route_table(routes):
+    """路由表编码为字节：行数、JSON头（字符串池、无法紧凑保存的路由）和8字节对齐的各列数组"""
+    if not isinstance(routes, RouteTable):
+        routes = RouteTable(routes)
+    meta = json.dumps({
+        'strings': routes.strings(),
+        'raw': {str(index): route for index, route in routes.raw_routes().items()}
+    }, ensure_ascii=False).encode('utf-8')
+
+    parts = [_TABLE_HEADER.pack(len(routes), len(meta)), meta, _padding(_TABLE_HEADER.size + len(meta))]
+    for column in routes.columns():
+        data = _column_bytes(column)
+        parts += [data, _padding(len(data))]
+    return b''.join(parts)
+
+
+def unpack_route_table(view):
+    """由 pack_route_table 的结果（bytes 或 memoryview）还原路由表"""
+    count, meta_length = _TABLE_HEADER.unpack_from(view)
+    offset = _TABLE_HEADER.size
+    meta = json.loads(bytes(view[offset:offset + meta_length]).decode('utf-8'))
+    offset += meta_length
+    offset += -offset % 8
+
+    columns = []
+    for typecode in COLUMN_TYPES:
+        column = array(typecode)
+        length = count * column.itemsize
+        if offset + length > len(view):
+            raise SnapshotError("路由表数据不完整")
+        column.frombytes(view[offset:offset + length])
+        if sys.byteorder != 'little' and column.itemsize > 1:
+            column.byteswap()
+        columns.append(column)
+        offset += length + (-length % 8)
+
+    raw = {int(index): route for index, route in meta['raw'].items()}
+    try:
+        return RouteTable.from_columns(columns, meta['strings'], raw)
+    except ValueError as e:
+        raise SnapshotError(f"路由表数据无效: {e}")
+
+
+def save_snapshot(path, routes, interfaces=None):
+    """保存快照；routes {协议版本: 路由表或路由字典列表}，interfaces 接口字典列表
+
+    先写入同目录下的临时文件再替换，写入中途退出不会留下损坏的快照。
+    """
+    import tempfile
+
+    meta = json.dumps({'saved_at': time.time(), 'system': platform.system(),
+                       'host': platform.node()}).encode('utf-8')
+    sections = [_section(_TAG_META, meta),
+                _section(_TAG_INTERFACES, json.dumps(interfaces or [], ensure_ascii=False).encode('utf-8'))]
+    for version, table in routes.items():
+        if version in _TABLE_TAGS and table is not None:
+            sections.append(_section(_TABLE_TAGS[version], pack_route_table(table)))
+
+    body = b''.join(sections)
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(sections), len(body), zlib.crc32(body))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.route_snapshot.', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header + _padding(_HEADER.size) + body)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_snapshot(path):
+    """读取快照，文件不存在时返回 None；文件无效时抛出 SnapshotError"""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+
+    with f:
+        if os.fstat(f.fileno()).st_size < _HEADER.size:
+            raise SnapshotError("快照文件不完整")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return _parse_snapshot(view)
+            finally:
+                view.release()
+
+
+def _parse_snapshot(view):
+    magic, format_version, section_count, body_length, checksum = _HEADER.unpack_from(view)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("不是路由快照文件")
+    if format_version != SNAPSHOT_FORMAT_VERSION:
+        raise SnapshotError(f"快照格式版本不支持: {format_version}")
+
+    start = _HEADER.size + (-_HEADER.size % 8)
+    # 切片引用映射的内存，离开 with 时释放，出错时映射也能正常关闭
+    with view[start:start + body_length] as body:
+        if len(body) != body_length or zlib.crc32(body) != checksum:
+            raise SnapshotError("快照校验和错误")
+        return _parse_sections(body, section_count)
+
+
+def _parse_sections(body, section_count):
+    meta = {}
+    interfaces = []
+    routes = {}
+    versions = {tag: version for version, tag in _TABLE_TAGS.items()}
+    offset = 0
+    try:
+        for _ in range(section_count):
+            tag, length = _SECTION.unpack_from(body, offset)
+            offset += _SECTION.size
+            with body[offset:offset + length] as data:
+                if len(data) != length:
+                    raise SnapshotError("快照内容不完整")
+                if tag == _TAG_META:
+                    meta = json.loads(bytes(data).decode('utf-8'))
+                elif tag == _TAG_INTERFACES:
+                    interfaces = json.loads(bytes(data).decode('utf-8'))
+                elif tag in versions:
+                    routes[versions[tag]] = unpack_route_table(data)
+                # 未知的段（较新版本写入的可选内容）跳过
+            offset += length + (-length % 8)
+    except (struct.error, ValueError, KeyError) as e:
+        raise SnapshotError(f"快照内容损坏: {e}")
+
+    return Snapshot(routes, interfaces, meta.get('saved_at', 0),
+                    meta.get('system', ''), meta.get('host', ''))
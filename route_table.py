@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+紧凑的列式路由表 - 以整数数组代替每条路由一个字典
+
+目标地址和网关按两个64位整数保存（IPv4只用低32位），前缀长度为uint8，
+跃点数为uint32，接口名和路由表名统一驻留在字符串池中。
+界面和增删路由代码通过 RouteRow 轻量视图按字典方式读取字段。
+"""
+
+import socket
+import struct
+from array import array
+from collections.abc import Mapping
+from itertools import repeat
+
+ROUTE_FIELDS = ('destination', 'netmask', 'gateway', 'interface', 'metric', 'persistent', 'table')
+
+FLAG_PERSISTENT = 0x01
+FLAG_IPV6 = 0x02
+FLAG_ONLINK = 0x04
+
+# 跃点数的特殊取值：空值和Windows持久路由中的 "Default"
+METRIC_NONE = 0xFFFFFFFF
+METRIC_DEFAULT = 0xFFFFFFFE
+
+# 列数组的类型：目标地址高/低64位、前缀长度、网关高/低64位、跃点数、接口名编号、路由表名编号、标志
+COLUMN_TYPES = ('Q', 'Q', 'B', 'Q', 'Q', 'I', 'I', 'I', 'B')
+
+_QQ = struct.Struct('!QQ')
+_I = struct.Struct('!I')
+
+
+def _pack_address(family, address):
+    """地址字符串转换为 (高64位, 低64位)"""
+    raw = socket.inet_pton(family, address)
+    if family == socket.AF_INET:
+        return 0, _I.unpack(raw)[0]
+    return _QQ.unpack(raw)
+
+
+def _unpack_address(ipv6, high, low):
+    """(高64位, 低64位) 转换为地址字符串"""
+    if ipv6:
+        return socket.inet_ntop(socket.AF_INET6, _QQ.pack(high, low))
+    return socket.inet_ntoa(_I.pack(low))
+
+
+def _netmask_to_prefix(netmask):
+    """点分十进制子网掩码转换为前缀长度，非连续掩码返回 None"""
+    value = _I.unpack(socket.inet_aton(netmask))[0]
+    prefix = 32 - (~value & 0xffffffff).bit_length()
+    if value != (0xffffffff << (32 - prefix)) & 0xffffffff:
+        return None
+    return prefix
+
+
+def _prefix_to_netmask(prefix):
+    """前缀长度转换为点分十进制子网掩码"""
+    return socket.inet_ntoa(_I.pack((0xffffffff << (32 - prefix)) & 0xffffffff))
+
+
+# 各前缀长度对应的子网掩码
+_NETMASKS = tuple(_prefix_to_netmask(prefix) for prefix in range(33))
+
+
+class RouteRow(Mapping):
+    """RouteTable 中一行的只读视图，可像路由字典一样使用 get()/[] 读取字段"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    @property
+    def index(self):
+        return self._index
+
+    def __getitem__(self, name):
+        return self._table.field(self._index, name)
+
+    def __iter__(self):
+        return iter(ROUTE_FIELDS)
+
+    def __len__(self):
+        return len(ROUTE_FIELDS)
+
+    def __repr__(self):
+        return f"RouteRow({dict(self)!r})"
+
+    def to_dict(self):
+        """转换为普通路由字典"""
+        return dict(self)
+
+
+class RouteTable:
+    """列式路由存储
+
+    每条路由约占用42字节；无法紧凑表示的路由（例如非连续子网掩码）
+    原样保存在 _raw 中，保证读取结果与原始数据一致。
+    """
+
+    def __init__(self, routes=None):
+        self.dest_hi = array('Q')
+        self.dest_lo = array('Q')
+        self.prefix = array('B')
+        self.gw_hi = array('Q')
+        self.gw_lo = array('Q')
+        self.metric = array('I')
+        self.interface = array('I')
+        self.table = array('I')
+        self.flags = array('B')
+
+        self._strings = []
+        self._string_ids = {}
+        self._raw = {}
+
+        if routes is not None:
+            self.extend(routes)
+
+    def __len__(self):
+        return len(self.flags)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.flags)
+        if not 0 <= index < len(self.flags):
+            raise IndexError("路由行号超出范围")
+        return RouteRow(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.flags)):
+            yield RouteRow(self, index)
+
+    def _intern(self, value):
+        """字符串驻留，返回字符串池中的编号"""
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+
+    def _append_row(self, dest, prefix, gateway, interface, metric, table, flags):
+        self.dest_hi.append(dest[0])
+        self.dest_lo.append(dest[1])
+        self.prefix.append(prefix)
+        self.gw_hi.append(gateway[0])
+        self.gw_lo.append(gateway[1])
+        self.metric.append(metric)
+        self.interface.append(self._intern(interface))
+        self.table.append(self._intern(table))
+        self.flags.append(flags)
+
+    def add(self, destination, netmask, gateway, interface='', metric='', persistent=False, table=''):
+        """添加一条路由，字段含义与路由字典相同"""
+        try:
+            flags = FLAG_PERSISTENT if persistent else 0
+
+            if ':' in destination:
+                flags |= FLAG_IPV6
+                family = socket.AF_INET6
+                address, _, prefix_text = destination.partition('/')
+                prefix = int(prefix_text or netmask)
+                if not prefix_text or not 0 <= prefix <= 128 or str(prefix) != netmask:
+                    raise ValueError(destination)
+            else:
+                family = socket.AF_INET
+                address = destination
+                prefix = _netmask_to_prefix(netmask)
+                if prefix is None or _prefix_to_netmask(prefix) != netmask:
+                    raise ValueError(netmask)
+            dest = _pack_address(family, address)
+            if _unpack_address(flags & FLAG_IPV6, *dest) != address:
+                # 非规范写法无法原样还原
+                raise ValueError(address)
+
+            if gateway == 'On-link':
+                flags |= FLAG_ONLINK
+                gw = (0, 0)
+            else:
+                gw = _pack_address(family, gateway)
+                if _unpack_address(flags & FLAG_IPV6, *gw) != gateway:
+                    raise ValueError(gateway)
+
+            metric = str(metric)
+            if metric == '':
+                metric_value = METRIC_NONE
+            elif metric == 'Default':
+                metric_value = METRIC_DEFAULT
+            elif metric.isdigit() and int(metric) < METRIC_DEFAULT and str(int(metric)) == metric:
+                metric_value = int(metric)
+            else:
+                raise ValueError(metric)
+        except (OSError, ValueError):
+            self._add_raw(destination, netmask, gateway, interface, metric, persistent, table)
+            return
+
+        self._append_row(dest, prefix, gw, interface, metric_value, table, flags)
+
+    def _add_raw(self, destination, netmask, gateway, interface, metric, persistent, table):
+        """保存无法紧凑表示的路由"""
+        self._raw[len(self.flags)] = {
+            'destination': destination,
+            'netmask': netmask,
+            'gateway': gateway,
+            'interface': interface,
+            'metric': str(metric),
+            'persistent': bool(persistent),
+            'table': table
+        }
+        self._append_row((0, 0), 0, (0, 0), interface, METRIC_NONE, table,
+                         FLAG_PERSISTENT if persistent else 0)
+
+    def append(self, route):
+        """添加一条路由字典（或 RouteRow）"""
+        self.add(route.get('destination', ''), route.get('netmask', ''), route.get('gateway', ''),
+                 route.get('interface', ''), route.get('metric', ''),
+                 route.get('persistent', False), route.get('table', '') or '')
+
+    def extend(self, routes):
+        for route in routes:
+            self.append(route)
+
+    def field(self, index, name):
+        """读取指定行的字段值（字符串形式，persistent为布尔值）"""
+        raw = self._raw.get(index) if self._raw else None
+        if raw is not None:
+            return raw[name]
+
+        flags = self.flags[index]
+        ipv6 = flags & FLAG_IPV6
+
+        if name == 'destination':
+            address = _unpack_address(ipv6, self.dest_hi[index], self.dest_lo[index])
+            return f"{address}/{self.prefix[index]}" if ipv6 else address
+        if name == 'netmask':
+            return str(self.prefix[index]) if ipv6 else _prefix_to_netmask(self.prefix[index])
+        if name == 'gateway':
+            if flags & FLAG_ONLINK:
+                return 'On-link'
+            return _unpack_address(ipv6, self.gw_hi[index], self.gw_lo[index])
+        if name == 'interface':
+            return self._strings[self.interface[index]]
+        if name == 'metric':
+            metric = self.metric[index]
+            if metric == METRIC_NONE:
+                return ''
+            if metric == METRIC_DEFAULT:
+                return 'Default'
+            return str(metric)
+        if name == 'persistent':
+            return bool(flags & FLAG_PERSISTENT)
+        if name == 'table':
+            return self._strings[self.table[index]]
+        raise KeyError(name)
+
+    def rows_where(self, persistent, start=0, stop=None):
+        """返回持久/非持久路由的行号数组；start/stop 限定行号范围"""
+        want = FLAG_PERSISTENT if persistent else 0
+        flags = self.flags
+        if stop is None:
+            stop = len(flags)
+        return array('L', (index for index in range(start, stop)
+                           if flags[index] & FLAG_PERSISTENT == want))
+
+    def to_dicts(self):
+        """转换为路由字典列表"""
+        return list(self.iter_dicts())
+
+    def iter_dicts(self):
+        """逐行产出路由字典；一次解码整行，比通过 RouteRow 逐个读取字段快"""
+        strings = self._strings
+        raw_routes = self._raw
+        netmasks = _NETMASKS
+        for index, (dest_hi, dest_lo, prefix, gw_hi, gw_lo, metric, interface, table, flags) \
+                in enumerate(zip(*self.columns())):
+            if raw_routes:
+                raw = raw_routes.get(index)
+                if raw is not None:
+                    yield dict(raw)
+                    continue
+
+            ipv6 = flags & FLAG_IPV6
+            if ipv6:
+                destination = f"{_unpack_address(ipv6, dest_hi, dest_lo)}/{prefix}"
+                netmask = str(prefix)
+            else:
+                destination = socket.inet_ntoa(_I.pack(dest_lo))
+                netmask = netmasks[prefix]
+            if metric == METRIC_NONE:
+                metric = ''
+            elif metric == METRIC_DEFAULT:
+                metric = 'Default'
+            yield {
+                'destination': destination,
+                'netmask': netmask,
+                'gateway': 'On-link' if flags & FLAG_ONLINK else _unpack_address(ipv6, gw_hi, gw_lo),
+                'interface': strings[interface],
+                'metric': str(metric),
+                'persistent': bool(flags & FLAG_PERSISTENT),
+                'table': strings[table]
+            }
+
+    def columns(self):
+        """列数组（顺序与 COLUMN_TYPES 一致）"""
+        return (self.dest_hi, self.dest_lo, self.prefix, self.gw_hi, self.gw_lo,
+                self.metric, self.interface, self.table, self.flags)
+
+    def strings(self):
+        """字符串池（接口名、路由表名），按编号排列"""
+        return list(self._strings)
+
+    def raw_routes(self):
+        """无法紧凑保存的路由 {行号: 路由字典}"""
+        return dict(self._raw)
+
+    @classmethod
+    def from_columns(cls, columns, strings, raw=None):
+        """由列数组、字符串池和无法紧凑保存的路由重建路由表（columns 的顺序与 columns() 相同）"""
+        if len(columns) != len(COLUMN_TYPES):
+            raise ValueError("列数不匹配")
+        count = len(columns[-1])
+        for column, typecode in zip(columns, COLUMN_TYPES):
+            if column.typecode != typecode or len(column) != count:
+                raise ValueError("列数组类型或长度不匹配")
+
+        table = cls()
+        (table.dest_hi, table.dest_lo, table.prefix, table.gw_hi, table.gw_lo,
+         table.metric, table.interface, table.table, table.flags) = columns
+        table._strings = list(strings)
+        table._string_ids = {value: index for index, value in enumerate(table._strings)}
+        table._raw = dict(raw or {})
+        if count and (max(table.interface) >= len(table._strings)
+                      or max(table.table) >= len(table._strings)):
+            raise ValueError("字符串编号超出字符串池")
+        return table
+
+    def slice(self, start, stop):
+        """行号 [start, stop) 的路由组成的新路由表（复制列数组片段和字符串池）"""
+        stop = min(stop, len(self.flags))
+        table = RouteTable()
+        (table.dest_hi, table.dest_lo, table.prefix, table.gw_hi, table.gw_lo,
+         table.metric, table.interface, table.table, table.flags) = (column[start:stop] for column in self.columns())
+        table._strings = list(self._strings)
+        table._string_ids = dict(self._string_ids)
+        table._raw = {index - start: route for index, route in self._raw.items() if start <= index < stop}
+        return table
+
+    def row_tuples(self):
+        """每行的可哈希表示，用于比较两个路由表；可由 from_row_tuples 还原
+
+        (目标高64位, 目标低64位, 前缀长度, 网关高64位, 网关低64位, 跃点数, 接口名, 路由表名, 标志, 原始字段)，
+        原始字段只有无法紧凑保存的路由才有（按 ROUTE_FIELDS 顺序的元组），其余为 None。
+        """
+        strings = self._strings
+        rows = list(zip(self.dest_hi, self.dest_lo, self.prefix, self.gw_hi, self.gw_lo, self.metric,
+                        map(strings.__getitem__, self.interface), map(strings.__getitem__, self.table),
+                        self.flags, repeat(None)))
+        for index, raw in self._raw.items():
+            rows[index] = rows[index][:-1] + (tuple(raw[name] for name in ROUTE_FIELDS),)
+        return rows
+
+    @classmethod
+    def from_row_tuples(cls, rows):
+        """由 row_tuples 的结果重建路由表"""
+        table = cls()
+        for row in rows:
+            if row[9] is not None:
+                table._raw[len(table.flags)] = dict(zip(ROUTE_FIELDS, row[9]))
+            table._append_row((row[0], row[1]), row[2], (row[3], row[4]), row[6], row[5], row[7], row[8])
+        return table
+
+    def nbytes(self):
+        """列数组占用的字节数（不含字符串池和无法紧凑保存的路由）"""
+        return sum(column.itemsize * len(column) for column in self.columns())
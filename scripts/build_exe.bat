@@ -1,9 +1,21 @@
 @echo off
+rem Usage: build_exe.bat [onedir^|onefile]
+rem   onedir  (default) fastest startup: no unpacking to a temp folder on every launch
+rem   onefile single RouteManager.exe with a splash screen shown while it unpacks
 echo Building Route Manager executable...
 
 cd /d "%~dp0.."
 rem Change to project root directory (parent of scripts folder)
 
+set MODE=%~1
+if "%MODE%"=="" set MODE=onedir
+if /I not "%MODE%"=="onedir" if /I not "%MODE%"=="onefile" (
+    echo Unknown build mode: %MODE%
+    echo Usage: build_exe.bat [onedir^|onefile]
+    pause
+    exit /b 1
+)
+
 echo Attempting to close any running instances...
 taskkill /F /IM RouteManager.exe >nul 2>&1
 timeout /T 2 >nul
@@ -12,15 +24,25 @@ echo Cleaning previous builds...
 if exist build rmdir /s /q build >nul 2>&1
 if exist dist rmdir /s /q dist >nul 2>&1
 
-echo Building executable with PyInstaller...
-pyinstaller --onefile --windowed --name "RouteManager" --icon="icon/route_manager.ico" route_manager.py
+rem Dialogs and platform backends are imported lazily; list them so PyInstaller still bundles them
+set HIDDEN=--hidden-import route_dialogs --hidden-import windows_routes --hidden-import netlink
+
+if /I "%MODE%"=="onedir" (
+    echo Building executable with PyInstaller [onedir]...
+    pyinstaller --onedir --windowed --noconfirm --name "RouteManager" --icon="icon/route_manager.ico" %HIDDEN% route_manager.py
+    set EXE=dist\RouteManager\RouteManager.exe
+) else (
+    echo Building executable with PyInstaller [onefile + splash]...
+    pyinstaller --onefile --windowed --noconfirm --name "RouteManager" --icon="icon/route_manager.ico" --splash "icon/icon_256x256.png" %HIDDEN% route_manager.py
+    set EXE=dist\RouteManager.exe
+)
 
-if exist "dist\RouteManager.exe" (
+if exist "%EXE%" (
     echo.
     echo Build successful!
-    echo Executable created: dist\RouteManager.exe
+    echo Executable created: %EXE%
     echo Size:
-    dir "dist\RouteManager.exe" | find "RouteManager.exe"
+    dir "%EXE%" | find "RouteManager.exe"
 
     echo.
     echo Cleaning up build artifacts...
@@ -31,11 +53,11 @@ if exist "dist\RouteManager.exe" (
     echo Build complete! You can find the executable in the dist/ folder.
     echo.
     echo Testing the executable...
-    start "" "dist\RouteManager.exe"
+    start "" "%EXE%"
 ) else (
     echo.
     echo Build failed! Please check the error messages above.
 )
 
 echo.
-pause
\ No newline at end of file
+pause
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析器性能测试 - 用生成的 route print / ipconfig / ip addr 输出测试各解析器
+
+不需要Windows主机：按指定的路由条数（10 ~ 1,000,000）和适配器数量（1 ~ 2,000）
+生成英文和中文系统的模拟输出，测量每个解析器的吞吐量、峰值内存和结果持有的内存块数，
+并检查解析结果的数量与生成的数据一致。
+
+用法:
+    python tools/bench_parsers.py                          # 默认规模
+    python tools/bench_parsers.py --full                   # 包含100万条路由、2000个适配器
+    python tools/bench_parsers.py --routes 1000 --adapters 10 --locale zh
+    python tools/bench_parsers.py --filter ipconfig
+    python tools/bench_parsers.py --save-baseline base.json
+    python tools/bench_parsers.py --baseline base.json     # 比基准慢或占用内存多于容差时返回 1
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import windows_routes
+
+SEPARATOR = '=' * 75
+
+DEFAULT_ROUTES = (10, 1000, 100000)
+FULL_ROUTES = (10, 1000, 100000, 1000000)
+DEFAULT_ADAPTERS = (1, 100)
+FULL_ADAPTERS = (1, 100, 2000)
+LOCALES = ('en', 'zh')
+
+# 与基准比较时允许的相对变化
+DEFAULT_TOLERANCE = 0.25
+# 耗时差异小于此值（秒）时不视为退化，避免极小输入的计时噪声
+TIME_NOISE_FLOOR = 0.0005
+
+# route print 各段落标题和表头
+ROUTE_PRINT_TEXT = {
+    'en': {
+        'interfaces': 'Interface List',
+        'ipv4': 'IPv4 Route Table',
+        'ipv6': 'IPv6 Route Table',
+        'active': 'Active Routes:',
+        'persistent': 'Persistent Routes:',
+        'ipv4_header': 'Network Destination        Netmask          Gateway       Interface  Metric',
+        'persistent_header': '  Network Address          Netmask  Gateway Address  Metric',
+        'ipv6_header': ' If Metric Network Destination      Gateway',
+        'onlink': 'On-link',
+        'default': 'Default',
+        'none': '  None',
+    },
+    'zh': {
+        'interfaces': '接口列表',
+        'ipv4': 'IPv4 路由表',
+        'ipv6': 'IPv6 路由表',
+        'active': '活动路由:',
+        'persistent': '永久路由:',
+        'ipv4_header': '网络目标        网络掩码          网关       接口   跃点数',
+        'persistent_header': '  网络地址          网络掩码  网关地址  跃点数',
+        'ipv6_header': ' 如果跃点数网络目标      网关',
+        'onlink': '在链路上',
+        'default': '默认',
+        'none': '  无',
+    },
+}
+
+ADAPTER_NAMES = ('Intel(R) Ethernet Connection I219-LM', 'Realtek PCIe GbE Family Controller',
+                 'Hyper-V Virtual Ethernet Adapter', 'Intel(R) Wi-Fi 6 AX201 160MHz',
+                 'WireGuard Tunnel', 'TAP-Windows Adapter V9')
+
+
+def _dotted(value):
+    return f'{value >> 24 & 255}.{value >> 16 & 255}.{value >> 8 & 255}.{value & 255}'
+
+
+def _mac(rng, separator):
+    return separator.join(f'{rng.randrange(256):02x}' for _ in range(6))
+
+
+def _ipv6_route_lines(out, interface, metric, destination, gateway):
+    """IPv6路由行；目标网络超过24个字符时网关折到下一行"""
+    if len(destination) > 24:
+        out.append(f'{interface:3d} {metric:6d} {destination}')
+        out.append(f'{"":36}{gateway}')
+    else:
+        out.append(f'{interface:3d} {metric:6d} {destination:<24} {gateway}')
+
+
+def generate_route_print(routes, adapters, locale='en', seed=1):
+    """生成 route print 输出，返回 (文本, 期望结果)
+
+    路由中约60%为IPv4活动路由、10%为IPv4持久路由、30%为IPv6活动路由（含每个接口的 /128 地址路由）。
+    与实际输出一样，超过列宽的IPv6目标网络之后换行显示网关。
+    """
+    text = ROUTE_PRINT_TEXT[locale]
+    rng = random.Random(seed)
+    out = [SEPARATOR, text['interfaces']]
+    for number in range(1, adapters + 1):
+        out.append(f'{number:3d}...{_mac(rng, " ")} ......{ADAPTER_NAMES[number % len(ADAPTER_NAMES)]} #{number}')
+    out.append(f'  1...........................Software Loopback Interface 1')
+    out += [SEPARATOR, '', text['ipv4'], SEPARATOR, text['active'], text['ipv4_header']]
+
+    persistent_count = routes // 10
+    ipv6_count = max(routes * 3 // 10, min(adapters, routes))
+    ipv4_count = max(routes - persistent_count - ipv6_count, 0)
+
+    for _ in range(ipv4_count):
+        prefix = rng.randint(8, 32)
+        network = rng.getrandbits(32) >> (32 - prefix) << (32 - prefix)
+        mask = (0xffffffff << (32 - prefix)) & 0xffffffff
+        gateway = text['onlink'] if rng.random() < 0.5 else _dotted(0xc0a80001 + rng.randrange(250))
+        out.append(f'{_dotted(network):>17} {_dotted(mask):>16} {gateway:>15} '
+                   f'{_dotted(0x0a000000 + rng.randrange(max(adapters, 1))):>15} {rng.randint(1, 9999):>6}')
+    out += [SEPARATOR, text['persistent'], text['persistent_header']]
+    for _ in range(persistent_count):
+        metric = text['default'] if rng.random() < 0.5 else str(rng.randint(1, 9999))
+        out.append(f'  {_dotted(rng.getrandbits(32) & 0xffffff00):>15} {"255.255.255.0":>16} '
+                   f'{_dotted(0xc0a80001 + rng.randrange(250)):>16}  {metric}')
+    if not persistent_count:
+        out.append(text['none'])
+
+    out += [SEPARATOR, '', text['ipv6'], SEPARATOR, text['active'], text['ipv6_header']]
+    host_routes = min(adapters, ipv6_count)
+    for number in range(1, host_routes + 1):
+        # 每个接口自身地址的 /128 主机路由
+        _ipv6_route_lines(out, number, rng.randint(1, 9999), f'fe80::{rng.getrandbits(64):x}/128', text['onlink'])
+    for _ in range(ipv6_count - host_routes):
+        destination = f'2001:db8:{rng.randrange(65536):x}:{rng.randrange(65536):x}::/64'
+        gateway = text['onlink'] if rng.random() < 0.5 else f'fe80::{rng.getrandbits(16):x}'
+        _ipv6_route_lines(out, rng.randint(1, max(adapters, 1)), rng.randint(1, 9999), destination, gateway)
+    out += [SEPARATOR, text['persistent'], text['none'], SEPARATOR]
+
+    expected = {'ipv4': ipv4_count + persistent_count, 'ipv6': ipv6_count, 'interfaces': adapters + 1}
+    return '\n'.join(out), expected
+
+
+# ipconfig /all 各字段（英文、中文）
+IPCONFIG_TEXT = {
+    'en': {
+        'title': 'Windows IP Configuration',
+        'ethernet': 'Ethernet adapter',
+        'wireless': 'Wireless LAN adapter',
+        'media': '   Media State . . . . . . . . . . . : Media disconnected',
+        'suffix': '   Connection-specific DNS Suffix  . : corp.example.com',
+        'description': '   Description . . . . . . . . . . . : ',
+        'mac': '   Physical Address. . . . . . . . . : ',
+        'dhcp': '   DHCP Enabled. . . . . . . . . . . : ',
+        'yes': 'Yes',
+        'no': 'No',
+        'ipv6': '   Link-local IPv6 Address . . . . . : ',
+        'ipv4': '   IPv4 Address. . . . . . . . . . . : ',
+        'preferred': '(Preferred)',
+        'mask': '   Subnet Mask . . . . . . . . . . . : 255.255.255.0',
+        'gateway': '   Default Gateway . . . . . . . . . : ',
+        'dhcp_server': '   DHCP Server . . . . . . . . . . . : ',
+        'dns': '   DNS Servers . . . . . . . . . . . : ',
+    },
+    'zh': {
+        'title': 'Windows IP 配置',
+        'ethernet': '以太网适配器',
+        'wireless': '无线局域网适配器',
+        'media': '   媒体状态  . . . . . . . . . . . . : 媒体已断开连接',
+        'suffix': '   连接特定的 DNS 后缀 . . . . . . . : corp.example.com',
+        'description': '   描述. . . . . . . . . . . . . . . : ',
+        'mac': '   物理地址. . . . . . . . . . . . . : ',
+        'dhcp': '   DHCP 已启用 . . . . . . . . . . . : ',
+        'yes': '是',
+        'no': '否',
+        'ipv6': '   本地链接 IPv6 地址. . . . . . . . : ',
+        'ipv4': '   IPv4 地址 . . . . . . . . . . . . : ',
+        'preferred': '(首选)',
+        'mask': '   子网掩码  . . . . . . . . . . . . : 255.255.255.0',
+        'gateway': '   默认网关. . . . . . . . . . . . . : ',
+        'dhcp_server': '   DHCP 服务器 . . . . . . . . . . . : ',
+        'dns': '   DNS 服务器  . . . . . . . . . . . : ',
+    },
+}
+
+
+def generate_ipconfig(adapters, locale='en', seed=1):
+    """生成 ipconfig /all 输出，返回 (文本, 期望结果)；约20%的适配器为断开状态"""
+    text = IPCONFIG_TEXT[locale]
+    rng = random.Random(seed)
+    out = ['', text['title'], '']
+    connected = 0
+    for number in range(1, adapters + 1):
+        kind = text['wireless'] if number % 5 == 0 else text['ethernet']
+        out += [f'{kind} {number}:', '']
+        description = f'{text["description"]}{ADAPTER_NAMES[number % len(ADAPTER_NAMES)]} #{number}'
+        mac = f'{text["mac"]}{_mac(rng, "-").upper()}'
+        if rng.random() < 0.2:
+            out += [text['media'], text['suffix'], description, mac,
+                    f'{text["dhcp"]}{text["yes"]}', '']
+            continue
+
+        connected += 1
+        dhcp = rng.random() < 0.5
+        address = 0x0a000000 + number * 256 + 100
+        out += [text['suffix'], description, mac,
+                f'{text["dhcp"]}{text["yes"] if dhcp else text["no"]}',
+                f'{text["ipv6"]}fe80::{rng.getrandbits(64):x}%{number}{text["preferred"]}',
+                f'{text["ipv4"]}{_dotted(address)}{text["preferred"]}',
+                text['mask'],
+                f'{text["gateway"]}{_dotted(address - 99)}']
+        if dhcp:
+            out.append(f'{text["dhcp_server"]}{_dotted(address - 99)}')
+        out += [f'{text["dns"]}{_dotted(address - 99)}',
+                '                                       8.8.8.8', '']
+
+    return '\n'.join(out), {'ipv4_addresses': connected}
+
+
+def generate_ip_addr(adapters, seed=1):
+    """生成 ip addr show 输出，返回 (文本, 期望结果)；每个接口一个IPv4地址和一个全局IPv6地址"""
+    rng = random.Random(seed)
+    out = ['1: lo: <LOOPBACK,UP,LOWER_UP> mtu 65536 qdisc noqueue state UNKNOWN group default qlen 1000',
+           '    link/loopback 00:00:00:00:00:00 brd 00:00:00:00:00:00',
+           '    inet 127.0.0.1/8 scope host lo',
+           '       valid_lft forever preferred_lft forever',
+           '    inet6 ::1/128 scope host',
+           '       valid_lft forever preferred_lft forever']
+    for number in range(2, adapters + 2):
+        name = f'eth{number - 2}'
+        out += [f'{number}: {name}: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 1500 qdisc mq state UP group default qlen 1000',
+                f'    link/ether {_mac(rng, ":")} brd ff:ff:ff:ff:ff:ff',
+                f'    inet {_dotted(0x0a000000 + number * 256 + 100)}/24 brd {_dotted(0x0a000000 + number * 256 + 255)} scope global {name}',
+                '       valid_lft forever preferred_lft forever',
+                f'    inet6 2001:db8:{number:x}::{rng.getrandbits(16):x}/64 scope global dynamic',
+                '       valid_lft 86400sec preferred_lft 14400sec',
+                f'    inet6 fe80::{rng.getrandbits(64):x}/64 scope link',
+                '       valid_lft forever preferred_lft forever']
+    return '\n'.join(out), {'interfaces': adapters + 1, 'ipv4_addresses': adapters + 1}
+
+
+class Case:
+    """一个测试项：解析器、输入文本、结果检查"""
+
+    def __init__(self, name, parse, text, items, check):
+        self.name = name
+        self.parse = parse
+        self.text = text
+        self.lines = text.count('\n') + 1
+        self.items = items
+        self.check = check
+
+
+def _check_equal(label, actual, expected):
+    if actual != expected:
+        return f'{label} {actual}，期望 {expected}'
+    return None
+
+
+def _dialog_parser(name):
+    """设备IP信息对话框中的解析方法（不使用对话框状态，可以直接调用）"""
+    from route_dialogs import IPInfoDialog
+    method = getattr(IPInfoDialog, name)
+    return lambda output: method(None, output)
+
+
+def build_cases(route_sizes, adapter_sizes, locales, seed=1):
+    """生成全部测试项"""
+    cases = []
+    for locale in locales:
+        for routes in route_sizes:
+            adapters = min(max(routes // 500, 4), 200)
+            text, expected = generate_route_print(routes, adapters, locale, seed)
+            cases.append(Case(f'parse_windows_routes/{locale}/{routes}', windows_routes.parse_windows_routes,
+                              text, routes,
+                              lambda result, e=expected: _check_equal('IPv4路由', len(result), e['ipv4'])))
+            cases.append(Case(f'parse_windows_routes_ipv6/{locale}/{routes}',
+                              windows_routes.parse_windows_routes_ipv6, text, routes,
+                              lambda result, e=expected: _check_equal('IPv6路由', len(result), e['ipv6'])))
+
+        for adapters in adapter_sizes:
+            # 接口下拉框：route print 的接口列表和接口地址（route_core.get_system_interfaces）
+            text, expected = generate_route_print(adapters * 4, adapters, locale, seed)
+            cases.append(Case(f'windows_interfaces/{locale}/{adapters}',
+                              lambda output: windows_routes.parse_route_print_all(output).interface_list(),
+                              text, adapters,
+                              lambda result, e=expected: _check_equal('接口', len(result), e['interfaces'])))
+
+            text, expected = generate_ipconfig(adapters, locale, seed)
+            cases.append(Case(f'parse_ipconfig_output/{locale}/{adapters}', _dialog_parser('_parse_ipconfig_output'),
+                              text, adapters,
+                              lambda result, e=expected: _check_equal(
+                                  'IPv4地址', sum(len(i['ipv4_addresses']) for i in result), e['ipv4_addresses'])))
+
+    # ip addr 的输出不随系统语言变化
+    for adapters in adapter_sizes:
+        text, expected = generate_ip_addr(adapters, seed)
+        cases.append(Case(f'parse_ip_addr_output/{adapters}', _dialog_parser('_parse_ip_addr_output'),
+                          text, adapters,
+                          lambda result, e=expected: _check_equal('接口', len(result), e['interfaces'])
+                          or _check_equal('IPv4地址', sum(len(i['ipv4_addresses']) for i in result),
+                                          e['ipv4_addresses'])))
+    return cases
+
+
+def measure(case, repeat):
+    """返回 (最短耗时秒数, 峰值内存字节, 结果持有的内存块数, 检查错误)"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = case.parse(case.text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        error = case.check(result)
+        del result
+
+    # 内存单独测量一次（tracemalloc 会使解析变慢，不计入耗时）
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    result = case.parse(case.text)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    retained = sys.getallocatedblocks() - blocks
+    del result
+    return best, peak, retained, error
+
+
+def compare(name, metrics, baseline, tolerance):
+    """与基准比较，返回退化说明列表"""
+    base = baseline.get(name)
+    if base is None:
+        return []
+    problems = []
+    if (metrics['seconds'] > base['seconds'] * (1 + tolerance)
+            and metrics['seconds'] - base['seconds'] > TIME_NOISE_FLOOR):
+        problems.append(f"耗时 {base['seconds'] * 1000:.1f} -> {metrics['seconds'] * 1000:.1f} ms")
+    if metrics['peak_bytes'] > base['peak_bytes'] * (1 + tolerance):
+        problems.append(f"峰值内存 {base['peak_bytes'] / 1024:.0f} -> {metrics['peak_bytes'] / 1024:.0f} KB")
+    if metrics['blocks'] > base['blocks'] * (1 + tolerance) + 100:
+        problems.append(f"内存块 {base['blocks']} -> {metrics['blocks']}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='解析器性能测试（模拟的 route print / ipconfig / ip addr 输出）')
+    parser.add_argument('--routes', type=int, nargs='+', help=f'路由条数（默认 {" ".join(map(str, DEFAULT_ROUTES))}）')
+    parser.add_argument('--adapters', type=int, nargs='+',
+                        help=f'适配器数量（默认 {" ".join(map(str, DEFAULT_ADAPTERS))}）')
+    parser.add_argument('--locale', choices=LOCALES, action='append', help='系统语言（默认英文和中文）')
+    parser.add_argument('--full', action='store_true', help='完整规模：100万条路由、2000个适配器')
+    parser.add_argument('--filter', help='只运行名称包含此文本的测试项')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数，取最短耗时（默认 3）')
+    parser.add_argument('--seed', type=int, default=1, help='生成数据的随机种子')
+    parser.add_argument('--baseline', help='与基准文件比较，退化超过容差时返回 1')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'允许的相对退化（默认 {DEFAULT_TOLERANCE}）')
+    parser.add_argument('--save-baseline', metavar='FILE', help='把本次结果保存为基准文件')
+    args = parser.parse_args(argv)
+
+    route_sizes = args.routes or (FULL_ROUTES if args.full else DEFAULT_ROUTES)
+    adapter_sizes = args.adapters or (FULL_ADAPTERS if args.full else DEFAULT_ADAPTERS)
+    cases = build_cases(route_sizes, adapter_sizes, args.locale or LOCALES, args.seed)
+    if args.filter:
+        cases = [case for case in cases if args.filter in case.name]
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print(f'{"测试项":<40} {"行数":>9} {"耗时ms":>10} {"行/秒":>11} {"项/秒":>11} {"峰值KB":>9} {"内存块":>9}')
+    results = {}
+    failures = []
+    for case in cases:
+        seconds, peak, blocks, error = measure(case, max(args.repeat, 1))
+        metrics = {'seconds': seconds, 'peak_bytes': peak, 'blocks': blocks}
+        results[case.name] = metrics
+        print(f'{case.name:<40} {case.lines:>9} {seconds * 1000:>10.2f} {case.lines / seconds:>11.0f} '
+              f'{case.items / seconds:>11.0f} {peak / 1024:>9.0f} {blocks:>9}')
+
+        if error:
+            failures.append(f'{case.name}: 解析结果错误：{error}')
+        for problem in compare(case.name, metrics, baseline, args.tolerance):
+            failures.append(f'{case.name}: {problem}')
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f'基准已保存到 {args.save_baseline}')
+
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
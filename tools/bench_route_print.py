@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+route print 解析性能测试
+
+模拟输出与 bench_parsers.py 使用同一个生成器。
+
+用法:
+    python tools/bench_route_print.py                  # 生成约10万条路由的模拟输出
+    python tools/bench_route_print.py --routes 200000 --locale zh
+    python tools/bench_route_print.py captured.txt     # 使用抓取的 route print 输出
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from windows_routes import parse_route_print_all
+from bench_parsers import LOCALES, generate_route_print
+
+
+def bench(label, func, repeat):
+    """运行 repeat 次，返回最短耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'{label:<28} {best * 1000:9.1f} ms')
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='route print 解析性能测试')
+    parser.add_argument('input', nargs='?', help='抓取的 route print 输出文件，不指定时生成模拟输出')
+    parser.add_argument('--routes', type=int, default=100000, help='模拟路由条数（默认 100000）')
+    parser.add_argument('--interfaces', type=int, default=200, help='模拟接口数量（默认 200）')
+    parser.add_argument('--locale', choices=LOCALES, default='en', help='模拟的系统语言（默认 en）')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数，取最短耗时（默认 5）')
+    args = parser.parse_args(argv)
+
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8', errors='ignore') as f:
+            output = f.read()
+    else:
+        output, _expected = generate_route_print(args.routes, args.interfaces, args.locale)
+
+    result = parse_route_print_all(output)
+    print(f'输入 {output.count(chr(10)) + 1} 行: 接口 {len(result.interfaces)} 个，'
+          f'IPv4路由 {len(result.ipv4)} 条，IPv6路由 {len(result.ipv6)} 条')
+    bench('单遍解析（接口+IPv4+IPv6）', lambda: parse_route_print_all(output), args.repeat)
+    bench('接口列表（含接口地址）', result.interface_list, args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
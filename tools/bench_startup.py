@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动导入耗时测试
+
+在新的解释器中以 -X importtime 导入主程序模块，统计总耗时和最慢的直接导入，
+并检查应当延迟导入的模块（对话框、asyncio、平台数据源等）没有在启动时被导入。
+
+用法:
+    python tools/bench_startup.py                  # 导入 route_manager，重复5次取最短耗时
+    python tools/bench_startup.py --budget 150     # 超过150毫秒时返回非零退出码
+    python tools/bench_startup.py --module route_cli
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入主程序模块的耗时预算（毫秒）
+DEFAULT_BUDGET_MS = 200
+
+# 启动时不应导入的模块：在第一次使用时才导入
+LAZY_MODULES = ('asyncio', 'route_dialogs', 'netlink', 'windows_routes', 'tempfile')
+
+
+def measure(module):
+    """在新的解释器中导入模块，返回 (总耗时微秒, [(累计耗时微秒, 层级, 模块名)])"""
+    env = dict(os.environ)
+    # 需要写入 .pyc，否则每次都要重新编译源代码
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr}")
+
+    entries = []
+    total = None
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _self, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(cumulative), depth, name.strip()))
+        if name.strip() == module and depth == 0:
+            total = int(cumulative)
+    return total, entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='启动导入耗时测试')
+    parser.add_argument('--module', default='route_manager', help='要导入的模块（默认 route_manager）')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数，取最短耗时（默认 5）')
+    parser.add_argument('--top', type=int, default=10, help='显示最慢的直接导入数量（默认 10）')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f'耗时预算（毫秒，默认 {DEFAULT_BUDGET_MS}），超过时返回 1')
+    args = parser.parse_args(argv)
+
+    # 第一次导入写入 .pyc，不计入结果
+    measure(args.module)
+    best = None
+    for _ in range(max(args.repeat, 1)):
+        total, entries = measure(args.module)
+        if best is None or total < best[0]:
+            best = (total, entries)
+    total, entries = best
+
+    print(f'导入 {args.module}: {total / 1000:.1f} ms（{args.repeat} 次中最短）')
+    print('最慢的直接导入:')
+    direct = sorted((entry for entry in entries if entry[1] == 1), reverse=True)
+    for cumulative, _depth, name in direct[:args.top]:
+        print(f'  {name:<28} {cumulative / 1000:7.1f} ms')
+
+    status = 0
+    loaded = {name for _cumulative, _depth, name in entries}
+    eager = [name for name in LAZY_MODULES if name in loaded and name != args.module]
+    if eager:
+        print(f'应延迟导入但启动时已导入: {", ".join(eager)}')
+        status = 1
+    if total / 1000 > args.budget:
+        print(f'超出耗时预算 {args.budget:.0f} ms')
+        status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+虚拟滚动表格 - 只为可见行创建控件的大数据量路由表格
+
+数据按需从外部数据源（如 RouteTable）读取，界面上只保留与可见行数相同的Treeview行，
+滚动、排序后的重绘以及选择都只处理可见的几十行。
+逐行的增删改（如netlink实时事件）不改动数据源，而是记录在增量层中：
+修改后的显示值、新增的行和删除标记，按行标识索引，显示时与数据源合并；
+增量层过大时在下次重绘前重建一次显示顺序。
+对外提供路由管理器用到的 ttk.Treeview 接口子集，可直接替换原表格。
+"""
+
+import socket
+import tkinter as tk
+from tkinter import ttk
+from array import array
+from itertools import islice
+
+
+def sort_key(value):
+    """排序键：数字按数值、IP地址按地址字节、其余按文本排序"""
+    if value.isdigit():
+        return (0, int(value), b'')
+
+    address = value.split('/', 1)[0]
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            return (1, family, socket.inet_pton(family, address))
+        except (OSError, ValueError):
+            continue
+
+    return (2, 0, value.encode('utf-8', 'ignore'))
+
+
+class VirtualTreeview:
+    """虚拟滚动的Treeview替代品
+
+    行以稳定的行标识（与 ttk.Treeview 的 iid 含义相同）访问；
+    未实现的属性和方法转发给内部的 ttk.Treeview。
+    """
+
+    DEFAULT_ROW_HEIGHT = 22
+    # 增量层（移走/删除的行、排序插入的行）超过主序列的 1/COMPACT_RATIO 时重建显示顺序
+    COMPACT_RATIO = 16
+    COMPACT_MIN = 256
+
+    def __init__(self, parent, columns, height=20, **kwargs):
+        kwargs.setdefault('show', 'headings')
+        self.tree = ttk.Treeview(parent, columns=columns, height=height,
+                                 selectmode='browse', **kwargs)
+
+        # 数据源 (行数, key_of(行号), values_of(行号))，不复制
+        self._source = (0, str, lambda row: ())
+        self._rows = 0                  # 行号总数，含之后新增和已删除的行
+        self._index = None              # {行标识: 行号}，按需建立后随增删维护
+        self._added_keys = []           # 数据源之后新增的行（行号从数据源行数开始）
+        self._added_values = []
+        self._overrides = {}            # {行号: 修改后的显示值}
+        self._deleted = set()           # 已删除的行号
+
+        # 显示顺序 = 主序列与增量层按排序键合并；主序列中已删除或已移入增量层的行显示时跳过
+        self._order = None              # 主序列（行号数组），None表示按行号顺序
+        self._order_pos = None          # 主序列的逆排列：行号 -> 主序列中的位置
+        self._order_dirty = True        # 下次重绘前重建主序列
+        self._main_len = 0
+        self._skip = set()
+        self._extras = []               # 增量层：建立主序列后新增或排序列改变的行，按排序键排列
+        self._extra_keys = []
+        self._extra_rows = set()
+        self._main_keys = {}            # 主序列中已修改的行在主序列中的排序键
+        self._sort_index = None
+        self._sort_column = None
+        self._sort_reverse = False
+        self._heading_text = {}
+
+        # 可见区域（位置为主序列与增量层合并后的序号，跳过的行也占一个位置）
+        self._top = 0
+        self._visible = height
+        self._slots = []                # 内部Treeview中的占位行
+        self._slot_rows = []            # 每个占位行当前显示的行号
+        self._selected_key = None
+        self._yscrollcommand = None
+        self._render_pending = False
+
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self._scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda e: self._scroll_by(3))
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<Up>', lambda e: self._move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self._move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self._move_selection(-self._visible))
+        self.tree.bind('<Next>', lambda e: self._move_selection(self._visible))
+        self.tree.bind('<Home>', lambda e: self._move_selection(-self._count()))
+        self.tree.bind('<End>', lambda e: self._move_selection(self._count()))
+
+    def __getattr__(self, name):
+        return getattr(self.tree, name)
+
+    def __len__(self):
+        return self._count()
+
+    # ---- Treeview兼容接口 ----
+
+    def __setitem__(self, option, value):
+        if option == 'columns':
+            self._order_dirty = True
+        self.tree[option] = value
+
+    def __getitem__(self, option):
+        return self.tree[option]
+
+    def configure(self, **kwargs):
+        if 'yscrollcommand' in kwargs:
+            self._yscrollcommand = kwargs.pop('yscrollcommand')
+            self._update_scrollbar()
+        if kwargs:
+            return self.tree.configure(**kwargs)
+
+    config = configure
+
+    def heading(self, column, **kwargs):
+        if 'text' in kwargs:
+            self._heading_text[column] = kwargs['text']
+        if kwargs and 'command' not in kwargs:
+            kwargs['command'] = lambda c=column: self.sort_by(c)
+        return self.tree.heading(column, **kwargs)
+
+    def get_children(self, item=''):
+        return tuple(self._key(row) for row in range(self._rows) if row not in self._deleted)
+
+    def exists(self, key):
+        return key in self._get_index()
+
+    def item(self, key, option=None, **kwargs):
+        row = self._get_index()[key]
+        if 'values' in kwargs:
+            values = tuple(str(value) for value in kwargs['values'])
+            if (self._sort_index is not None and not self._order_dirty
+                    and self._values_key(values) != self._sort_value(row)):
+                # 排序列的值改变，移入增量层重新定位
+                self._unplace(row)
+                self._overrides[row] = values
+                self._place(row)
+            else:
+                self._overrides[row] = values
+            self._changed()
+            return None
+        values = tuple(self._row_values(row))
+        if option is None:
+            return {'values': values}
+        return values if option == 'values' else ''
+
+    def insert(self, parent, index, iid=None, values=()):
+        """添加一行：排序时按排序键定位，否则排在最后（不支持插入到指定位置）"""
+        positions = self._get_index()
+        if iid is None:
+            iid = f"row{self._rows}"
+        row = self._rows
+        self._rows += 1
+        self._added_keys.append(iid)
+        self._added_values.append(tuple(str(value) for value in values))
+        positions[iid] = row
+        if not self._order_dirty:
+            self._place(row)
+        self._changed()
+        return iid
+
+    def delete(self, *keys):
+        positions = self._get_index()
+        for key in keys:
+            row = positions.pop(key, None)
+            if row is None:
+                continue
+            if not self._order_dirty:
+                self._unplace(row)
+            self._deleted.add(row)
+            self._overrides.pop(row, None)
+            if key == self._selected_key:
+                self._selected_key = None
+        self._changed()
+
+    def selection(self):
+        # 数据变化时会清除已不存在的选中行
+        if self._selected_key is not None:
+            return (self._selected_key,)
+        return ()
+
+    def selection_set(self, key):
+        if isinstance(key, (tuple, list)):
+            key = key[0] if key else None
+        self._selected_key = key
+        if key is not None:
+            self.see(key)
+        self._schedule_render()
+
+    def see(self, key):
+        position = self._display_position(key)
+        if position is None:
+            return
+        if position < self._top:
+            self._top = position
+        elif position >= self._top + self._visible:
+            self._top = position - self._visible + 1
+        self._schedule_render()
+
+    def identify_row(self, y):
+        slot = self.tree.identify_row(y)
+        if slot in self._slots:
+            return self._key(self._slot_rows[self._slots.index(slot)])
+        return ''
+
+    def yview(self, *args):
+        self._ensure_order()
+        total = self._positions()
+        if not args:
+            if total == 0:
+                return (0.0, 1.0)
+            return (self._top / total, min(1.0, (self._top + self._visible) / total))
+
+        if args[0] == 'moveto':
+            self._top = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if len(args) > 2 and args[2] == 'pages':
+                step *= self._visible
+            self._top += step
+        self._render()
+
+    def yview_moveto(self, fraction):
+        self.yview('moveto', fraction)
+
+    # ---- 批量数据接口 ----
+
+    def set_rows(self, rows):
+        """用 {行标识: 显示值} 整体替换表格数据，只重绘可见行"""
+        keys = list(rows)
+        values = [tuple(str(value) for value in row_values) for row_values in rows.values()]
+        self._reset((len(keys), keys.__getitem__, values.__getitem__))
+        self._index = {key: row for row, key in enumerate(keys)}
+        if self._selected_key not in self._index:
+            self._selected_key = None
+
+    def set_source(self, length, key_of, values_of):
+        """使用外部数据源替换表格数据
+
+        length: 行数；key_of(行号) 返回行标识；values_of(行号) 返回显示值。
+        数据不会被复制，只有可见行和排序列会被读取；
+        之后通过 insert/delete/item 的修改记录在增量层中，数据源保持不变。
+        """
+        self._reset((length, key_of, values_of))
+        # 保留仍然存在的选中行
+        if self._selected_key is not None and self._selected_key not in self._get_index():
+            self._selected_key = None
+
+    def sort_by(self, column):
+        """按列排序；再次点击同一列时反向排序"""
+        columns = list(self.tree['columns'])
+        if column not in columns:
+            return
+        if self._sort_column == column:
+            self._sort_reverse = not self._sort_reverse
+        else:
+            self._sort_column = column
+            self._sort_reverse = False
+
+        for name in columns:
+            text = self._heading_text.get(name, name)
+            if name == column:
+                text += ' ▼' if self._sort_reverse else ' ▲'
+            self.tree.heading(name, text=text)
+
+        self._order_dirty = True
+        if self._selected_key is not None:
+            self.see(self._selected_key)
+        self._schedule_render()
+
+    # ---- 内部实现：数据 ----
+
+    def _reset(self, source):
+        self._source = source
+        self._rows = source[0]
+        self._index = None
+        self._added_keys = []
+        self._added_values = []
+        self._overrides = {}
+        self._deleted = set()
+        self._order_dirty = True
+        self._schedule_render()
+
+    def _count(self):
+        return self._rows - len(self._deleted)
+
+    def _key(self, row):
+        length, key_of, _values_of = self._source
+        return key_of(row) if row < length else self._added_keys[row - length]
+
+    def _row_values(self, row):
+        values = self._overrides.get(row)
+        if values is not None:
+            return values
+        length, _key_of, values_of = self._source
+        return values_of(row) if row < length else self._added_values[row - length]
+
+    def _get_index(self):
+        """{行标识: 行号}；每个数据源只完整建立一次，之后随 insert/delete 更新"""
+        if self._index is None:
+            deleted = self._deleted
+            self._index = {self._key(row): row for row in range(self._rows) if row not in deleted}
+        return self._index
+
+    def _changed(self):
+        """增删改之后：增量层过大时标记重建显示顺序，并安排重绘"""
+        if len(self._skip) + len(self._extras) > max(self.COMPACT_MIN, self._main_len // self.COMPACT_RATIO):
+            self._order_dirty = True
+        self._schedule_render()
+
+    # ---- 内部实现：显示顺序 ----
+
+    def _values_key(self, values):
+        value = values[self._sort_index] if self._sort_index < len(values) else ''
+        return sort_key(str(value))
+
+    def _sort_value(self, row):
+        """行的排序键；未排序时为行号（新增的行排在最后）"""
+        if self._sort_index is None:
+            return row
+        return self._values_key(self._row_values(row))
+
+    def _main_row(self, position):
+        return self._order[position] if self._order is not None else position
+
+    def _main_key(self, position):
+        """主序列中第 position 行建立主序列时的排序键"""
+        row = self._main_row(position)
+        key = self._main_keys.get(row)
+        return key if key is not None else self._sort_value(row)
+
+    def _main_position(self, row):
+        return self._order_pos[row] if self._order is not None else row
+
+    def _precedes(self, a, b):
+        return a > b if self._sort_reverse and self._sort_index is not None else a < b
+
+    def _bisect(self, length, key_at, key, right):
+        """按当前排序方向二分查找：right 为假时返回排在 key 之前的个数，为真时再加上与 key 相等的个数"""
+        low, high = 0, length
+        while low < high:
+            middle = (low + high) // 2
+            current = key_at(middle)
+            if self._precedes(current, key) or (right and current == key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _place(self, row):
+        """把主序列建立后新增或需要重新定位的行放入增量层"""
+        if self._sort_index is None and self._order is None and row == self._main_len:
+            # 按行号顺序显示时新增的行直接接在主序列末尾
+            self._main_len += 1
+            return
+        key = self._sort_value(row)
+        position = self._bisect(len(self._extras), self._extra_keys.__getitem__, key, True)
+        self._extras.insert(position, row)
+        self._extra_keys.insert(position, key)
+        self._extra_rows.add(row)
+
+    def _unplace(self, row):
+        """从显示顺序中移除一行：增量层中的行直接删除，主序列中的行标记为跳过"""
+        if row in self._extra_rows:
+            position = self._bisect(len(self._extras), self._extra_keys.__getitem__, self._sort_value(row), False)
+            while self._extras[position] != row:
+                position += 1
+            del self._extras[position]
+            del self._extra_keys[position]
+            self._extra_rows.discard(row)
+        elif row not in self._skip:
+            if self._sort_index is not None:
+                self._main_keys.setdefault(row, self._sort_value(row))
+            self._skip.add(row)
+
+    def _ensure_order(self):
+        """按当前排序列重建主序列并清空增量层（仅在数据源、排序列变化或增量层过大后）"""
+        if not self._order_dirty:
+            return
+        self._order_dirty = False
+        self._skip = set()
+        self._extras = []
+        self._extra_keys = []
+        self._extra_rows = set()
+        self._main_keys = {}
+
+        self._sort_index = None
+        if self._sort_column is not None:
+            columns = list(self.tree['columns'])
+            if self._sort_column in columns:
+                self._sort_index = columns.index(self._sort_column)
+            else:
+                self._sort_column = None
+
+        deleted = self._deleted
+        rows = [row for row in range(self._rows) if row not in deleted] if deleted else range(self._rows)
+        if self._sort_index is not None:
+            keys = [self._sort_value(row) for row in rows]
+            self._order = array('L', (rows[index] for index in sorted(range(len(keys)), key=keys.__getitem__,
+                                                                         reverse=self._sort_reverse)))
+        elif deleted:
+            self._order = array('L', rows)
+        else:
+            self._order = None
+        self._order_pos = None
+        if self._order is not None:
+            # 已删除的行不在主序列中，对应位置不会被读取
+            self._order_pos = array('L', [0]) * self._rows
+            for position, row in enumerate(self._order):
+                self._order_pos[row] = position
+        self._main_len = len(self._order) if self._order is not None else self._rows
+
+    def _positions(self):
+        return self._main_len + len(self._extras)
+
+    def _iter_rows(self, position):
+        """从显示位置 position 开始按显示顺序产出行号（合并主序列与增量层，跳过已删除/已移走的行）"""
+        extras = self._extras
+        keys = self._extra_keys
+        main_len = self._main_len
+        skip = self._skip
+
+        # 位置 position 之前有 i 个主序列的行和 position - i 个增量层的行
+        if extras:
+            low, high = 0, main_len
+            while low < high:
+                middle = (low + high) // 2
+                if middle + self._bisect(len(extras), keys.__getitem__, self._main_key(middle), False) >= position:
+                    high = middle
+                else:
+                    low = middle + 1
+            i, j = low, position - low
+        else:
+            i, j = position, 0
+
+        while i < main_len or j < len(extras):
+            # 排序键相同时主序列的行在前
+            if j >= len(extras) or (i < main_len and not self._precedes(keys[j], self._main_key(i))):
+                row = self._main_row(i)
+                i += 1
+                if row in skip:
+                    continue
+            else:
+                row = extras[j]
+                j += 1
+            yield row
+
+    def _display_position(self, key):
+        row = self._get_index().get(key)
+        if row is None:
+            return None
+        self._ensure_order()
+        extras = self._extras
+        if row in self._extra_rows:
+            key = self._sort_value(row)
+            j = self._bisect(len(extras), self._extra_keys.__getitem__, key, False)
+            while extras[j] != row:
+                j += 1
+            return j + self._bisect(self._main_len, self._main_key, key, True)
+        position = self._main_position(row)
+        if extras:
+            position += self._bisect(len(extras), self._extra_keys.__getitem__, self._main_key(position), False)
+        return position
+
+    # ---- 内部实现：显示 ----
+
+    def _schedule_render(self):
+        if not self._render_pending:
+            self._render_pending = True
+            self.tree.after_idle(self._render)
+
+    def _render(self):
+        """将可见范围内的数据填入占位行"""
+        self._render_pending = False
+        self._ensure_order()
+
+        self._top = max(0, min(self._top, self._positions() - self._visible))
+        rows = list(islice(self._iter_rows(self._top), self._visible))
+        count = len(rows)
+
+        # 调整占位行数量
+        while len(self._slots) < count:
+            self._slots.append(self.tree.insert('', tk.END))
+        if len(self._slots) > count:
+            self.tree.delete(*self._slots[count:])
+            del self._slots[count:]
+
+        selected_slot = None
+        self._slot_rows = rows
+        for slot, row in zip(self._slots, rows):
+            self.tree.item(slot, values=list(self._row_values(row)))
+            if self._key(row) == self._selected_key:
+                selected_slot = slot
+
+        current = self.tree.selection()
+        if selected_slot is not None:
+            if current != (selected_slot,):
+                self.tree.selection_set(selected_slot)
+        elif current:
+            self.tree.selection_remove(*current)
+
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        if self._yscrollcommand is not None:
+            first, last = self.yview()
+            self._yscrollcommand(first, last)
+
+    def _on_configure(self, event):
+        try:
+            row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or self.DEFAULT_ROW_HEIGHT)
+        except (ValueError, tk.TclError):
+            row_height = self.DEFAULT_ROW_HEIGHT
+        # 扣除表头占用的一行
+        visible = max(1, event.height // row_height - 1)
+        if visible != self._visible:
+            self._visible = visible
+            self._schedule_render()
+
+    def _on_mousewheel(self, event):
+        self._scroll_by(-3 if event.delta > 0 else 3)
+        return 'break'
+
+    def _scroll_by(self, units):
+        self._top += units
+        self._render()
+        return 'break'
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._slots:
+            self._selected_key = self._key(self._slot_rows[self._slots.index(selection[0])])
+
+    def _move_selection(self, step):
+        if self._count() == 0:
+            return 'break'
+        self._ensure_order()
+        position = self._display_position(self._selected_key) if self._selected_key is not None else None
+        if position is None:
+            position = self._top
+        else:
+            position = max(0, min(self._positions() - 1, position + step))
+        row = next(self._iter_rows(position), None)
+        while row is None and position > 0:
+            # 末尾是已删除的行，向前找
+            position -= 1
+            row = next(self._iter_rows(position), None)
+        if row is not None:
+            self._selected_key = self._key(row)
+            self.see(self._selected_key)
+        self._render()
+        return 'break'
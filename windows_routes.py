@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Windows路由数据源 - 解析 route print 输出
+
+一次 route print 的输出只扫描一遍，同时得到接口列表、IPv4和IPv6的活动/持久路由；
+IPv4/IPv6两个视图和接口列表可以共用同一次命令执行和解析结果（RoutePrint）。
+解析器是逐行处理的生成器，命令输出边到达边解析（stream_route_print），
+调用方可以在解析过程中显示已得到的路由。
+"""
+
+import re
+import subprocess
+import threading
+import time
+
+from route_profile import PROFILER, STAGE_PARSE
+from route_table import RouteTable
+
+# route print 输出的段落
+SECTION_NONE = 0
+SECTION_INTERFACES = 1
+SECTION_IPV4_ACTIVE = 2
+SECTION_IPV4_PERSISTENT = 3
+SECTION_IPV6_ACTIVE = 4
+SECTION_IPV6_PERSISTENT = 5
+
+# 流式解析时每处理多少行产出一次中间结果
+PARSE_BATCH_LINES = 2000
+
+# 段落标题（英文系统和中文系统的 route print 输出）
+_INTERFACE_LIST_TITLES = ('Interface List', '接口列表')
+_IPV4_TABLE_TITLES = ('IPv4 Route Table', 'IPv4 路由表')
+_IPV6_TABLE_TITLES = ('IPv6 Route Table', 'IPv6 路由表')
+_ACTIVE_ROUTES_TITLES = ('Active Routes:', '活动路由:')
+_PERSISTENT_ROUTES_TITLES = ('Persistent Routes:', '永久路由:')
+_IPV6_HEADER_TITLES = ('If', 'Network Destination', '如果跃点数')
+# 中文系统中的 On-link 和持久路由的默认跃点数
+_ONLINK_LOCALIZED = '在链路上'
+_DEFAULT_METRIC_LOCALIZED = '默认'
+
+_MAC_PATTERN = re.compile(r'([0-9A-Fa-f]{2}[-\s][0-9A-Fa-f]{2}[-\s][0-9A-Fa-f]{2}[-\s][0-9A-Fa-f]{2}[-\s][0-9A-Fa-f]{2}[-\s][0-9A-Fa-f]{2})')
+# 不作为接口地址显示的地址
+_IGNORED_ADDRESSES = ('::1', '127.0.0.1', '0.0.0.0', '255.255.255.255')
+
+
+def is_valid_ip_address(address):
+    """验证是否为有效的IP地址或网络地址"""
+    try:
+        # 检查是否为On-link（这是有效的网关值）
+        if address == "On-link":
+            return True
+
+        # 检查是否为有效的IPv4地址或网络
+        if '.' in address:
+            # IPv4地址验证
+            parts = address.split('.')
+            if len(parts) == 4:
+                for part in parts:
+                    if not part.isdigit() or int(part) < 0 or int(part) > 255:
+                        return False
+                return True
+            elif len(parts) <= 4:  # 可能是简化的网络地址
+                for part in parts:
+                    if not part.isdigit() or int(part) < 0 or int(part) > 255:
+                        return False
+                return True
+
+        return False
+    except:
+        return False
+
+
+def _parse_interface_line(line):
+    """解析接口列表中的一行，返回 (接口编号, 接口名称)，不是接口行时返回 None"""
+    if '....' in line:
+        parts = line.split('....', 1)  # 只分割第一个
+    elif '...' in line:
+        parts = line.split('...', 1)
+    else:
+        return None
+
+    interface_num = parts[0].strip()
+    rest_part = parts[1].strip()
+
+    # 提取真正的接口编号（去除MAC地址前缀）
+    if '...' in interface_num:
+        interface_num = interface_num.split('...')[0].strip()
+
+    # 提取接口名称
+    if '......' in rest_part:
+        interface_name = rest_part.split('......')[-1].strip()
+    else:
+        interface_name = rest_part
+
+    # 清理接口名称，移除MAC地址和其他特殊字符
+    interface_name = interface_name.lstrip('.:').strip()
+    interface_name = _MAC_PATTERN.sub('', interface_name).strip()
+    return interface_num, interface_name
+
+
+def _add_ipv6_route(routes, parts, persistent, addresses, wrapped=False):
+    """IPv6路由行：接口编号 跃点数 目标网络 [网关]；过长的目标网络会使网关折到下一行
+
+    wrapped 为真时，没有网关的行不添加而返回真，由调用方把下一行的网关补在 parts 后面再添加；
+    否则没有网关的路由记为 On-link。
+    活动路由中的 /128 直连主机路由是接口自身的地址，顺便记入 addresses {接口编号: [地址]}。
+    """
+    interface_num = parts[0]
+
+    metric = ''
+    for i, part in enumerate(parts[1:], 1):
+        if part.isdigit():
+            metric = part
+            network_parts = parts[i+1:]
+            break
+    else:
+        network_parts = parts[1:]
+
+    if not network_parts:
+        return False
+    if wrapped and len(network_parts) == 1:
+        return True
+    destination = network_parts[0]
+    gateway = network_parts[1] if len(network_parts) > 1 else 'On-link'
+    if gateway == _ONLINK_LOCALIZED:
+        gateway = 'On-link'
+
+    prefix_length = ''
+    if '/' in destination:
+        prefix_length = destination.split('/')[1]
+
+    routes.add(destination, prefix_length, gateway, interface_num, metric, persistent=persistent)
+
+    if prefix_length == '128' and gateway == 'On-link' and not persistent:
+        address = destination[:-4]
+        if address not in _IGNORED_ADDRESSES:
+            addresses.setdefault(interface_num, []).append(address)
+    return False
+
+
+class RoutePrint:
+    """一次 route print 的解析结果"""
+
+    def __init__(self):
+        # [(接口编号, 接口名称)]，按输出顺序
+        self.interfaces = []
+        self.ipv4 = RouteTable()
+        self.ipv6 = RouteTable()
+        # {接口编号: [地址]}，解析路由时一并建立
+        # IPv4路由行中的接口列是接口地址而不是接口编号，只有IPv6路由能对应到接口编号
+        self.addresses = {}
+
+    def routes(self, version="IPv4"):
+        """指定协议版本的路由（活动和持久路由）"""
+        return self.ipv4 if version == "IPv4" else self.ipv6
+
+    def interface_list(self):
+        """接口列表（与 RouteManager 接口下拉框使用的格式一致）"""
+        interfaces = []
+        for interface_num, interface_name in self.interfaces:
+            ips = []
+            for ip in self.addresses.get(interface_num, ()):
+                if ip not in ips:
+                    ips.append(ip)
+                    if len(ips) >= 2:  # 只取前2个IP
+                        break
+
+            # 构建显示名称
+            display_name = interface_name if interface_name else f"接口 {interface_num}"
+            if ips:
+                display_name += f" ({', '.join(ips)})"
+
+            interfaces.append({
+                'number': interface_num,
+                'name': interface_name if interface_name else f"接口 {interface_num}",
+                'display': f"{interface_num} - {display_name}",
+                'ips': ips,
+                'mac': None
+            })
+        return interfaces
+
+
+def iter_route_print(lines, batch_lines=PARSE_BATCH_LINES):
+    """单遍解析 route print 输出的生成器
+
+    lines 为逐行的可迭代对象（可以是正在执行的命令的输出）；每解析 batch_lines 行
+    产出一次 RoutePrint（始终是同一个对象，内容逐步增加），结束时再产出一次完整结果。
+    """
+    result = RoutePrint()
+    interfaces = result.interfaces
+    ipv4 = result.ipv4
+    ipv6 = result.ipv6
+    addresses = result.addresses
+    section = SECTION_NONE
+    family = 4
+    pending = batch_lines
+    # 网关折到下一行的IPv6路由：(parts, 是否持久路由)
+    wrapped = None
+
+    for raw_line in lines:
+        pending -= 1
+        if not pending:
+            pending = batch_lines
+            yield result
+
+        line = raw_line.strip()
+        if not line:
+            continue
+        if wrapped is not None:
+            parts, persistent = wrapped
+            wrapped = None
+            if raw_line[0].isspace() and ' ' not in line:
+                # 只有网关的续行
+                _add_ipv6_route(ipv6, parts + [line], persistent, addresses)
+                continue
+            _add_ipv6_route(ipv6, parts, persistent, addresses)
+        first = line[0]
+
+        # 路由行和接口行都以数字开头，其余行才需要判断段落标题
+        if first.isdigit():
+            if section == SECTION_IPV4_ACTIVE:
+                parts = line.split()
+                if len(parts) >= 5 and is_valid_ip_address(parts[0]):
+                    gateway = parts[2]
+                    if gateway == _ONLINK_LOCALIZED:
+                        gateway = 'On-link'
+                    ipv4.add(parts[0], parts[1], gateway, parts[3], parts[4], persistent=False)
+            elif section == SECTION_IPV4_PERSISTENT:
+                parts = line.split()
+                # 持久路由没有接口信息
+                if len(parts) >= 4 and is_valid_ip_address(parts[0]):
+                    metric = parts[3]
+                    if metric == _DEFAULT_METRIC_LOCALIZED:
+                        metric = 'Default'
+                    ipv4.add(parts[0], parts[1], parts[2], "", metric, persistent=True)
+            elif section == SECTION_IPV6_ACTIVE or section == SECTION_IPV6_PERSISTENT:
+                parts = line.split()
+                persistent = section == SECTION_IPV6_PERSISTENT
+                if len(parts) >= 3 and _add_ipv6_route(ipv6, parts, persistent, addresses, wrapped=True):
+                    wrapped = (parts, persistent)
+            elif section == SECTION_INTERFACES:
+                interface = _parse_interface_line(line)
+                if interface:
+                    interfaces.append(interface)
+            continue
+
+        if first == '=':
+            if section == SECTION_INTERFACES:
+                section = SECTION_NONE
+            continue
+        if section == SECTION_INTERFACES:
+            interface = _parse_interface_line(line)
+            if interface:
+                interfaces.append(interface)
+                continue
+        if line.startswith(_INTERFACE_LIST_TITLES):
+            section = SECTION_INTERFACES
+        elif any(title in line for title in _IPV4_TABLE_TITLES):
+            family = 4
+            section = SECTION_NONE
+        elif any(title in line for title in _IPV6_TABLE_TITLES):
+            family = 6
+            section = SECTION_IPV6_ACTIVE
+        elif line.startswith(_ACTIVE_ROUTES_TITLES):
+            section = SECTION_IPV4_ACTIVE if family == 4 else SECTION_IPV6_ACTIVE
+        elif line.startswith(_PERSISTENT_ROUTES_TITLES):
+            section = SECTION_IPV4_PERSISTENT if family == 4 else SECTION_IPV6_PERSISTENT
+        elif section in (SECTION_IPV6_ACTIVE, SECTION_IPV6_PERSISTENT) \
+                and not line.startswith(_IPV6_HEADER_TITLES):
+            # 接口编号为空等不规则的IPv6路由行
+            parts = line.split()
+            persistent = section == SECTION_IPV6_PERSISTENT
+            if len(parts) >= 3 and _add_ipv6_route(ipv6, parts, persistent, addresses, wrapped=True):
+                wrapped = (parts, persistent)
+
+    if wrapped is not None:
+        _add_ipv6_route(ipv6, *wrapped, addresses)
+    yield result
+
+
+def parse_route_print_all(output):
+    """单遍解析 route print 输出（字符串或逐行的可迭代对象），返回 RoutePrint"""
+    if isinstance(output, str):
+        output = output.split('\n')
+
+    for result in iter_route_print(output):
+        pass
+    return result
+
+
+def parse_windows_routes(output):
+    """解析Windows路由表输出，包括持久路由"""
+    return parse_route_print_all(output).ipv4
+
+
+def parse_windows_routes_ipv6(output):
+    """解析Windows IPv6路由表输出，包括持久路由"""
+    return parse_route_print_all(output).ipv6
+
+
+def parse_route_print(output, version="IPv4"):
+    """按协议版本解析 route print 输出"""
+    return parse_route_print_all(output).routes(version)
+
+
+def stream_route_print(timeout=10):
+    """执行 route print，逐行产出命令输出"""
+    from route_core import iter_command_lines
+
+    try:
+        yield from iter_command_lines(['route', 'print'], timeout=timeout, shell=False)
+    except subprocess.CalledProcessError as e:
+        raise Exception(f"执行route命令失败: {e.stderr}") from None
+
+
+# 最近一次 route print 的解析结果，供IPv4/IPv6视图和接口列表共用
+_snapshot_lock = threading.Lock()
+_snapshot = None
+_snapshot_time = 0
+# 路由被修改的次数；解析结果只在执行命令以来没有修改时复用
+_generation = 0
+_snapshot_generation = 0
+
+
+def get_route_print(max_age=0, progress=None):
+    """执行并解析 route print；max_age 秒内已有解析结果时直接复用
+
+    progress(RoutePrint): 可选回调，命令输出边到达边解析，每解析一批行调用一次
+    """
+    global _snapshot, _snapshot_time, _snapshot_generation
+
+    with _snapshot_lock:
+        if (_snapshot is not None and _snapshot_generation == _generation
+                and time.time() - _snapshot_time < max_age):
+            return _snapshot
+
+        generation = _generation
+        started = time.time()
+        # 解析的自身耗时不含启动 route 命令和等待输出的时间（分别记录）
+        with PROFILER.span(STAGE_PARSE) as span:
+            for snapshot in iter_route_print(stream_route_print()):
+                if progress:
+                    progress(snapshot)
+            span.rows = len(snapshot.ipv4) + len(snapshot.ipv6)
+        _snapshot = snapshot
+        _snapshot_time = started
+        _snapshot_generation = generation
+        return snapshot
+
+
+def invalidate_route_print():
+    """路由被修改后调用：之前执行的 route print 结果不再复用（不等待正在执行的读取）"""
+    global _generation
+    _generation += 1
+
+
+def get_windows_routes(version="IPv4", max_age=0, progress=None):
+    """读取并解析Windows路由表
+
+    progress(routes): 可选回调，解析过程中以逐步增加的 RouteTable 调用
+    """
+    if progress:
+        return get_route_print(max_age, lambda snapshot: progress(snapshot.routes(version))).routes(version)
+    return get_route_print(max_age).routes(version)